@@ -25,18 +25,12 @@ def upgrade() -> None:
     # Index on scans.website_id for faster website->scans lookups
     op.create_index('idx_scans_website_id', 'scans', ['website_id'])
     
-    # Index on issues.scan_id for faster scan->issues lookups
-    op.create_index('idx_issues_scan_id', 'issues', ['scan_id'])
-    
     # Index on pages.scan_id for faster scan->pages lookups
     op.create_index('idx_pages_scan_id', 'pages', ['scan_id'])
     
     # Index on issues.page_id for faster page->issues lookups
     op.create_index('idx_issues_page_id', 'issues', ['page_id'])
     
-    # Composite index for issues severity filtering
-    op.create_index('idx_issues_scan_severity', 'issues', ['scan_id', 'severity'])
-    
     # Index on scans.created_at for faster ordering
     op.create_index('idx_scans_created_at', 'scans', ['created_at'])
     
@@ -49,9 +43,7 @@ def downgrade() -> None:
     
     op.drop_index('idx_scans_status', table_name='scans')
     op.drop_index('idx_scans_created_at', table_name='scans')
-    op.drop_index('idx_issues_scan_severity', table_name='issues')
     op.drop_index('idx_issues_page_id', table_name='issues')
     op.drop_index('idx_pages_scan_id', table_name='pages')
-    op.drop_index('idx_issues_scan_id', table_name='issues')
     op.drop_index('idx_scans_website_id', table_name='scans')
     op.drop_index('idx_websites_client_id', table_name='websites')
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""Add per-website fetch mode
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-02-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add websites.fetch_mode (http, browser, auto); existing websites keep the browser"""
+    op.add_column('websites', sa.Column('fetch_mode', sa.String(length=20), nullable=True, server_default='browser'))
+
+
+def downgrade() -> None:
+    op.drop_column('websites', 'fetch_mode')
@@ -0,0 +1,40 @@
+"""Denormalize scan_id onto issues
+
+Revision ID: 004
+Revises: 003
+Create Date: 2025-02-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add issues.scan_id, backfill it from pages and index scan-level issue queries"""
+    op.add_column('issues', sa.Column('scan_id', sa.Integer(), nullable=True))
+    
+    # Backfill from the owning page
+    op.execute(
+        "UPDATE issues SET scan_id = (SELECT pages.scan_id FROM pages WHERE pages.id = issues.page_id)"
+    )
+    
+    op.alter_column('issues', 'scan_id', existing_type=sa.Integer(), nullable=False)
+    op.create_foreign_key('fk_issues_scan_id', 'issues', 'scans', ['scan_id'], ['id'])
+    
+    # Covering indexes for the results page: severity/type filters and per-page grouping
+    op.create_index('idx_issues_scan_severity_type', 'issues', ['scan_id', 'severity', 'type'])
+    op.create_index('idx_issues_scan_page', 'issues', ['scan_id', 'page_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_issues_scan_page', table_name='issues')
+    op.drop_index('idx_issues_scan_severity_type', table_name='issues')
+    op.drop_constraint('fk_issues_scan_id', 'issues', type_='foreignkey')
+    op.drop_column('issues', 'scan_id')
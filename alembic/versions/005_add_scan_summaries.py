@@ -0,0 +1,51 @@
+"""Add precomputed scan summaries
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-02-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create scan_summaries; existing scans are summarized lazily on first view"""
+    op.create_table(
+        'scan_summaries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('scan_id', sa.Integer(), nullable=False),
+        sa.Column('total_pages', sa.Integer(), nullable=True),
+        sa.Column('pages_with_performance_data', sa.Integer(), nullable=True),
+        sa.Column('pages_with_technical_data', sa.Integer(), nullable=True),
+        sa.Column('avg_seo_score', sa.Float(), nullable=True),
+        sa.Column('avg_performance_score', sa.Float(), nullable=True),
+        sa.Column('avg_technical_score', sa.Float(), nullable=True),
+        sa.Column('avg_mobile_score', sa.Float(), nullable=True),
+        sa.Column('schema_coverage', sa.Float(), nullable=True),
+        sa.Column('mobile_coverage', sa.Float(), nullable=True),
+        sa.Column('avg_load_time', sa.Float(), nullable=True),
+        sa.Column('avg_page_size', sa.Integer(), nullable=True),
+        sa.Column('total_issues', sa.Integer(), nullable=True),
+        sa.Column('severity_counts', sa.JSON(), nullable=True),
+        sa.Column('type_counts', sa.JSON(), nullable=True),
+        sa.Column('top_affected_urls', sa.JSON(), nullable=True),
+        sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['scan_id'], ['scans.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_scan_summaries_id', 'scan_summaries', ['id'])
+    op.create_index('ix_scan_summaries_scan_id', 'scan_summaries', ['scan_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scan_summaries_scan_id', table_name='scan_summaries')
+    op.drop_index('ix_scan_summaries_id', table_name='scan_summaries')
+    op.drop_table('scan_summaries')
@@ -0,0 +1,26 @@
+"""Extend the scan/severity/type issue index with id for keyset pagination
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-02-01 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Issue explorer pages (WHERE scan/severity/type AND id > cursor ORDER BY id) read the index in order"""
+    op.create_index('idx_issues_scan_severity_type_id', 'issues', ['scan_id', 'severity', 'type', 'id'])
+    op.drop_index('idx_issues_scan_severity_type', table_name='issues')
+
+
+def downgrade() -> None:
+    op.create_index('idx_issues_scan_severity_type', 'issues', ['scan_id', 'severity', 'type'])
+    op.drop_index('idx_issues_scan_severity_type_id', table_name='issues')
@@ -0,0 +1,25 @@
+"""Add normalized resource rows to issues
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-02-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add issues.resources; existing rows stay NULL and are parsed from element when read"""
+    op.add_column('issues', sa.Column('resources', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('issues', 'resources')
@@ -0,0 +1,44 @@
+"""Add scan-level resource index
+
+Revision ID: 008
+Revises: 007
+Create Date: 2025-02-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create scan_resources; existing scans keep their per-page blocking resource issues"""
+    op.create_table(
+        'scan_resources',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('scan_id', sa.Integer(), nullable=False),
+        sa.Column('issue_id', sa.Integer(), nullable=True),
+        sa.Column('url', sa.Text(), nullable=False),
+        sa.Column('resource_type', sa.String(length=50), nullable=False),
+        sa.Column('issue_type', sa.String(length=100), nullable=False),
+        sa.Column('details', sa.JSON(), nullable=True),
+        sa.Column('page_ids', sa.JSON(), nullable=True),
+        sa.Column('page_count', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['scan_id'], ['scans.id']),
+        sa.ForeignKeyConstraint(['issue_id'], ['issues.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_scan_resources_id', 'scan_resources', ['id'])
+    op.create_index('idx_scan_resources_scan_type', 'scan_resources', ['scan_id', 'issue_type'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_scan_resources_scan_type', table_name='scan_resources')
+    op.drop_index('ix_scan_resources_id', table_name='scan_resources')
+    op.drop_table('scan_resources')
@@ -0,0 +1,31 @@
+"""Add incremental scan validators
+
+Revision ID: 009
+Revises: 008
+Create Date: 2025-02-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add websites.incremental_scan and the per-page response validators; existing websites stay on full scans"""
+    op.add_column('websites', sa.Column('incremental_scan', sa.Boolean(), nullable=True, server_default=sa.false()))
+    op.add_column('pages', sa.Column('html_hash', sa.String(length=64), nullable=True))
+    op.add_column('pages', sa.Column('etag', sa.String(length=255), nullable=True))
+    op.add_column('pages', sa.Column('last_modified', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('pages', 'last_modified')
+    op.drop_column('pages', 'etag')
+    op.drop_column('pages', 'html_hash')
+    op.drop_column('websites', 'incremental_scan')
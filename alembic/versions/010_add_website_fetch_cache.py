@@ -0,0 +1,25 @@
+"""Add per-website fetch cache policy
+
+Revision ID: 010
+Revises: 009
+Create Date: 2025-02-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add websites.fetch_cache_max_age; null keeps existing websites fetching every page live"""
+    op.add_column('websites', sa.Column('fetch_cache_max_age', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('websites', 'fetch_cache_max_age')
@@ -0,0 +1,43 @@
+"""Add content-addressed raw HTML snapshots
+
+Revision ID: 011
+Revises: 010
+Create Date: 2025-02-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create html_snapshots and websites.store_html_snapshots; snapshots are kept only for websites that opt in"""
+    op.create_table(
+        'html_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('codec', sa.String(length=10), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_html_snapshots_id', 'html_snapshots', ['id'])
+    op.create_index('ix_html_snapshots_content_hash', 'html_snapshots', ['content_hash'], unique=True)
+    # Pages are matched to snapshots (and orphaned snapshots found) by hash
+    op.create_index('ix_pages_html_hash', 'pages', ['html_hash'])
+    op.add_column('websites', sa.Column('store_html_snapshots', sa.Boolean(), nullable=True, server_default=sa.false()))
+
+
+def downgrade() -> None:
+    op.drop_column('websites', 'store_html_snapshots')
+    op.drop_index('ix_pages_html_hash', table_name='pages')
+    op.drop_index('ix_html_snapshots_content_hash', table_name='html_snapshots')
+    op.drop_index('ix_html_snapshots_id', table_name='html_snapshots')
+    op.drop_table('html_snapshots')
@@ -0,0 +1,29 @@
+"""Add sitemap snapshot validators for conditional sitemap fetching
+
+Revision ID: 012
+Revises: 011
+Create Date: 2025-02-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add ETag and parent index lastmod to sitemap snapshots, looked up per website and sitemap URL"""
+    op.add_column('sitemap_snapshots', sa.Column('etag', sa.String(length=255), nullable=True))
+    op.add_column('sitemap_snapshots', sa.Column('index_lastmod', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('idx_sitemap_snapshots_website_url', 'sitemap_snapshots', ['website_id', 'sitemap_url'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_sitemap_snapshots_website_url', table_name='sitemap_snapshots')
+    op.drop_column('sitemap_snapshots', 'index_lastmod')
+    op.drop_column('sitemap_snapshots', 'etag')
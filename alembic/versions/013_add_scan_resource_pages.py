@@ -0,0 +1,65 @@
+"""Store scan resource page references as rows
+
+Revision ID: 013
+Revises: 012
+Create Date: 2025-02-20 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create scan_resource_pages from the scan_resources.page_ids lists, then drop the lists"""
+    op.create_table(
+        'scan_resource_pages',
+        sa.Column('scan_resource_id', sa.Integer(), nullable=False),
+        sa.Column('page_id', sa.Integer(), nullable=False),
+        sa.Column('scan_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['scan_resource_id'], ['scan_resources.id']),
+        sa.ForeignKeyConstraint(['page_id'], ['pages.id']),
+        sa.ForeignKeyConstraint(['scan_id'], ['scans.id']),
+        sa.PrimaryKeyConstraint('scan_resource_id', 'page_id')
+    )
+    op.create_index('idx_scan_resource_pages_page', 'scan_resource_pages', ['page_id'])
+    op.create_index('idx_scan_resource_pages_scan', 'scan_resource_pages', ['scan_id'])
+
+    bind = op.get_bind()
+    scan_resources = sa.table(
+        'scan_resources', sa.column('id', sa.Integer()), sa.column('scan_id', sa.Integer()),
+        sa.column('page_ids', sa.JSON())
+    )
+    scan_resource_pages = sa.table(
+        'scan_resource_pages', sa.column('scan_resource_id', sa.Integer()),
+        sa.column('page_id', sa.Integer()), sa.column('scan_id', sa.Integer())
+    )
+    rows = []
+    for resource_id, scan_id, page_ids in bind.execute(
+        sa.select(scan_resources.c.id, scan_resources.c.scan_id, scan_resources.c.page_ids)
+    ):
+        rows.extend(
+            {'scan_resource_id': resource_id, 'page_id': page_id, 'scan_id': scan_id}
+            for page_id in dict.fromkeys(page_ids or [])
+        )
+        if len(rows) >= 5000:
+            bind.execute(scan_resource_pages.insert(), rows)
+            rows = []
+    if rows:
+        bind.execute(scan_resource_pages.insert(), rows)
+
+    op.drop_column('scan_resources', 'page_ids')
+
+
+def downgrade() -> None:
+    # Page references are not copied back; downgraded scans lose their resource page lists
+    op.add_column('scan_resources', sa.Column('page_ids', sa.JSON(), nullable=True))
+    op.drop_index('idx_scan_resource_pages_scan', table_name='scan_resource_pages')
+    op.drop_index('idx_scan_resource_pages_page', table_name='scan_resource_pages')
+    op.drop_table('scan_resource_pages')
@@ -21,6 +21,9 @@ celery_app.conf.update(
     task_routes={
         'app.tasks.scan_tasks.run_website_scan': {'queue': 'scans'},
         'app.tasks.scan_tasks.run_enterprise_website_scan': {'queue': 'scans'},
+        'app.tasks.scan_tasks.purge_scan_data': {'queue': 'scans'},
+        'app.tasks.scan_tasks.reanalyze_scan': {'queue': 'scans'},
+        'app.tasks.scan_tasks.generate_scan_report': {'queue': 'reports'},
         'app.tasks.monitoring_tasks.check_robots_sitemap': {'queue': 'monitoring'},
     },
     
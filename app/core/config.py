@@ -18,7 +18,29 @@ class Settings(BaseSettings):
     
     # Crawling
     max_concurrent_crawls: int = 5
+    analysis_process_pool_size: int = 0  # Page analysis worker processes (0 = analyze in-process)
     default_crawl_timeout: int = 300
+    http_fetch_timeout: float = 15.0     # Seconds per request in http/auto fetch mode
+    http_fetch_max_connections: int = 20 # Pooled HTTP/2 keep-alive connections per scan
+    fetch_cache_dir: str = "fetch_cache"  # Shared on-disk cache for websites with fetch_cache_max_age
+    fetch_cache_max_bytes: int = 2 * 1024 * 1024 * 1024  # Compressed responses kept before LRU eviction
+
+    # Streaming scan pipeline (crawl -> analyze -> persist)
+    scan_streaming_enabled: bool = True
+    scan_analysis_workers: int = 2       # Concurrent page analyses
+    scan_pipeline_queue_size: int = 10   # Max crawl results buffered between stages
+    scan_persist_batch_size: int = 10    # Pages committed per database batch
+    scan_reanalysis_chunk_size: int = 200  # Stored pages (with HTML snapshots) re-analyzed per chunk
+    near_duplicate_max_distance: int = 3  # SimHash bits within which pages are near-duplicates
+    
+    # Scan deletion
+    scan_purge_background_threshold: int = 20000  # Issues above which scans are purged by a Celery task
+    scan_purge_chunk_size: int = 500              # Pages deleted per purge transaction
+    
+    # PDF reports (generated by a Celery task, shared by API and workers)
+    report_cache_dir: str = "reports"
+    report_cache_max_bytes: int = 500 * 1024 * 1024  # Cached PDFs kept on disk before LRU eviction
+    report_job_timeout: int = 1800  # Seconds after which a pending/running report job is requeued
     
     @property
     def async_database_url(self) -> str:
@@ -1,7 +1,10 @@
 from .client import Client
 from .website import Website
 from .scan import Scan
+from .scan_summary import ScanSummary
+from .scan_resource import ScanResource, ScanResourcePage
 from .page import Page
+from .html_snapshot import HtmlSnapshot
 from .issue import Issue
 from .schedule import Schedule
 from .robots_snapshot import RobotsSnapshot
@@ -11,7 +14,11 @@ __all__ = [
     "Client",
     "Website", 
     "Scan",
+    "ScanSummary",
+    "ScanResource",
+    "ScanResourcePage",
     "Page",
+    "HtmlSnapshot",
     "Issue",
     "Schedule",
     "RobotsSnapshot",
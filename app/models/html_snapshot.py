@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from sqlalchemy.sql import func
+from app.database import Base
+
+class HtmlSnapshot(Base):
+    __tablename__ = "html_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # SHA-256 of the raw HTML; pages reference their snapshot through pages.html_hash
+    content_hash = Column(String(64), nullable=False, unique=True, index=True)
+    
+    # Compressed raw HTML
+    codec = Column(String(10), nullable=False)  # zstd, zlib
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, default=0)  # Uncompressed bytes
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
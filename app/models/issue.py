@@ -1,13 +1,19 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Index, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
 class Issue(Base):
     __tablename__ = "issues"
+    __table_args__ = (
+        # Scan-level filtering/aggregation without joining pages; trailing id serves keyset pages
+        Index('idx_issues_scan_severity_type_id', 'scan_id', 'severity', 'type', 'id'),
+        Index('idx_issues_scan_page', 'scan_id', 'page_id'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     page_id = Column(Integer, ForeignKey("pages.id"), nullable=False)
+    scan_id = Column(Integer, ForeignKey("scans.id"), nullable=False)  # Denormalized from pages.scan_id
     
     # Issue classification
     type = Column(String(100), nullable=False, index=True)  # meta_title, meta_desc, h_tags, images, etc.
@@ -18,6 +24,7 @@ class Issue(Base):
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=False)
     element = Column(Text, nullable=True)  # Specific element that has the issue
+    resources = Column(JSON, nullable=True)  # Resource rows parsed from element at write time (NULL: not normalized)
     recommendation = Column(Text, nullable=True)
     
     # Scoring impact
@@ -35,6 +35,11 @@ class Page(Base):
     # Content analysis
     word_count = Column(Integer, default=0)
     content_hash = Column(String(255), nullable=True)
+    html_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the fetched HTML (incremental scans, snapshots)
+    
+    # HTTP validators of the fetched response, sent back as conditional request headers
+    etag = Column(String(255), nullable=True)
+    last_modified = Column(String(64), nullable=True)
     
     # Scoring
     seo_score = Column(Float, default=0.0)
@@ -31,4 +31,6 @@ class Scan(Base):
     
     # Relationships
     website = relationship("Website", back_populates="scans")
-    pages = relationship("Page", back_populates="scan", cascade="all, delete-orphan")
\ No newline at end of file
+    pages = relationship("Page", back_populates="scan", cascade="all, delete-orphan")
+    summary = relationship("ScanSummary", back_populates="scan", uselist=False, cascade="all, delete-orphan")
+    resources = relationship("ScanResource", back_populates="scan", cascade="all, delete-orphan")
\ No newline at end of file
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database import Base
+
+class ScanResource(Base):
+    __tablename__ = "scan_resources"
+    __table_args__ = (
+        Index('idx_scan_resources_scan_type', 'scan_id', 'issue_type'),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    scan_id = Column(Integer, ForeignKey("scans.id"), nullable=False)
+    issue_id = Column(Integer, ForeignKey("issues.id"), nullable=True)  # The single issue stored for this resource
+    
+    # Resource identity
+    url = Column(Text, nullable=False)
+    resource_type = Column(String(50), nullable=False)  # css, javascript
+    issue_type = Column(String(100), nullable=False)  # blocking_css_resource, blocking_js_resource
+    
+    # Resource attributes, stored once per scan instead of once per page
+    details = Column(JSON, default=dict)
+    
+    # Number of pages referencing the resource (one ScanResourcePage row each)
+    page_count = Column(Integer, default=0)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    scan = relationship("Scan", back_populates="resources")
+
+
+class ScanResourcePage(Base):
+    """One page referencing a scan resource; new references are appended as rows"""
+    __tablename__ = "scan_resource_pages"
+    __table_args__ = (
+        Index('idx_scan_resource_pages_page', 'page_id'),
+        Index('idx_scan_resource_pages_scan', 'scan_id'),
+    )
+    
+    scan_resource_id = Column(Integer, ForeignKey("scan_resources.id"), primary_key=True)
+    page_id = Column(Integer, ForeignKey("pages.id"), primary_key=True)
+    scan_id = Column(Integer, ForeignKey("scans.id"), nullable=False)
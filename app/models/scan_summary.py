@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, JSON, Float
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database import Base
+
+class ScanSummary(Base):
+    __tablename__ = "scan_summaries"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    scan_id = Column(Integer, ForeignKey("scans.id"), nullable=False, unique=True, index=True)
+    
+    # Pages
+    total_pages = Column(Integer, default=0)
+    pages_with_performance_data = Column(Integer, default=0)
+    pages_with_technical_data = Column(Integer, default=0)
+    
+    # Score averages
+    avg_seo_score = Column(Float, default=0.0)
+    avg_performance_score = Column(Float, default=0.0)
+    avg_technical_score = Column(Float, default=0.0)
+    avg_mobile_score = Column(Float, default=0.0)
+    
+    # Coverage percentages
+    schema_coverage = Column(Float, default=0.0)  # Pages with schema markup
+    mobile_coverage = Column(Float, default=0.0)  # Pages with mobile_score > 70
+    
+    # Performance
+    avg_load_time = Column(Float, default=0.0)  # Seconds
+    avg_page_size = Column(Integer, default=0)  # Bytes
+    
+    # Issues
+    total_issues = Column(Integer, default=0)
+    severity_counts = Column(JSON, default=dict)  # {severity: count}
+    type_counts = Column(JSON, default=dict)  # {severity: {type: count}}
+    top_affected_urls = Column(JSON, default=dict)  # {type: [url, ...]} most affected pages per issue type
+    
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    scan = relationship("Scan", back_populates="summary")
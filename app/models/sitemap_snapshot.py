@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
 class SitemapSnapshot(Base):
     __tablename__ = "sitemap_snapshots"
+    __table_args__ = (
+        # Latest snapshot of a sitemap, read before every discovery and monitoring check
+        Index('idx_sitemap_snapshots_website_url', 'website_id', 'sitemap_url'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     website_id = Column(Integer, ForeignKey("websites.id"), nullable=False)
@@ -22,7 +26,7 @@ class SitemapSnapshot(Base):
     
     # Content analysis
     urls_list = Column(JSON, default=list)  # List of URLs found in sitemap
-    urls_with_metadata = Column(JSON, default=list)  # Detailed URL data with priority, changefreq, lastmod
+    urls_with_metadata = Column(JSON, default=list)  # [url, priority, changefreq, lastmod] per URL of a regular sitemap
     priority_distribution = Column(JSON, default=dict)  # Distribution of priority values
     changefreq_distribution = Column(JSON, default=dict)  # Distribution of changefreq values
     image_urls_count = Column(Integer, default=0)  # Count of image URLs if image sitemap
@@ -33,7 +37,9 @@ class SitemapSnapshot(Base):
     compressed_size = Column(Integer, nullable=True)  # Size if gzip compressed
     uncompressed_size = Column(Integer, nullable=True)  # Uncompressed size
     
-    last_modified = Column(DateTime(timezone=True), nullable=True)
+    last_modified = Column(DateTime(timezone=True), nullable=True)  # Last-Modified response header
+    etag = Column(String(255), nullable=True)  # ETag response header, sent back as If-None-Match
+    index_lastmod = Column(DateTime(timezone=True), nullable=True)  # <lastmod> of this sitemap in its parent index
     
     # Status
     is_accessible = Column(Boolean, default=True)
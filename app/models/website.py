@@ -18,6 +18,10 @@ class Website(Base):
     max_pages = Column(Integer, default=1000)
     max_depth = Column(Integer, default=5)
     include_external = Column(Boolean, default=False)
+    fetch_mode = Column(String(20), default="browser", server_default="browser")  # http, browser, auto
+    incremental_scan = Column(Boolean, default=False, server_default="false")  # Reuse unchanged pages of the previous scan
+    fetch_cache_max_age = Column(Integer, nullable=True)  # Seconds a cached response stays fresh (null = no fetch cache)
+    store_html_snapshots = Column(Boolean, default=False, server_default="false")  # Keep raw HTML for re-analysis
     
     # Status
     is_active = Column(Boolean, default=True)
@@ -6,6 +6,7 @@ from typing import List
 from app.database import get_db
 from app.models import Client
 from app.schemas import ClientCreate, ClientResponse, ClientUpdate
+from app.services.deletion_service import DeletionService
 
 router = APIRouter(prefix="/clients", tags=["clients"])
 
@@ -91,5 +92,4 @@ async def delete_client(
             detail="Client not found"
         )
     
-    await db.delete(db_client)
-    await db.commit()
\ No newline at end of file
+    await DeletionService(db).delete_client(client_id)
\ No newline at end of file
@@ -4,11 +4,15 @@ from fastapi.responses import HTMLResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
+from typing import Optional
+from urllib.parse import urlencode
 import os
 import logging
 
 from app.database import get_db
 from app.models import Client, Website, Scan, Page, Issue
+from app.services.deletion_service import DeletionService
+from app.services.issue_explorer_service import IssueExplorerService, IssueFilters, DEFAULT_PAGE_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -209,9 +213,8 @@ async def delete_client_htmx(
         if not client:
             raise HTTPException(status_code=404, detail="Client not found")
         
-        # Delete client
-        await db.delete(client)
-        await db.commit()
+        # Delete client with its websites, scans, pages and issues (set-based)
+        await DeletionService(db).delete_client(client_id)
         
         # Return empty content to remove the row
         return HTMLResponse(content="")
@@ -235,9 +238,8 @@ async def delete_website_htmx(
         if not website:
             raise HTTPException(status_code=404, detail="Website not found")
         
-        # Delete website
-        await db.delete(website)
-        await db.commit()
+        # Delete website with its scans, pages, issues, schedules and snapshots (set-based)
+        await DeletionService(db).delete_website(website_id)
         
         # Return empty content to remove the row
         return HTMLResponse(content="")
@@ -246,3 +248,36 @@ async def delete_website_htmx(
         raise HTTPException(status_code=400, detail="Cannot delete website")
 
 
+
+
+@router.get("/scans/{scan_id}/issues", response_class=HTMLResponse)
+async def get_scan_issue_group_htmx(
+    scan_id: int,
+    request: Request,
+    severity: Optional[str] = None,
+    type: Optional[str] = None,
+    category: Optional[str] = None,
+    url_prefix: Optional[str] = None,
+    after: Optional[int] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    db: AsyncSession = Depends(get_db)
+):
+    """One page of an issue group's resource rows; appended by the results page 'load more' button"""
+    filters = IssueFilters(severity=severity, type=type, category=category, url_prefix=url_prefix)
+    resources, next_cursor = await IssueExplorerService(db).list_resources(scan_id, filters, after, limit)
+    
+    query = {key: value for key, value in (
+        ('severity', severity), ('type', type), ('category', category), ('url_prefix', url_prefix), ('limit', limit)
+    ) if value}
+    return templates.TemplateResponse(
+        "components/partials/issue_group_page.html",
+        {
+            "request": request,
+            "severity": severity,
+            "issue_type": type,
+            "resources": resources,
+            "after": after,
+            "next_cursor": next_cursor,
+            "base_url": f"/htmx/scans/{scan_id}/issues?{urlencode(query)}"
+        }
+    )
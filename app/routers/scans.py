@@ -1,22 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
-from typing import List
-from datetime import datetime
-import tempfile
-import os
+from typing import List, Optional
+from datetime import datetime, timedelta
 
 from app.database import get_db
 from app.models import Scan, Website, Page, Issue
-from app.schemas import ScanCreate, ScanResponse, PageResponse, IssueResponse
-from app.tasks.scan_tasks import run_website_scan, run_enterprise_website_scan
-from app.services.report_service import ReportService
+from app.schemas import ScanCreate, ScanResponse, PageResponse, IssueResponse, IssueGroupsResponse, IssueExplorerPage, ScanResourcePage
+from app.tasks.scan_tasks import run_website_scan, run_enterprise_website_scan, purge_scan_data, generate_scan_report
+from app.services.report_service import REPORT_VERSION, report_state, set_report_state, cached_report_path
+from app.services.report_cache import ReportArtifactCache
+from app.services.deletion_service import DeletionService
+from app.services.issue_explorer_service import IssueExplorerService, IssueFilters, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.config import settings
 from celery import current_app as celery_app
 
 router = APIRouter(prefix="/scans", tags=["scans"])
 
+# Shown in the browser tab opened by the report links while the PDF is being generated
+REPORT_RETRY_AFTER = 3
+REPORT_PENDING_PAGE = """<!DOCTYPE html>
+<html lang="it"><head><meta charset="utf-8"><meta http-equiv="refresh" content="{retry}">
+<title>Report in preparazione</title></head>
+<body style="font-family: sans-serif; text-align: center; padding-top: 4rem;">
+<p>Il report della scansione #{scan_id} è in preparazione, il download partirà automaticamente.</p>
+</body></html>"""
+
 @router.post("/", response_model=ScanResponse, status_code=status.HTTP_201_CREATED)
 async def create_scan(
     scan: ScanCreate,
@@ -160,7 +171,7 @@ async def get_scan_issues(
     
     from sqlalchemy.orm import selectinload
     
-    query = select(Issue).join(Page).where(Page.scan_id == scan_id).options(selectinload(Issue.page))
+    query = select(Issue).where(Issue.scan_id == scan_id).options(selectinload(Issue.page))
     if severity:
         query = query.where(Issue.severity == severity)
     
@@ -170,6 +181,90 @@ async def get_scan_issues(
     issues = result.scalars().all()
     return issues
 
+@router.get("/{scan_id}/issues/groups", response_model=IssueGroupsResponse)
+async def get_scan_issue_groups(
+    scan_id: int,
+    severity: Optional[str] = None,
+    type: Optional[str] = None,
+    category: Optional[str] = None,
+    url_prefix: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Issue and affected page counts per severity and type, aggregated in SQL"""
+    scan_result = await db.execute(
+        select(Scan.id).where(Scan.id == scan_id)
+    )
+    if scan_result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scan not found"
+        )
+    
+    filters = IssueFilters(severity=severity, type=type, category=category, url_prefix=url_prefix)
+    groups = await IssueExplorerService(db).group_counts(scan_id, filters)
+    return {
+        "scan_id": scan_id,
+        "total": sum(group["count"] for group in groups),
+        "groups": groups
+    }
+
+@router.get("/{scan_id}/issues/explore", response_model=IssueExplorerPage)
+async def explore_scan_issues(
+    scan_id: int,
+    severity: Optional[str] = None,
+    type: Optional[str] = None,
+    category: Optional[str] = None,
+    url_prefix: Optional[str] = None,
+    after: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Keyset-paginated issues of a scan: pass the returned next_cursor as `after`
+    to get the following page. Cost per page does not grow with the offset.
+    """
+    scan_result = await db.execute(
+        select(Scan.id).where(Scan.id == scan_id)
+    )
+    if scan_result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scan not found"
+        )
+    
+    filters = IssueFilters(severity=severity, type=type, category=category, url_prefix=url_prefix)
+    items, next_cursor = await IssueExplorerService(db).list_issues(scan_id, filters, after, limit)
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
+    }
+
+@router.get("/{scan_id}/resources", response_model=ScanResourcePage)
+async def get_scan_resources(
+    scan_id: int,
+    issue_type: Optional[str] = None,
+    after: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """Site-wide resource index of a scan (blocking CSS/JS), keyset-paginated like the issue explorer"""
+    scan_result = await db.execute(
+        select(Scan.id).where(Scan.id == scan_id)
+    )
+    if scan_result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scan not found"
+        )
+    
+    items, next_cursor = await IssueExplorerService(db).list_scan_resources(scan_id, issue_type, after, limit)
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
+    }
+
 @router.delete("/{scan_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_scan(
     scan_id: int,
@@ -196,25 +291,17 @@ async def delete_scan(
         except Exception as e:
             print(f"Error cancelling Celery task {task_id}: {e}")
     
-    # Delete associated issues first (through pages)
-    pages_result = await db.execute(
-        select(Page).where(Page.scan_id == scan_id)
-    )
-    pages = pages_result.scalars().all()
+    deletion_service = DeletionService(db)
     
-    for page in pages:
-        # Delete issues for this page
-        issues_result = await db.execute(
-            select(Issue).where(Issue.page_id == page.id)
-        )
-        issues = issues_result.scalars().all()
-        for issue in issues:
-            await db.delete(issue)
-        await db.delete(page)
+    # Very large scans are purged in the background in chunked transactions
+    if await deletion_service.count_scan_issues(scan_id) > settings.scan_purge_background_threshold:
+        scan.status = "deleting"
+        await db.commit()
+        purge_scan_data.delay(scan_id)
+        return {"detail": "Scan deletion scheduled"}
     
-    # Delete the scan
-    await db.delete(scan)
-    await db.commit()
+    # Set-based delete of issues, pages and the scan
+    await deletion_service.delete_scan(scan_id)
     
     return {"detail": "Scan deleted successfully"}
 
@@ -273,13 +360,7 @@ async def retry_scan(
     
     return scan
 
-@router.get("/{scan_id}/report")
-async def download_scan_report(
-    scan_id: int,
-    db: AsyncSession = Depends(get_db)
-):
-    """Generate and download a PDF report for a scan"""
-    # Get scan with related data
+async def _get_reportable_scan(db: AsyncSession, scan_id: int) -> Scan:
     scan_result = await db.execute(
         select(Scan).where(Scan.id == scan_id)
     )
@@ -296,51 +377,112 @@ async def download_scan_report(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Report can only be generated for completed scans"
         )
+    return scan
+
+def _report_job_active(scan: Scan) -> bool:
+    """Whether a report job for the current version and scan run is queued or running"""
+    state = report_state(scan)
+    if state.get('status') not in ('pending', 'running') or state.get('version') != REPORT_VERSION:
+        return False
+    completed_at = scan.completed_at.isoformat() if scan.completed_at else None
+    if state.get('scan_completed_at') != completed_at:
+        return False
+    # A job that never reported back (worker lost) is requeued after the timeout
+    updated_at = datetime.fromisoformat(state['updated_at'])
+    return datetime.utcnow() - updated_at < timedelta(seconds=settings.report_job_timeout)
+
+async def _queue_report(db: AsyncSession, scan: Scan) -> None:
+    if _report_job_active(scan):
+        return
+    task = generate_scan_report.delay(scan.id)
+    set_report_state(scan, status='pending', task_id=task.id)
+    await db.commit()
+
+def _report_status(scan: Scan) -> dict:
+    state = report_state(scan)
+    if cached_report_path(scan):
+        report_status = "ready"
+    elif _report_job_active(scan):
+        report_status = state['status']
+    elif state.get('status') == 'failed' and state.get('version') == REPORT_VERSION:
+        report_status = "failed"
+    else:
+        report_status = "not_started"
+    return {
+        "scan_id": scan.id,
+        "status": report_status,
+        "report_version": REPORT_VERSION,
+        "download_url": f"/api/v1/scans/{scan.id}/report" if report_status == "ready" else None,
+        "error": state.get('error') if report_status == "failed" else None
+    }
+
+@router.post("/{scan_id}/report", status_code=status.HTTP_202_ACCEPTED)
+async def request_scan_report(
+    scan_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue PDF report generation for a scan (no-op when ready or already queued)"""
+    scan = await _get_reportable_scan(db, scan_id)
+    if not cached_report_path(scan):
+        await _queue_report(db, scan)
+    return _report_status(scan)
+
+@router.get("/{scan_id}/report/status")
+async def get_scan_report_status(
+    scan_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Report generation status: not_started, pending, running, ready or failed"""
+    scan = await _get_reportable_scan(db, scan_id)
+    return _report_status(scan)
+
+@router.get("/{scan_id}/report")
+async def download_scan_report(
+    scan_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Download the PDF report of a scan. Until the background job has built it this
+    queues the job and answers 202: a JSON status, or an auto-refreshing page for browsers.
+    """
+    scan = await _get_reportable_scan(db, scan_id)
+    pdf_path = cached_report_path(scan)
+    
+    if pdf_path is None:
+        await _queue_report(db, scan)
+        report_status = _report_status(scan)
+        headers = {"Retry-After": str(REPORT_RETRY_AFTER)}
+        if "text/html" in request.headers.get("accept", ""):
+            return HTMLResponse(
+                content=REPORT_PENDING_PAGE.format(retry=REPORT_RETRY_AFTER, scan_id=scan_id),
+                status_code=status.HTTP_202_ACCEPTED,
+                headers=headers
+            )
+        return JSONResponse(content=report_status, status_code=status.HTTP_202_ACCEPTED, headers=headers)
+    
+    # Artifacts are content-addressed: the input digest is a strong validator for the file
+    etag = f'"{report_state(scan).get("digest", "")}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    ReportArtifactCache().touch(pdf_path)
     
-    # Get website with client relationship
     website_result = await db.execute(
-        select(Website).options(selectinload(Website.client)).where(Website.id == scan.website_id)
+        select(Website.domain).where(Website.id == scan.website_id)
     )
-    website = website_result.scalar_one_or_none()
-    
-    if not website:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Associated website not found"
-        )
-    
-    # Get pages and issues
-    pages_result = await db.execute(
-        select(Page).where(Page.scan_id == scan_id)
-    )
-    pages = pages_result.scalars().all()
-    
-    issues_result = await db.execute(
-        select(Issue).join(Page).where(Page.scan_id == scan_id)
+    domain = website_result.scalar_one_or_none() or "website"
+    
+    # Filename from the scan completion date, so repeat downloads of one report match
+    completed = (scan.completed_at or datetime.now()).strftime("%Y%m%d_%H%M%S")
+    filename = f"seo_report_{domain.replace('https://', '').replace('http://', '').replace('/', '_')}_{completed}.pdf"
+    
+    # FileResponse answers Range requests (206) and If-Range against this ETag
+    return FileResponse(
+        path=pdf_path,
+        filename=filename,
+        media_type="application/pdf",
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"}
     )
-    issues = issues_result.scalars().all()
-    
-    try:
-        # Generate PDF report
-        report_service = ReportService()
-        pdf_path = report_service.generate_scan_report(scan, website, pages, issues)
-        
-        # Create filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"seo_report_{website.domain.replace('https://', '').replace('http://', '').replace('/', '_')}_{timestamp}.pdf"
-        
-        return FileResponse(
-            path=pdf_path,
-            filename=filename,
-            media_type="application/pdf",
-            background=None  # File will be deleted after response
-        )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate report: {str(e)}"
-        )
 
 @router.post("/{scan_id}/cancel", response_model=ScanResponse)
 async def cancel_scan(
@@ -383,72 +525,3 @@ async def cancel_scan(
     await db.refresh(scan)
     
     return scan
-
-@router.get("/{scan_id}/report")
-async def download_scan_report(
-    scan_id: int,
-    db: AsyncSession = Depends(get_db)
-):
-    """Generate and download a PDF report for a scan"""
-    # Get scan with related data
-    scan_result = await db.execute(
-        select(Scan).where(Scan.id == scan_id)
-    )
-    scan = scan_result.scalar_one_or_none()
-    
-    if scan is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Scan not found"
-        )
-    
-    if scan.status != "completed":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Report can only be generated for completed scans"
-        )
-    
-    # Get website with client relationship
-    website_result = await db.execute(
-        select(Website).options(selectinload(Website.client)).where(Website.id == scan.website_id)
-    )
-    website = website_result.scalar_one_or_none()
-    
-    if not website:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Associated website not found"
-        )
-    
-    # Get pages and issues
-    pages_result = await db.execute(
-        select(Page).where(Page.scan_id == scan_id)
-    )
-    pages = pages_result.scalars().all()
-    
-    issues_result = await db.execute(
-        select(Issue).join(Page).where(Page.scan_id == scan_id)
-    )
-    issues = issues_result.scalars().all()
-    
-    try:
-        # Generate PDF report
-        report_service = ReportService()
-        pdf_path = report_service.generate_scan_report(scan, website, pages, issues)
-        
-        # Create filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"seo_report_{website.domain.replace('https://', '').replace('http://', '').replace('/', '_')}_{timestamp}.pdf"
-        
-        return FileResponse(
-            path=pdf_path,
-            filename=filename,
-            media_type="application/pdf",
-            background=None  # File will be deleted after response
-        )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate report: {str(e)}"
-        )
\ No newline at end of file
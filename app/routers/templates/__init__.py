@@ -543,8 +543,7 @@ async def scans_section(request: Request, db: AsyncSession = Depends(get_db)):
             )
             .outerjoin(Website, Scan.website_id == Website.id)
             .outerjoin(Client, Website.client_id == Client.id)
-            .outerjoin(Page, Scan.id == Page.scan_id)
-            .outerjoin(Issue, Page.id == Issue.page_id)
+            .outerjoin(Issue, Scan.id == Issue.scan_id)
             .group_by(
                 Scan.id, Scan.website_id, Scan.status, Scan.pages_scanned,
                 Scan.seo_score, Scan.created_at, Scan.completed_at,
@@ -755,17 +754,8 @@ async def template_comparison(request: Request):
     {% endblock %}
     """
     
-    # Save the template temporarily and render it
-    import tempfile
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as f:
-        f.write(comparison_html)
-        temp_path = f.name
-    
-    try:
-        temp_templates = Jinja2Templates(directory=os.path.dirname(temp_path))
-        return temp_templates.TemplateResponse(os.path.basename(temp_path), context)
-    finally:
-        os.unlink(temp_path)
+    # Render the inline template with the shared environment (resolves base.html)
+    return HTMLResponse(templates.env.from_string(comparison_html).render(context))
 
 @router.get("/docs", response_class=HTMLResponse)
 async def template_documentation(request: Request):
@@ -869,14 +859,5 @@ async def template_documentation(request: Request):
     {% endblock %}
     """
     
-    # Save and render the documentation template
-    import tempfile
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as f:
-        f.write(docs_html)
-        temp_path = f.name
-    
-    try:
-        temp_templates = Jinja2Templates(directory=os.path.dirname(temp_path))
-        return temp_templates.TemplateResponse(os.path.basename(temp_path), context)
-    finally:
-        os.unlink(temp_path)
\ No newline at end of file
+    # Render the inline template with the shared environment (resolves base.html)
+    return HTMLResponse(templates.env.from_string(docs_html).render(context))
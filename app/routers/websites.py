@@ -6,6 +6,7 @@ from typing import List
 from app.database import get_db
 from app.models import Website, Client
 from app.schemas import WebsiteCreate, WebsiteResponse, WebsiteUpdate
+from app.services.deletion_service import DeletionService
 
 router = APIRouter(prefix="/websites", tags=["websites"])
 
@@ -106,5 +107,4 @@ async def delete_website(
             detail="Website not found"
         )
     
-    await db.delete(db_website)
-    await db.commit()
\ No newline at end of file
+    await DeletionService(db).delete_website(website_id)
\ No newline at end of file
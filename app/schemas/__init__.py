@@ -2,12 +2,12 @@ from .client import ClientCreate, ClientResponse, ClientUpdate
 from .website import WebsiteCreate, WebsiteResponse, WebsiteUpdate
 from .scan import ScanCreate, ScanResponse, ScanUpdate
 from .page import PageResponse
-from .issue import IssueResponse
+from .issue import IssueResponse, IssueGroupsResponse, IssueExplorerPage, ScanResourcePage
 
 __all__ = [
     "ClientCreate", "ClientResponse", "ClientUpdate",
     "WebsiteCreate", "WebsiteResponse", "WebsiteUpdate", 
     "ScanCreate", "ScanResponse", "ScanUpdate",
     "PageResponse",
-    "IssueResponse"
+    "IssueResponse", "IssueGroupsResponse", "IssueExplorerPage", "ScanResourcePage"
 ]
\ No newline at end of file
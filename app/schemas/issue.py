@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Any, Optional
 
 class PageInfo(BaseModel):
     id: int
@@ -27,4 +27,51 @@ class IssueResponse(BaseModel):
     page: Optional[PageInfo] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class IssueGroup(BaseModel):
+    severity: str
+    type: str
+    count: int
+    pages: int
+
+class IssueGroupsResponse(BaseModel):
+    scan_id: int
+    total: int
+    groups: List[IssueGroup]
+
+class IssueExplorerItem(BaseModel):
+    id: int
+    page_id: int
+    page_url: str
+    type: str
+    category: str
+    severity: str
+    title: str
+    description: str
+    element: Optional[str] = None
+    resources: Optional[List[Dict[str, Any]]] = None
+    recommendation: Optional[str] = None
+    score_impact: Optional[float] = 0.0
+    status: Optional[str] = "open"
+    detected_at: Optional[datetime] = None
+
+class IssueExplorerPage(BaseModel):
+    items: List[IssueExplorerItem]
+    next_cursor: Optional[int] = None
+    has_more: bool = False
+
+class ScanResourceItem(BaseModel):
+    id: int
+    issue_id: Optional[int] = None
+    url: str
+    resource_type: str
+    issue_type: str
+    details: Optional[Dict[str, Any]] = None
+    page_ids: List[int] = []
+    page_count: int = 0
+
+class ScanResourcePage(BaseModel):
+    items: List[ScanResourceItem]
+    next_cursor: Optional[int] = None
+    has_more: bool = False
@@ -11,6 +11,10 @@ class WebsiteBase(BaseModel):
     max_pages: int = Field(1000, ge=1, le=10000)
     max_depth: int = Field(5, ge=1, le=20)
     include_external: bool = False
+    fetch_mode: str = Field("browser", pattern="^(http|browser|auto)$")
+    incremental_scan: bool = False
+    fetch_cache_max_age: Optional[int] = Field(None, ge=0, le=30 * 24 * 3600)
+    store_html_snapshots: bool = False
     is_active: bool = True
 
 class WebsiteCreate(WebsiteBase):
@@ -25,6 +29,10 @@ class WebsiteUpdate(BaseModel):
     max_pages: Optional[int] = Field(None, ge=1, le=10000)
     max_depth: Optional[int] = Field(None, ge=1, le=20)
     include_external: Optional[bool] = None
+    fetch_mode: Optional[str] = Field(None, pattern="^(http|browser|auto)$")
+    incremental_scan: Optional[bool] = None
+    fetch_cache_max_age: Optional[int] = Field(None, ge=0, le=30 * 24 * 3600)
+    store_html_snapshots: Optional[bool] = None
     is_active: Optional[bool] = None
 
 class WebsiteResponse(WebsiteBase):
@@ -0,0 +1,29 @@
+"""
+Date Utilities for SEO Auditing
+Sitemap lastmod comparison and HTTP date header parsing shared by discovery and incremental scans
+"""
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # Stored lastmods are naive or aware depending on the database backend
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def lastmod_unchanged(previous: Optional[datetime], current: Optional[datetime]) -> bool:
+    """Whether the sitemap lastmod proves a page unchanged; unknown dates never do"""
+    if previous is None or current is None:
+        return False
+    return _naive_utc(current) <= _naive_utc(previous)
+
+def parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    """Last-Modified header value as a datetime, None when missing or malformed"""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
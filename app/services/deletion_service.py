@@ -0,0 +1,134 @@
+"""
+Set-Based Deletion Service
+Deletes scans, websites and clients with their dependent rows using bulk DELETE statements
+"""
+import logging
+from typing import Dict, List, Tuple
+from sqlalchemy import select, delete, func, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Client, Website, Scan, ScanSummary, ScanResource, ScanResourcePage, Page, Issue, Schedule, RobotsSnapshot, SitemapSnapshot,
+    HtmlSnapshot
+)
+from app.services.report_cache import ReportArtifactCache
+
+logger = logging.getLogger(__name__)
+
+def _html_snapshots_statement(scan_ids):
+    """DELETE of the HTML snapshots referenced only by pages of the selected scans"""
+    return delete(HtmlSnapshot).where(
+        HtmlSnapshot.content_hash.in_(select(Page.html_hash).where(Page.scan_id.in_(scan_ids))),
+        ~exists().where(Page.html_hash == HtmlSnapshot.content_hash, Page.scan_id.not_in(scan_ids))
+    )
+
+def _scan_data_statements(scan_ids) -> List[Tuple[str, object]]:
+    """DELETE statements for the issues, pages and scans selected by scan_ids, children first"""
+    return [
+        ('scan_resource_pages', delete(ScanResourcePage).where(ScanResourcePage.scan_id.in_(scan_ids))),
+        ('scan_resources', delete(ScanResource).where(ScanResource.scan_id.in_(scan_ids))),
+        ('issues', delete(Issue).where(Issue.scan_id.in_(scan_ids))),
+        ('html_snapshots', _html_snapshots_statement(scan_ids)),
+        ('pages', delete(Page).where(Page.scan_id.in_(scan_ids))),
+        ('scan_summaries', delete(ScanSummary).where(ScanSummary.scan_id.in_(scan_ids))),
+        ('scans', delete(Scan).where(Scan.id.in_(scan_ids))),
+    ]
+
+def _website_data_statements(website_ids) -> List[Tuple[str, object]]:
+    """DELETE statements for everything owned by the websites selected by website_ids"""
+    scan_ids = select(Scan.id).where(Scan.website_id.in_(website_ids))
+    return _scan_data_statements(scan_ids) + [
+        ('schedules', delete(Schedule).where(Schedule.website_id.in_(website_ids))),
+        ('robots_snapshots', delete(RobotsSnapshot).where(RobotsSnapshot.website_id.in_(website_ids))),
+        ('sitemap_snapshots', delete(SitemapSnapshot).where(SitemapSnapshot.website_id.in_(website_ids))),
+        ('websites', delete(Website).where(Website.id.in_(website_ids))),
+    ]
+
+def _execution_options() -> Dict[str, object]:
+    # Rows are gone after the statement; no need to reconcile objects in the session
+    return {'synchronize_session': False}
+
+
+class DeletionService:
+    """Async deletion of scans, websites and clients for the API and HTMX endpoints"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _execute(self, statements: List[Tuple[str, object]]) -> Dict[str, int]:
+        counts = {}
+        for table, statement in statements:
+            result = await self.db.execute(statement, execution_options=_execution_options())
+            counts[table] = result.rowcount
+        await self.db.commit()
+        return counts
+
+    async def count_scan_issues(self, scan_id: int) -> int:
+        """Number of issue rows of a scan"""
+        result = await self.db.execute(
+            select(func.count(Issue.id)).where(Issue.scan_id == scan_id)
+        )
+        return result.scalar_one()
+
+    async def delete_scan(self, scan_id: int) -> Dict[str, int]:
+        """Delete a scan with its pages and issues"""
+        counts = await self._execute(_scan_data_statements([scan_id]))
+        ReportArtifactCache().remove_scan(scan_id)
+        logger.info(f"Deleted scan {scan_id}: {counts}")
+        return counts
+
+    async def delete_website(self, website_id: int) -> Dict[str, int]:
+        """Delete a website with its scans, pages, issues, schedules and snapshots"""
+        counts = await self._execute(_website_data_statements([website_id]))
+        logger.info(f"Deleted website {website_id}: {counts}")
+        return counts
+
+    async def delete_client(self, client_id: int) -> Dict[str, int]:
+        """Delete a client with all of its websites and their data"""
+        website_ids = select(Website.id).where(Website.client_id == client_id)
+        counts = await self._execute(
+            _website_data_statements(website_ids) + [('clients', delete(Client).where(Client.id == client_id))]
+        )
+        logger.info(f"Deleted client {client_id}: {counts}")
+        return counts
+
+
+def purge_scan_sync(db: Session, scan_id: int, chunk_size: int = 500) -> Dict[str, int]:
+    """
+    Delete a (large) scan in chunks of pages, committing after each chunk so no single
+    transaction holds locks on tens of thousands of issue rows. Used by the purge task.
+    """
+    counts = {'html_snapshots': 0, 'issues': 0, 'pages': 0, 'scans': 0}
+    # Resource index rows point at issues of the scan; drop them before the chunked deletes
+    db.execute(
+        delete(ScanResourcePage).where(ScanResourcePage.scan_id == scan_id), execution_options=_execution_options()
+    )
+    db.execute(delete(ScanResource).where(ScanResource.scan_id == scan_id), execution_options=_execution_options())
+    # Snapshot sharing is decided against all pages, so orphaned snapshots go before any page does
+    counts['html_snapshots'] = db.execute(
+        _html_snapshots_statement([scan_id]), execution_options=_execution_options()
+    ).rowcount
+    while True:
+        page_ids = db.scalars(
+            select(Page.id).where(Page.scan_id == scan_id).order_by(Page.id).limit(chunk_size)
+        ).all()
+        if not page_ids:
+            break
+
+        counts['issues'] += db.execute(
+            delete(Issue).where(Issue.page_id.in_(page_ids)), execution_options=_execution_options()
+        ).rowcount
+        counts['pages'] += db.execute(
+            delete(Page).where(Page.id.in_(page_ids)), execution_options=_execution_options()
+        ).rowcount
+        db.commit()
+
+    db.execute(delete(ScanSummary).where(ScanSummary.scan_id == scan_id), execution_options=_execution_options())
+    counts['scans'] = db.execute(
+        delete(Scan).where(Scan.id == scan_id), execution_options=_execution_options()
+    ).rowcount
+    db.commit()
+    ReportArtifactCache().remove_scan(scan_id)
+    logger.info(f"Purged scan {scan_id}: {counts}")
+    return counts
@@ -0,0 +1,136 @@
+"""
+Near-Duplicate Detection Service
+Clusters the pages of a scan by content SimHash and records the clusters on Page.duplicate_group_id
+"""
+import logging
+from typing import Dict, List, Optional
+from sqlalchemy import select, update, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Page, Issue
+from app.services.issue_resources import normalize_issue_resources
+from app.services.seo_analyzer.core.simhash import cluster_near_duplicates, parse_simhash
+from app.services.seo_analyzer.severity_calculator import SeverityCalculator
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_ISSUE_TYPE = 'contenuto_duplicato'
+
+# Page rows per bulk UPDATE of canonical flags
+CANONICAL_UPDATE_CHUNK_SIZE = 500
+
+def mark_canonical_pages(db: Session, scan_id: int) -> Dict[str, int]:
+    """
+    Set is_canonical on the pages of a scan: in each group sharing a canonical URL the page at
+    that URL (else the first page) is canonical; a page without canonical becomes its own.
+    Must run before detect_near_duplicates, which picks representatives by canonical URL.
+    Runs in the caller's transaction; committing stays with the caller.
+    """
+    canonical_groups: Dict[str, List[tuple]] = {}
+    canonical_updates: List[Dict[str, object]] = []
+    pages_without_canonical = 0
+
+    for page_id, url, canonical_url in db.execute(
+        select(Page.id, Page.url, Page.canonical_url).where(Page.scan_id == scan_id).order_by(Page.id)
+    ):
+        if canonical_url:
+            canonical_groups.setdefault(canonical_url, []).append((page_id, url))
+        else:
+            pages_without_canonical += 1
+            canonical_updates.append({'id': page_id, 'canonical_url': url, 'is_canonical': 1})
+
+    for canonical_url, group_pages in canonical_groups.items():
+        canonical_id = next((page_id for page_id, url in group_pages if url == canonical_url), None)
+        if canonical_id is None:
+            canonical_id, first_url = group_pages[0]
+            logger.warning(f"No page found for canonical URL {canonical_url}, using {first_url}")
+        canonical_updates.extend(
+            {'id': page_id, 'is_canonical': 1 if page_id == canonical_id else 0}
+            for page_id, _ in group_pages
+        )
+
+    for offset in range(0, len(canonical_updates), CANONICAL_UPDATE_CHUNK_SIZE):
+        db.execute(update(Page), canonical_updates[offset:offset + CANONICAL_UPDATE_CHUNK_SIZE])
+
+    return {
+        'pages': len(canonical_updates),
+        'canonical_groups': len(canonical_groups),
+        'pages_sharing_canonical': sum(len(group) - 1 for group in canonical_groups.values() if len(group) > 1),
+        'pages_without_canonical': pages_without_canonical
+    }
+
+def detect_near_duplicates(db: Session, scan_id: int, max_distance: Optional[int] = None) -> Dict[str, int]:
+    """
+    Assign duplicate_group_id to every page in a near-duplicate cluster and add a duplicate
+    content issue to each page of a cluster except its representative. Pages whose canonical
+    points elsewhere are already consolidated and get no issue.
+    Runs in the caller's transaction; committing stays with the caller.
+    """
+    max_distance = settings.near_duplicate_max_distance if max_distance is None else max_distance
+    rows = db.execute(
+        select(Page.id, Page.url, Page.canonical_url, Page.content_hash)
+        .where(Page.scan_id == scan_id)
+        .order_by(Page.id)
+    ).all()
+
+    pages = {}
+    signatures = {}
+    for page_id, url, canonical_url, content_hash in rows:
+        signature = parse_simhash(content_hash)
+        if signature is not None:
+            signatures[page_id] = signature
+            pages[page_id] = (url, canonical_url)
+
+    clusters = cluster_near_duplicates(signatures, max_distance)
+    group_updates: List[Dict[str, object]] = []
+    issue_rows: List[Dict[str, object]] = []
+    severity = SeverityCalculator.calculate_severity_from_registry(DUPLICATE_ISSUE_TYPE)
+    score_impact = SeverityCalculator.get_severity_score_from_registry(DUPLICATE_ISSUE_TYPE)
+
+    for number, page_ids in enumerate(clusters, start=1):
+        group_id = f"dup_{scan_id}_{number}"
+        group_updates.extend({'id': page_id, 'duplicate_group_id': group_id} for page_id in page_ids)
+
+        # The representative is the page the others declare as canonical, else the first crawled
+        urls = {pages[page_id][0]: page_id for page_id in page_ids}
+        representative = next(
+            (urls[pages[page_id][1]] for page_id in page_ids if pages[page_id][1] in urls),
+            min(page_ids)
+        )
+        representative_url = pages[representative][0]
+
+        for page_id in page_ids:
+            url, canonical_url = pages[page_id]
+            if page_id == representative or (canonical_url and canonical_url != url):
+                continue
+            description = (
+                f'Il contenuto è quasi identico ad altre {len(page_ids) - 1} pagine '
+                f'(es. {representative_url})'
+            )
+            issue_rows.append({
+                'page_id': page_id,
+                'scan_id': scan_id,
+                'type': DUPLICATE_ISSUE_TYPE,
+                'category': 'content',
+                'severity': severity,
+                'title': 'Contenuto Duplicato',
+                'description': description,
+                'recommendation': 'Differenzia il contenuto o indica la pagina principale con un tag canonical',
+                'score_impact': score_impact,
+                'resources': normalize_issue_resources(DUPLICATE_ISSUE_TYPE, None, description)
+            })
+
+    if group_updates:
+        db.execute(update(Page), group_updates)
+    if issue_rows:
+        db.execute(insert(Issue), issue_rows)
+
+    counts = {
+        'pages_with_signature': len(signatures),
+        'clusters': len(clusters),
+        'duplicate_pages': len(group_updates),
+        'issues': len(issue_rows)
+    }
+    logger.info(f"Near-duplicate detection for scan {scan_id}: {counts}")
+    return counts
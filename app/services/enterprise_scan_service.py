@@ -5,21 +5,34 @@ and comprehensive sitemap integration for enterprise-scale auditing.
 """
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-from sqlalchemy import select
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session, selectinload
 
 from app.models import Website, Scan, Page, Issue, SitemapSnapshot, RobotsSnapshot
 from app.database import SyncSessionLocal
+from app.core.config import settings
 from app.services.seo_analyzer.seo_analyzer import SEOAnalyzer
+from app.services.seo_analyzer.analysis_pool import (
+    PageSnapshot, analyze_snapshot, get_analysis_pool, reset_analysis_pool
+)
 from app.services.url_utils import clean_url, normalize_url
-from app.services.sitemap_parser import SitemapParser
+from app.services.sitemap_parser import SitemapParser, SitemapState
 from app.services.url_discovery_service import URLDiscoveryService, URLDiscoveryConfig, DiscoveredURL, URLSource
 from app.services.url_queue_manager import URLQueueManager, CrawlBudget, QueuedURL
+from app.services.page_fetcher import PageFetcher
+from app.services.fetch_cache import FetchCache
+from app.services.page_batch_writer import PageBatchWriter
+from app.services.scan_summary_service import compute_scan_summary
+from app.services.duplicate_detection import detect_near_duplicates
+from app.services.incremental_scan import IncrementalScanState, response_validators
+from app.services.date_utils import lastmod_unchanged
+from app.services.html_snapshots import PendingSnapshot, html_digest
 
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
-import hashlib
 
 logger = logging.getLogger(__name__)
 
@@ -51,17 +64,27 @@ class EnterpriseScanService:
                 
                 logger.info(f"Starting enterprise scan {scan_id} for website {website.domain}")
                 
-                # Phase 1: Multi-Source URL Discovery
-                discovery_results = self._run_url_discovery_sync(website, db)
-                
-                # Phase 2: Priority-Based URL Processing
-                processing_results = self._process_urls_with_priority_sync(
-                    db, scan, website, discovery_results
+                # One event loop for the whole scan: discovery, crawling, queue and DB writes
+                discovery_results, processing_results = asyncio.run(
+                    self._run_scan_phases(db, scan, website)
                 )
                 
                 # Update scan completion
                 scan.status = "completed"
                 scan.completed_at = datetime.utcnow()
+                
+                # Cluster near-duplicate content across the scan
+                try:
+                    detect_near_duplicates(db, scan.id)
+                except Exception as duplicate_error:
+                    logger.warning(f"Error detecting near-duplicates for scan {scan_id}: {str(duplicate_error)}")
+                
+                # Precompute the results page summary
+                try:
+                    compute_scan_summary(db, scan.id)
+                except Exception as summary_error:
+                    logger.warning(f"Error computing summary for scan {scan_id}: {str(summary_error)}")
+                
                 db.commit()
                 
                 # Combine results - filter out non-serializable objects
@@ -102,51 +125,51 @@ class EnterpriseScanService:
             
             raise e
     
-    def _run_url_discovery_sync(self, website: Website, db: Session) -> Dict[str, Any]:
-        """Run comprehensive URL discovery in sync context"""
+    async def _run_scan_phases(self, db: Session, scan: Scan, website: Website):
+        """Scan-scoped coroutine running every async phase on the same event loop"""
+        # Phase 1: Multi-Source URL Discovery
+        discovery_results = await self._run_url_discovery(website, db)
         
-        async def _discover_urls():
-            """Async URL discovery function"""
-            # Get robots.txt content for sitemap discovery
-            robots_content = self._get_robots_content(website, db)
-            
-            # Configure URL discovery based on website settings
-            config = URLDiscoveryConfig()
-            config.max_crawl_pages = website.max_pages
-            config.max_crawl_depth = website.max_depth
-            config.crawl_external = website.include_external
-            
-            # Create discovery service
-            discovery_service = URLDiscoveryService(config)
-            
-            # Run discovery
-            discovery_results = await discovery_service.discover_urls(
-                domain=website.domain,
-                robots_content=robots_content,
-                manual_urls=self._get_manual_urls(website),
-                crawl_config={
-                    'max_depth': website.max_depth,
-                    'max_pages': website.max_pages,
-                    'include_external': website.include_external
-                }
-            )
-            
-            return discovery_results
+        # Phase 2: Priority-Based URL Processing
+        processing_results = await self._process_urls_with_priority(
+            db, scan, website, discovery_results
+        )
         
-        # Run in clean event loop
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        return discovery_results, processing_results
+    
+    async def _run_url_discovery(self, website: Website, db: Session) -> Dict[str, Any]:
+        """Run comprehensive URL discovery on the scan's event loop"""
+        # Get robots.txt content for sitemap discovery
+        robots_content = self._get_robots_content(website, db)
         
-        try:
-            results = loop.run_until_complete(_discover_urls())
-            
-            # Store sitemap snapshots for monitoring
-            self._store_sitemap_snapshots(website, results, db)
-            
-            return results
-        finally:
-            loop.close()
-            asyncio.set_event_loop(None)
+        # Configure URL discovery based on website settings
+        config = URLDiscoveryConfig()
+        config.max_crawl_pages = website.max_pages
+        config.max_crawl_depth = website.max_depth
+        config.crawl_external = website.include_external
+        
+        # Create discovery service; sitemaps come from the fetch cache when the website opted in,
+        # and child sitemaps unchanged since the previous discovery are not downloaded again
+        discovery_service = URLDiscoveryService(
+            config, cache=FetchCache.for_website(website), known_sitemaps=self._load_known_sitemaps(website, db)
+        )
+        
+        # Run discovery
+        results = await discovery_service.discover_urls(
+            domain=website.domain,
+            robots_content=robots_content,
+            manual_urls=self._get_manual_urls(website),
+            crawl_config={
+                'max_depth': website.max_depth,
+                'max_pages': website.max_pages,
+                'include_external': website.include_external
+            }
+        )
+        
+        # Store sitemap snapshots for monitoring
+        self._store_sitemap_snapshots(website, results, db)
+        
+        return results
     
     def _get_robots_content(self, website: Website, db: Session) -> Optional[str]:
         """Get latest robots.txt content from database"""
@@ -163,41 +186,69 @@ class EnterpriseScanService:
         # For now, return empty list
         return []
     
+    @staticmethod
+    def _latest_sitemap_snapshots(website_id: int, db: Session) -> Dict[str, SitemapSnapshot]:
+        """Most recent snapshot of each sitemap URL of the website"""
+        latest_ids = select(func.max(SitemapSnapshot.id))\
+            .where(SitemapSnapshot.website_id == website_id)\
+            .group_by(SitemapSnapshot.sitemap_url)
+        snapshots = db.scalars(select(SitemapSnapshot).where(SitemapSnapshot.id.in_(latest_ids)))
+        return {snapshot.sitemap_url: snapshot for snapshot in snapshots}
+    
+    def _load_known_sitemaps(self, website: Website, db: Session) -> Dict[str, SitemapState]:
+        """Sitemap states of the previous discovery, letting unchanged child sitemaps be skipped"""
+        known = {}
+        for sitemap_url, snapshot in self._latest_sitemap_snapshots(website.id, db).items():
+            records = snapshot.urls_with_metadata
+            # Only snapshots holding every URL record of the sitemap can replace downloading it
+            if records is not None and len(records) != (snapshot.urls_count or 0):
+                records = None
+            known[sitemap_url] = SitemapState(
+                url=sitemap_url,
+                content_hash=snapshot.content_hash,
+                etag=snapshot.etag,
+                last_modified=snapshot.last_modified,
+                index_lastmod=snapshot.index_lastmod,
+                is_index=bool(snapshot.is_sitemap_index),
+                url_records=records
+            )
+        return known
+    
     def _store_sitemap_snapshots(self, website: Website, discovery_results: Dict[str, Any], db: Session):
-        """Store sitemap snapshots for monitoring and change detection"""
-        sitemap_sources = discovery_results.get('sources', {}).get('sitemap', {})
-        sitemap_urls = sitemap_sources.get('urls', [])
-        
-        for sitemap_url in sitemap_urls:
-            if hasattr(sitemap_url, 'source_sitemap') and sitemap_url.source_sitemap:
-                # Create or update sitemap snapshot
-                existing_snapshot = db.query(SitemapSnapshot)\
-                    .filter(
-                        SitemapSnapshot.website_id == website.id,
-                        SitemapSnapshot.sitemap_url == sitemap_url.source_sitemap
-                    ).first()
-                
-                # Calculate content hash for change detection
-                content_hash = hashlib.md5(str(sitemap_url.source_sitemap).encode()).hexdigest()
-                
-                if existing_snapshot:
-                    existing_snapshot.urls_count = 1  # Update with actual count
-                    existing_snapshot.content_hash = content_hash
-                    existing_snapshot.is_accessible = True
-                else:
-                    new_snapshot = SitemapSnapshot(
-                        website_id=website.id,
-                        sitemap_url=sitemap_url.source_sitemap,
-                        content_hash=content_hash,
-                        urls_count=1,
-                        is_accessible=True,
-                        sitemap_type='regular'
-                    )
-                    db.add(new_snapshot)
+        """Store one snapshot per sitemap reached by the discovery for monitoring and change detection"""
+        states = discovery_results.get('sources', {}).get('sitemap', {}).get('sitemaps', [])
+        if not states:
+            return
+        latest = self._latest_sitemap_snapshots(website.id, db)
+        
+        for state in states:
+            if state.outcome == 'failed':
+                continue
+            snapshot = latest.get(state.url)
+            if snapshot is None:
+                snapshot = SitemapSnapshot(website_id=website.id, sitemap_url=state.url)
+                db.add(snapshot)
+            elif state.has_changed:
+                snapshot.previous_hash = snapshot.content_hash
+                snapshot.previous_urls_count = snapshot.urls_count
+            
+            snapshot.content_hash = state.content_hash or ''
+            snapshot.has_changed = state.has_changed
+            snapshot.etag = state.etag
+            snapshot.last_modified = state.last_modified
+            snapshot.index_lastmod = state.index_lastmod
+            snapshot.parent_sitemap_url = state.parent_url
+            snapshot.is_sitemap_index = state.is_index
+            snapshot.sitemap_type = 'index' if state.is_index else 'regular'
+            snapshot.child_sitemaps_count = state.child_count
+            snapshot.urls_with_metadata = state.url_records
+            snapshot.urls_count = len(state.url_records) if state.url_records is not None else 0
+            snapshot.status_code = state.status_code
+            snapshot.is_accessible = True
         
         db.commit()
     
-    def _process_urls_with_priority_sync(
+    async def _process_urls_with_priority(
         self, 
         db: Session, 
         scan: Scan, 
@@ -224,7 +275,8 @@ class EnterpriseScanService:
         )
         
         # Initialize queue manager
-        queue_manager = URLQueueManager(crawl_budget)
+        # Concurrent browser pages are bounded by the queue manager's processing semaphore
+        queue_manager = URLQueueManager(crawl_budget, max_concurrent=settings.max_concurrent_crawls)
         
         # Add discovered URLs to queue
         queue_manager.add_urls(discovered_urls)
@@ -232,9 +284,9 @@ class EnterpriseScanService:
         logger.info(f"Added {len(discovered_urls)} URLs to priority queue for scan {scan.id}")
         
         # Process URLs in priority order
-        return self._process_priority_queue_sync(db, scan, website, queue_manager)
+        return await self._process_priority_queue(db, scan, website, queue_manager)
     
-    def _process_priority_queue_sync(
+    async def _process_priority_queue(
         self, 
         db: Session, 
         scan: Scan, 
@@ -246,206 +298,284 @@ class EnterpriseScanService:
         pages_scanned = 0
         pages_failed = 0
         total_issues = 0
-        batch_size = 5  # Process 5 URLs at a time
-        
-        async def _process_batch(batch: List[QueuedURL]):
-            """Process a batch of URLs asynchronously"""
-            browser_config = BrowserConfig(headless=True, verbose=False)
-            crawl_config = CrawlerRunConfig(
-                cache_mode=CacheMode.BYPASS,
-                word_count_threshold=10,
-                screenshot=False,
-                check_robots_txt=website.robots_respect,
-                process_iframes=True,
-                excluded_tags=['script', 'style', 'nav', 'footer', 'aside']
-            )
+        # Twice the page pool so a slow URL does not leave browser pages idle
+        batch_size = queue_manager.max_concurrent * 2
+        
+        # Pages and issues are bulk inserted; URLs already stored (resumed scan) are skipped
+        writer = PageBatchWriter(db)
+        writer.mark_existing(scan.id, (url for url, in db.query(Page.url).filter(Page.scan_id == scan.id)))
+        
+        # Incremental mode: unchanged URLs are copied from the previous completed scan
+        incremental = IncrementalScanState.load(db, website.id, scan.id) if website.incremental_scan else None
+        
+        # Analysis is CPU-bound and runs off the event loop so concurrent fetches keep flowing,
+        # with the same backends as the streaming sync scan: worker processes or threads
+        domain = website.domain
+        process_pool = get_analysis_pool(settings.analysis_process_pool_size)
+        analysis_executor = None if process_pool is not None else ThreadPoolExecutor(
+            max_workers=max(1, settings.scan_analysis_workers), thread_name_prefix='enterprise-analyze'
+        )
+        
+        browser_config = BrowserConfig(headless=True, verbose=False)
+        crawl_config = CrawlerRunConfig(
+            cache_mode=CacheMode.BYPASS,
+            word_count_threshold=10,
+            screenshot=False,
+            check_robots_txt=website.robots_respect,
+            process_iframes=True,
+            excluded_tags=['script', 'style', 'nav', 'footer', 'aside']
+        )
+        
+        async def _analyze(crawl_result: Any) -> Dict[str, Any]:
+            """analyze_page() result of a fetched page, computed in the analysis executor"""
+            loop = asyncio.get_running_loop()
+            if process_pool is not None:
+                try:
+                    # Only a compact, picklable snapshot crosses the process boundary
+                    analyzed = await loop.run_in_executor(
+                        process_pool, analyze_snapshot, PageSnapshot.from_crawl_result(crawl_result),
+                        domain, crawl_result.url
+                    )
+                    return analyzed['analysis']
+                except BrokenProcessPool as pool_error:
+                    logger.error(f"Analysis process pool crashed: {str(pool_error)}")
+                    reset_analysis_pool()
+                    raise
+                except Exception as analysis_error:
+                    logger.error(f"Error analyzing {crawl_result.url} in the process pool: {str(analysis_error)}")
+            # analyze_page never raises: failures give an empty analysis
+            return await loop.run_in_executor(analysis_executor, self.seo_analyzer.analyze_page, crawl_result, domain)
+        
+        async def _fetch(fetcher: PageFetcher, queued_url: QueuedURL):
+            """
+            Fetch and analyze one URL, waiting for a free processing slot for the fetch only.
+            Results are (queued URL, crawl result, error, previous page, analysis); previous is the
+            previous scan's page when the URL is unchanged and gets carried forward.
+            """
+            fetched = await _fetch_page(fetcher, queued_url)
+            queued_url, result, error, previous = fetched
+            if result is None or error or previous is not None or writer.has_page(scan.id, clean_url(result.url)):
+                return (*fetched, None)
+            return (*fetched, await _analyze(result))
+        
+        async def _fetch_page(fetcher: PageFetcher, queued_url: QueuedURL):
+            previous = incremental.get(clean_url(queued_url.url)) if incremental else None
+            if previous and lastmod_unchanged(previous.sitemap_lastmod, queued_url.discovered_url.lastmod):
+                incremental.stats['sitemap_unchanged'] += 1
+                return (queued_url, None, None, previous)
             
-            async with AsyncWebCrawler(config=browser_config, verbose=False) as crawler:
-                batch_results = []
-                
-                for queued_url in batch:
-                    try:
-                        # Crawl the URL
-                        result = await crawler.arun(
-                            url=queued_url.url,
-                            config=crawl_config
-                        )
-                        
-                        if result and result.success:
-                            batch_results.append((queued_url, result, None))
-                        else:
-                            batch_results.append((queued_url, None, "Crawl failed"))
+            async with queue_manager.processing_semaphore:
+                try:
+                    result = await fetcher.fetch(
+                        queued_url.url, previous.conditional_headers if previous else None
+                    )
                     
-                    except Exception as e:
-                        batch_results.append((queued_url, None, str(e)))
+                    if previous and getattr(result, 'not_modified', False):
+                        incremental.stats['not_modified'] += 1
+                        return (queued_url, result, None, previous)
+                    if result and result.success:
+                        if previous and previous.html_hash and html_digest(result.html) == previous.html_hash:
+                            incremental.stats['content_unchanged'] += 1
+                            return (queued_url, result, None, previous)
+                        return (queued_url, result, None, None)
+                    return (queued_url, None, "Crawl failed", None)
                 
-                return batch_results
+                except Exception as e:
+                    return (queued_url, None, str(e), None)
         
-        # Create clean event loop for processing
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        async def _process_batch(fetcher: PageFetcher, batch: List[QueuedURL]):
+            """Fetch a batch of URLs concurrently on the shared fetcher"""
+            return await asyncio.gather(*(_fetch(fetcher, queued_url) for queued_url in batch))
         
+        # One fetcher for the whole scan: pooled HTTP client and/or one lazily launched browser
+        fetcher = PageFetcher(
+            website.fetch_mode,
+            crawl_config,
+            browser_factory=lambda: AsyncWebCrawler(config=browser_config, verbose=False),
+            cache=FetchCache.for_website(website)
+        )
         try:
-            # Process URLs in batches
-            while queue_manager.crawl_budget.remaining_budget > 0:
-                # Get next batch
-                batch = loop.run_until_complete(
-                    queue_manager.get_next_batch(batch_size)
-                )
-                
-                if not batch:
-                    break  # No more URLs to process
-                
-                # Process batch
-                batch_results = loop.run_until_complete(_process_batch(batch))
-                
-                # Store results in database
-                for queued_url, crawl_result, error in batch_results:
-                    try:
-                        if crawl_result and not error:
-                            # Process successful crawl
-                            page_data = self._process_single_page_sync(
-                                db, scan, queued_url, crawl_result
-                            )
-                            pages_scanned += 1
-                            total_issues += page_data.get('issues_count', 0)
+            async with fetcher:
+                # Process URLs in batches
+                while queue_manager.crawl_budget.remaining_budget > 0:
+                    # Get next batch
+                    batch = await queue_manager.get_next_batch(batch_size)
+                    
+                    if not batch:
+                        break  # No more URLs to process
+                    
+                    # Process batch
+                    batch_results = await _process_batch(fetcher, batch)
+                    
+                    # Store results in database
+                    carries = []
+                    for queued_url, crawl_result, error, previous, analysis_result in batch_results:
+                        try:
+                            if previous is not None:
+                                # Unchanged since the previous scan: copy instead of analyzing
+                                carries.append((previous, self._carried_page_fields(queued_url, crawl_result)))
+                                pages_scanned += 1
+                                await queue_manager.mark_completed(queued_url.url, success=True)
+                            elif crawl_result and not error:
+                                # Process successful crawl
+                                page_data = self._process_single_page_sync(
+                                    writer, scan, queued_url, crawl_result, analysis_result
+                                )
+                                pages_scanned += 1
+                                total_issues += page_data.get('issues_count', 0)
                             
-                            # Mark as completed
-                            loop.run_until_complete(
-                                queue_manager.mark_completed(queued_url.url, success=True)
-                            )
-                        else:
-                            # Handle failure
-                            pages_failed += 1
-                            loop.run_until_complete(
-                                queue_manager.mark_completed(
+                                # Mark as completed
+                                await queue_manager.mark_completed(queued_url.url, success=True)
+                            else:
+                                # Handle failure
+                                pages_failed += 1
+                                await queue_manager.mark_completed(
                                     queued_url.url, success=False, error=error
                                 )
-                            )
                             
-                    except Exception as process_error:
-                        logger.error(f"Error processing {queued_url.url}: {process_error}")
-                        pages_failed += 1
-                        loop.run_until_complete(
-                            queue_manager.mark_completed(
+                        except Exception as process_error:
+                            logger.error(f"Error processing {queued_url.url}: {process_error}")
+                            pages_failed += 1
+                            await queue_manager.mark_completed(
                                 queued_url.url, success=False, error=str(process_error)
                             )
-                        )
-                
-                # Commit batch to database
-                db.commit()
-                
-                logger.info(f"Processed batch: {len(batch)} URLs, "
-                          f"Total: {pages_scanned} scanned, {pages_failed} failed")
-        
+                    
+                    # Write and commit batch to database
+                    if carries:
+                        total_issues += incremental.carry_forward(writer, scan.id, carries)
+                    writer.flush()
+                    db.commit()
+                    
+                    logger.info(f"Processed batch: {len(batch)} URLs, "
+                              f"Total: {pages_scanned} scanned, {pages_failed} failed")
         finally:
-            loop.close()
-            asyncio.set_event_loop(None)
+            if analysis_executor is not None:
+                analysis_executor.shutdown(wait=True)
         
         return {
             'pages_scanned': pages_scanned,
             'pages_failed': pages_failed,
             'total_issues': total_issues,
             'processing_method': 'priority_queue',
-            'queue_statistics': queue_manager.get_queue_status()
+            'queue_statistics': queue_manager.get_queue_status(),
+            'incremental': {'previous_scan_id': incremental.previous_scan_id, **incremental.stats} if incremental else None
         }
     
     def _process_single_page_sync(
         self, 
-        db: Session, 
+        writer: PageBatchWriter, 
         scan: Scan, 
         queued_url: QueuedURL, 
-        crawl_result: Any
+        crawl_result: Any,
+        analysis_result: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Process a single page and store results with URL discovery metadata"""
+        """
+        Queue a single analyzed page for bulk insert with URL discovery metadata.
+        The analysis normally comes from the analysis executor; it is computed here when missing.
+        """
         
         # Clean URL
         clean_page_url = clean_url(crawl_result.url)
         
-        # Check if page already exists
-        existing_page = db.query(Page).filter(
-            Page.scan_id == scan.id,
-            Page.url == clean_page_url
-        ).first()
-        
-        if existing_page:
+        # Skip pages already stored or queued for this scan
+        if writer.has_page(scan.id, clean_page_url):
             logger.debug(f"Page already exists: {clean_page_url}")
-            return {'issues_count': existing_page.issues_count}
+            return {'issues_count': 0}
         
-        # Run SEO analysis
-        analysis_result = self.seo_analyzer.analyze_page(crawl_result, scan.website.domain)
+        # SEO analysis: single pass over content, scores and issues (analyze_full)
+        if analysis_result is None:
+            analysis_result = self.seo_analyzer.analyze_page(crawl_result, scan.website.domain)
         
-        # Create page with URL discovery metadata
-        page = Page(
-            scan_id=scan.id,
-            url=clean_page_url,
-            status_code=getattr(crawl_result, 'status_code', 200),
-            response_time=getattr(crawl_result, 'response_time', 0),
+        # Issues
+        issues = [
+            {
+                'type': issue_data.get('type', 'unknown'),
+                'severity': issue_data.get('severity', 'low'),
+                'category': issue_data.get('category', 'general'),
+                'title': issue_data.get('title', ''),
+                'description': issue_data.get('description', ''),
+                'recommendation': issue_data.get('recommendation', ''),
+                'element': issue_data.get('element', ''),
+                'score_impact': issue_data.get('score_impact', 0)
+            }
+            for issue_data in analysis_result.get('issues', [])
+        ]
+        
+        html = getattr(crawl_result, 'html', '')
+        snapshot = PendingSnapshot.from_html(html) if getattr(scan.website, 'store_html_snapshots', False) else None
+        
+        # Page with URL discovery metadata
+        page = {
+            'scan_id': scan.id,
+            'url': clean_page_url,
+            'status_code': getattr(crawl_result, 'status_code', 200),
+            'response_time': getattr(crawl_result, 'response_time', 0),
             
             # SEO data
-            title=analysis_result.get('title', ''),
-            meta_description=analysis_result.get('meta_description', ''),
-            h1_tags=analysis_result.get('h1_tags', []),
-            h2_tags=analysis_result.get('h2_tags', []),
-            h3_tags=analysis_result.get('h3_tags', []),
+            'title': analysis_result.get('title', ''),
+            'meta_description': analysis_result.get('meta_description', ''),
+            'h1_tags': analysis_result.get('h1_tags', []),
+            'h2_tags': analysis_result.get('h2_tags', []),
+            'h3_tags': analysis_result.get('h3_tags', []),
             
             # Content analysis
-            word_count=analysis_result.get('word_count', 0),
-            content_hash=analysis_result.get('content_hash', ''),
+            'word_count': analysis_result.get('word_count', 0),
+            'content_hash': analysis_result.get('content_hash', ''),
             
             # Scoring
-            seo_score=analysis_result.get('seo_score', 0),
-            performance_score=analysis_result.get('performance_score', 0),
-            technical_score=analysis_result.get('technical_score', 0),
-            mobile_score=analysis_result.get('mobile_score', 0),
+            'seo_score': analysis_result.get('seo_score', 0),
+            'performance_score': analysis_result.get('performance_score', 0),
+            'technical_score': analysis_result.get('technical_score', 0),
+            'mobile_score': analysis_result.get('mobile_score', 0),
             
-            # URL Discovery Metadata (Enterprise Features)
-            discovery_source=queued_url.discovered_url.source.value,
-            discovery_priority=queued_url.discovered_url.calculated_priority,
-            sitemap_priority=queued_url.discovered_url.sitemap_priority,
-            sitemap_changefreq=queued_url.discovered_url.changefreq.freq_value if queued_url.discovered_url.changefreq else None,
-            sitemap_lastmod=queued_url.discovered_url.lastmod,
-            source_sitemap_url=queued_url.discovered_url.source_sitemap,
-            parent_url=queued_url.discovered_url.parent_url,
-            crawl_depth=queued_url.discovered_url.depth,
+            # Validators for the next incremental scan
+            'html_hash': snapshot.content_hash if snapshot else html_digest(html),
+            **response_validators(crawl_result),
             
-            # Processing Metadata
-            queue_priority=queued_url.queue_priority.name,
-            processing_started=queued_url.processing_started,
-            processing_completed=datetime.utcnow(),
-            estimated_processing_time=queued_url.estimated_processing_time,
-            actual_processing_time=queued_url.processing_duration,
-            processing_status='completed'
-        )
-        
-        db.add(page)
-        db.flush()  # Get page ID
-        
-        # Store issues
-        issues_count = 0
-        for issue_data in analysis_result.get('issues', []):
-            issue = Issue(
-                page_id=page.id,
-                type=issue_data.get('type', 'unknown'),
-                severity=issue_data.get('severity', 'low'),
-                category=issue_data.get('category', 'general'),
-                title=issue_data.get('title', ''),
-                description=issue_data.get('description', ''),
-                recommendation=issue_data.get('recommendation', ''),
-                element=issue_data.get('element', ''),
-                score_impact=issue_data.get('score_impact', 0)
-            )
-            db.add(issue)
-            issues_count += 1
+            **self._queue_metadata_fields(queued_url)
+        }
         
-        page.issues_count = issues_count
+        issues_count = writer.add_page(page, issues, snapshot=snapshot)
         
         return {
             'issues_count': issues_count,
-            'seo_score': page.seo_score,
-            'discovery_source': page.discovery_source
+            'seo_score': page['seo_score'],
+            'discovery_source': page['discovery_source']
+        }
+    
+    @staticmethod
+    def _queue_metadata_fields(queued_url: QueuedURL) -> Dict[str, Any]:
+        """Page columns for the URL discovery and processing metadata of a queued URL"""
+        return {
+            # URL Discovery Metadata (Enterprise Features)
+            'discovery_source': queued_url.discovered_url.source.value,
+            'discovery_priority': queued_url.discovered_url.calculated_priority,
+            'sitemap_priority': queued_url.discovered_url.sitemap_priority,
+            'sitemap_changefreq': queued_url.discovered_url.changefreq.freq_value if queued_url.discovered_url.changefreq else None,
+            'sitemap_lastmod': queued_url.discovered_url.lastmod,
+            'source_sitemap_url': queued_url.discovered_url.source_sitemap,
+            'parent_url': queued_url.discovered_url.parent_url,
+            'crawl_depth': queued_url.discovered_url.depth,
+            
+            # Processing Metadata
+            'queue_priority': queued_url.queue_priority.name,
+            'processing_started': queued_url.processing_started,
+            'processing_completed': datetime.utcnow(),
+            'estimated_processing_time': queued_url.estimated_processing_time,
+            'actual_processing_time': queued_url.processing_duration,
+            'processing_status': 'completed'
         }
     
+    def _carried_page_fields(self, queued_url: QueuedURL, crawl_result: Any) -> Dict[str, Any]:
+        """Columns replaced on a page carried forward: this scan's queue metadata and fresh validators"""
+        fields = self._queue_metadata_fields(queued_url)
+        if crawl_result is not None:
+            # A 304 may refresh the validators; a refetched identical page replaces them
+            fields.update({key: value for key, value in response_validators(crawl_result).items() if value})
+            if not getattr(crawl_result, 'not_modified', False):
+                fields['response_time'] = getattr(crawl_result, 'response_time', None)
+        return fields
+    
     def get_discovery_statistics(self, scan_id: int) -> Dict[str, Any]:
         """Get comprehensive URL discovery statistics for a scan"""
         with SyncSessionLocal() as db:
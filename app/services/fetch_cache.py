@@ -0,0 +1,178 @@
+"""
+Persistent Fetch Cache
+Compressed responses (body and headers) on local disk keyed by normalized URL, shared between
+scans, with a per-website freshness policy and a total size cap enforced by LRU eviction
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from app.core.config import settings
+from app.services.url_utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+ENTRY_SUFFIX = '.z'
+
+# Eviction frees space down to this share of max_bytes, so one directory scan covers many puts
+EVICTION_LOW_WATER = 0.9
+
+def cache_key(url: str) -> str:
+    """Digest of the normalized URL: scheme and host case, empty path and fragment do not matter"""
+    parts = urlsplit(normalize_url(url))
+    normalized = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', parts.query, ''))
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    """A cached response; url is the final URL after redirects"""
+    url: str
+    status_code: int
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    fetched_at: float = 0.0
+
+    @property
+    def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace')
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.fetched_at
+
+
+class FetchCache:
+    """
+    One zlib-compressed file per normalized URL holding the response metadata (JSON line) and
+    body. Entries older than max_age are misses and get overwritten by the next fetch. File
+    mtime doubles as the LRU clock: hits touch the file and eviction removes the least recently
+    used entries once the cache exceeds max_bytes, down to a low-water mark below it. Files are
+    sharded by the first key byte.
+    """
+
+    def __init__(self, max_age: int, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.max_age = max_age
+        self.directory = directory or settings.fetch_cache_dir
+        self.max_bytes = max_bytes if max_bytes is not None else settings.fetch_cache_max_bytes
+        self._size: Optional[int] = None
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0}
+
+    @classmethod
+    def for_website(cls, website: Any) -> Optional['FetchCache']:
+        """Cache with the website's freshness policy, or None when the website has not opted in"""
+        max_age = getattr(website, 'fetch_cache_max_age', None)
+        if not isinstance(max_age, int) or max_age <= 0:
+            return None
+        return cls(max_age)
+
+    def path_for(self, url: str) -> str:
+        key = cache_key(url)
+        return os.path.join(self.directory, key[:2], key + ENTRY_SUFFIX)
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Fresh cached response for a URL, or None on a miss"""
+        path = self.path_for(url)
+        try:
+            with open(path, 'rb') as handle:
+                payload = zlib.decompress(handle.read())
+        except FileNotFoundError:
+            self.stats['misses'] += 1
+            return None
+        except (OSError, zlib.error) as e:
+            logger.warning(f"Unreadable fetch cache entry {path}: {str(e)}")
+            self.stats['misses'] += 1
+            return None
+
+        meta, _, body = payload.partition(b'\n')
+        try:
+            entry = CachedResponse(body=body, **json.loads(meta))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Corrupt fetch cache entry {path}: {str(e)}")
+            self.stats['misses'] += 1
+            return None
+        if entry.age() > self.max_age:
+            self.stats['misses'] += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.stats['hits'] += 1
+        return entry
+
+    def put(self, url: str, status_code: int, body: bytes, headers: Optional[Dict[str, str]] = None,
+            final_url: Optional[str] = None) -> str:
+        """Store a response atomically under the requested URL, evicting if the cache grows too large"""
+        meta = json.dumps({
+            'url': final_url or url,
+            'status_code': status_code,
+            'headers': dict(headers or {}),
+            'fetched_at': time.time()
+        }, ensure_ascii=False).encode('utf-8')
+        data = zlib.compress(meta + b'\n' + body)
+
+        path = self.path_for(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+        temp_fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path))
+        try:
+            with os.fdopen(temp_fd, 'wb') as handle:
+                handle.write(data)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        self.stats['stores'] += 1
+
+        if self._size is None:
+            self._size = self._total_size()
+        else:
+            self._size += len(data) - previous_size
+        if self._size > self.max_bytes:
+            self.evict(keep=path)
+        return path
+
+    def _entries(self):
+        for path in glob.glob(os.path.join(self.directory, '*', '*' + ENTRY_SUFFIX)):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            yield stat.st_mtime, stat.st_size, path
+
+    def _total_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Remove least recently used entries until the cache is back under the low-water mark"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * EVICTION_LOW_WATER)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            if path == keep:
+                continue
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not remove fetch cache entry {path}: {str(e)}")
+                continue
+            total -= size
+            removed += 1
+        self._size = total
+        if removed:
+            logger.info(f"Evicted {removed} fetch cache entries, cache size now {total} bytes")
+        return removed
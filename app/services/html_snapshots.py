@@ -0,0 +1,107 @@
+"""
+Raw HTML Snapshot Store
+Compressed raw page HTML deduplicated by content hash, kept so scans can be re-analyzed without recrawling
+"""
+import hashlib
+import logging
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models import HtmlSnapshot
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; snapshots fall back to zlib
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+
+def html_digest(html: Optional[str]) -> Optional[str]:
+    """SHA-256 of the fetched HTML, identifying byte-identical responses across scans"""
+    if not html:
+        return None
+    return hashlib.sha256(html.encode('utf-8', errors='replace')).hexdigest()
+
+def compress_html(html: str) -> Tuple[str, bytes]:
+    """(codec, compressed bytes) with zstd when available, else zlib"""
+    return _compress(html.encode('utf-8', errors='replace'))
+
+def _compress(raw: bytes) -> Tuple[str, bytes]:
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return 'zlib', zlib.compress(raw, ZLIB_LEVEL)
+
+def decompress_html(codec: str, data: bytes) -> str:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd snapshot found but the zstandard package is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == 'zlib':
+        raw = zlib.decompress(data)
+    else:
+        raise ValueError(f"Unknown snapshot codec: {codec}")
+    return raw.decode('utf-8', errors='replace')
+
+
+@dataclass
+class PendingSnapshot:
+    """Compressed HTML waiting to be written; content_hash matches pages.html_hash"""
+    content_hash: str
+    codec: str
+    data: bytes
+    size: int
+
+    @classmethod
+    def from_html(cls, html: Optional[str]) -> Optional['PendingSnapshot']:
+        if not html:
+            return None
+        raw = html.encode('utf-8', errors='replace')
+        codec, data = _compress(raw)
+        return cls(hashlib.sha256(raw).hexdigest(), codec, data, len(raw))
+
+
+def store_snapshots(db: Session, snapshots: Iterable[PendingSnapshot]) -> int:
+    """
+    Insert the snapshots whose content hash is not stored yet; returns the rows written.
+    Runs in the caller's transaction; a concurrent scan storing the same HTML is tolerated.
+    """
+    pending: Dict[str, PendingSnapshot] = {snapshot.content_hash: snapshot for snapshot in snapshots}
+    if not pending:
+        return 0
+    stored = set(db.scalars(
+        select(HtmlSnapshot.content_hash).where(HtmlSnapshot.content_hash.in_(pending))
+    ))
+    rows = [
+        {'content_hash': snapshot.content_hash, 'codec': snapshot.codec, 'data': snapshot.data, 'size': snapshot.size}
+        for content_hash, snapshot in pending.items() if content_hash not in stored
+    ]
+    if rows:
+        db.execute(_insert_ignoring_duplicates(db), rows)
+    return len(rows)
+
+def _insert_ignoring_duplicates(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(HtmlSnapshot)
+    return dialect_insert(HtmlSnapshot).on_conflict_do_nothing(index_elements=['content_hash'])
+
+def load_snapshots(db: Session, content_hashes: Iterable[str]) -> Dict[str, str]:
+    """Decompressed HTML by content hash for the given hashes that have a snapshot"""
+    hashes = {content_hash for content_hash in content_hashes if content_hash}
+    if not hashes:
+        return {}
+    rows = db.execute(
+        select(HtmlSnapshot.content_hash, HtmlSnapshot.codec, HtmlSnapshot.data)
+        .where(HtmlSnapshot.content_hash.in_(hashes))
+    )
+    return {content_hash: decompress_html(codec, data) for content_hash, codec, data in rows}
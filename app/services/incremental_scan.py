@@ -0,0 +1,138 @@
+"""
+Incremental Scan State
+Reuses the previous scan of a website: conditional request validators, sitemap lastmod checks
+and copy-forward of the pages and issues whose content did not change
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Page, Issue, Scan
+from app.services.date_utils import lastmod_unchanged
+from app.services.duplicate_detection import DUPLICATE_ISSUE_TYPE
+from app.services.page_batch_writer import PageBatchWriter
+from app.services.resource_index import SITE_WIDE_RESOURCE_ISSUES, load_resource_issues
+
+logger = logging.getLogger(__name__)
+
+# Page columns that belong to the new scan rather than the copied row
+SCAN_BOUND_PAGE_COLUMNS = frozenset({'id', 'scan_id', 'created_at', 'duplicate_group_id'})
+
+# Issues recomputed across the whole scan after all pages are stored
+SCAN_LEVEL_ISSUES = frozenset({DUPLICATE_ISSUE_TYPE, 'url_structure_issue'})
+
+@dataclass
+class PreviousPage:
+    """Fields of a previous-scan page needed to decide whether its URL changed"""
+    id: int
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    sitemap_lastmod: Optional[datetime] = None
+    html_hash: Optional[str] = None
+
+    @property
+    def conditional_headers(self) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers from the stored validators"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+def response_validators(result: Any) -> Dict[str, Optional[str]]:
+    """ETag and Last-Modified of a fetch result, as page columns"""
+    headers = getattr(result, 'response_headers', None) or {}
+    lowered = {str(key).lower(): value for key, value in headers.items()}
+    return {
+        'etag': (lowered.get('etag') or None),
+        'last_modified': (lowered.get('last-modified') or None)
+    }
+
+
+class IncrementalScanState:
+    """
+    Pages of the website's previous completed scan, keyed by URL. A URL is carried forward
+    (page row, page issues and site-wide resource references copied into the new scan) when
+    its sitemap lastmod did not move, the server answers a conditional request with 304, or
+    the refetched HTML is byte-identical. Runs inside the caller's transaction.
+    """
+
+    def __init__(self, db: Session, previous_scan_id: int, pages: Dict[str, PreviousPage]):
+        self.db = db
+        self.previous_scan_id = previous_scan_id
+        self.pages = pages
+        self._resource_issues: Optional[Dict[int, List[Dict[str, Any]]]] = None
+        self.stats = {'sitemap_unchanged': 0, 'not_modified': 0, 'content_unchanged': 0}
+
+    @classmethod
+    def load(cls, db: Session, website_id: int, scan_id: int) -> Optional['IncrementalScanState']:
+        """State of the latest completed scan of the website before scan_id, or None"""
+        previous_scan_id = db.scalar(
+            select(Scan.id)
+            .where(Scan.website_id == website_id, Scan.id != scan_id, Scan.status == 'completed')
+            .order_by(Scan.completed_at.desc(), Scan.id.desc())
+            .limit(1)
+        )
+        if previous_scan_id is None:
+            return None
+
+        rows = db.execute(
+            select(Page.id, Page.url, Page.etag, Page.last_modified, Page.sitemap_lastmod, Page.html_hash)
+            .where(Page.scan_id == previous_scan_id, Page.status_code == 200)
+        )
+        pages = {row.url: PreviousPage(*row) for row in rows}
+        logger.info(f"Incremental scan {scan_id}: {len(pages)} pages of scan {previous_scan_id} can be reused")
+        return cls(db, previous_scan_id, pages)
+
+    def get(self, url: str) -> Optional[PreviousPage]:
+        return self.pages.get(url)
+
+    def carry_forward(self, writer: PageBatchWriter, scan_id: int,
+                      carries: List[Tuple[PreviousPage, Dict[str, Any]]]) -> int:
+        """
+        Queue copies of previous pages with their issues on the writer; overrides replace
+        copied columns (discovery metadata, fresh validators). Returns the issues queued.
+        """
+        if not carries:
+            return 0
+        page_ids = [previous.id for previous, _ in carries]
+
+        rows = {
+            row['id']: row
+            for row in self.db.execute(select(Page.__table__).where(Page.id.in_(page_ids))).mappings()
+        }
+        issues_by_page: Dict[int, List[Dict[str, Any]]] = {page_id: [] for page_id in page_ids}
+        issue_rows = self.db.execute(
+            select(Issue.__table__)
+            .where(Issue.page_id.in_(page_ids))
+            .where(Issue.type.not_in(SITE_WIDE_RESOURCE_ISSUES | SCAN_LEVEL_ISSUES))
+            .order_by(Issue.id)
+        ).mappings()
+        for issue in issue_rows:
+            issues_by_page[issue['page_id']].append(dict(issue))
+        resource_issues = self._load_resource_issues()
+
+        issues_queued = 0
+        for previous, overrides in carries:
+            row = rows.get(previous.id)
+            if row is None:
+                continue
+            page = {key: value for key, value in row.items() if key not in SCAN_BOUND_PAGE_COLUMNS}
+            page.update(overrides, scan_id=scan_id)
+            if writer.has_page(scan_id, page['url']):
+                continue
+            issues = issues_by_page[previous.id] + resource_issues.get(previous.id, [])
+            issues_queued += writer.add_page(page, issues)
+        return issues_queued
+
+    def _load_resource_issues(self) -> Dict[int, List[Dict[str, Any]]]:
+        """Blocking-resource issues of the previous scan per page, loaded once"""
+        if self._resource_issues is None:
+            self._resource_issues = load_resource_issues(self.db, self.previous_scan_id)
+        return self._resource_issues
@@ -0,0 +1,184 @@
+"""
+Issue Explorer Service
+Filtered, keyset-paginated browsing of scan issues with grouped counts aggregated in SQL
+"""
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+from sqlalchemy import select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Page, Issue, ScanResource, ScanResourcePage
+from app.services.issue_resources import resource_rows
+from app.services.resource_index import issue_references
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+SEVERITY_ORDER = {'critical': 1, 'high': 2, 'medium': 3, 'low': 4}
+
+@dataclass
+class IssueFilters:
+    """Optional filters shared by the issue listing and the grouped counts"""
+    severity: Optional[str] = None
+    type: Optional[str] = None
+    category: Optional[str] = None
+    url_prefix: Optional[str] = None
+
+    def _filter_columns(self, query, columns):
+        if self.severity:
+            query = query.where(columns.severity == self.severity)
+        if self.type:
+            query = query.where(columns.type == self.type)
+        if self.category:
+            query = query.where(columns.category == self.category)
+        return query
+
+    def apply(self, query, scan_id: int):
+        """Filter an issue query (joined to the issue's page when url_prefix is set)"""
+        query = self._filter_columns(query.where(Issue.scan_id == scan_id), Issue)
+        if self.url_prefix:
+            url_matches = Page.url.startswith(self.url_prefix, autoescape=True)
+            # Site-wide resource issues also match through any page referencing the resource
+            linked = (
+                select(ScanResource.issue_id)
+                .join(ScanResourcePage, ScanResourcePage.scan_resource_id == ScanResource.id)
+                .join(Page, Page.id == ScanResourcePage.page_id)
+                .where(ScanResourcePage.scan_id == scan_id, url_matches)
+            )
+            query = query.where(or_(url_matches, Issue.id.in_(linked)))
+        return query
+
+    def apply_references(self, query, references):
+        """Filter an issue_references query (joined to the referencing page when url_prefix is set)"""
+        query = self._filter_columns(query, references.c)
+        if self.url_prefix:
+            query = query.where(Page.url.startswith(self.url_prefix, autoescape=True))
+        return query
+
+class IssueExplorerService:
+    """Browses the issues of a scan without loading them all: SQL counts plus keyset pages"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def group_counts(self, scan_id: int, filters: Optional[IssueFilters] = None) -> List[Dict[str, Any]]:
+        """
+        Issue and affected page counts per (severity, type), most severe first; a site-wide
+        resource issue counts once per page referencing the resource
+        """
+        filters = filters or IssueFilters()
+        references = issue_references(scan_id)
+        query = select(
+            references.c.severity, references.c.type, func.count(), func.count(func.distinct(references.c.page_id))
+        )
+        if filters.url_prefix:
+            query = query.join(Page, references.c.page_id == Page.id)
+        result = await self.db.execute(
+            filters.apply_references(query, references).group_by(references.c.severity, references.c.type)
+        )
+        groups = [
+            {'severity': severity, 'type': issue_type, 'count': count, 'pages': pages}
+            for severity, issue_type, count, pages in result
+        ]
+        groups.sort(key=lambda group: (SEVERITY_ORDER.get(group['severity'], 5), -group['count'], group['type']))
+        return groups
+
+    async def list_issues(self, scan_id: int, filters: Optional[IssueFilters] = None,
+                          after_id: Optional[int] = None,
+                          limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        One page of issues ordered by id, starting after the after_id cursor.
+        Returns the rows (issue columns plus page_url) and the cursor of the next page, if any.
+        """
+        filters = filters or IssueFilters()
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = (
+            select(Issue, Page.url)
+            .join(Page, Issue.page_id == Page.id)
+        )
+        query = filters.apply(query, scan_id)
+        if after_id is not None:
+            query = query.where(Issue.id > after_id)
+
+        # One extra row tells whether another page exists
+        result = await self.db.execute(query.order_by(Issue.id).limit(limit + 1))
+        rows = result.all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        items = [
+            {
+                'id': issue.id,
+                'page_id': issue.page_id,
+                'page_url': page_url,
+                'type': issue.type,
+                'category': issue.category,
+                'severity': issue.severity,
+                'title': issue.title,
+                'description': issue.description,
+                'element': issue.element,
+                'resources': issue.resources,
+                'recommendation': issue.recommendation,
+                'score_impact': issue.score_impact,
+                'status': issue.status,
+                'detected_at': issue.detected_at
+            }
+            for issue, page_url in rows
+        ]
+        next_cursor = items[-1]['id'] if has_more else None
+        return items, next_cursor
+
+    async def list_resources(self, scan_id: int, filters: IssueFilters, after_id: Optional[int] = None,
+                             limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """One page of issues expanded to resource table rows, for the lazily loaded UI groups"""
+        items, next_cursor = await self.list_issues(scan_id, filters, after_id, limit)
+        resources = []
+        for item in items:
+            resources.extend(resource_rows(
+                item['resources'], item['page_url'], item['type'], item['element'], item['description']
+            ))
+        return resources, next_cursor
+
+    async def list_scan_resources(self, scan_id: int, issue_type: Optional[str] = None,
+                                  after_id: Optional[int] = None,
+                                  limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """One keyset page of the scan resource index: each blocking resource once, with its pages"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = select(ScanResource).where(ScanResource.scan_id == scan_id)
+        if issue_type:
+            query = query.where(ScanResource.issue_type == issue_type)
+        if after_id is not None:
+            query = query.where(ScanResource.id > after_id)
+
+        result = await self.db.execute(query.order_by(ScanResource.id).limit(limit + 1))
+        rows = result.scalars().all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        page_ids: Dict[int, List[int]] = {resource.id: [] for resource in rows}
+        if page_ids:
+            links = await self.db.execute(
+                select(ScanResourcePage.scan_resource_id, ScanResourcePage.page_id)
+                .where(ScanResourcePage.scan_resource_id.in_(page_ids))
+                .order_by(ScanResourcePage.scan_resource_id, ScanResourcePage.page_id)
+            )
+            for resource_id, page_id in links:
+                page_ids[resource_id].append(page_id)
+        items = [
+            {
+                'id': resource.id,
+                'issue_id': resource.issue_id,
+                'url': resource.url,
+                'resource_type': resource.resource_type,
+                'issue_type': resource.issue_type,
+                'details': resource.details,
+                'page_ids': page_ids[resource.id],
+                'page_count': resource.page_count
+            }
+            for resource in rows
+        ]
+        next_cursor = items[-1]['id'] if has_more else None
+        return items, next_cursor
@@ -0,0 +1,104 @@
+"""
+Issue Resource Normalization
+Parses issue element JSON into fixed-shape resource rows once, when issues are stored
+"""
+import logging
+from typing import Dict, List, Any, Optional
+
+from app.services.seo_analyzer.core.resource_details import IssueFactory
+
+logger = logging.getLogger(__name__)
+
+# Issue types whose details are specific resources; no page-level fallback row for these
+RESOURCE_BASED_ISSUES = frozenset({
+    'blocking_css_resource', 'risorsa_css_bloccante',
+    'blocking_js_resource', 'risorsa_js_bloccante',
+    'image_missing_alt', 'immagine_senza_alt',
+    'image_oversized', 'immagine_sovradimensionata',
+    'too_many_images', 'troppe_immagini',
+    'image_bad_filename', 'immagine_nome_file_cattivo',
+    'large_image', 'immagine_grande',
+    'missing_meta_description', 'meta_description_mancante',
+    'h1_mancante', 'missing_h1',
+    'canonical_mancante', 'missing_canonical',
+    'missing_schema_markup', 'schema_markup_mancante'
+})
+
+# Shape of every stored resource row (Issue.resources)
+RESOURCE_FIELDS = ('resource_url', 'resource_type', 'optimization', 'title', 'content')
+
+def _resource_row(resource_url: str = '', resource_type: str = '', optimization: str = '',
+                  title: str = '', content: str = '') -> Dict[str, str]:
+    return {
+        'resource_url': resource_url or '',
+        'resource_type': resource_type or '',
+        'optimization': optimization or '',
+        'title': title or '',
+        'content': content or ''
+    }
+
+def _page_level_row(issue_type: str, description: Optional[str]) -> Dict[str, str]:
+    """Row for page-level issues (title, meta description, content, ...) without a specific resource"""
+    optimization_text = description or 'Risolvi questo problema'
+    resource_type = 'pagina'
+
+    # Personalizza in base al tipo di issue
+    if 'meta_desc' in issue_type or 'meta_description' in issue_type:
+        resource_type = 'meta-description'
+        if 'too_long' in issue_type or 'troppo_lunga' in issue_type:
+            optimization_text = f"Meta description troppo lunga. {description or ''}"
+        elif 'too_short' in issue_type or 'troppo_corta' in issue_type:
+            optimization_text = f"Meta description troppo corta. {description or ''}"
+    elif 'title' in issue_type:
+        resource_type = 'title-tag'
+        if 'too_long' in issue_type or 'troppo_lungo' in issue_type:
+            optimization_text = f"Title tag troppo lungo. {description or ''}"
+        elif 'too_short' in issue_type or 'troppo_corto' in issue_type:
+            optimization_text = f"Title tag troppo corto. {description or ''}"
+    elif 'content' in issue_type or 'contenuto' in issue_type:
+        resource_type = 'contenuto'
+
+    return _resource_row(
+        resource_type=resource_type,
+        optimization=optimization_text,
+        title=optimization_text,
+        content=description
+    )
+
+def normalize_issue_resources(issue_type: str, element: Optional[str],
+                              description: Optional[str]) -> List[Dict[str, str]]:
+    """
+    Resource rows for one issue, parsed from its (consolidated) element JSON.
+    Resource-based issues without granular details get no rows rather than made-up ones.
+    """
+    issue_dict = {'element': element or '', 'description': description or '', 'type': issue_type}
+    try:
+        resources = IssueFactory.extract_consolidated_resources(issue_dict)
+        if not resources:
+            single = IssueFactory.extract_resource_details(issue_dict)
+            resources = [single] if single else []
+    except Exception as e:
+        logger.error(f"Error parsing resource details for issue type {issue_type}: {e}")
+        return []
+
+    if resources:
+        return [
+            _resource_row(
+                resource_url=resource.resource_url,
+                resource_type=getattr(resource.resource_type, 'value', resource.resource_type)
+            )
+            for resource in resources
+        ]
+    if issue_type not in RESOURCE_BASED_ISSUES:
+        return [_page_level_row(issue_type, description)]
+    return []
+
+def resource_rows(resources: Optional[List[Dict[str, str]]], page_url: str, issue_type: str = '',
+                  element: Optional[str] = None, description: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Template rows for an issue: its stored resources tagged with the page URL.
+    Issues stored before normalization (resources is NULL) are parsed here instead.
+    """
+    if resources is None:
+        resources = normalize_issue_resources(issue_type, element, description)
+    return [{'page_url': page_url, **resource} for resource in resources]
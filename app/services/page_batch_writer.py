@@ -0,0 +1,148 @@
+"""
+Bulk Page/Issue Writer
+Buffers scan pages with their issues and writes them with multi-row INSERT ... RETURNING
+"""
+import logging
+from typing import Dict, List, Any, Optional, Iterable, Set, Tuple
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Page, Issue
+from app.services.issue_resources import normalize_issue_resources
+from app.services.resource_index import ScanResourceIndex, resource_reference_count, split_site_wide_issues
+from app.services.html_snapshots import PendingSnapshot, store_snapshots
+
+logger = logging.getLogger(__name__)
+
+PAGE_COLUMNS = frozenset(Page.__table__.columns.keys()) - {'id'}
+ISSUE_COLUMNS = frozenset(Issue.__table__.columns.keys()) - {'id', 'page_id', 'scan_id'}
+
+class PageBatchWriter:
+    """
+    Collects pages and issues and inserts them in bulk: one multi-row INSERT ... RETURNING
+    assigns the page ids of a whole batch, then the issues of the batch go in one executemany.
+    Blocking-resource issues are not stored per page but merged into the scan resource index;
+    a page's issues_count is its own issue rows plus the indexed resources it references.
+    Raw HTML snapshots queued with pages are stored once per content hash, and existing pages
+    can be rewritten with new analysis results (re-analysis).
+    Runs inside the caller's session transaction; committing stays with the caller.
+    """
+
+    def __init__(self, db: Session, flush_size: Optional[int] = None):
+        self.db = db
+        self.flush_size = max(1, flush_size or settings.scan_persist_batch_size)
+        self._pending: List[Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]] = []
+        self._updates: List[Tuple[Dict[str, Any], int, List[Dict[str, Any]], List[Dict[str, Any]]]] = []
+        self._snapshots: Dict[str, PendingSnapshot] = {}
+        self.resource_index = ScanResourceIndex(db)
+        self._urls: Set[Tuple[int, str]] = set()
+        self.pages_written = 0
+        self.issues_written = 0
+
+    def __len__(self) -> int:
+        return len(self._pending) + len(self._updates)
+
+    @staticmethod
+    def _prepare_issues(issues: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Issue rows (columns only, resources normalized) and site-wide resource issues of a page"""
+        issue_rows = [
+            {key: value for key, value in issue.items() if key in ISSUE_COLUMNS}
+            for issue in issues
+        ]
+        issue_rows, resource_issues = split_site_wide_issues(issue_rows)
+        for issue_row in issue_rows:
+            if 'resources' not in issue_row:
+                # Parse element once here so result pages only project stored rows
+                issue_row['resources'] = normalize_issue_resources(
+                    issue_row.get('type', ''), issue_row.get('element'), issue_row.get('description')
+                )
+        return issue_rows, resource_issues
+
+    def add_page(self, page: Dict[str, Any], issues: Iterable[Dict[str, Any]] = (),
+                 snapshot: Optional[PendingSnapshot] = None) -> int:
+        """
+        Queue a page row (column -> value) with its issue rows and optionally its raw HTML
+        snapshot; flushes when the batch is full. Returns the page's issues_count.
+        """
+        page_row = {key: value for key, value in page.items() if key in PAGE_COLUMNS}
+        issue_rows, resource_issues = self._prepare_issues(issues)
+        page_row['issues_count'] = len(issue_rows) + resource_reference_count(resource_issues)
+        if snapshot is not None:
+            self._snapshots[snapshot.content_hash] = snapshot
+            page_row.setdefault('html_hash', snapshot.content_hash)
+        self._pending.append((page_row, issue_rows, resource_issues))
+        self._urls.add((page_row.get('scan_id'), page_row.get('url')))
+
+        if len(self) >= self.flush_size:
+            self.flush()
+        return page_row['issues_count']
+
+    def update_page(self, page_id: int, scan_id: int, fields: Dict[str, Any],
+                    issues: Iterable[Dict[str, Any]] = ()) -> int:
+        """
+        Queue new analysis results for a stored page: column updates plus issues added to the
+        page. Removing the page's previous issues stays with the caller. Returns the page's issues_count.
+        """
+        page_row = {key: value for key, value in fields.items() if key in PAGE_COLUMNS}
+        issue_rows, resource_issues = self._prepare_issues(issues)
+        page_row['issues_count'] = len(issue_rows) + resource_reference_count(resource_issues)
+        self._updates.append(({**page_row, 'id': page_id}, scan_id, issue_rows, resource_issues))
+
+        if len(self) >= self.flush_size:
+            self.flush()
+        return page_row['issues_count']
+
+    def has_page(self, scan_id: int, url: str) -> bool:
+        """Whether a page for this scan and URL was already queued or marked as existing"""
+        return (scan_id, url) in self._urls
+
+    def mark_existing(self, scan_id: int, urls: Iterable[str]) -> None:
+        """Register URLs already stored for the scan (e.g. when resuming), so has_page sees them"""
+        self._urls.update((scan_id, url) for url in urls)
+
+    def flush(self) -> List[int]:
+        """Write all queued snapshots, pages, page updates and issues; returns the new page ids in queue order"""
+        if self._snapshots:
+            snapshots, self._snapshots = self._snapshots, {}
+            store_snapshots(self.db, snapshots.values())
+        if not self._pending and not self._updates:
+            return []
+
+        pending, self._pending = self._pending, []
+        updates, self._updates = self._updates, []
+        page_ids = []
+        if pending:
+            page_ids = self.db.scalars(
+                insert(Page).returning(Page.id, sort_by_parameter_order=True),
+                [page_row for page_row, _, _ in pending]
+            ).all()
+        if updates:
+            self.db.execute(update(Page), [page_row for page_row, _, _, _ in updates])
+
+        # (page id, scan id, issue rows, resource issues) of new and updated pages alike
+        written = [
+            (page_id, page_row['scan_id'], issues, resource_issues)
+            for page_id, (page_row, issues, resource_issues) in zip(page_ids, pending)
+        ] + [
+            (page_row['id'], scan_id, issues, resource_issues)
+            for page_row, scan_id, issues, resource_issues in updates
+        ]
+        issue_rows = [
+            {**issue_row, 'page_id': page_id, 'scan_id': scan_id}
+            for page_id, scan_id, issues, _ in written
+            for issue_row in issues
+        ]
+        if issue_rows:
+            self.db.execute(insert(Issue), issue_rows)
+
+        for page_id, scan_id, _, resource_issues in written:
+            if resource_issues:
+                self.resource_index.add(scan_id, page_id, resource_issues)
+        resource_issue_count = self.resource_index.flush()
+
+        self.pages_written += len(page_ids)
+        self.issues_written += len(issue_rows) + resource_issue_count
+        logger.debug(f"Bulk wrote {len(page_ids)} new and {len(updates)} updated pages, "
+                     f"{len(issue_rows) + resource_issue_count} issues")
+        return list(page_ids)
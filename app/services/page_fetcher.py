@@ -0,0 +1,381 @@
+"""
+Page Fetcher with per-website fetch mode
+Fetches pages over pooled HTTP/2, through the headless browser, or over HTTP with
+browser fallback for client-rendered pages, producing crawl4ai-compatible results.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Callable, AsyncIterator
+from urllib.parse import urljoin, urlparse, urldefrag
+from urllib.robotparser import RobotFileParser
+
+import httpx
+from bs4 import BeautifulSoup
+
+from app.core.config import settings
+from app.services.fetch_cache import FetchCache
+
+logger = logging.getLogger(__name__)
+
+FETCH_MODES = ('http', 'browser', 'auto')
+DEFAULT_FETCH_MODE = 'browser'
+
+USER_AGENT = 'SEO-Audit-Bot/1.0 (+https://seo-audit.ai/bot)'
+
+# Tags stripped from cleaned_html, mirroring the browser crawl's excluded_tags
+EXCLUDED_TAGS = ['script', 'style', 'nav', 'footer', 'aside', 'noscript', 'template']
+
+# Client-rendered shell heuristic: almost no server-rendered text plus a JS mount point or bundle
+CLIENT_RENDERED_MAX_WORDS = 50
+APP_MOUNT_IDS = {'root', 'app', '__next', '__nuxt', '___gatsby', 'svelte', 'main-app'}
+
+@dataclass
+class HttpFetchResult:
+    """Fetch result exposing the crawl4ai CrawlResult fields the scan pipeline reads"""
+    url: str
+    success: bool = False
+    status_code: Optional[int] = None
+    html: str = ''
+    cleaned_html: str = ''
+    markdown: str = ''
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    links: Dict[str, List[Dict[str, Any]]] = field(default_factory=lambda: {'internal': [], 'external': []})
+    media: Dict[str, List[Dict[str, Any]]] = field(default_factory=lambda: {'images': []})
+    response_headers: Dict[str, str] = field(default_factory=dict)
+    response_time: Optional[float] = None
+    error_message: Optional[str] = None
+    not_modified: bool = False  # 304 answer to a conditional request
+
+    # Rendering hints for the auto fetch mode
+    text_word_count: int = 0
+    script_count: int = 0
+    has_app_mount: bool = False
+
+
+def looks_client_rendered(result: HttpFetchResult) -> bool:
+    """True when the server HTML is an empty JS application shell that needs the browser"""
+    if not result.success or not result.html:
+        return False
+    if result.text_word_count > CLIENT_RENDERED_MAX_WORDS:
+        return False
+    return result.has_app_mount or result.script_count > 0
+
+
+def _same_site(host: str, base_host: str) -> bool:
+    return host.removeprefix('www.') == base_host.removeprefix('www.')
+
+
+def build_fetch_result(url: str, status_code: int, html: str, headers: Dict[str, str],
+                       response_time: Optional[float] = None) -> HttpFetchResult:
+    """Parse server HTML once into metadata, links, media and cleaned content"""
+    result = HttpFetchResult(
+        url=url,
+        success=True,
+        status_code=status_code,
+        html=html,
+        response_headers=headers,
+        response_time=response_time
+    )
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Metadata (crawl4ai keys: title, description, keywords, author, og:*, twitter:*)
+    metadata: Dict[str, Any] = {}
+    if soup.title and soup.title.string:
+        metadata['title'] = soup.title.string.strip()
+    for meta in soup.find_all('meta'):
+        key = (meta.get('name') or meta.get('property') or '').strip().lower()
+        content = meta.get('content')
+        if key and content is not None and key not in metadata:
+            metadata[key] = content.strip()
+    result.metadata = metadata
+
+    # Links
+    base_host = urlparse(url).netloc.lower()
+    seen = set()
+    for anchor in soup.find_all('a', href=True):
+        href = anchor['href'].strip()
+        if not href or href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+            continue
+        absolute = urldefrag(urljoin(url, href))[0]
+        parsed = urlparse(absolute)
+        if parsed.scheme not in ('http', 'https') or absolute in seen:
+            continue
+        seen.add(absolute)
+        bucket = 'internal' if _same_site(parsed.netloc.lower(), base_host) else 'external'
+        result.links[bucket].append({
+            'href': absolute,
+            'text': anchor.get_text(' ', strip=True),
+            'title': anchor.get('title', ''),
+            'base_domain': parsed.netloc.lower()
+        })
+
+    # Media
+    for img in soup.find_all('img'):
+        src = img.get('src') or img.get('data-src') or ''
+        if not src:
+            continue
+        result.media['images'].append({
+            'src': urljoin(url, src),
+            'alt': img.get('alt', ''),
+            'desc': img.get('title', ''),
+            'width': img.get('width'),
+            'height': img.get('height'),
+            'type': 'image'
+        })
+
+    # Rendering hints, then cleaned content
+    result.script_count = len(soup.find_all('script', src=True))
+    result.has_app_mount = any(
+        node.get('id', '').lower() in APP_MOUNT_IDS and not node.get_text(strip=True)
+        for node in soup.find_all(['div', 'main', 'section'], id=True)
+    )
+    for node in soup.find_all(EXCLUDED_TAGS):
+        node.decompose()
+    body = soup.body or soup
+    result.cleaned_html = str(body)
+    # Plain text stands in for crawl4ai's markdown (word counts, content analysis)
+    result.markdown = body.get_text(separator=' ', strip=True)
+    result.text_word_count = len(result.markdown.split())
+    return result
+
+
+class HttpFetcher:
+    """Pooled HTTP/2 keep-alive client fetching server-rendered HTML"""
+
+    def __init__(self, timeout: Optional[float] = None, max_connections: Optional[int] = None):
+        self.timeout = timeout or settings.http_fetch_timeout
+        self.max_connections = max_connections or settings.http_fetch_max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _create_client(self) -> httpx.AsyncClient:
+        options = dict(
+            timeout=self.timeout,
+            follow_redirects=True,
+            headers={'User-Agent': USER_AGENT, 'Accept': 'text/html,application/xhtml+xml'},
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections
+            )
+        )
+        try:
+            return httpx.AsyncClient(http2=True, **options)
+        except ImportError:
+            # HTTP/2 needs the optional h2 package (httpx[http2])
+            logger.warning("h2 not installed, HTTP fetcher falling back to HTTP/1.1")
+            return httpx.AsyncClient(**options)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> HttpFetchResult:
+        """
+        Fetch a page; transport errors and non-HTML responses yield an unsuccessful result.
+        With conditional headers (If-None-Match / If-Modified-Since) a 304 yields a not_modified result.
+        """
+        started = time.perf_counter()
+        try:
+            response = await self.client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            return HttpFetchResult(url=url, error_message=f"HTTP fetch failed: {str(e)}")
+
+        elapsed = time.perf_counter() - started
+        headers = {key.lower(): value for key, value in response.headers.items()}
+        final_url = str(response.url)
+        if response.status_code == 304:
+            return HttpFetchResult(
+                url=final_url, status_code=304, response_headers=headers,
+                response_time=elapsed, not_modified=True
+            )
+        content_type = headers.get('content-type', '')
+        if 'html' not in content_type and 'xml' not in content_type:
+            return HttpFetchResult(
+                url=final_url, status_code=response.status_code, response_headers=headers,
+                response_time=elapsed, error_message=f"Non-HTML content: {content_type or 'unknown'}"
+            )
+
+        return build_fetch_result(final_url, response.status_code, response.text, headers, elapsed)
+
+    async def is_not_modified(self, url: str, headers: Dict[str, str]) -> bool:
+        """Conditional HEAD request: whether the server answers 304 for the given validators"""
+        try:
+            response = await self.client.head(url, headers=headers)
+        except httpx.HTTPError as e:
+            logger.debug(f"Conditional request failed for {url}: {str(e)}")
+            return False
+        return response.status_code == 304
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class PageFetcher:
+    """
+    Fetches pages according to a website's fetch mode:
+    http (pooled client only), browser (crawl4ai only) or auto (HTTP, browser for JS shells).
+    The browser is launched lazily, so http/auto scans of static sites never start Chromium.
+    With a fetch cache, fresh cached pages are served from disk in every mode and successful
+    fetches are stored for later scans.
+    """
+
+    def __init__(self, fetch_mode: Optional[str], crawl_config: Any,
+                 browser_factory: Optional[Callable[[], Any]] = None,
+                 http_fetcher: Optional[HttpFetcher] = None,
+                 cache: Optional[FetchCache] = None):
+        if fetch_mode not in FETCH_MODES:
+            fetch_mode = DEFAULT_FETCH_MODE
+        self.fetch_mode = fetch_mode
+        self.crawl_config = crawl_config
+        self.browser_factory = browser_factory
+        self.http = http_fetcher or HttpFetcher()
+        self.cache = cache
+        self._browser = None
+        self._browser_lock = asyncio.Lock()
+        self.stats = {'http': 0, 'browser': 0, 'browser_fallbacks': 0, 'not_modified': 0, 'cached': 0}
+
+    async def __aenter__(self) -> 'PageFetcher':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _get_browser(self):
+        async with self._browser_lock:
+            if self._browser is None:
+                if self.browser_factory is None:
+                    raise RuntimeError("Browser fetch requested but no browser factory configured")
+                browser = self.browser_factory()
+                self._browser = await browser.__aenter__()
+            return self._browser
+
+    async def fetch_with_browser(self, url: str):
+        browser = await self._get_browser()
+        self.stats['browser'] += 1
+        return await browser.arun(url=url, config=self.crawl_config)
+
+    async def fetch(self, url: str, conditional_headers: Optional[Dict[str, str]] = None):
+        """
+        Fetch a single URL using the configured mode. With conditional headers from a previous
+        scan an unchanged page comes back as a not_modified result without body: the HTTP modes
+        send them with the GET, the browser mode checks with a conditional HEAD before rendering.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(url)
+            if cached is not None:
+                self.stats['cached'] += 1
+                return build_fetch_result(cached.url, cached.status_code, cached.text, cached.headers)
+            result = await self._fetch_live(url, conditional_headers)
+            self._store(url, result)
+            return result
+        return await self._fetch_live(url, conditional_headers)
+
+    def _store(self, url: str, result: Any) -> None:
+        """Cache a successful HTML result (rendered DOM in browser mode)"""
+        html = getattr(result, 'html', None)
+        if not getattr(result, 'success', False) or not html or getattr(result, 'status_code', None) != 200:
+            return
+        headers = getattr(result, 'response_headers', None) or {}
+        try:
+            self.cache.put(
+                url, 200, html.encode('utf-8'),
+                headers={str(key).lower(): str(value) for key, value in headers.items()},
+                final_url=getattr(result, 'url', None)
+            )
+        except OSError as e:
+            logger.warning(f"Could not cache {url}: {str(e)}")
+
+    async def _fetch_live(self, url: str, conditional_headers: Optional[Dict[str, str]] = None):
+        if self.fetch_mode == 'browser':
+            if conditional_headers and await self.http.is_not_modified(url, conditional_headers):
+                self.stats['not_modified'] += 1
+                return HttpFetchResult(url=url, status_code=304, not_modified=True)
+            return await self.fetch_with_browser(url)
+
+        result = await self.http.fetch(url, headers=conditional_headers or None)
+        self.stats['http'] += 1
+        if result.not_modified:
+            self.stats['not_modified'] += 1
+            return result
+        if self.fetch_mode == 'auto' and (result.status_code is None or looks_client_rendered(result)):
+            logger.info(f"Falling back to browser for {url}")
+            self.stats['browser_fallbacks'] += 1
+            return await self.fetch_with_browser(url)
+        return result
+
+    async def _load_robots(self, start_url: str) -> Optional[RobotFileParser]:
+        parsed = urlparse(start_url)
+        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        try:
+            response = await self.http.client.get(robots_url)
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not fetch robots.txt {robots_url}: {str(e)}")
+            return None
+        if response.status_code != 200:
+            return None
+        robots = RobotFileParser()
+        robots.parse(response.text.splitlines())
+        return robots
+
+    async def deep_crawl(self, start_url: str, max_depth: int, max_pages: int,
+                         include_external: bool = False, respect_robots: bool = True,
+                         concurrency: Optional[int] = None) -> AsyncIterator[Any]:
+        """
+        Breadth-first crawl from start_url following internal links, yielding results as
+        they complete. Mirrors BFSDeepCrawlStrategy limits (depth, page count, external links).
+        """
+        concurrency = concurrency or settings.max_concurrent_crawls
+        robots = await self._load_robots(start_url) if respect_robots else None
+        seen = {urldefrag(start_url)[0]}
+        frontier = deque([(start_url, 0)])
+        yielded = 0
+
+        while frontier and yielded < max_pages:
+            # One BFS wave at a time, bounded by the page budget and the concurrency limit
+            wave = []
+            while frontier and len(wave) < min(concurrency, max_pages - yielded):
+                url, depth = frontier.popleft()
+                if robots is not None and not robots.can_fetch(USER_AGENT, url):
+                    continue
+                wave.append((url, depth))
+            if not wave:
+                continue
+
+            results = await asyncio.gather(
+                *(self.fetch(url) for url, _ in wave), return_exceptions=True
+            )
+            for (url, depth), result in zip(wave, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Fetch failed for {url}: {str(result)}")
+                    continue
+                yielded += 1
+                yield result
+
+                if depth >= max_depth:
+                    continue
+                links = getattr(result, 'links', {}) or {}
+                candidates = list(links.get('internal', []))
+                if include_external:
+                    candidates += links.get('external', [])
+                for link in candidates:
+                    href = link.get('href') if isinstance(link, dict) else None
+                    if not href:
+                        continue
+                    href = urldefrag(urljoin(url, href))[0]
+                    if href not in seen:
+                        seen.add(href)
+                        frontier.append((href, depth + 1))
+
+    async def close(self):
+        await self.http.close()
+        if self._browser is not None:
+            try:
+                await self._browser.__aexit__(None, None, None)
+            finally:
+                self._browser = None
@@ -0,0 +1,114 @@
+"""
+Report Artifact Cache
+Content-addressed PDF reports on local disk, keyed by scan id and a digest of the report inputs,
+with a total size cap enforced by least-recently-used eviction
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def report_digest(inputs: Dict[str, Any]) -> str:
+    """Stable digest of everything a report is rendered from"""
+    payload = json.dumps(inputs, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ReportArtifactCache:
+    """
+    Stores one file per (scan id, input digest). Identical inputs map to the same file, so a
+    report is rendered once however often it is downloaded. File mtime doubles as the LRU clock:
+    hits touch the file and eviction removes the least recently used artifacts first.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.directory = directory or settings.report_cache_dir
+        self.max_bytes = max_bytes if max_bytes is not None else settings.report_cache_max_bytes
+
+    def path_for(self, scan_id: int, digest: str) -> str:
+        return os.path.join(self.directory, f"scan_{scan_id}_{digest}.pdf")
+
+    def touch(self, path: str) -> None:
+        """Mark an artifact as recently used"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def get(self, scan_id: int, digest: str) -> Optional[str]:
+        """Path of the cached artifact, or None on a miss"""
+        path = self.path_for(scan_id, digest)
+        if not os.path.exists(path):
+            return None
+        self.touch(path)
+        return path
+
+    def put(self, scan_id: int, digest: str, render: Callable[[str], Any]) -> str:
+        """
+        Render an artifact with render(target_path) and move it into the cache atomically.
+        Artifacts of the same scan with other digests are superseded and removed.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(scan_id, digest)
+        temp_fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        os.close(temp_fd)
+        try:
+            render(temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+        for stale in glob.glob(os.path.join(self.directory, f"scan_{scan_id}_*.pdf")):
+            if stale != path:
+                self._remove(stale)
+        self.evict(keep=path)
+        return path
+
+    def remove_scan(self, scan_id: int) -> int:
+        """Drop every artifact of a scan (e.g. when the scan is deleted)"""
+        removed = 0
+        for path in glob.glob(os.path.join(self.directory, f"scan_{scan_id}_*.pdf")):
+            removed += self._remove(path)
+        return removed
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Remove least recently used artifacts until the cache fits in max_bytes"""
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, "scan_*.pdf")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            if self._remove(path):
+                total -= size
+                removed += 1
+        if removed:
+            logger.info(f"Evicted {removed} cached reports, cache size now {total} bytes")
+        return removed
+
+    def _remove(self, path: str) -> int:
+        try:
+            os.unlink(path)
+            return 1
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            logger.warning(f"Could not remove cached report {path}: {str(e)}")
+            return 0
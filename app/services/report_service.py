@@ -1,7 +1,12 @@
-import tempfile
+"""
+PDF Report Service
+Builds scan PDF reports from SQL aggregates and bounded queries, cached by scan and report inputs
+"""
 import os
+import logging
+from dataclasses import dataclass, field, asdict
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Any, Optional, Set, Tuple
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.colors import HexColor, black, red, orange, blue
@@ -9,7 +14,74 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib import colors
 
+from sqlalchemy import select, func, case, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
 from app.models import Scan, Website, Page, Issue
+from app.services.report_cache import ReportArtifactCache, report_digest
+from app.services.resource_index import issue_references
+
+logger = logging.getLogger(__name__)
+
+# Bump when the report layout or content changes: cached PDFs of older versions are regenerated
+REPORT_VERSION = 1
+
+REPORT_ISSUES_LIMIT = 50       # Issues listed in the analysis table
+REPORT_ISSUES_PER_TYPE = 10    # ... of which at most this many per type
+REPORT_PAGES_LIMIT = 20        # Pages listed in the pages summary
+
+@dataclass
+class ReportData:
+    """Everything the report shows, gathered with aggregates and LIMIT queries"""
+    total_pages: int = 0
+    total_issues: int = 0
+    severity_counts: Dict[str, int] = field(default_factory=dict)
+    error_pages: int = 0
+    untitled_pages: int = 0
+    avg_response_time: float = 0.0
+    issue_types: Set[str] = field(default_factory=set)
+    issue_rows: List[Tuple[str, str, str, str]] = field(default_factory=list)  # type, severity, description, page url
+    page_rows: List[Tuple[str, Optional[int], Optional[str], int]] = field(default_factory=list)  # url, status, title, issues
+
+
+def report_inputs(scan: Scan, website: Website, data: ReportData) -> Dict[str, Any]:
+    """Everything the PDF depends on; its digest addresses the cached artifact"""
+    figures = asdict(data)
+    figures['issue_types'] = sorted(data.issue_types)
+    return {
+        'report_version': REPORT_VERSION,
+        'domain': website.domain,
+        'client': website.client.name if website.client else None,
+        'scan_status': scan.status,
+        'scan_completed_at': scan.completed_at,
+        'data': figures
+    }
+
+def report_state(scan: Scan) -> Dict[str, Any]:
+    """Report job state stored in scan.config['report'] ({} when never requested)"""
+    return dict((scan.config or {}).get('report') or {})
+
+def set_report_state(scan: Scan, **state) -> Dict[str, Any]:
+    """Replace the report job state (config is reassigned so the JSON change is persisted)"""
+    state = {
+        'version': REPORT_VERSION,
+        'scan_completed_at': scan.completed_at.isoformat() if scan.completed_at else None,
+        'updated_at': datetime.utcnow().isoformat(),
+        **state
+    }
+    scan.config = {**(scan.config or {}), 'report': state}
+    return state
+
+def cached_report_path(scan: Scan) -> Optional[str]:
+    """Path of a ready report for this version and this run of the scan, if one exists"""
+    state = report_state(scan)
+    completed_at = scan.completed_at.isoformat() if scan.completed_at else None
+    if (state.get('status') == 'ready' and state.get('version') == REPORT_VERSION
+            and state.get('scan_completed_at') == completed_at and state.get('path')
+            and os.path.exists(state['path'])):
+        return state['path']
+    return None
 
 
 class ReportService:
@@ -46,56 +118,98 @@ class ReportService:
             spaceAfter=12
         )
     
-    def generate_scan_report(self, scan: Scan, website: Website, pages: List[Page], issues: List[Issue]) -> str:
-        """Generate a comprehensive PDF report for a scan"""
-        
-        # Create temporary file for the PDF
-        temp_fd, temp_path = tempfile.mkstemp(suffix='.pdf')
-        os.close(temp_fd)
-        
+    def collect_report_data(self, db: Session, scan_id: int) -> ReportData:
+        """Report figures from SQL; only the listed issues and pages are fetched as rows"""
+        data = ReportData()
+
+        (data.total_pages, data.error_pages, data.untitled_pages, avg_response_time) = db.execute(
+            select(
+                func.count(Page.id),
+                func.sum(case((or_(Page.status_code.is_(None), Page.status_code != 200), 1), else_=0)),
+                func.sum(case((or_(Page.title.is_(None), Page.title == ''), 1), else_=0)),
+                func.avg(Page.response_time)
+            ).where(Page.scan_id == scan_id)
+        ).one()
+        data.error_pages = data.error_pages or 0
+        data.untitled_pages = data.untitled_pages or 0
+        data.avg_response_time = float(avg_response_time or 0.0)
+
+        # Same counting rule as the scan summary: site-wide resource issues once per referencing page
+        references = issue_references(scan_id)
+        for severity, issue_type, count in db.execute(
+            select(references.c.severity, references.c.type, func.count())
+            .group_by(references.c.severity, references.c.type)
+        ):
+            severity = severity or 'unknown'
+            data.severity_counts[severity] = data.severity_counts.get(severity, 0) + count
+            data.issue_types.add(issue_type)
+        data.total_issues = sum(data.severity_counts.values())
+
+        data.issue_rows = [
+            (issue_type or 'Altro', severity, description, page_url or 'N/A')
+            for issue_type, severity, description, page_url in db.execute(
+                select(Issue.type, Issue.severity, Issue.description, Page.url)
+                .outerjoin(Page, Issue.page_id == Page.id)
+                .where(Issue.scan_id == scan_id)
+                .order_by(Issue.id)
+                .limit(REPORT_ISSUES_LIMIT)
+            )
+        ]
+
+        data.page_rows = [
+            tuple(row) for row in db.execute(
+                select(Page.url, Page.status_code, Page.title, Page.issues_count)
+                .where(Page.scan_id == scan_id)
+                .order_by(Page.id)
+                .limit(REPORT_PAGES_LIMIT)
+            )
+        ]
+        return data
+
+    def generate_scan_report(self, scan: Scan, website: Website, data: ReportData, output_path: str) -> str:
+        """Generate a comprehensive PDF report for a scan into output_path"""
         try:
             # Create PDF document
             doc = SimpleDocTemplate(
-                temp_path,
+                output_path,
                 pagesize=A4,
                 rightMargin=72,
                 leftMargin=72,
                 topMargin=72,
                 bottomMargin=72
             )
-            
+
             # Build report content
             content = []
-            
+
             # Title and header
             content.extend(self._build_header(scan, website))
-            
+
             # Executive Summary
-            content.extend(self._build_executive_summary(scan, pages, issues))
-            
+            content.extend(self._build_executive_summary(data))
+
             # Statistics Overview
-            content.extend(self._build_statistics_overview(pages, issues))
-            
+            content.extend(self._build_statistics_overview(data))
+
             # Issues Analysis
-            content.extend(self._build_issues_analysis(issues))
-            
+            content.extend(self._build_issues_analysis(data))
+
             # Pages Summary
-            content.extend(self._build_pages_summary(pages))
-            
+            content.extend(self._build_pages_summary(data))
+
             # Recommendations
-            content.extend(self._build_recommendations(issues))
-            
+            content.extend(self._build_recommendations(data))
+
             # Build PDF
             doc.build(content)
-            
-            return temp_path
-            
+            return output_path
+
         except Exception as e:
-            # Clean up temp file on error
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+            # Clean up the partial file on error
+            if os.path.exists(output_path):
+                os.unlink(output_path)
             raise e
-    
+
     def _build_header(self, scan: Scan, website: Website) -> List:
         """Build report header section"""
         content = []
@@ -118,18 +232,18 @@ class ReportService:
         
         return content
     
-    def _build_executive_summary(self, scan: Scan, pages: List[Page], issues: List[Issue]) -> List:
+    def _build_executive_summary(self, data: ReportData) -> List:
         """Build executive summary section"""
         content = []
         
         content.append(Paragraph("Riepilogo Esecutivo", self.heading_style))
         
         # Count issues by severity
-        issues_by_severity = self._count_issues_by_severity(issues)
+        issues_by_severity = data.severity_counts
         
         # Calculate SEO score (simple algorithm)
-        total_issues = len(issues)
-        total_pages = len(pages)
+        total_issues = data.total_issues
+        total_pages = data.total_pages
         seo_score = max(0, 100 - (total_issues / max(total_pages, 1) * 10))
         
         summary_text = f"""
@@ -147,7 +261,7 @@ class ReportService:
         
         return content
     
-    def _build_statistics_overview(self, pages: List[Page], issues: List[Issue]) -> List:
+    def _build_statistics_overview(self, data: ReportData) -> List:
         """Build statistics overview section"""
         content = []
         
@@ -156,11 +270,11 @@ class ReportService:
         # Create statistics table
         stats_data = [
             ['Metrica', 'Valore'],
-            ['Pagine Analizzate', str(len(pages))],
-            ['Problemi Totali', str(len(issues))],
-            ['Pagine con Errori', str(sum(1 for page in pages if page.status_code != 200))],
-            ['Pagine Senza Titolo', str(sum(1 for page in pages if not page.title))],
-            ['Tempo Medio Risposta', f"{self._calculate_avg_response_time(pages):.2f}ms"]
+            ['Pagine Analizzate', str(data.total_pages)],
+            ['Problemi Totali', str(data.total_issues)],
+            ['Pagine con Errori', str(data.error_pages)],
+            ['Pagine Senza Titolo', str(data.untitled_pages)],
+            ['Tempo Medio Risposta', f"{data.avg_response_time:.2f}ms"]
         ]
         
         stats_table = Table(stats_data, colWidths=[3*inch, 2*inch])
@@ -180,38 +294,33 @@ class ReportService:
         
         return content
     
-    def _build_issues_analysis(self, issues: List[Issue]) -> List:
+    def _build_issues_analysis(self, data: ReportData) -> List:
         """Build issues analysis section"""
         content = []
         
         content.append(Paragraph("Analisi Problemi SEO", self.heading_style))
         
-        if not issues:
+        if not data.issue_rows:
             content.append(Paragraph("Nessun problema rilevato.", self.summary_style))
             return content
         
-        # Group issues by type and severity
+        # Group issues by type (the first issues of the scan only, for PDF size)
         issues_by_type = {}
-        for issue in issues[:50]:  # Limit to first 50 issues for PDF size
-            issue_type = issue.type or 'Altro'
-            if issue_type not in issues_by_type:
-                issues_by_type[issue_type] = []
-            issues_by_type[issue_type].append(issue)
+        for row in data.issue_rows:
+            issues_by_type.setdefault(row[0], []).append(row)
         
         # Create issues table
         issues_data = [['Tipo', 'Livello', 'Descrizione', 'Pagina']]
         
         for issue_type, type_issues in issues_by_type.items():
-            for issue in type_issues[:10]:  # Limit per type
-                severity_color = self._get_severity_color(issue.severity)
-                page_url = issue.page.url if issue.page else 'N/A'
+            for _, severity, description, page_url in type_issues[:REPORT_ISSUES_PER_TYPE]:  # Limit per type
                 # Truncate URL for display
                 display_url = page_url[:40] + '...' if len(page_url) > 40 else page_url
                 
                 issues_data.append([
                     issue_type,
-                    issue.severity.title() if issue.severity else 'N/A',
-                    issue.description[:60] + '...' if len(issue.description or '') > 60 else (issue.description or 'N/A'),
+                    severity.title() if severity else 'N/A',
+                    description[:60] + '...' if len(description or '') > 60 else (description or 'N/A'),
                     display_url
                 ])
         
@@ -233,24 +342,24 @@ class ReportService:
         
         return content
     
-    def _build_pages_summary(self, pages: List[Page]) -> List:
+    def _build_pages_summary(self, data: ReportData) -> List:
         """Build pages summary section"""
         content = []
         
         content.append(Paragraph("Riepilogo Pagine", self.heading_style))
         
-        if not pages:
+        if not data.page_rows:
             content.append(Paragraph("Nessuna pagina analizzata.", self.summary_style))
             return content
         
-        # Create pages table (top 20 pages)
+        # Create pages table (first pages of the scan)
         pages_data = [['URL', 'Status', 'Titolo', 'Problemi']]
         
-        for page in pages[:20]:  # Limit to first 20 pages
-            status_code = str(page.status_code) if page.status_code else 'N/A'
-            title = page.title[:40] + '...' if len(page.title or '') > 40 else (page.title or 'N/A')
-            url = page.url[:50] + '...' if len(page.url) > 50 else page.url
-            issues_count = str(page.issues_count or 0)
+        for page_url, page_status, page_title, page_issues in data.page_rows:
+            status_code = str(page_status) if page_status else 'N/A'
+            title = page_title[:40] + '...' if len(page_title or '') > 40 else (page_title or 'N/A')
+            url = page_url[:50] + '...' if len(page_url) > 50 else page_url
+            issues_count = str(page_issues or 0)
             
             pages_data.append([url, status_code, title, issues_count])
         
@@ -272,7 +381,7 @@ class ReportService:
         
         return content
     
-    def _build_recommendations(self, issues: List[Issue]) -> List:
+    def _build_recommendations(self, data: ReportData) -> List:
         """Build recommendations section"""
         content = []
         
@@ -281,19 +390,19 @@ class ReportService:
         # Generic recommendations based on issues found
         recommendations = []
         
-        if any(issue.type == 'meta' for issue in issues):
+        if 'meta' in data.issue_types:
             recommendations.append("• Ottimizzare i meta tag (title, description) per migliorare la visibilità sui motori di ricerca")
         
-        if any(issue.type == 'heading' for issue in issues):
+        if 'heading' in data.issue_types:
             recommendations.append("• Ristrutturare la gerarchia dei titoli (H1, H2, H3) per migliorare la struttura del contenuto")
         
-        if any(issue.type == 'image' for issue in issues):
+        if 'image' in data.issue_types:
             recommendations.append("• Aggiungere testi alternativi (alt text) alle immagini per migliorare l'accessibilità")
         
-        if any(issue.type == 'link' for issue in issues):
+        if 'link' in data.issue_types:
             recommendations.append("• Controllare e correggere i link non funzionanti")
         
-        if any(issue.severity == 'critical' for issue in issues):
+        if data.severity_counts.get('critical'):
             recommendations.append("• Dare priorità alla risoluzione dei problemi critici")
         
         if not recommendations:
@@ -310,14 +419,6 @@ class ReportService:
         
         return content
     
-    def _count_issues_by_severity(self, issues: List[Issue]) -> dict:
-        """Count issues by severity level"""
-        count = {}
-        for issue in issues:
-            severity = issue.severity or 'unknown'
-            count[severity] = count.get(severity, 0) + 1
-        return count
-    
     def _get_severity_color(self, severity: str) -> str:
         """Get color for severity level"""
         color_map = {
@@ -326,8 +427,39 @@ class ReportService:
             'minor': '#3498db'
         }
         return color_map.get(severity, '#95a5a6')
-    
-    def _calculate_avg_response_time(self, pages: List[Page]) -> float:
-        """Calculate average response time"""
-        response_times = [page.response_time for page in pages if page.response_time is not None]
-        return sum(response_times) / len(response_times) if response_times else 0.0
\ No newline at end of file
+
+
+def build_cached_report(db: Session, scan_id: int, cache: Optional[ReportArtifactCache] = None) -> str:
+    """
+    Return the report of a scan from the artifact cache, rendering it only when no artifact
+    exists for the current inputs, and record it as ready on the scan
+    """
+    scan = db.get(Scan, scan_id)
+    if scan is None:
+        raise ValueError(f"Scan {scan_id} not found")
+
+    path = cached_report_path(scan)
+    if path:
+        return path
+
+    cache = cache or ReportArtifactCache()
+    website = db.get(Website, scan.website_id)
+    service = ReportService()
+    data = service.collect_report_data(db, scan.id)
+    digest = report_digest(report_inputs(scan, website, data))
+
+    path = cache.get(scan.id, digest)
+    if path is None:
+        set_report_state(scan, status='running')
+        db.commit()
+        try:
+            path = cache.put(scan.id, digest, lambda target: service.generate_scan_report(scan, website, data, target))
+        except Exception as e:
+            set_report_state(scan, status='failed', error=str(e))
+            db.commit()
+            raise
+        logger.info(f"Report for scan {scan_id} written to {path}")
+
+    set_report_state(scan, status='ready', path=path, digest=digest)
+    db.commit()
+    return path
@@ -0,0 +1,231 @@
+"""
+Scan Resource Index
+Stores site-wide resources (render-blocking CSS and JavaScript) once per scan with the pages referencing them
+"""
+import json
+import logging
+from typing import Dict, List, Any, Iterable, Tuple
+from sqlalchemy import insert, select, update, union_all
+from sqlalchemy.orm import Session
+
+from app.models import Issue, ScanResource, ScanResourcePage
+from app.services.issue_resources import normalize_issue_resources
+from app.services.seo_analyzer.core.resource_details import IssueFactory
+
+logger = logging.getLogger(__name__)
+
+# Issue types whose resources are shared by template-driven pages (theme stylesheets, bundles)
+SITE_WIDE_RESOURCE_ISSUES = frozenset({
+    'blocking_css_resource', 'risorsa_css_bloccante',
+    'blocking_js_resource', 'risorsa_js_bloccante',
+})
+
+_SEVERITY_RANK = {'critical': 1, 'high': 2, 'medium': 3, 'low': 4}
+
+ResourceKey = Tuple[int, str, str]  # (scan_id, issue_type, resource_url)
+
+def split_site_wide_issues(issues: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Separate a page's issues into page-level issues and site-wide resource issues"""
+    page_issues, resource_issues = [], []
+    for issue in issues:
+        if issue.get('type') in SITE_WIDE_RESOURCE_ISSUES:
+            resource_issues.append(issue)
+        else:
+            page_issues.append(issue)
+    return page_issues, resource_issues
+
+def resource_reference_count(resource_issues: Iterable[Dict[str, Any]]) -> int:
+    """Number of distinct site-wide resources a page's blocking-resource issues reference"""
+    keys = set()
+    for issue in resource_issues:
+        for resource in IssueFactory.extract_consolidated_resources(issue) or []:
+            if resource.resource_url:
+                keys.add((issue.get('type'), resource.resource_url))
+    return len(keys)
+
+def issue_references(scan_id: int):
+    """
+    One row (issue_id, page_id, severity, type, category) per issue of a scan and page it
+    applies to: page-level issues once, indexed site-wide resource issues once per page
+    referencing the resource. This is the counting rule of Page.issues_count, scan summaries
+    and grouped issue counts.
+    """
+    indexed = select(ScanResource.issue_id).where(ScanResource.scan_id == scan_id, ScanResource.issue_id.is_not(None))
+    page_level = (
+        select(Issue.id.label('issue_id'), Issue.page_id.label('page_id'), Issue.severity.label('severity'),
+               Issue.type.label('type'), Issue.category.label('category'))
+        .where(Issue.scan_id == scan_id, Issue.id.not_in(indexed))
+    )
+    shared = (
+        select(Issue.id, ScanResourcePage.page_id, Issue.severity, Issue.type, Issue.category)
+        .join(ScanResource, ScanResource.id == ScanResourcePage.scan_resource_id)
+        .join(Issue, Issue.id == ScanResource.issue_id)
+        .where(ScanResourcePage.scan_id == scan_id)
+    )
+    return union_all(page_level, shared).subquery('issue_references')
+
+def load_resource_issues(db: Session, scan_id: int) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Blocking-resource issues of a scan per page, rebuilt from the resource index as
+    single-resource issues so a writer can index them again (for another scan or after re-analysis)
+    """
+    issues_by_page: Dict[int, List[Dict[str, Any]]] = {}
+    issues_by_resource: Dict[int, Dict[str, Any]] = {}
+    rows = db.execute(
+        select(ScanResourcePage.page_id, ScanResource.id, ScanResource.issue_type, ScanResource.details,
+               Issue.category, Issue.severity, Issue.title, Issue.recommendation, Issue.score_impact)
+        .join(ScanResource, ScanResource.id == ScanResourcePage.scan_resource_id)
+        .join(Issue, Issue.id == ScanResource.issue_id)
+        .where(ScanResourcePage.scan_id == scan_id)
+        .order_by(ScanResource.id, ScanResourcePage.page_id)
+    )
+    for page_id, resource_id, issue_type, details, category, severity, title, recommendation, score_impact in rows:
+        issue = issues_by_resource.get(resource_id)
+        if issue is None:
+            issue = issues_by_resource[resource_id] = {
+                'type': issue_type,
+                'category': category,
+                'severity': severity,
+                'title': title,
+                'element': json.dumps(details),
+                'recommendation': recommendation,
+                'score_impact': score_impact
+            }
+        issues_by_page.setdefault(page_id, []).append(issue)
+    return issues_by_page
+
+def _describe(resource_url: str, page_count: int) -> str:
+    pages = '1 pagina' if page_count == 1 else f'{page_count} pagine'
+    return f'Risorsa bloccante {resource_url} referenziata da {pages}'
+
+
+class ScanResourceIndex:
+    """
+    Maps each resource URL of a scan to the pages that reference it. A resource gets one
+    issue row and one scan_resources row (attributes and page count) however many pages
+    load it, plus one scan_resource_pages row per referencing page; later batches only
+    insert their new references. Runs inside the caller's transaction.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._pending: Dict[ResourceKey, Dict[str, Any]] = {}
+        self._stored: Dict[ResourceKey, Dict[str, Any]] = {}
+        self.resources_written = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, scan_id: int, page_id: int, issues: Iterable[Dict[str, Any]]) -> None:
+        """Register the resources of a page's (consolidated) blocking-resource issues"""
+        for issue in issues:
+            resources = IssueFactory.extract_consolidated_resources(issue) or []
+            score_share = (issue.get('score_impact') or 0.0) / max(1, len(resources))
+            for resource in resources:
+                if not resource.resource_url:
+                    continue
+                key = (scan_id, issue['type'], resource.resource_url)
+                entry = self._pending.get(key)
+                if entry is None:
+                    entry = self._pending[key] = {
+                        'issue': issue, 'resource': resource, 'score_impact': score_share, 'page_ids': {}
+                    }
+                elif _SEVERITY_RANK.get(issue.get('severity'), 5) < _SEVERITY_RANK.get(entry['issue'].get('severity'), 5):
+                    entry['issue'] = issue
+                entry['page_ids'][page_id] = None
+
+    def flush(self) -> int:
+        """Write pending references: new resources are inserted, every new page reference is one row"""
+        if not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        self._load_stored([key for key in pending if key not in self._stored])
+
+        new_keys = [key for key in pending if key not in self._stored]
+        if new_keys:
+            self._insert(new_keys, pending)
+
+        reference_rows, resource_updates, issue_updates = [], [], []
+        inserted = set(new_keys)
+        for key, entry in pending.items():
+            stored = self._stored[key]
+            reference_rows.extend(
+                {'scan_resource_id': stored['id'], 'page_id': page_id, 'scan_id': key[0]}
+                for page_id in entry['page_ids']
+            )
+            if key in inserted:
+                continue
+            stored['page_count'] += len(entry['page_ids'])
+            resource_updates.append({'id': stored['id'], 'page_count': stored['page_count']})
+            if stored['issue_id'] is not None:
+                issue_updates.append({'id': stored['issue_id'], 'description': _describe(key[2], stored['page_count'])})
+        if reference_rows:
+            self.db.execute(insert(ScanResourcePage), reference_rows)
+        if resource_updates:
+            self.db.execute(update(ScanResource), resource_updates)
+        if issue_updates:
+            self.db.execute(update(Issue), issue_updates)
+
+        logger.debug(f"Resource index: {len(new_keys)} new resources, {len(reference_rows)} page references")
+        return len(new_keys)
+
+    def _load_stored(self, keys: List[ResourceKey]) -> None:
+        """Pick up resources already stored for the scan (e.g. when a scan is resumed)"""
+        if not keys:
+            return
+        wanted = set(keys)
+        rows = self.db.execute(
+            select(ScanResource.id, ScanResource.issue_id, ScanResource.scan_id, ScanResource.issue_type,
+                   ScanResource.url, ScanResource.page_count)
+            .where(ScanResource.scan_id.in_({key[0] for key in keys}))
+            .where(ScanResource.url.in_({key[2] for key in keys}))
+        )
+        for resource_id, issue_id, scan_id, issue_type, url, page_count in rows:
+            key = (scan_id, issue_type, url)
+            if key in wanted:
+                self._stored[key] = {'id': resource_id, 'issue_id': issue_id, 'page_count': page_count or 0}
+
+    def _insert(self, keys: List[ResourceKey], pending: Dict[ResourceKey, Dict[str, Any]]) -> None:
+        issue_rows = []
+        for scan_id, issue_type, url in keys:
+            entry = pending[(scan_id, issue_type, url)]
+            issue, element = entry['issue'], entry['resource'].to_json()
+            description = _describe(url, len(entry['page_ids']))
+            issue_rows.append({
+                # The issue row is owned by the first referencing page; the others are linked rows
+                'page_id': next(iter(entry['page_ids'])),
+                'scan_id': scan_id,
+                'type': issue_type,
+                'category': issue.get('category', 'performance'),
+                'severity': issue.get('severity', 'medium'),
+                'title': issue.get('title', ''),
+                'description': description,
+                'element': element,
+                'resources': normalize_issue_resources(issue_type, element, description),
+                'recommendation': issue.get('recommendation'),
+                'score_impact': entry['score_impact']
+            })
+        issue_ids = self.db.scalars(
+            insert(Issue).returning(Issue.id, sort_by_parameter_order=True), issue_rows
+        ).all()
+
+        resource_rows = []
+        for key, issue_id in zip(keys, issue_ids):
+            resource = pending[key]['resource']
+            resource_rows.append({
+                'scan_id': key[0],
+                'issue_id': issue_id,
+                'url': key[2],
+                'resource_type': resource.resource_type.value,
+                'issue_type': key[1],
+                'details': json.loads(resource.to_json()),
+                'page_count': len(pending[key]['page_ids'])
+            })
+        resource_ids = self.db.scalars(
+            insert(ScanResource).returning(ScanResource.id, sort_by_parameter_order=True), resource_rows
+        ).all()
+
+        for key, issue_id, resource_id in zip(keys, issue_ids, resource_ids):
+            self._stored[key] = {'id': resource_id, 'issue_id': issue_id, 'page_count': len(pending[key]['page_ids'])}
+        self.resources_written += len(keys)
@@ -0,0 +1,181 @@
+"""
+Scan Re-Analysis
+Reruns page analysis of a completed scan over its stored raw HTML snapshots and rewrites issues and scores without recrawling
+"""
+import logging
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import select, delete, update, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Scan, Page, Issue, ScanResource, ScanResourcePage
+from app.services.duplicate_detection import DUPLICATE_ISSUE_TYPE, detect_near_duplicates, mark_canonical_pages
+from app.services.html_snapshots import load_snapshots
+from app.services.page_batch_writer import PageBatchWriter
+from app.services.page_fetcher import build_fetch_result
+from app.services.report_cache import ReportArtifactCache
+from app.services.resource_index import issue_references, load_resource_issues
+from app.services.scan_summary_service import compute_scan_summary
+from app.services.seo_analyzer.seo_analyzer import SEOAnalyzer
+from app.services.seo_analyzer.analysis_pool import (
+    PageSnapshot, analyze_page, analyze_snapshot, analysis_page_fields, get_analysis_pool
+)
+
+logger = logging.getLogger(__name__)
+
+# Issues that do not depend on the page HTML and are kept as they are
+URL_ISSUE_TYPES = frozenset({'url_structure_issue'})
+
+# Page content columns taken from the analysis besides analysis_page_fields
+CONTENT_COLUMNS = ('title', 'meta_description', 'h1_tags', 'h2_tags', 'h3_tags', 'word_count')
+
+def _execution_options() -> Dict[str, object]:
+    return {'synchronize_session': False}
+
+def _analyze_chunk(analyzer: Optional[SEOAnalyzer], domain: str,
+                   pages: List[Tuple[int, str, int, str]]) -> List[Tuple[int, str, Any]]:
+    """
+    (page id, url, analyze_page result or exception) for (page id, url, status, html) tuples:
+    in the shared process pool when one is configured, else in this process
+    """
+    snapshots = [
+        (page_id, url, PageSnapshot.from_crawl_result(build_fetch_result(url, status_code or 200, html, {})))
+        for page_id, url, status_code, html in pages
+    ]
+    pool = get_analysis_pool(settings.analysis_process_pool_size)
+    if pool is not None:
+        futures: List[Tuple[int, str, Future]] = [
+            (page_id, url, pool.submit(analyze_snapshot, snapshot, domain, url))
+            for page_id, url, snapshot in snapshots
+        ]
+        outcomes = []
+        for page_id, url, future in futures:
+            try:
+                outcomes.append((page_id, url, future.result()))
+            except Exception as e:
+                outcomes.append((page_id, url, e))
+        return outcomes
+
+    outcomes = []
+    for page_id, url, snapshot in snapshots:
+        try:
+            outcomes.append((page_id, url, analyze_page(analyzer, snapshot, domain, url)))
+        except Exception as e:
+            outcomes.append((page_id, url, e))
+    return outcomes
+
+def reanalyze_scan_sync(db: Session, scan_id: int, chunk_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Analyze again every page of a completed scan that has a stored HTML snapshot and replace
+    its analysis columns and issues; pages without a snapshot keep their results. Site-wide
+    resource issues, canonical flags, near-duplicate groups, scan totals, score and summary
+    are rebuilt. Runs in one transaction, committed at the end.
+    """
+    chunk_size = max(1, chunk_size or settings.scan_reanalysis_chunk_size)
+    scan = db.get(Scan, scan_id)
+    if scan is None:
+        raise ValueError(f"Scan {scan_id} not found")
+    if scan.status != 'completed':
+        raise ValueError(f"Scan {scan_id} is {scan.status}, only completed scans can be re-analyzed")
+
+    domain = scan.website.domain
+    analyzer = SEOAnalyzer()
+    writer = PageBatchWriter(db)
+    counts = {'pages_reanalyzed': 0, 'pages_without_snapshot': 0, 'pages_failed': 0}
+
+    # The resource index is rebuilt from scratch: keep the references of pages not re-analyzed
+    previous_resource_issues = load_resource_issues(db, scan_id)
+    resource_issue_ids = db.scalars(select(ScanResource.issue_id).where(ScanResource.scan_id == scan_id)).all()
+    db.execute(
+        delete(ScanResourcePage).where(ScanResourcePage.scan_id == scan_id), execution_options=_execution_options()
+    )
+    db.execute(delete(ScanResource).where(ScanResource.scan_id == scan_id), execution_options=_execution_options())
+    if resource_issue_ids:
+        db.execute(delete(Issue).where(Issue.id.in_(resource_issue_ids)), execution_options=_execution_options())
+    db.execute(
+        delete(Issue).where(Issue.scan_id == scan_id, Issue.type == DUPLICATE_ISSUE_TYPE),
+        execution_options=_execution_options()
+    )
+    db.execute(update(Page).where(Page.scan_id == scan_id).values(duplicate_group_id=None))
+
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Page.id, Page.url, Page.status_code, Page.html_hash)
+            .where(Page.scan_id == scan_id, Page.id > last_id)
+            .order_by(Page.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        snapshots = load_snapshots(db, (row.html_hash for row in rows))
+        pages = []
+        for row in rows:
+            html = snapshots.get(row.html_hash) if row.html_hash else None
+            if html is None:
+                counts['pages_without_snapshot'] += 1
+                if previous_resource_issues.get(row.id):
+                    writer.resource_index.add(scan_id, row.id, previous_resource_issues[row.id])
+                continue
+            pages.append((row.id, row.url, row.status_code, html))
+        if not pages:
+            continue
+
+        analyzed_ids = []
+        updates = []
+        for page_id, url, analyzed in _analyze_chunk(analyzer, domain, pages):
+            if isinstance(analyzed, Exception):
+                # The stored results stay; this page keeps its previous issues and references
+                logger.error(f"Error re-analyzing page {url}: {str(analyzed)}")
+                counts['pages_failed'] += 1
+                if previous_resource_issues.get(page_id):
+                    writer.resource_index.add(scan_id, page_id, previous_resource_issues[page_id])
+                continue
+            analysis = analyzed['analysis']
+            fields = {key: analysis[key] for key in CONTENT_COLUMNS if key in analysis}
+            fields.update(analysis_page_fields(analyzed))
+            # Same default as the scan post-processing: a page without canonical is its own
+            fields['canonical_url'] = fields['canonical_url'] or url
+            analyzed_ids.append(page_id)
+            updates.append((page_id, fields, analysis.get('issues', [])))
+
+        if analyzed_ids:
+            db.execute(
+                delete(Issue).where(Issue.page_id.in_(analyzed_ids), Issue.type.not_in(URL_ISSUE_TYPES)),
+                execution_options=_execution_options()
+            )
+        for page_id, fields, issues in updates:
+            writer.update_page(page_id, scan_id, fields, issues)
+        writer.flush()
+        counts['pages_reanalyzed'] += len(analyzed_ids)
+
+    writer.flush()
+    writer.resource_index.flush()
+    # Re-analysis can change canonical URLs: flags first, then the clusters that read them
+    mark_canonical_pages(db, scan_id)
+    detect_near_duplicates(db, scan_id)
+
+    # Kept URL issues and the rebuilt duplicate issues are not in the writer's counts: recount per page
+    references = issue_references(scan_id)
+    db.execute(
+        update(Page)
+        .where(Page.scan_id == scan_id)
+        .values(issues_count=select(func.count()).where(references.c.page_id == Page.id).scalar_subquery()),
+        execution_options=_execution_options()
+    )
+    scan.total_issues = db.scalar(select(func.count()).select_from(references))
+    page_scores = db.scalars(select(Page.seo_score).where(Page.scan_id == scan_id, Page.seo_score > 0)).all()
+    if page_scores:
+        scan.seo_score = analyzer.scoring_engine.calculate_website_score(page_scores)['average_score']
+    else:
+        scan.seo_score = 0.0
+    compute_scan_summary(db, scan_id)
+    db.commit()
+
+    ReportArtifactCache().remove_scan(scan_id)
+    result = {**counts, 'total_issues': scan.total_issues, 'seo_score': scan.seo_score}
+    logger.info(f"Re-analyzed scan {scan_id}: {result}")
+    return result
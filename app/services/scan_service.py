@@ -9,10 +9,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.database import AsyncSessionLocal
-from app.models import Scan, Page, Issue, Website
+from app.models import Scan, Page, Issue, Website, ScanResource
 from app.services.seo_analyzer import SEOAnalyzer
+from app.services.seo_analyzer.core.parsed_page import ParsedPage
 from app.services.seo_analyzer.issue_deduplicator import IssueDeduplicator
 from app.services.url_utils import clean_url
+from app.services.scan_summary_service import compute_scan_summary
+from app.services.issue_resources import normalize_issue_resources
+from app.services.resource_index import ScanResourceIndex, resource_reference_count, split_site_wide_issues
 
 logger = logging.getLogger(__name__)
 
@@ -88,6 +92,7 @@ class ScanService:
                     pages_scanned = 0
                     pages_failed = 0
                     total_issues = 0
+                    resource_index = ScanResourceIndex(db.sync_session)
                     
                     # Process each crawled page
                     # Handle both CrawlResultContainer and list-like results
@@ -104,8 +109,9 @@ class ScanService:
                     
                     for result in results_to_process:
                         try:
-                            # Analyze page using Crawl4AI data directly
-                            page_data = await self.seo_analyzer.analyze_page_content(result, website.domain)
+                            # Analyze page using Crawl4AI data directly (parsed once per page)
+                            parsed_page = ParsedPage(result)
+                            page_data = await self.seo_analyzer.analyze_page_content(result, website.domain, parsed_page)
                             
                             # Extract Core Web Vitals scores
                             cwv_data = page_data.get('core_web_vitals', {})
@@ -159,14 +165,19 @@ class ScanService:
                             await db.flush()
                             
                             # Save issues using Crawl4AI data with deduplication
-                            raw_issues = await self.seo_analyzer.analyze_page_issues(result, page.id)
+                            raw_issues = await self.seo_analyzer.analyze_page_issues(result, website.domain, page.id, parsed_page)
                             
                             # Deduplicate issues for this page
                             deduplicated_issues = self.issue_deduplicator.deduplicate_issues(raw_issues, page.id)
                             
-                            for issue_data in deduplicated_issues:
-                                issue = Issue(page_id=page.id, **issue_data)
+                            # Blocking CSS/JS go to the scan resource index, once per resource
+                            page_issues, resource_issues = split_site_wide_issues(deduplicated_issues)
+                            for issue_data in page_issues:
+                                issue = Issue(page_id=page.id, scan_id=scan_id, **issue_data)
+                                issue.resources = normalize_issue_resources(issue.type, issue.element, issue.description)
                                 db.add(issue)
+                            if resource_issues:
+                                resource_index.add(scan_id, page.id, resource_issues)
                             
                             # Update count to use deduplicated issues
                             issues = deduplicated_issues
@@ -174,9 +185,9 @@ class ScanService:
                             # Calculate SEO score for this page
                             page_score = self.seo_analyzer.scoring_engine.calculate_page_score(issues)
                             page.seo_score = page_score
-                            page.issues_count = len(issues)
+                            page.issues_count = len(page_issues) + resource_reference_count(resource_issues)
                             
-                            total_issues += len(issues)
+                            total_issues += page.issues_count
                             pages_scanned += 1
                             
                         except Exception as e:
@@ -203,6 +214,7 @@ class ScanService:
                                 # Add error issue
                                 error_issue = Issue(
                                     page_id=failed_page.id,
+                                    scan_id=scan_id,
                                     type="crawl_error",
                                     category="technical",
                                     severity="high",
@@ -210,6 +222,9 @@ class ScanService:
                                     description=f"Failed to crawl page: {str(e)}",
                                     recommendation="Check if the URL is accessible and the content format is supported"
                                 )
+                                error_issue.resources = normalize_issue_resources(
+                                    error_issue.type, None, error_issue.description
+                                )
                                 db.add(error_issue)
                                 total_issues += 1
                                 
@@ -218,6 +233,9 @@ class ScanService:
                             
                             pages_failed += 1
                     
+                    await db.flush()
+                    await db.run_sync(lambda _: resource_index.flush())
+                    
                     # Determine scan status based on success/failure ratio
                     total_pages = len(results_to_process)
                     success_ratio = pages_scanned / total_pages if total_pages > 0 else 0
@@ -243,9 +261,14 @@ class ScanService:
                     # Apply site-wide issue frequency analysis and aggregation
                     await db.flush()  # Ensure all issues are saved first
                     
-                    # Get all issues for this scan for frequency analysis
+                    # Get all issues for this scan for frequency analysis (indexed resources are already one per scan)
                     all_issues_result = await db.execute(
-                        select(Issue).join(Page).where(Page.scan_id == scan_id)
+                        select(Issue).where(
+                            Issue.scan_id == scan_id,
+                            Issue.id.not_in(select(ScanResource.issue_id).where(
+                                ScanResource.scan_id == scan_id, ScanResource.issue_id.is_not(None)
+                            ))
+                        )
                     )
                     all_issues_raw = all_issues_result.scalars().all()
                     
@@ -292,6 +315,12 @@ class ScanService:
                         "include_external": website.include_external
                     }
                     
+                    # Precompute the results page summary
+                    try:
+                        await db.run_sync(lambda session: compute_scan_summary(session, scan_id))
+                    except Exception as e:
+                        logger.warning(f"Error computing summary for scan {scan_id}: {str(e)}")
+                    
                     # Update website last scan time
                     website.last_scan_at = datetime.utcnow()
                     
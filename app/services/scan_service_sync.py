@@ -4,20 +4,54 @@ Eliminates async/sync conflicts while maintaining crawling functionality
 """
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from sqlalchemy.orm import Session, selectinload
 
+from app.core.config import settings
 from app.models import Website, Scan, Page, Issue
 from app.database import SyncSessionLocal
 from app.services.seo_analyzer.seo_analyzer import SEOAnalyzer
+from app.services.seo_analyzer.analysis_pool import (
+    PageSnapshot, analyze_page, analyze_snapshot, analysis_page_fields, get_analysis_pool, reset_analysis_pool
+)
 from app.services.url_utils import clean_url
+from app.services.page_fetcher import PageFetcher
+from app.services.html_snapshots import PendingSnapshot, html_digest
+from app.services.fetch_cache import FetchCache
+from app.services.page_batch_writer import PageBatchWriter
+from app.services.scan_summary_service import compute_scan_summary
+from app.services.duplicate_detection import detect_near_duplicates, mark_canonical_pages
+from app.services.issue_resources import normalize_issue_resources
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
 from crawl4ai.deep_crawling import BFSDeepCrawlStrategy
 
 logger = logging.getLogger(__name__)
 
+# Pages per bulk statement when post-processing a finished scan
+POST_PROCESS_CHUNK_SIZE = 500
+
+# File extensions that are crawled but never stored as pages
+NON_HTML_EXTENSIONS = (
+    # Images
+    '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.bmp', '.tiff', '.ico', 
+    # Documents
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    # Archives
+    '.zip', '.rar', '.tar', '.gz', '.7z',
+    # Executables
+    '.exe', '.dmg', '.pkg', '.deb', '.rpm',
+    # Fonts
+    '.woff', '.woff2', '.ttf', '.otf', '.eot',
+    # Data/Config
+    '.css', '.js', '.xml', '.json', '.txt', '.csv',
+    # Video/Audio
+    '.mp4', '.avi', '.mov', '.wmv', '.flv', '.mp3', '.wav', '.ogg'
+)
+
 
 class SyncScanService:
     """Synchronous scan service for Celery background tasks"""
@@ -44,6 +78,10 @@ class SyncScanService:
                 
                 logger.info(f"Starting scan {scan_id} for website {website.domain}")
                 
+                if settings.scan_streaming_enabled:
+                    # Crawl, analyze and persist pages as they arrive
+                    return self._run_streaming_scan(db, scan, website)
+                
                 # Run crawling (async part - works fine in new event loop)
                 crawl_results = self._run_crawling_sync(website)
                 
@@ -66,29 +104,72 @@ class SyncScanService:
             
             raise e
     
+    def _build_crawl_configs(self, website: Website, stream: bool = False):
+        """Build browser config, deep crawl strategy and run config for a website"""
+        browser_config = BrowserConfig(
+            headless=True,
+            verbose=False
+        )
+        
+        strategy = BFSDeepCrawlStrategy(
+            max_depth=website.max_depth,
+            max_pages=website.max_pages,
+            include_external=website.include_external
+        )
+        
+        crawl_config = CrawlerRunConfig(
+            cache_mode=CacheMode.BYPASS,
+            word_count_threshold=10,
+            screenshot=False,
+            check_robots_txt=website.robots_respect,
+            process_iframes=True,
+            excluded_tags=['script', 'style', 'nav', 'footer', 'aside'],
+            stream=stream
+        )
+        
+        return browser_config, strategy, crawl_config
+    
+    @staticmethod
+    def _uses_page_fetcher(website: Website) -> bool:
+        """
+        Whether the website is crawled through the page fetcher (HTTP fetch modes http/auto)
+        instead of the browser deep crawl strategy. Browser-mode websites keep the deep crawl
+        strategy even with a fetch cache, so their pages are always rendered fresh here; the
+        cache applies to them in enterprise scans (page fetcher and sitemap discovery) only.
+        """
+        return getattr(website, 'fetch_mode', None) in ('http', 'auto')
+    
+    @staticmethod
+    def _build_page_fetcher(website: Website, browser_config: BrowserConfig,
+                            crawl_config: CrawlerRunConfig) -> PageFetcher:
+        """Page fetcher for the website's fetch mode, launching the browser only if needed"""
+        return PageFetcher(
+            website.fetch_mode,
+            crawl_config,
+            browser_factory=lambda: AsyncWebCrawler(config=browser_config, verbose=True),
+            cache=FetchCache.for_website(website)
+        )
+    
+    @staticmethod
+    def _http_deep_crawl(fetcher: PageFetcher, website: Website):
+        """Breadth-first crawl with the same limits as the browser deep crawl strategy"""
+        return fetcher.deep_crawl(
+            start_url=website.domain,
+            max_depth=website.max_depth,
+            max_pages=website.max_pages,
+            include_external=website.include_external,
+            respect_robots=website.robots_respect
+        )
+    
     def _run_crawling_sync(self, website: Website) -> List[Any]:
         """Run crawling in a clean event loop"""
         
         async def _crawl():
-            browser_config = BrowserConfig(
-                headless=True,
-                verbose=False
-            )
-            
-            strategy = BFSDeepCrawlStrategy(
-                max_depth=website.max_depth,
-                max_pages=website.max_pages,
-                include_external=website.include_external
-            )
+            browser_config, strategy, crawl_config = self._build_crawl_configs(website)
             
-            crawl_config = CrawlerRunConfig(
-                cache_mode=CacheMode.BYPASS,
-                word_count_threshold=10,
-                screenshot=False,
-                check_robots_txt=website.robots_respect,
-                process_iframes=True,
-                excluded_tags=['script', 'style', 'nav', 'footer', 'aside']
-            )
+            if self._uses_page_fetcher(website):
+                async with self._build_page_fetcher(website, browser_config, crawl_config) as fetcher:
+                    return [result async for result in self._http_deep_crawl(fetcher, website)]
             
             async with AsyncWebCrawler(
                 config=browser_config,
@@ -117,204 +198,350 @@ class SyncScanService:
                 
                 return crawl_result
         
-        # Create clean event loop for crawling
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        # One event loop for the whole crawl
+        results = asyncio.run(_crawl())
+        return results if isinstance(results, list) else [results] if results else []
+    
+    def _run_streaming_scan(self, db: Session, scan: Scan, website: Website) -> Dict[str, Any]:
+        """
+        Streaming scan pipeline: crawl results are consumed as the crawler yields them,
+        analyzed by a bounded pool of workers and persisted in small committed batches.
+        Bounded queues between the stages keep memory flat regardless of max_pages.
+        """
+        stats = self._new_scan_stats()
+        queue_size = max(1, settings.scan_pipeline_queue_size)
+        batch_size = max(1, settings.scan_persist_batch_size)
+        domain = website.domain
+        
+        # Analysis is CPU-bound and runs off the event loop so crawling I/O keeps flowing:
+        # in worker processes (page snapshots) when a pool is configured, else in threads.
+        # Database writes run on a single dedicated thread that owns the session.
+        process_pool = get_analysis_pool(settings.analysis_process_pool_size)
+        if process_pool is not None:
+            worker_count = settings.analysis_process_pool_size
+            analysis_executor = None
+        else:
+            worker_count = max(1, settings.scan_analysis_workers)
+            analysis_executor = ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix='scan-analyze')
+        persist_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scan-persist')
+        writer = PageBatchWriter(db, flush_size=batch_size)
+        store_snapshot = bool(website.store_html_snapshots)
+        
+        async def _crawl_stage(crawl_queue: asyncio.Queue):
+            browser_config, strategy, crawl_config = self._build_crawl_configs(website, stream=True)
+            results_received = 0
+            
+            if self._uses_page_fetcher(website):
+                # Static pages over pooled HTTP or from the fetch cache; the browser starts only when needed
+                async with self._build_page_fetcher(website, browser_config, crawl_config) as fetcher:
+                    async for result in self._http_deep_crawl(fetcher, website):
+                        await crawl_queue.put(result)
+                for _ in range(worker_count):
+                    await crawl_queue.put(None)
+                return
+            
+            async with AsyncWebCrawler(config=browser_config, verbose=True) as crawler:
+                try:
+                    async for result in await strategy.arun(
+                        start_url=website.domain,
+                        crawler=crawler,
+                        config=crawl_config
+                    ):
+                        results_received += 1
+                        await crawl_queue.put(result)
+                except Exception as crawl_error:
+                    if results_received:
+                        # Keep the pages already streamed; the scan finalizes with what it has
+                        logger.error(f"Deep crawling stopped after {results_received} pages: {str(crawl_error)}")
+                    else:
+                        logger.warning(f"Deep crawling failed, attempting single page fallback: {str(crawl_error)}")
+                        try:
+                            result = await crawler.arun(url=website.domain, config=crawl_config)
+                        except Exception as fallback_error:
+                            logger.error(f"Both deep crawling and fallback failed: {str(fallback_error)}")
+                            raise fallback_error
+                        if result:
+                            await crawl_queue.put(result)
+            
+            # One end-of-stream marker per analysis worker
+            for _ in range(worker_count):
+                await crawl_queue.put(None)
+        
+        async def _analysis_stage(crawl_queue: asyncio.Queue, persist_queue: asyncio.Queue):
+            loop = asyncio.get_running_loop()
+            while True:
+                result = await crawl_queue.get()
+                if result is None:
+                    await persist_queue.put(None)
+                    return
+                record = self._prepare_page_record(result, store_snapshot)
+                if record['status'] == 'analyzed':
+                    if process_pool is not None:
+                        # Only a compact, picklable snapshot crosses the process boundary
+                        executor, func, page = process_pool, analyze_snapshot, PageSnapshot.from_crawl_result(result)
+                    else:
+                        executor, func, page = analysis_executor, self._analyze_with_local_analyzer, result
+                    try:
+                        record.update(await loop.run_in_executor(executor, func, page, domain, record['url']))
+                    except BrokenProcessPool as pool_error:
+                        logger.error(f"Analysis process pool crashed: {str(pool_error)}")
+                        reset_analysis_pool()
+                        raise
+                    except Exception as analysis_error:
+                        record['status'] = 'analysis_error'
+                        record['error'] = str(analysis_error)
+                # Drop the crawl result (HTML, markdown, media) as soon as it is analyzed
+                result = page = None
+                await persist_queue.put(record)
+        
+        async def _persist_stage(persist_queue: asyncio.Queue):
+            loop = asyncio.get_running_loop()
+            finished_workers = 0
+            batch = []
+            while finished_workers < worker_count:
+                record = await persist_queue.get()
+                if record is None:
+                    finished_workers += 1
+                    continue
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    await loop.run_in_executor(persist_executor, self._persist_page_batch, db, writer, scan, batch, stats)
+                    batch = []
+            if batch:
+                await loop.run_in_executor(persist_executor, self._persist_page_batch, db, writer, scan, batch, stats)
+        
+        async def _pipeline():
+            crawl_queue = asyncio.Queue(maxsize=queue_size)
+            persist_queue = asyncio.Queue(maxsize=queue_size)
+            tasks = [
+                asyncio.ensure_future(_crawl_stage(crawl_queue)),
+                *[asyncio.ensure_future(_analysis_stage(crawl_queue, persist_queue)) for _ in range(worker_count)],
+                asyncio.ensure_future(_persist_stage(persist_queue))
+            ]
+            try:
+                await asyncio.gather(*tasks)
+            except Exception:
+                # A failed stage would leave the others blocked on their queues
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
         
         try:
-            results = loop.run_until_complete(_crawl())
-            return results if isinstance(results, list) else [results] if results else []
+            # Scan-scoped event loop shared by every stage of the pipeline
+            asyncio.run(_pipeline())
         finally:
-            loop.close()
-            asyncio.set_event_loop(None)
+            if analysis_executor is not None:
+                analysis_executor.shutdown(wait=True)
+            persist_executor.shutdown(wait=True)
+        
+        return self._finalize_scan(db, scan, website, stats)
     
     def _process_crawl_results_sync(self, db: Session, scan: Scan, website: Website, 
                                   crawl_results: List[Any]) -> Dict[str, Any]:
         """Process crawl results using sync database operations"""
-        
-        pages_scanned = 0
-        pages_failed = 0
-        pages_filtered = 0
-        total_issues = 0
+        stats = self._new_scan_stats()
         
         # Convert results to list if single result
         results_to_process = crawl_results if isinstance(crawl_results, list) else [crawl_results]
         
         logger.info(f"Processing {len(results_to_process)} crawl results for scan {scan.id}")
         
+        writer = PageBatchWriter(db)
+        store_snapshot = bool(website.store_html_snapshots)
         for result in results_to_process:
-            if not result:
-                pages_failed += 1
-                continue
-                
-            try:
-                # Extract basic page data
-                url = getattr(result, 'url', '')
-                if not url:
-                    pages_failed += 1
-                    continue
-                
-                # Clean URL to remove invisible characters
-                url = clean_url(url)
-                
-                # Skip non-HTML content types - Don't save as pages but images should be analyzed within HTML pages
-                non_html_extensions = [
-                    # Images
-                    '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.bmp', '.tiff', '.ico', 
-                    # Documents
-                    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
-                    # Archives
-                    '.zip', '.rar', '.tar', '.gz', '.7z',
-                    # Executables
-                    '.exe', '.dmg', '.pkg', '.deb', '.rpm',
-                    # Fonts
-                    '.woff', '.woff2', '.ttf', '.otf', '.eot',
-                    # Data/Config
-                    '.css', '.js', '.xml', '.json', '.txt', '.csv',
-                    # Video/Audio
-                    '.mp4', '.avi', '.mov', '.wmv', '.flv', '.mp3', '.wav', '.ogg'
-                ]
-                
-                # Also check for URLs with query parameters that might be files
-                url_lower = url.lower()
-                is_non_html = any(url_lower.endswith(ext) for ext in non_html_extensions)
-                
-                # Additional check for URLs with query params pointing to files
-                if not is_non_html and '?' in url:
-                    # Check if query params suggest file download
-                    if any(param in url_lower for param in ['file=', 'download=', 'attachment=']):
-                        is_non_html = True
-                
-                if is_non_html:
-                    logger.info(f"🔍 FILTERING OUT non-HTML content from pages: {url}")
-                    pages_filtered += 1
-                    continue
-                
-                # Create page record
-                page = Page(
-                    scan_id=scan.id,
-                    url=url,
-                    title=getattr(result, 'metadata', {}).get('title', '') if hasattr(result, 'metadata') else '',
-                    meta_description=getattr(result, 'metadata', {}).get('description', '') if hasattr(result, 'metadata') else '',
-                    status_code=getattr(result, 'status_code', 200),
-                    word_count=len(getattr(result, 'markdown', '').split()) if hasattr(result, 'markdown') else 0
-                )
-                
-                db.add(page)
-                db.flush()  # Get page ID
-                
-                # Analyze page for SEO issues using async analyzer in sync context
-                try:
-                    # Run async analyzer in current thread (works fine)
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    
-                    try:
-                        # Analyze page content for technical data
-                        content_analysis = loop.run_until_complete(
-                            self.seo_analyzer.analyze_page_content(result, url)
-                        )
-                        
-                        # Extract technical SEO data
-                        technical_data = content_analysis.get('technical_seo', {})
-                        schema_data = technical_data.get('schema_markup', {})
-                        mobile_data = technical_data.get('mobile_optimization', {})
-                        
-                        # NEW: Extract canonical URL and analyze URL structure
-                        canonical_url = self.seo_analyzer.technical_seo_analyzer.extract_canonical_url(result)
-                        url_analysis = self.seo_analyzer.technical_seo_analyzer.analyze_url_structure(url)
-                        
-                        # Update page with technical data
-                        page.has_schema_markup = 1 if schema_data.get('has_schema', False) else 0
-                        page.schema_types = schema_data.get('schema_types', [])
-                        page.mobile_score = mobile_data.get('mobile_score', 0.0)
-                        page.technical_score = technical_data.get('overall_score', 0.0)
-                        page.technical_seo_data = technical_data
-                        
-                        # NEW: Set canonical and URL quality data
-                        page.canonical_url = canonical_url
-                        page.url_quality_score = url_analysis.get('url_quality_score', 100.0)
-                        page.url_structure_data = url_analysis
-                        
-                        # Analyze issues
-                        issues = loop.run_until_complete(
-                            self.seo_analyzer.analyze_page_issues(result, page.id)
-                        )
-                        
-                        # Create issue records
-                        for issue_data in issues:
-                            issue = Issue(page_id=page.id, **issue_data)
-                            db.add(issue)
-                        
-                        # Calculate SEO score for this page
-                        page_score = self.seo_analyzer.scoring_engine.calculate_page_score(issues)
-                        page.seo_score = page_score
-                        page.issues_count = len(issues)
-                        
-                        total_issues += len(issues)
-                        pages_scanned += 1
-                        
-                    finally:
-                        loop.close()
-                        asyncio.set_event_loop(None)
-                        
-                except Exception as analysis_error:
-                    logger.error(f"Error analyzing page {url}: {str(analysis_error)}")
-                    
-                    # Create error page anyway
-                    page.seo_score = 0.0
-                    page.issues_count = 0
-                    
-                    # Add error issue
-                    error_issue = Issue(
-                        page_id=page.id,
-                        type="analysis_error",
-                        category="technical",
-                        severity="high",
-                        title="Analysis Error",
-                        description=f"Failed to analyze page: {str(analysis_error)}",
-                        recommendation="Check if the page content is accessible and valid"
-                    )
-                    db.add(error_issue)
-                    total_issues += 1
-                    pages_failed += 1
-                    
-            except Exception as e:
-                logger.error(f"Error processing crawl result for {getattr(result, 'url', 'unknown')}: {str(e)}")
-                pages_failed += 1
+            record = self._analyze_crawl_result(result, website.domain, store_snapshot)
+            self._store_page_record(writer, scan, record, stats)
+        writer.flush()
+        
+        return self._finalize_scan(db, scan, website, stats)
+    
+    @staticmethod
+    def _new_scan_stats() -> Dict[str, int]:
+        return {
+            'pages_found': 0,
+            'pages_scanned': 0,
+            'pages_failed': 0,
+            'pages_filtered': 0,
+            'total_issues': 0
+        }
+    
+    @staticmethod
+    def _is_non_html_url(url: str) -> bool:
+        """Whether a URL points to a file that should not be stored as a page"""
+        url_lower = url.lower()
+        is_non_html = url_lower.endswith(NON_HTML_EXTENSIONS)
+        
+        # Additional check for URLs with query params pointing to files
+        if not is_non_html and '?' in url:
+            # Check if query params suggest file download
+            if any(param in url_lower for param in ['file=', 'download=', 'attachment=']):
+                is_non_html = True
+        
+        return is_non_html
+    
+    def _prepare_page_record(self, result: Any, store_snapshot: bool = False) -> Dict[str, Any]:
+        """
+        Build the page record for a crawl result without analyzing it: basic page fields
+        (with the compressed raw HTML when store_snapshot is set), or a failed/filtered/error
+        status. Never touches the database.
+        """
+        if not result:
+            return {'status': 'failed'}
+        
+        raw_url = getattr(result, 'url', '')
+        try:
+            # Extract basic page data
+            if not raw_url:
+                return {'status': 'failed'}
+            
+            # Clean URL to remove invisible characters
+            url = clean_url(raw_url)
+            
+            # Skip non-HTML content types - Don't save as pages but images should be analyzed within HTML pages
+            if self._is_non_html_url(url):
+                logger.info(f"🔍 FILTERING OUT non-HTML content from pages: {url}")
+                return {'status': 'filtered'}
+            
+            metadata = getattr(result, 'metadata', {}) or {}
+            html = getattr(result, 'html', None) or ''
+            snapshot = PendingSnapshot.from_html(html) if store_snapshot else None
+            return {
+                'status': 'analyzed',
+                'url': url,
+                'page_fields': {
+                    'title': metadata.get('title', ''),
+                    'meta_description': metadata.get('description', ''),
+                    'status_code': getattr(result, 'status_code', 200),
+                    'word_count': len(getattr(result, 'markdown', '').split()) if hasattr(result, 'markdown') else 0,
+                    'html_hash': snapshot.content_hash if snapshot else html_digest(html)
+                },
+                'snapshot': snapshot
+            }
+        except Exception as e:
+            return {'status': 'error', 'url': raw_url or 'unknown', 'error': str(e)}
+    
+    def _analyze_with_local_analyzer(self, result: Any, domain: str, url: str) -> Dict[str, Any]:
+        return analyze_page(self.seo_analyzer, result, domain, url)
+    
+    def _analyze_crawl_result(self, result: Any, domain: str, store_snapshot: bool = False) -> Dict[str, Any]:
+        """
+        Analyze a single crawl result in-process into a page record that no longer
+        references the crawl result. Safe to run in a worker thread.
+        """
+        record = self._prepare_page_record(result, store_snapshot)
+        if record['status'] != 'analyzed':
+            return record
+        
+        # Analyze page: content data, scores and issues in a single pass
+        try:
+            record.update(self._analyze_with_local_analyzer(result, domain, record['url']))
+        except Exception as analysis_error:
+            record['status'] = 'analysis_error'
+            record['error'] = str(analysis_error)
+        
+        return record
+    
+    def _persist_page_batch(self, db: Session, writer: PageBatchWriter, scan: Scan,
+                            records: List[Dict[str, Any]], stats: Dict[str, int]) -> None:
+        """Bulk insert a batch of page records and commit so results show up while the crawl runs"""
+        for record in records:
+            self._store_page_record(writer, scan, record, stats)
+        try:
+            writer.flush()
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error committing page batch for scan {scan.id}: {str(e)}")
+            db.rollback()
+            raise
+    
+    def _store_page_record(self, writer: PageBatchWriter, scan: Scan, record: Dict[str, Any],
+                           stats: Dict[str, int]) -> None:
+        """Queue one analyzed page record and its issues for bulk insert, updating scan statistics"""
+        stats['pages_found'] += 1
+        status = record['status']
+        
+        if status == 'failed':
+            stats['pages_failed'] += 1
+            return
+        if status == 'filtered':
+            stats['pages_filtered'] += 1
+            return
+        
+        url = record['url']
+        if status == 'error':
+            self._store_failed_page(writer, scan, url, record['error'], stats)
+            return
+        
+        try:
+            # Page row
+            page = {'scan_id': scan.id, 'url': url, **record['page_fields']}
+            
+            if status == 'analysis_error':
+                logger.error(f"Error analyzing page {url}: {record['error']}")
                 
-                # Try to save failed page record
-                try:
-                    failed_page = Page(
-                        scan_id=scan.id,
-                        url=clean_url(getattr(result, 'url', 'unknown')),  # Clean URL to remove invisible characters
-                        title='Failed to Process',
-                        status_code=0,
-                        word_count=0,
-                        seo_score=0.0,
-                        issues_count=1
-                    )
-                    db.add(failed_page)
-                    db.flush()
-                    
-                    # Add error issue
-                    error_issue = Issue(
-                        page_id=failed_page.id,
-                        type="crawl_error",
-                        category="technical",
-                        severity="high",
-                        title="Crawl Error",
-                        description=f"Failed to crawl page: {str(e)}",
-                        recommendation="Check if the URL is accessible and the content format is supported"
-                    )
-                    db.add(error_issue)
-                    total_issues += 1
-                    
-                except Exception as save_error:
-                    logger.error(f"Failed to save error information: {str(save_error)}")
+                # Create error page anyway, with an error issue
+                page.update(seo_score=0.0, issues_count=0)
+                writer.add_page(page, [{
+                    'type': "analysis_error",
+                    'category': "technical",
+                    'severity': "high",
+                    'title': "Analysis Error",
+                    'description': f"Failed to analyze page: {record['error']}",
+                    'recommendation': "Check if the page content is accessible and valid"
+                }])
+                stats['total_issues'] += 1
+                stats['pages_failed'] += 1
+                return
+            
+            # Technical data, canonical, URL quality, signature and page score
+            issues = record['analysis'].get('issues', [])
+            page.update(analysis_page_fields(record))
+            stats['total_issues'] += writer.add_page(page, issues, snapshot=record.get('snapshot'))
+            stats['pages_scanned'] += 1
+            
+        except Exception as e:
+            self._store_failed_page(writer, scan, url, str(e), stats)
+    
+    def _store_failed_page(self, writer: PageBatchWriter, scan: Scan, url: str, error: str,
+                           stats: Dict[str, int]) -> None:
+        """Record a page that could not be processed, with a crawl_error issue"""
+        logger.error(f"Error processing crawl result for {url}: {error}")
+        stats['pages_failed'] += 1
+        
+        # Try to queue a failed page record
+        try:
+            writer.add_page({
+                'scan_id': scan.id,
+                'url': clean_url(url),  # Clean URL to remove invisible characters
+                'title': 'Failed to Process',
+                'status_code': 0,
+                'word_count': 0,
+                'seo_score': 0.0,
+                'issues_count': 1
+            }, [{
+                'type': "crawl_error",
+                'category': "technical",
+                'severity': "high",
+                'title': "Crawl Error",
+                'description': f"Failed to crawl page: {error}",
+                'recommendation': "Check if the URL is accessible and the content format is supported"
+            }])
+            stats['total_issues'] += 1
+            
+        except Exception as save_error:
+            logger.error(f"Failed to save error information: {str(save_error)}")
+    
+    def _finalize_scan(self, db: Session, scan: Scan, website: Website,
+                       stats: Dict[str, int]) -> Dict[str, Any]:
+        """Compute final scan status, scores and post-processing once all pages are stored"""
+        pages_scanned = stats['pages_scanned']
+        pages_failed = stats['pages_failed']
+        pages_filtered = stats['pages_filtered']
+        total_issues = stats['total_issues']
         
         # Finalize scan - calculate success based on HTML pages only (exclude filtered)
-        total_pages = len(results_to_process)
+        total_pages = stats['pages_found']
         html_pages_attempted = total_pages - pages_filtered  # Exclude filtered files from calculation
         success_ratio = pages_scanned / html_pages_attempted if html_pages_attempted > 0 else 0
         
@@ -331,7 +558,7 @@ class SyncScanService:
         
         logger.info(f"Scan {scan.id}: {pages_scanned} succeeded, {pages_failed} failed, {pages_filtered} filtered, status: {scan.status}")
         scan.completed_at = datetime.utcnow()
-        scan.pages_found = len(results_to_process)
+        scan.pages_found = total_pages
         scan.pages_scanned = pages_scanned
         scan.pages_failed = pages_failed
         scan.total_issues = total_issues
@@ -342,9 +569,9 @@ class SyncScanService:
         except Exception as e:
             logger.warning(f"Error in duplicate/canonical post-processing: {str(e)}")
         
-        # Calculate overall website SEO score
+        # Calculate overall website SEO score from the score column only
         db.flush()  # Ensure all pages are saved
-        page_scores = [p.seo_score for p in scan.pages if p.seo_score > 0]
+        page_scores = db.scalars(select(Page.seo_score).where(Page.scan_id == scan.id, Page.seo_score > 0)).all()
         if page_scores:
             website_score_data = self.seo_analyzer.scoring_engine.calculate_website_score(page_scores)
             scan.seo_score = website_score_data['average_score']
@@ -358,6 +585,12 @@ class SyncScanService:
             "include_external": website.include_external
         }
         
+        # Precompute the results page summary
+        try:
+            compute_scan_summary(db, scan.id)
+        except Exception as e:
+            logger.warning(f"Error computing summary for scan {scan.id}: {str(e)}")
+        
         # Update website last scan time
         website.last_scan_at = datetime.utcnow()
         
@@ -373,109 +606,54 @@ class SyncScanService:
         }
     
     def _post_process_duplicates_and_canonical(self, db: Session, scan: Scan) -> None:
-        """Post-process pages for duplicate detection and canonical analysis"""
-        
-        # Get all pages for this scan
-        pages = db.query(Page).filter(Page.scan_id == scan.id).all()
+        """
+        Post-process pages for duplicate detection and canonical analysis.
+        Reads only the columns it needs and writes with bulk UPDATE/INSERT, without loading Page objects.
+        """
         
-        if not pages:
+        # Canonical flags must be stored before near-duplicate clusters pick their representatives
+        canonical_counts = mark_canonical_pages(db, scan.id)
+        if not canonical_counts['pages']:
             return
         
-        logger.info(f"🔍 Post-processing {len(pages)} pages for duplicate/canonical analysis")
-        
-        # Prepare data for duplicate analysis
-        pages_data = []
-        for page in pages:
-            pages_data.append({
-                'url': page.url,
-                'canonical_url': page.canonical_url,
-                'page_id': page.id
-            })
-        
-        # Run duplicate content analysis
-        duplicate_analysis = self.seo_analyzer.technical_seo_analyzer.detect_duplicate_content_issues(pages_data)
-        
-        # Group pages by canonical URL and set is_canonical flags
-        canonical_groups = {}
-        pages_without_canonical = []
-        
-        for page in pages:
-            if page.canonical_url:
-                canonical_url = page.canonical_url
-                if canonical_url not in canonical_groups:
-                    canonical_groups[canonical_url] = []
-                canonical_groups[canonical_url].append(page)
-            else:
-                pages_without_canonical.append(page)
-                # Pages without canonical are considered canonical themselves
-                page.canonical_url = page.url
-                page.is_canonical = 1
-        
-        # Process canonical groups
-        group_counter = 0
-        for canonical_url, group_pages in canonical_groups.items():
-            group_counter += 1
-            group_id = f"group_{scan.id}_{group_counter}"
-            
-            # Find the canonical page (the one that matches the canonical URL)
-            canonical_page = None
-            for page in group_pages:
-                if page.url == canonical_url:
-                    canonical_page = page
-                    break
-            
-            # If no page matches canonical URL, pick the first one as canonical
-            if not canonical_page and group_pages:
-                canonical_page = group_pages[0]
-                logger.warning(f"No page found for canonical URL {canonical_url}, using {canonical_page.url}")
-            
-            # Set flags for all pages in group
-            for page in group_pages:
-                page.duplicate_group_id = group_id
-                page.is_canonical = 1 if page == canonical_page else 0
-        
-        # Create issues for duplicate content problems
-        duplicate_issues = duplicate_analysis.get('duplicate_issues', [])
-        for issue_data in duplicate_issues:
-            # Create issue records for each affected page
-            affected_pages = issue_data.get('affected_pages', [])
-            for affected_url in affected_pages:
-                # Find the page object
-                affected_page = next((p for p in pages if p.url == affected_url), None)
-                if affected_page:
-                    duplicate_issue = Issue(
-                        page_id=affected_page.id,
-                        type=issue_data['type'],
-                        category=issue_data['category'],
-                        severity=issue_data['severity'],
-                        title=issue_data['type'].replace('_', ' ').title(),
-                        description=issue_data['message'],
-                        recommendation=issue_data['recommendation']
-                    )
-                    db.add(duplicate_issue)
-        
-        # Create issues for URL structure problems
-        for page in pages:
-            url_issues = page.url_structure_data.get('url_issues', [])
-            for url_issue_desc in url_issues:
-                url_issue = Issue(
-                    page_id=page.id,
-                    type='url_structure_issue',
-                    category='technical',
-                    severity='medium',
-                    title='URL Structure Issue',
-                    description=url_issue_desc,
-                    recommendation='Improve URL structure for better SEO'
-                )
-                db.add(url_issue)
-        
-        # Update scan statistics
-        total_canonical_groups = len(canonical_groups)
-        total_duplicates = sum(len(group) - 1 for group in canonical_groups.values() if len(group) > 1)
+        logger.info(f"🔍 Post-processed {canonical_counts['pages']} pages for duplicate/canonical analysis")
         
-        logger.info(f"📊 Duplicate analysis complete:")
-        logger.info(f"   Canonical groups: {total_canonical_groups}")
-        logger.info(f"   Duplicate pages: {total_duplicates}")
-        logger.info(f"   Pages without canonical: {len(pages_without_canonical)}")
+        # Cluster near-duplicate content (SimHash + LSH) into duplicate groups with issues
+        duplicate_counts = detect_near_duplicates(db, scan.id)
         
-        db.flush()  # Save all changes
\ No newline at end of file
+        # Create issues for URL structure problems, one chunk of pages at a time
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(Page.id, Page.url_structure_data)
+                .where(Page.scan_id == scan.id, Page.id > last_id)
+                .order_by(Page.id)
+                .limit(POST_PROCESS_CHUNK_SIZE)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+        
+            url_issue_rows = [
+                {
+                    'page_id': page_id,
+                    'scan_id': scan.id,
+                    'type': 'url_structure_issue',
+                    'category': 'technical',
+                    'severity': 'medium',
+                    'title': 'URL Structure Issue',
+                    'description': url_issue_desc,
+                    'recommendation': 'Improve URL structure for better SEO',
+                    'resources': normalize_issue_resources('url_structure_issue', None, url_issue_desc)
+                }
+                for page_id, url_structure_data in rows
+                for url_issue_desc in (url_structure_data or {}).get('url_issues', [])
+            ]
+            if url_issue_rows:
+                db.execute(insert(Issue), url_issue_rows)
+        
+        logger.info(f"📊 Duplicate analysis complete:")
+        logger.info(f"   Canonical groups: {canonical_counts['canonical_groups']}")
+        logger.info(f"   Pages sharing a canonical: {canonical_counts['pages_sharing_canonical']}")
+        logger.info(f"   Near-duplicate clusters: {duplicate_counts['clusters']} ({duplicate_counts['duplicate_pages']} pages)")
+        logger.info(f"   Pages without canonical: {canonical_counts['pages_without_canonical']}")
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""
+Scan Summary Service
+Computes the per-scan aggregates shown on the results page once, when the scan completes
+"""
+import logging
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Scan, Page, ScanSummary
+from app.services.resource_index import issue_references
+
+logger = logging.getLogger(__name__)
+
+TOP_AFFECTED_URLS_LIMIT = 10
+MOBILE_OPTIMIZED_SCORE = 70
+PERFORMANCE_ROWS_PER_FETCH = 500
+
+def page_load_time(core_web_vitals: Optional[Dict[str, Any]]) -> Optional[float]:
+    """Load time in seconds from core web vitals: TTFB, falling back to LCP"""
+    if not core_web_vitals:
+        return None
+    ttfb = core_web_vitals.get('ttfb')
+    if ttfb and isinstance(ttfb, (int, float)) and ttfb > 0:
+        return ttfb / 1000  # Convert ms to seconds
+    lcp = core_web_vitals.get('lcp')
+    if lcp and isinstance(lcp, (int, float)) and lcp > 0:
+        return lcp / 1000
+    return None
+
+def page_size(core_web_vitals: Optional[Dict[str, Any]],
+              technical_seo_data: Optional[Dict[str, Any]]) -> Optional[int]:
+    """Page size in bytes from technical SEO data (page_size, else content_length)"""
+    if not core_web_vitals or not technical_seo_data:
+        return None
+    for key in ('page_size', 'content_length'):
+        if key in technical_seo_data:
+            size = technical_seo_data[key]
+            if isinstance(size, (int, float)) and size > 0:
+                return int(size)
+            return None
+    return None
+
+def average_load_time_and_size(rows: Iterable[Tuple[Any, Any]]) -> Tuple[float, int]:
+    """Average load time (s) and page size (bytes) over (core_web_vitals, technical_seo_data) rows"""
+    load_times, sizes = [], []
+    for core_web_vitals, technical_seo_data in rows:
+        load_time = page_load_time(core_web_vitals)
+        if load_time is not None:
+            load_times.append(load_time)
+        size = page_size(core_web_vitals, technical_seo_data)
+        if size is not None:
+            sizes.append(size)
+    avg_load_time = round(sum(load_times) / len(load_times), 2) if load_times else 0.0
+    avg_page_size = int(sum(sizes) / len(sizes)) if sizes else 0
+    return avg_load_time, avg_page_size
+
+
+def compute_scan_summary(db: Session, scan_id: int, persist: bool = True) -> ScanSummary:
+    """
+    Aggregate pages and issues of a scan with SQL (averages, coverage, severity/type counts,
+    most affected URLs per issue type). When persist is set the summary row is inserted or
+    updated in the session; committing is left to the caller.
+    """
+    summary = db.scalar(select(ScanSummary).where(ScanSummary.scan_id == scan_id)) if persist else None
+    if summary is None:
+        summary = ScanSummary(scan_id=scan_id)
+
+    # Page aggregates (AVG/COUNT skip NULL scores, as the per-page lists did)
+    page_stats = db.execute(
+        select(
+            func.count(Page.id),
+            func.avg(Page.seo_score),
+            func.avg(Page.performance_score),
+            func.count(Page.performance_score),
+            func.avg(Page.technical_score),
+            func.count(Page.technical_score),
+            func.avg(Page.mobile_score),
+            func.sum(case((Page.has_schema_markup > 0, 1), else_=0)),
+            func.sum(case((Page.mobile_score > MOBILE_OPTIMIZED_SCORE, 1), else_=0))
+        ).where(Page.scan_id == scan_id)
+    ).one()
+    (total_pages, avg_seo, avg_performance, performance_count, avg_technical,
+     technical_count, avg_mobile, schema_pages, mobile_pages) = page_stats
+
+    summary.total_pages = total_pages or 0
+    summary.avg_seo_score = round(avg_seo or 0.0, 1)
+    summary.avg_performance_score = round(avg_performance or 0.0, 1)
+    summary.pages_with_performance_data = performance_count or 0
+    summary.avg_technical_score = round(avg_technical or 0.0, 1)
+    summary.pages_with_technical_data = technical_count or 0
+    summary.avg_mobile_score = round(avg_mobile or 0.0, 1)
+    summary.schema_coverage = round((schema_pages or 0) / total_pages * 100, 1) if total_pages else 0.0
+    summary.mobile_coverage = round((mobile_pages or 0) / total_pages * 100, 1) if total_pages else 0.0
+
+    # Load time and page size live in JSON columns: stream just those two columns
+    performance_rows = db.execute(
+        select(Page.core_web_vitals, Page.technical_seo_data)
+        .where(Page.scan_id == scan_id)
+        .execution_options(yield_per=PERFORMANCE_ROWS_PER_FETCH)
+    )
+    summary.avg_load_time, summary.avg_page_size = average_load_time_and_size(performance_rows)
+
+    # Issue counts by severity and type; a site-wide resource issue counts once per referencing page
+    references = issue_references(scan_id)
+    severity_counts: Dict[str, int] = {}
+    type_counts: Dict[str, Dict[str, int]] = {}
+    for severity, issue_type, count in db.execute(
+        select(references.c.severity, references.c.type, func.count())
+        .group_by(references.c.severity, references.c.type)
+    ):
+        severity_counts[severity] = severity_counts.get(severity, 0) + count
+        type_counts.setdefault(severity, {})[issue_type] = count
+    summary.severity_counts = severity_counts
+    summary.type_counts = type_counts
+    summary.total_issues = sum(severity_counts.values())
+
+    # Most affected URLs per issue type, ranked in the database so only the top rows come back
+    top_affected_urls: Dict[str, List[str]] = {}
+    issue_count = func.count()
+    ranked = (
+        select(
+            references.c.type.label('type'),
+            Page.url.label('url'),
+            func.row_number().over(
+                partition_by=references.c.type, order_by=(issue_count.desc(), Page.url)
+            ).label('rank')
+        )
+        .join(Page, references.c.page_id == Page.id)
+        .group_by(references.c.type, Page.url)
+        .subquery()
+    )
+    for issue_type, url in db.execute(
+        select(ranked.c.type, ranked.c.url)
+        .where(ranked.c.rank <= TOP_AFFECTED_URLS_LIMIT)
+        .order_by(ranked.c.type, ranked.c.rank)
+    ):
+        top_affected_urls.setdefault(issue_type, []).append(url)
+    summary.top_affected_urls = top_affected_urls
+
+    if persist:
+        db.add(summary)
+        db.flush()
+    return summary
+
+
+async def load_scan_summary(db: AsyncSession, scan: Scan) -> ScanSummary:
+    """
+    Stored summary of a scan. Scans finished before summaries existed are summarized on
+    first view and stored; running scans get a fresh, unsaved summary each time.
+    """
+    summary = await db.scalar(select(ScanSummary).where(ScanSummary.scan_id == scan.id))
+    if summary is not None:
+        return summary
+
+    finished = scan.status not in ('pending', 'running')
+    summary = await db.run_sync(lambda session: compute_scan_summary(session, scan.id, persist=finished))
+    if finished:
+        await db.commit()
+        logger.info(f"Stored summary for scan {scan.id}")
+    return summary
@@ -0,0 +1,144 @@
+"""
+Process Pool Analysis Backend
+Runs CPU-bound page analysis in worker processes using picklable page snapshots
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
+
+from .seo_analyzer import SEOAnalyzer
+from .core.parsed_page import ParsedPage
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PageSnapshot:
+    """Compact, picklable copy of the crawl result fields the analyzers read"""
+    url: str
+    html: str = ''
+    cleaned_html: str = ''
+    markdown: str = ''
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    media: Dict[str, Any] = field(default_factory=dict)
+    links: Dict[str, Any] = field(default_factory=dict)
+    status_code: Optional[int] = 200
+    response_time: Optional[float] = None
+
+    @classmethod
+    def from_crawl_result(cls, crawl_result) -> 'PageSnapshot':
+        return cls(
+            url=getattr(crawl_result, 'url', '') or '',
+            html=getattr(crawl_result, 'html', '') or '',
+            cleaned_html=getattr(crawl_result, 'cleaned_html', '') or '',
+            markdown=ParsedPage._extract_markdown_text(crawl_result),
+            metadata=dict(getattr(crawl_result, 'metadata', {}) or {}),
+            media=dict(getattr(crawl_result, 'media', {}) or {}),
+            links=dict(getattr(crawl_result, 'links', {}) or {}),
+            status_code=getattr(crawl_result, 'status_code', 200),
+            response_time=getattr(crawl_result, 'response_time', None)
+        )
+
+
+def analyze_page(seo_analyzer: SEOAnalyzer, crawl_result, domain: str, url: str) -> Dict[str, Any]:
+    """Full page analysis plus canonical URL and URL structure, as stored on the Page row"""
+    # Parse the page once for the analysis and canonical extraction
+    parsed_page = ParsedPage(crawl_result)
+    technical_analyzer = seo_analyzer.technical_seo_analyzer
+    return {
+        'analysis': seo_analyzer.analyze_full(crawl_result, domain, parsed_page),
+        'canonical_url': technical_analyzer.extract_canonical_url(crawl_result, parsed_page),
+        'url_analysis': technical_analyzer.analyze_url_structure(url)
+    }
+
+
+def analysis_page_fields(analyzed: Dict[str, Any]) -> Dict[str, Any]:
+    """Page columns derived from an analyze_page result (scores, technical data, canonical, URL quality)"""
+    analysis = analyzed['analysis']
+    url_analysis = analyzed['url_analysis']
+    technical_data = analysis.get('technical_seo', {})
+    schema_data = technical_data.get('schema_markup', {})
+    mobile_data = technical_data.get('mobile_optimization', {})
+    return {
+        # Technical data
+        'has_schema_markup': 1 if schema_data.get('has_schema', False) else 0,
+        'schema_types': schema_data.get('schema_types', []),
+        'mobile_score': mobile_data.get('mobile_score', 0.0),
+        'technical_score': technical_data.get('overall_score', 0.0),
+        'technical_seo_data': technical_data,
+
+        # Canonical, URL quality and near-duplicate signature data
+        'canonical_url': analyzed['canonical_url'],
+        'content_hash': analysis.get('content_hash'),
+        'url_quality_score': url_analysis.get('url_quality_score', 100.0),
+        'url_structure_data': url_analysis,
+
+        # SEO score for this page
+        'seo_score': analysis.get('seo_score', 0.0),
+        'issues_count': len(analysis.get('issues', []))
+    }
+
+
+# Per-process analyzer, created once in each pool worker
+_worker_analyzer: Optional[SEOAnalyzer] = None
+
+def _init_worker():
+    global _worker_analyzer
+    _worker_analyzer = SEOAnalyzer()
+
+def analyze_snapshot(snapshot: PageSnapshot, domain: str, url: str) -> Dict[str, Any]:
+    """Pool worker entry point: analyze a page snapshot in this process"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _init_worker()
+    return analyze_page(_worker_analyzer, snapshot, domain, url)
+
+
+# Shared pool for this process (e.g. one Celery worker child), reused across scans
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def get_analysis_pool(size: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Return the shared analysis process pool, creating it on first use.
+    Returns None when the pool is disabled (size <= 0) or cannot be started here,
+    in which case callers analyze in-process.
+    """
+    global _pool
+    if size <= 0:
+        return None
+
+    with _pool_lock:
+        if _pool is not None:
+            return _pool
+
+        pool = None
+        try:
+            # spawn: never fork a process that is running an event loop and browser threads
+            pool = ProcessPoolExecutor(
+                max_workers=size,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+            # Workers start lazily: fail here, not mid-scan, if children are not allowed
+            pool.submit(os.getpid).result(timeout=120)
+        except Exception as e:
+            logger.warning(f"Analysis process pool unavailable, analyzing in-process: {str(e)}")
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            return None
+
+        logger.info(f"Started analysis process pool with {size} workers")
+        _pool = pool
+        return _pool
+
+def reset_analysis_pool():
+    """Discard the shared pool (e.g. after a worker crashed); the next scan starts a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -4,9 +4,10 @@ WCAG compliance and accessibility analysis for better SEO and user experience
 """
 from typing import Dict, List, Any, Optional, Tuple
 import re
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 
 from ..core.base_analyzer import BaseAnalyzer, AnalysisResult
+from ..core.parsed_page import ParsedPage
 from app.core.config import seo_config
 
 class AccessibilityAnalyzer(BaseAnalyzer):
@@ -27,11 +28,10 @@ class AccessibilityAnalyzer(BaseAnalyzer):
             'language_declaration': {'level': 'A', 'guideline': '3.1.1'}
         }
     
-    def analyze(self, crawl_result, **kwargs) -> AnalysisResult:
+    def analyze(self, crawl_result, parsed_page: Optional[ParsedPage] = None, **kwargs) -> AnalysisResult:
         """Perform comprehensive accessibility analysis"""
-        
-        html_content = self.extract_html_content(crawl_result)
-        text_content = self.extract_text_content(crawl_result)
+        page = ParsedPage.ensure(crawl_result, parsed_page)
+        html_content = page.raw_html
         
         scores = {}
         issues = []
@@ -41,17 +41,17 @@ class AccessibilityAnalyzer(BaseAnalyzer):
         if not html_content:
             return AnalysisResult(scores={'accessibility_score': 0}, issues=[], opportunities=[], metadata={})
         
-        # Parse HTML
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # Reuse the shared parsed tree
+        soup = page.soup
         
         # Perform different accessibility checks
-        alt_text_data = self._check_alt_text(soup)
+        alt_text_data = self._check_alt_text(page.images)
         color_contrast_data = self._check_color_contrast(html_content)
         keyboard_nav_data = self._check_keyboard_navigation(soup)
         form_accessibility_data = self._check_form_accessibility(soup)
-        heading_structure_data = self._check_heading_structure(soup)
-        link_accessibility_data = self._check_link_accessibility(soup)
-        language_data = self._check_language_declaration(soup)
+        heading_structure_data = self._check_heading_structure(page.headings)
+        link_accessibility_data = self._check_link_accessibility(page.links)
+        language_data = self._check_language_declaration(page.html_tag)
         aria_data = self._check_aria_attributes(soup)
         
         # Collect scores
@@ -96,11 +96,10 @@ class AccessibilityAnalyzer(BaseAnalyzer):
         
         return AnalysisResult(scores=scores, issues=issues, opportunities=opportunities, metadata=metadata)
     
-    def _check_alt_text(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _check_alt_text(self, images: List[Tag]) -> Dict[str, Any]:
         """Check image alt text compliance"""
         result = {'score': 100, 'issues': [], 'opportunities': []}
         
-        images = soup.find_all('img')
         if not images:
             return result
         
@@ -331,13 +330,13 @@ class AccessibilityAnalyzer(BaseAnalyzer):
         
         return result
     
-    def _check_heading_structure(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _check_heading_structure(self, headings_by_level: Dict[int, List[Tag]]) -> Dict[str, Any]:
         """Check heading hierarchy for accessibility"""
         result = {'score': 100, 'issues': [], 'opportunities': []}
         
         headings = []
         for level in range(1, 7):
-            for heading in soup.find_all(f'h{level}'):
+            for heading in headings_by_level.get(level, []):
                 headings.append({
                     'level': level,
                     'text': heading.get_text(strip=True),
@@ -384,11 +383,10 @@ class AccessibilityAnalyzer(BaseAnalyzer):
         
         return result
     
-    def _check_link_accessibility(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _check_link_accessibility(self, links: List[Tag]) -> Dict[str, Any]:
         """Check link accessibility and purpose clarity"""
         result = {'score': 100, 'issues': [], 'opportunities': []}
         
-        links = soup.find_all('a', href=True)
         if not links:
             return result
         
@@ -441,12 +439,10 @@ class AccessibilityAnalyzer(BaseAnalyzer):
         
         return result
     
-    def _check_language_declaration(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _check_language_declaration(self, html_tag: Optional[Tag]) -> Dict[str, Any]:
         """Check for proper language declaration"""
         result = {'score': 100, 'issues': [], 'opportunities': []}
         
-        html_tag = soup.find('html')
-        
         if not html_tag or not html_tag.get('lang'):
             result['issues'].append(
                 self.create_issue(
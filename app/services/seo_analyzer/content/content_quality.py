@@ -8,7 +8,8 @@ from collections import Counter
 from datetime import datetime, timedelta
 
 from ..core.base_analyzer import BaseAnalyzer, AnalysisResult
-from ..core.content_extractor import ContentExtractor
+from ..core.content_extractor import ContentExtractor, TextTokens
+from ..core.parsed_page import ParsedPage
 from app.core.config import seo_config
 
 class ContentQualityAnalyzer(BaseAnalyzer):
@@ -18,12 +19,14 @@ class ContentQualityAnalyzer(BaseAnalyzer):
         super().__init__(config)
         self.extractor = ContentExtractor()
     
-    def analyze(self, crawl_result, **kwargs) -> AnalysisResult:
+    def analyze(self, crawl_result, parsed_page: Optional[ParsedPage] = None, **kwargs) -> AnalysisResult:
         """Perform comprehensive content quality analysis"""
+        page = ParsedPage.ensure(crawl_result, parsed_page)
         
         # Extract content
-        text_content = self.extract_text_content(crawl_result)
-        html_content = self.extract_html_content(crawl_result)
+        text_content = page.text
+        html_content = page.raw_html
+        tokens = page.text_tokens
         
         # Initialize result structure
         scores = {}
@@ -32,11 +35,11 @@ class ContentQualityAnalyzer(BaseAnalyzer):
         metadata = {}
         
         # Analyze different aspects
-        readability_data = self._analyze_readability(text_content)
-        keyword_data = self._analyze_keyword_optimization(text_content, html_content)
-        structure_data = self._analyze_content_structure(html_content)
+        readability_data = self._analyze_readability(text_content, tokens)
+        keyword_data = self._analyze_keyword_optimization(text_content, html_content, tokens)
+        structure_data = self._analyze_content_structure(html_content, page)
         freshness_data = self._analyze_content_freshness(text_content, html_content)
-        uniqueness_data = self._analyze_content_uniqueness(text_content)
+        uniqueness_data = self._analyze_content_uniqueness(text_content, tokens)
         
         # Collect scores
         scores.update({
@@ -64,18 +67,19 @@ class ContentQualityAnalyzer(BaseAnalyzer):
         scores['overall_content_quality'] = overall_score
         
         # Collect metadata
+        content_type = self.extractor.detect_content_type(text_content, tokens)
         metadata.update({
-            'word_count': len(re.findall(r'\b\w+\b', text_content)),
+            'word_count': tokens.word_count,
             'character_count': len(text_content),
-            'reading_time_minutes': self.extractor.detect_content_type(text_content).get('reading_time_minutes', 0),
-            'content_type': self.extractor.detect_content_type(text_content),
-            'top_keywords': self.extractor.extract_keywords(text_content, 'it', 5),
+            'reading_time_minutes': content_type.get('reading_time_minutes', 0),
+            'content_type': content_type,
+            'top_keywords': keyword_data.get('keywords', [])[:5],
             'entities': self.extractor.extract_entities(text_content)
         })
         
         return AnalysisResult(scores=scores, issues=issues, opportunities=opportunities, metadata=metadata)
     
-    def _analyze_readability(self, text: str) -> Dict[str, Any]:
+    def _analyze_readability(self, text: str, tokens: Optional[TextTokens] = None) -> Dict[str, Any]:
         """Analyze text readability and complexity"""
         result = {'score': 0, 'issues': [], 'opportunities': []}
         
@@ -90,9 +94,10 @@ class ContentQualityAnalyzer(BaseAnalyzer):
             )
             return result
         
-        # Calculate readability scores
-        flesch_kincaid = self.extractor.calculate_readability_score(text, 'flesch_kincaid')
-        flesch_ease = self.extractor.calculate_readability_score(text, 'flesch_reading_ease')
+        # Calculate readability scores (one tokenization, syllables counted per distinct word)
+        tokens = tokens or self.extractor.tokenize(text)
+        readability = self.extractor.readability_scores(text, tokens)
+        flesch_kincaid = readability['flesch_kincaid']
         
         # Evaluate Flesch-Kincaid (lower is better for general audience)
         if flesch_kincaid > seo_config.readability_max_score:
@@ -119,11 +124,8 @@ class ContentQualityAnalyzer(BaseAnalyzer):
             score = 100
         
         # Evaluate sentence structure
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        if sentences:
-            avg_sentence_length = len(re.findall(r'\b\w+\b', text)) / len(sentences)
+        if tokens.sentences:
+            avg_sentence_length = tokens.word_count / len(tokens.sentences)
             
             if avg_sentence_length > 25:
                 result['issues'].append(
@@ -140,15 +142,18 @@ class ContentQualityAnalyzer(BaseAnalyzer):
         result['score'] = score
         return result
     
-    def _analyze_keyword_optimization(self, text: str, html: str) -> Dict[str, Any]:
+    def _analyze_keyword_optimization(self, text: str, html: str,
+                                      tokens: Optional[TextTokens] = None) -> Dict[str, Any]:
         """Analyze keyword usage and optimization"""
-        result = {'score': 80, 'issues': [], 'opportunities': []}
+        result = {'score': 80, 'issues': [], 'opportunities': [], 'keywords': []}
         
         if not text:
             return result
         
         # Extract top keywords
-        keywords = self.extractor.extract_keywords(text, 'it', 10)
+        tokens = tokens or self.extractor.tokenize(text)
+        keywords = self.extractor.extract_keywords(text, 'it', 10, tokens)
+        result['keywords'] = keywords
         
         if not keywords:
             result['issues'].append(
@@ -165,7 +170,7 @@ class ContentQualityAnalyzer(BaseAnalyzer):
         
         # Check keyword density for top keyword
         top_keyword = keywords[0][0]
-        density = self.extractor.calculate_keyword_density(text, top_keyword)
+        density = self.extractor.calculate_keyword_density(text, top_keyword, tokens)
         
         if density > seo_config.keyword_density_max:
             result['issues'].append(
@@ -215,15 +220,18 @@ class ContentQualityAnalyzer(BaseAnalyzer):
         
         return result
     
-    def _analyze_content_structure(self, html: str) -> Dict[str, Any]:
+    def _analyze_content_structure(self, html: str, page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Analyze content structure and organization"""
         result = {'score': 100, 'issues': [], 'opportunities': []}
         
         if not html:
             return result
         
-        # Extract text blocks
-        text_blocks = self.extractor.extract_text_blocks(html)
+        # Extract text blocks from the shared tree when available
+        if page is not None:
+            text_blocks = page.content_blocks
+        else:
+            text_blocks = self.extractor.extract_text_blocks(html)
         
         # Count different types of content
         headings = [block for block in text_blocks if block['type'].startswith('heading_')]
@@ -266,7 +274,13 @@ class ContentQualityAnalyzer(BaseAnalyzer):
             )
         
         # Check internal linking
-        internal_links = re.findall(r'<a[^>]*href=["\'](?!http|mailto|tel)([^"\']+)["\'][^>]*>', html)
+        if page is not None:
+            internal_links = [
+                a['href'] for a in page.links
+                if a['href'] and not a['href'].startswith(('http', 'mailto', 'tel'))
+            ]
+        else:
+            internal_links = re.findall(r'<a[^>]*href=["\'](?!http|mailto|tel)([^"\']+)["\'][^>]*>', html)
         if not internal_links:
             result['issues'].append(
                 self.create_issue(
@@ -330,7 +344,7 @@ class ContentQualityAnalyzer(BaseAnalyzer):
         
         return result
     
-    def _analyze_content_uniqueness(self, text: str) -> Dict[str, Any]:
+    def _analyze_content_uniqueness(self, text: str, tokens: Optional[TextTokens] = None) -> Dict[str, Any]:
         """Analyze content uniqueness and detect potential duplication"""
         result = {'score': 100, 'issues': [], 'opportunities': []}
         
@@ -338,8 +352,8 @@ class ContentQualityAnalyzer(BaseAnalyzer):
             return result
         
         # Simple duplicate detection based on repeated phrases
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip() and len(s) > 20]
+        tokens = tokens or self.extractor.tokenize(text)
+        sentences = [s for s in tokens.sentences if len(s) > 20]
         
         if sentences:
             # Check for exact duplicate sentences
@@ -9,6 +9,7 @@ from dataclasses import dataclass
 from app.core.issue_registry import IssueRegistry
 from app.core.issue_migration import IssueMigrationUtility
 from ..severity_calculator import SeverityCalculator
+from .parsed_page import ParsedPage
 
 logger = logging.getLogger(__name__)
 
@@ -36,19 +37,9 @@ class BaseAnalyzer(ABC):
         """Extract HTML content with fallback"""
         return getattr(crawl_result, 'html', '') or getattr(crawl_result, 'cleaned_html', '')
     
-    def extract_text_content(self, crawl_result) -> str:
-        """Extract clean text content"""
-        html_content = self.extract_html_content(crawl_result)
-        if html_content:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
-            return soup.get_text(separator=' ', strip=True)
-        
-        # Fallback to markdown - handle both string and object types
-        markdown_content = getattr(crawl_result, 'markdown', '')
-        if markdown_content and hasattr(markdown_content, 'raw_markdown'):
-            return markdown_content.raw_markdown
-        return str(markdown_content) if markdown_content else ''
+    def extract_text_content(self, crawl_result, parsed_page: Optional[ParsedPage] = None) -> str:
+        """Extract clean text content (falls back to markdown when there is no HTML)"""
+        return ParsedPage.ensure(crawl_result, parsed_page).text
     
     def safe_execute(self, func, *args, default=None, **kwargs):
         """Safely execute function with error handling"""
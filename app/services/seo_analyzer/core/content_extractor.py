@@ -4,6 +4,8 @@ Shared functions for extracting and analyzing content from crawl results
 """
 import re
 import math
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
 from typing import List, Dict, Any, Tuple, Optional
 from bs4 import BeautifulSoup
 from collections import Counter
@@ -11,6 +13,60 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+WORD_RE = re.compile(r'\b\w+\b')
+SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+
+# Distinct words remembered by the syllable counter (per process)
+SYLLABLE_CACHE_SIZE = 100_000
+
+@lru_cache(maxsize=SYLLABLE_CACHE_SIZE)
+def count_syllables(word: str) -> int:
+    """Count syllables in a lower-case word (approximation), memoized over the vocabulary"""
+    vowels = 'aeiouy'
+    syllables = 0
+    prev_char_was_vowel = False
+    
+    for char in word:
+        if char in vowels:
+            if not prev_char_was_vowel:
+                syllables += 1
+            prev_char_was_vowel = True
+        else:
+            prev_char_was_vowel = False
+    
+    # Handle silent 'e'
+    if word.endswith('e') and syllables > 1:
+        syllables -= 1
+    
+    return max(1, syllables)
+
+@dataclass
+class TextTokens:
+    """Words and sentences of a text, tokenized once and shared by every content metric"""
+    text: str
+    words: List[str] = field(default_factory=list)  # Lower-cased
+    sentences: List[str] = field(default_factory=list)  # Stripped, non-empty
+    
+    @classmethod
+    def from_text(cls, text: str) -> 'TextTokens':
+        if not text:
+            return cls('')
+        sentences = [s.strip() for s in SENTENCE_SPLIT_RE.split(text)]
+        return cls(text, WORD_RE.findall(text.lower()), [s for s in sentences if s])
+    
+    @property
+    def word_count(self) -> int:
+        return len(self.words)
+    
+    @cached_property
+    def word_counts(self) -> Counter:
+        return Counter(self.words)
+    
+    @cached_property
+    def syllable_count(self) -> int:
+        """Total syllables, counted once per distinct word"""
+        return sum(count_syllables(word) * count for word, count in self.word_counts.items())
+
 class ContentExtractor:
     """Utility class for content extraction and analysis"""
     
@@ -20,6 +76,9 @@ class ContentExtractor:
         'en': {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'}
     }
     
+    # Elements whose text is not considered page content
+    NON_CONTENT_TAGS = ('script', 'style', 'nav', 'footer', 'aside')
+    
     @staticmethod
     def extract_text_blocks(html_content: str) -> List[Dict[str, Any]]:
         """Extract meaningful text blocks from HTML"""
@@ -27,16 +86,23 @@ class ContentExtractor:
             return []
         
         soup = BeautifulSoup(html_content, 'html.parser')
+        return ContentExtractor.extract_text_blocks_from_soup(soup)
+    
+    @staticmethod
+    def extract_text_blocks_from_soup(soup: BeautifulSoup) -> List[Dict[str, Any]]:
+        """Extract meaningful text blocks from an already parsed tree without mutating it"""
+        excluded = ContentExtractor.NON_CONTENT_TAGS
         
-        # Remove script, style, nav, footer elements
-        for element in soup(['script', 'style', 'nav', 'footer', 'aside']):
-            element.decompose()
+        def is_content(element) -> bool:
+            return element.find_parent(excluded) is None
         
         text_blocks = []
         
         # Extract headings
         for level in range(1, 7):
             for heading in soup.find_all(f'h{level}'):
+                if not is_content(heading):
+                    continue
                 text = heading.get_text(strip=True)
                 if text:
                     text_blocks.append({
@@ -48,6 +114,8 @@ class ContentExtractor:
         
         # Extract paragraphs
         for p in soup.find_all('p'):
+            if not is_content(p):
+                continue
             text = p.get_text(strip=True)
             if text and len(text) > 20:  # Ignore very short paragraphs
                 text_blocks.append({
@@ -59,6 +127,8 @@ class ContentExtractor:
         
         # Extract list items
         for li in soup.find_all('li'):
+            if not is_content(li):
+                continue
             text = li.get_text(strip=True)
             if text:
                 text_blocks.append({
@@ -71,87 +141,77 @@ class ContentExtractor:
         return text_blocks
     
     @staticmethod
-    def calculate_readability_score(text: str, method: str = 'flesch_kincaid') -> float:
-        """Calculate readability score using various methods"""
+    def tokenize(text: str) -> TextTokens:
+        """Tokenize a text once for readability, keyword and content type metrics"""
+        return TextTokens.from_text(text)
+    
+    @staticmethod
+    def readability_scores(text: str, tokens: Optional[TextTokens] = None) -> Dict[str, float]:
+        """Flesch-Kincaid grade and Flesch reading ease from a single tokenization"""
+        scores = {'flesch_kincaid': 0.0, 'flesch_reading_ease': 0.0}
         if not text or len(text) < 100:
-            return 0.0
-        
-        # Basic text statistics
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
+            return scores
         
-        words = re.findall(r'\b\w+\b', text.lower())
-        syllables = sum(ContentExtractor._count_syllables(word) for word in words)
-        
-        if not sentences or not words:
-            return 0.0
+        tokens = tokens or TextTokens.from_text(text)
+        if not tokens.sentences or not tokens.words:
+            return scores
         
-        avg_sentence_length = len(words) / len(sentences)
-        avg_syllables_per_word = syllables / len(words)
+        avg_sentence_length = tokens.word_count / len(tokens.sentences)
+        avg_syllables_per_word = tokens.syllable_count / tokens.word_count
         
-        if method == 'flesch_kincaid':
-            # Flesch-Kincaid Grade Level
-            score = 0.39 * avg_sentence_length + 11.8 * avg_syllables_per_word - 15.59
-            return max(0, min(20, score))  # Clamp between 0-20
+        # Flesch-Kincaid Grade Level, clamped between 0-20
+        grade = 0.39 * avg_sentence_length + 11.8 * avg_syllables_per_word - 15.59
+        scores['flesch_kincaid'] = max(0, min(20, grade))
         
-        elif method == 'flesch_reading_ease':
-            # Flesch Reading Ease (0-100, higher is easier)
-            score = 206.835 - 1.015 * avg_sentence_length - 84.6 * avg_syllables_per_word
-            return max(0, min(100, score))
-        
-        return 0.0
+        # Flesch Reading Ease (0-100, higher is easier)
+        ease = 206.835 - 1.015 * avg_sentence_length - 84.6 * avg_syllables_per_word
+        scores['flesch_reading_ease'] = max(0, min(100, ease))
+        return scores
+    
+    @staticmethod
+    def calculate_readability_score(text: str, method: str = 'flesch_kincaid',
+                                    tokens: Optional[TextTokens] = None) -> float:
+        """Calculate readability score using various methods"""
+        return ContentExtractor.readability_scores(text, tokens).get(method, 0.0)
     
     @staticmethod
     def _count_syllables(word: str) -> int:
         """Count syllables in a word (approximation)"""
-        word = word.lower()
-        vowels = 'aeiouy'
-        syllables = 0
-        prev_char_was_vowel = False
-        
-        for char in word:
-            if char in vowels:
-                if not prev_char_was_vowel:
-                    syllables += 1
-                prev_char_was_vowel = True
-            else:
-                prev_char_was_vowel = False
-        
-        # Handle silent 'e'
-        if word.endswith('e') and syllables > 1:
-            syllables -= 1
-        
-        return max(1, syllables)
+        return count_syllables(word.lower())
     
     @staticmethod
-    def extract_keywords(text: str, lang: str = 'it', top_n: int = 10) -> List[Tuple[str, int]]:
+    def extract_keywords(text: str, lang: str = 'it', top_n: int = 10,
+                         tokens: Optional[TextTokens] = None) -> List[Tuple[str, int]]:
         """Extract most frequent keywords from text"""
         if not text:
             return []
         
-        # Clean and tokenize
-        words = re.findall(r'\b\w{3,}\b', text.lower())
+        tokens = tokens or TextTokens.from_text(text)
         
-        # Remove stop words
+        # Words of 3+ characters without stop words
         stop_words = ContentExtractor.STOP_WORDS.get(lang, set())
-        filtered_words = [word for word in words if word not in stop_words]
-        
-        # Count frequencies
-        word_counts = Counter(filtered_words)
+        word_counts = Counter({
+            word: count for word, count in tokens.word_counts.items()
+            if len(word) >= 3 and word not in stop_words
+        })
         
         return word_counts.most_common(top_n)
     
     @staticmethod
-    def calculate_keyword_density(text: str, keyword: str) -> float:
+    def calculate_keyword_density(text: str, keyword: str, tokens: Optional[TextTokens] = None) -> float:
         """Calculate keyword density as percentage"""
         if not text or not keyword:
             return 0.0
         
-        text_lower = text.lower()
+        tokens = tokens or TextTokens.from_text(text)
         keyword_lower = keyword.lower()
         
-        total_words = len(re.findall(r'\b\w+\b', text_lower))
-        keyword_count = len(re.findall(r'\b' + re.escape(keyword_lower) + r'\b', text_lower))
+        total_words = tokens.word_count
+        if WORD_RE.fullmatch(keyword_lower):
+            # Single-word keywords are looked up in the shared word counts
+            keyword_count = tokens.word_counts.get(keyword_lower, 0)
+        else:
+            keyword_count = len(re.findall(r'\b' + re.escape(keyword_lower) + r'\b', text.lower()))
         
         if total_words == 0:
             return 0.0
@@ -159,13 +219,13 @@ class ContentExtractor:
         return (keyword_count / total_words) * 100
     
     @staticmethod
-    def detect_content_type(text: str) -> Dict[str, Any]:
+    def detect_content_type(text: str, tokens: Optional[TextTokens] = None) -> Dict[str, Any]:
         """Detect content type and characteristics"""
         if not text:
             return {'type': 'empty', 'confidence': 1.0}
         
         # Length-based classification
-        word_count = len(re.findall(r'\b\w+\b', text))
+        word_count = (tokens or TextTokens.from_text(text)).word_count
         
         if word_count < 100:
             content_type = 'snippet'
@@ -176,6 +236,8 @@ class ContentExtractor:
         else:
             content_type = 'long_form'
         
+        text_lower = text.lower()
+        
         # Detect commercial intent
         commercial_keywords = [
             'prezzo', 'costo', 'acquista', 'compra', 'vendita', 'offerta', 'sconto',
@@ -184,7 +246,7 @@ class ContentExtractor:
         
         commercial_score = 0
         for keyword in commercial_keywords:
-            if keyword in text.lower():
+            if keyword in text_lower:
                 commercial_score += 1
         
         # Detect informational intent
@@ -195,7 +257,7 @@ class ContentExtractor:
         
         info_score = 0
         for keyword in info_keywords:
-            if keyword in text.lower():
+            if keyword in text_lower:
                 info_score += 1
         
         return {
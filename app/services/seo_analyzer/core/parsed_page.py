@@ -0,0 +1,197 @@
+"""
+Parsed Page Document Model
+Parses a crawl result's HTML once and exposes the nodes every analyzer needs
+"""
+import json
+import logging
+from functools import cached_property
+from typing import Dict, List, Any, Optional
+from bs4 import BeautifulSoup, Tag
+
+from .content_extractor import ContentExtractor, TextTokens
+from .tag_tokenizer import DocumentTags, tokenize_resource_tags
+
+logger = logging.getLogger(__name__)
+
+class ParsedPage:
+    """Single-parse view of a crawled page shared across the analyzer pipeline"""
+
+    HEADING_LEVELS = range(1, 7)
+
+    def __init__(self, crawl_result):
+        self.url = getattr(crawl_result, 'url', '') or ''
+        self.html = getattr(crawl_result, 'html', '') or ''
+        self.cleaned_html = getattr(crawl_result, 'cleaned_html', '') or ''
+        self.metadata = getattr(crawl_result, 'metadata', {}) or {}
+        self.markdown_text = self._extract_markdown_text(crawl_result)
+
+    @classmethod
+    def ensure(cls, crawl_result, parsed_page: Optional['ParsedPage'] = None) -> 'ParsedPage':
+        """Return the given parsed page, or parse the crawl result if none was provided"""
+        return parsed_page if parsed_page is not None else cls(crawl_result)
+
+    @staticmethod
+    def _extract_markdown_text(crawl_result) -> str:
+        """Get raw markdown text - handles both string and MarkdownGenerationResult"""
+        markdown_content = getattr(crawl_result, 'markdown', '')
+        if not markdown_content:
+            return ''
+        if hasattr(markdown_content, 'raw_markdown'):
+            return markdown_content.raw_markdown or ''
+        return str(markdown_content)
+
+    # --- Document trees ---------------------------------------------------
+
+    @property
+    def raw_html(self) -> str:
+        """Primary HTML document (raw HTML with cleaned HTML fallback)"""
+        return self.html or self.cleaned_html
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        """Parsed tree of the primary HTML document"""
+        return BeautifulSoup(self.raw_html, 'html.parser')
+
+    @cached_property
+    def cleaned_soup(self) -> BeautifulSoup:
+        """Parsed tree of Crawl4AI's cleaned HTML, reusing the primary tree when identical"""
+        if not self.cleaned_html or self.cleaned_html == self.raw_html:
+            return self.soup
+        return BeautifulSoup(self.cleaned_html, 'html.parser')
+
+    @cached_property
+    def resource_tags(self) -> DocumentTags:
+        """Images, stylesheets, scripts and head boundaries of the raw HTML, from one regex pass"""
+        return tokenize_resource_tags(self.html)
+
+    # --- Text ---------------------------------------------------------------
+
+    @cached_property
+    def text(self) -> str:
+        """Visible text of the primary document, falling back to markdown"""
+        if self.raw_html:
+            return self.soup.get_text(separator=' ', strip=True)
+        return self.markdown_text
+
+    @cached_property
+    def text_tokens(self) -> TextTokens:
+        """Words and sentences of the visible text, shared by the content metrics"""
+        return TextTokens.from_text(self.text)
+
+    @cached_property
+    def content_blocks(self) -> List[Dict[str, Any]]:
+        """Headings, paragraphs and list items outside script/style/nav/footer/aside"""
+        return ContentExtractor.extract_text_blocks_from_soup(self.soup)
+
+    @cached_property
+    def cleaned_text(self) -> str:
+        """Visible text of the cleaned HTML document"""
+        if not self.cleaned_html:
+            return ''
+        return self.cleaned_soup.get_text(separator=' ', strip=True)
+
+    @property
+    def content_text(self) -> str:
+        """Main content text: markdown when available, cleaned HTML text otherwise"""
+        return self.markdown_text or self.cleaned_text
+
+    # --- Node lists ---------------------------------------------------------
+
+    @cached_property
+    def all_nodes(self) -> List[Tag]:
+        """Every element node of the primary tree, in document order (single traversal)"""
+        return self.soup.find_all(True)
+
+    @cached_property
+    def nodes_by_tag(self) -> Dict[str, List[Tag]]:
+        """All element nodes of the primary tree bucketed by tag name, in document order"""
+        buckets: Dict[str, List[Tag]] = {}
+        for node in self.all_nodes:
+            buckets.setdefault(node.name, []).append(node)
+        return buckets
+
+    def nodes(self, tag_name: str) -> List[Tag]:
+        """Element nodes with the given tag name"""
+        return self.nodes_by_tag.get(tag_name, [])
+
+    @cached_property
+    def headings(self) -> Dict[int, List[Tag]]:
+        """Heading nodes grouped by level (1-6)"""
+        return {level: self.nodes(f'h{level}') for level in self.HEADING_LEVELS}
+
+    @property
+    def images(self) -> List[Tag]:
+        return self.nodes('img')
+
+    @cached_property
+    def links(self) -> List[Tag]:
+        """Anchor nodes carrying an href"""
+        return [a for a in self.nodes('a') if a.has_attr('href')]
+
+    @property
+    def scripts(self) -> List[Tag]:
+        return self.nodes('script')
+
+    @cached_property
+    def external_scripts(self) -> List[Tag]:
+        """Script nodes loading an external source"""
+        return [s for s in self.scripts if s.get('src')]
+
+    @property
+    def link_tags(self) -> List[Tag]:
+        return self.nodes('link')
+
+    @cached_property
+    def stylesheets(self) -> List[Tag]:
+        """<link rel="stylesheet"> nodes"""
+        return self.links_with_rel('stylesheet')
+
+    @property
+    def meta_tags(self) -> List[Tag]:
+        return self.nodes('meta')
+
+    @cached_property
+    def html_tag(self) -> Optional[Tag]:
+        html_nodes = self.nodes('html')
+        return html_nodes[0] if html_nodes else None
+
+    def links_with_rel(self, rel: str) -> List[Tag]:
+        """<link> nodes whose rel attribute contains the given value"""
+        rel = rel.lower()
+        return [link for link in self.link_tags if rel in self._rel_values(link)]
+
+    def meta_content(self, name: str) -> Optional[str]:
+        """Content of the first <meta name="..."> with the given name"""
+        name = name.lower()
+        for meta in self.meta_tags:
+            if str(meta.get('name', '')).lower() == name and meta.has_attr('content'):
+                return meta.get('content')
+        return None
+
+    @staticmethod
+    def _rel_values(node: Tag) -> List[str]:
+        rel = node.get('rel', [])
+        if isinstance(rel, str):
+            rel = rel.split()
+        return [value.lower() for value in rel]
+
+    # --- Structured data ----------------------------------------------------
+
+    @cached_property
+    def jsonld_blocks(self) -> List[Any]:
+        """Decoded JSON-LD objects, with top-level arrays flattened"""
+        blocks = []
+        for script in self.scripts:
+            if str(script.get('type', '')).strip().lower() != 'application/ld+json':
+                continue
+            try:
+                schema_obj = json.loads(script.get_text().strip())
+            except (json.JSONDecodeError, ValueError) as e:
+                logger.warning(f"Invalid JSON-LD found: {str(e)}")
+                continue
+
+            if isinstance(schema_obj, list):
+                blocks.extend(schema_obj)
+            else:
+                blocks.append(schema_obj)
+        return blocks
@@ -0,0 +1,115 @@
+"""
+Near-Duplicate Content Signatures
+64-bit SimHash of page text and LSH banding to cluster near-duplicate pages of a scan
+"""
+import hashlib
+from collections import Counter, defaultdict
+from typing import Dict, Hashable, List, Mapping, Optional, Sequence
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3
+
+# Pages below this many words are too short for a meaningful signature
+MIN_WORDS = 20
+
+# Signatures at most this many bits apart are near-duplicates
+DEFAULT_MAX_DISTANCE = 3
+
+# Comparisons allowed per band bucket after the representative pass; bigger buckets keep
+# only the representative links (and exact-signature grouping)
+MAX_BUCKET_COMPARISONS = 250_000
+
+def _shingle_hash(shingle: str) -> int:
+    # Stable across processes (unlike hash()), so analysis pool workers agree
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def simhash(words: Sequence[str], shingle_size: int = SHINGLE_SIZE) -> Optional[int]:
+    """SimHash over word shingles weighted by frequency; None for texts shorter than MIN_WORDS"""
+    if len(words) < max(MIN_WORDS, shingle_size):
+        return None
+
+    shingles = Counter(' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1))
+    weighted = [(_shingle_hash(shingle), weight) for shingle, weight in shingles.items()]
+    total = sum(shingles.values())
+
+    signature = 0
+    for bit in range(SIMHASH_BITS):
+        ones = sum(weight for value, weight in weighted if value >> bit & 1)
+        if 2 * ones > total:
+            signature |= 1 << bit
+    return signature
+
+def format_simhash(signature: Optional[int]) -> Optional[str]:
+    return format(signature, '016x') if signature is not None else None
+
+def parse_simhash(value: Optional[str]) -> Optional[int]:
+    """Signature stored as 16 hex digits; anything else (legacy hashes, empty) is ignored"""
+    if not value or len(value) != SIMHASH_BITS // 4:
+        return None
+    try:
+        return int(value, 16)
+    except ValueError:
+        return None
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+def cluster_near_duplicates(signatures: Mapping[Hashable, int],
+                            max_distance: int = DEFAULT_MAX_DISTANCE) -> List[List[Hashable]]:
+    """
+    Group keys whose signatures are within max_distance bits, transitively.
+    Signatures are split into max_distance + 1 bands: two signatures that close agree on at
+    least one whole band, so only keys sharing a band bucket are compared (LSH banding)
+    instead of every pair. Identical signatures are collapsed before banding. Within a bucket
+    every member is first compared with the first member; only members left in another
+    cluster are compared with the rest of the bucket, so template-heavy sites whose pages
+    all land in one bucket stay linear.
+    Returns the clusters with more than one key, in first-seen order.
+    """
+    keys_by_signature: Dict[int, List[Hashable]] = defaultdict(list)
+    for key, signature in signatures.items():
+        keys_by_signature[signature].append(key)
+    unique = list(keys_by_signature)
+    parent = list(range(len(unique)))
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def merge_if_close(a: int, b: int) -> None:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b and hamming_distance(unique[a], unique[b]) <= max_distance:
+            parent[root_b] = root_a
+
+    bands = max_distance + 1
+    band_bits = SIMHASH_BITS // bands
+    for band in range(bands):
+        shift = band * band_bits
+        width = SIMHASH_BITS - shift if band == bands - 1 else band_bits
+        mask = (1 << width) - 1
+
+        buckets: Dict[int, List[int]] = defaultdict(list)
+        for index, signature in enumerate(unique):
+            buckets[(signature >> shift) & mask].append(index)
+
+        for members in buckets.values():
+            if len({find(index) for index in members}) < 2:
+                continue  # Single member, or already clustered through another band
+            representative = members[0]
+            for other in members[1:]:
+                merge_if_close(representative, other)
+
+            leftovers = [index for index in members if find(index) != find(representative)]
+            if len(leftovers) * len(members) > MAX_BUCKET_COMPARISONS:
+                continue
+            for a in leftovers:
+                for b in members:
+                    if a != b:
+                        merge_if_close(a, b)
+
+    clusters: Dict[int, List[Hashable]] = {}
+    for index, signature in enumerate(unique):
+        clusters.setdefault(find(index), []).extend(keys_by_signature[signature])
+    return [keys for keys in clusters.values() if len(keys) > 1]
@@ -0,0 +1,126 @@
+"""
+Resource Tag Tokenizer
+Walks an HTML document once and collects the tags that drive the performance heuristics
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Tags of interest plus comments (skipped). Attribute values may contain '>' when quoted.
+_TAG_RE = re.compile(
+    r'<!--.*?-->'
+    r'|<(/?)(img|link|script|style|head|body)\b((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>',
+    re.IGNORECASE | re.DOTALL
+)
+_ATTR_RE = re.compile(
+    r'([^\s"\'<>/=]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'=<>`]+)))?'
+)
+_RAW_TEXT_END_RE = {
+    'script': re.compile(r'</script\s*>', re.IGNORECASE),
+    'style': re.compile(r'</style\s*>', re.IGNORECASE),
+}
+_LOADCSS_RE = re.compile(r'loadCSS\(\s*["\']([^"\']+)["\']')
+
+@dataclass
+class ResourceTag:
+    """A start tag with lower-cased attribute names and its offsets in the document"""
+    name: str
+    attrs: Dict[str, str]
+    start: int
+    end: int
+    in_head: bool = False
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.attrs.get(name, default)
+
+    def has(self, name: str) -> bool:
+        return name in self.attrs
+
+    @property
+    def rel(self) -> List[str]:
+        return self.attrs.get('rel', '').lower().split()
+
+
+@dataclass
+class DocumentTags:
+    """Resource tags of one document, in document order"""
+    images: List[ResourceTag] = field(default_factory=list)
+    stylesheets: List[ResourceTag] = field(default_factory=list)
+    preloads: List[ResourceTag] = field(default_factory=list)
+    scripts: List[ResourceTag] = field(default_factory=list)
+    loadcss_urls: List[str] = field(default_factory=list)
+    head_start: Optional[int] = None
+    head_end: Optional[int] = None
+
+    @property
+    def external_scripts(self) -> List[ResourceTag]:
+        return [script for script in self.scripts if script.get('src')]
+
+
+def parse_attributes(source: str) -> Dict[str, str]:
+    """Attributes of a tag body; the first occurrence of a repeated attribute wins"""
+    attrs = {}
+    for match in _ATTR_RE.finditer(source):
+        name = match.group(1).lower()
+        if name in attrs:
+            continue
+        value = match.group(2)
+        if value is None:
+            value = match.group(3)
+        if value is None:
+            value = match.group(4) or ''
+        attrs[name] = value
+    return attrs
+
+def tokenize_resource_tags(html: str) -> DocumentTags:
+    """
+    Single pass over the document: every <img>, <link rel=stylesheet|preload> and <script>,
+    the <head> boundaries (closed by </head> or an implied <body>) and loadCSS() calls found
+    in inline scripts. Comments are skipped and script/style bodies are not scanned for tags.
+    """
+    tags = DocumentTags()
+    if not html:
+        return tags
+
+    pos = 0
+    length = len(html)
+    while pos < length:
+        match = _TAG_RE.search(html, pos)
+        if not match:
+            break
+        pos = match.end()
+        name = match.group(2)
+        if name is None:
+            continue  # comment
+        name = name.lower()
+        closing = bool(match.group(1))
+        in_head = tags.head_start is not None and tags.head_end is None
+
+        if name in ('head', 'body'):
+            if name == 'head' and not closing and tags.head_start is None:
+                tags.head_start = match.start()
+            elif tags.head_start is not None and tags.head_end is None and (closing or name == 'body'):
+                tags.head_end = match.start()
+            continue
+        if closing:
+            continue
+
+        tag = ResourceTag(name, parse_attributes(match.group(3)), match.start(), match.end(), in_head)
+        if name == 'img':
+            tags.images.append(tag)
+        elif name == 'link':
+            rel = tag.rel
+            if 'stylesheet' in rel:
+                tags.stylesheets.append(tag)
+            elif 'preload' in rel:
+                tags.preloads.append(tag)
+        elif name in _RAW_TEXT_END_RE:
+            if name == 'script':
+                tags.scripts.append(tag)
+            end = _RAW_TEXT_END_RE[name].search(html, pos)
+            body_end = end.start() if end else length
+            if name == 'script' and not tag.has('src'):
+                tags.loadcss_urls.extend(m.group(1) for m in _LOADCSS_RE.finditer(html, pos, body_end))
+            pos = end.end() if end else length
+
+    return tags
@@ -1,15 +1,18 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import re
 import markdown
 from markdown.extensions import toc
 
 from app.core.config import seo_config
+from .core.parsed_page import ParsedPage
 
 class Crawl4AIAnalyzer:
     """Analyzes SEO data using Crawl4AI's extracted content"""
     
-    def extract_seo_data(self, crawl_result, domain: str) -> Dict[str, Any]:
+    def extract_seo_data(self, crawl_result, domain: str,
+                         parsed_page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Extract SEO data from Crawl4AI result"""
+        page = ParsedPage.ensure(crawl_result, parsed_page)
         
         # Get metadata from Crawl4AI (this contains title, description, etc.)
         metadata = getattr(crawl_result, 'metadata', {}) or {}
@@ -19,10 +22,10 @@ class Crawl4AIAnalyzer:
         meta_desc = metadata.get('description', '') or metadata.get('meta_description', '')
         
         # Calculate word count from markdown content
-        word_count = self._calculate_word_count(crawl_result)
+        word_count = self._calculate_word_count(crawl_result, page)
         
         # Extract headings from structured data
-        headings = self._extract_headings_from_crawl4ai(crawl_result)
+        headings = self._extract_headings_from_crawl4ai(crawl_result, page)
         
         # Analyze images using Crawl4AI's media extraction
         image_data = self._analyze_images_from_crawl4ai(crawl_result)
@@ -39,7 +42,8 @@ class Crawl4AIAnalyzer:
             **link_data
         }
     
-    def _extract_headings_from_crawl4ai(self, crawl_result) -> Dict[str, List[str]]:
+    def _extract_headings_from_crawl4ai(self, crawl_result,
+                                        parsed_page: Optional[ParsedPage] = None) -> Dict[str, List[str]]:
         """Extract headings from Crawl4AI's markdown or HTML"""
         headings = {
             'h1_tags': [],
@@ -53,8 +57,7 @@ class Crawl4AIAnalyzer:
         
         # Fallback to parsing cleaned HTML
         elif hasattr(crawl_result, 'cleaned_html') and crawl_result.cleaned_html:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(crawl_result.cleaned_html, 'html.parser')
+            soup = ParsedPage.ensure(crawl_result, parsed_page).cleaned_soup
             headings['h1_tags'] = [h.get_text(strip=True) for h in soup.find_all('h1')]
             headings['h2_tags'] = [h.get_text(strip=True) for h in soup.find_all('h2')]
             headings['h3_tags'] = [h.get_text(strip=True) for h in soup.find_all('h3')]
@@ -167,32 +170,12 @@ class Crawl4AIAnalyzer:
         
         return False
     
-    def _calculate_word_count(self, crawl_result) -> int:
-        """Calculate word count from Crawl4AI markdown content"""
+    def _calculate_word_count(self, crawl_result, parsed_page: Optional[ParsedPage] = None) -> int:
+        """Calculate word count from Crawl4AI markdown content (cleaned HTML fallback)"""
         try:
-            # Try to get word count from markdown content
-            if hasattr(crawl_result, 'markdown') and crawl_result.markdown:
-                # Get raw markdown text - handle both string and object types
-                if hasattr(crawl_result, 'markdown') and crawl_result.markdown and hasattr(crawl_result.markdown, 'raw_markdown'):
-                    text = crawl_result.markdown.raw_markdown
-                else:
-                    # Handle string markdown content directly
-                    text = str(crawl_result.markdown) if crawl_result.markdown else ''
-                
-                if text:
-                    # Simple word count (split by whitespace, filter empty strings)
-                    words = [word for word in text.split() if word.strip()]
-                    return len(words)
-            
-            # Fallback to cleaned HTML if markdown not available
-            if hasattr(crawl_result, 'cleaned_html') and crawl_result.cleaned_html:
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(crawl_result.cleaned_html, 'html.parser')
-                text = soup.get_text(separator=' ', strip=True)
-                words = [word for word in text.split() if word.strip()]
-                return len(words)
-                
-            return 0
+            page = ParsedPage.ensure(crawl_result, parsed_page)
+            # Simple word count (split by whitespace)
+            return len(page.content_text.split())
             
         except Exception as e:
             # Log error but don't fail the whole analysis
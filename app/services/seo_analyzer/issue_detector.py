@@ -1,10 +1,11 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 import re
 from app.core.config import seo_config
 from app.core.issue_registry import IssueRegistry
 from app.core.issue_migration import IssueMigrationUtility
 from .core.resource_details import ResourceDetailsBuilder, IssueFactory
+from .core.parsed_page import ParsedPage
 from .performance_analyzer import PerformanceAnalyzer
 from .severity_calculator import SeverityCalculator
 
@@ -13,8 +14,9 @@ logger = logging.getLogger(__name__)
 class IssueDetector:
     """Detects and categorizes SEO issues using configurable rules"""
     
-    def __init__(self):
-        self.performance_analyzer = PerformanceAnalyzer()
+    def __init__(self, performance_analyzer: Optional[PerformanceAnalyzer] = None):
+        # Share the caller's PerformanceAnalyzer when given (e.g. SEOAnalyzer's instance)
+        self.performance_analyzer = performance_analyzer or PerformanceAnalyzer()
     
     def _create_issue_from_registry(self, issue_type: str, context: Dict[str, Any] = None, 
                                    custom_description: str = None, custom_recommendation: str = None) -> Dict[str, Any]:
@@ -69,9 +71,11 @@ class IssueDetector:
         logger.debug(f"Created issue '{migrated_type}' with severity '{severity}' from registry")
         return issue
     
-    def detect_all_issues(self, crawl_result, page_id: int) -> List[Dict[str, Any]]:
+    def detect_all_issues(self, crawl_result, page_id: int,
+                          parsed_page: Optional[ParsedPage] = None) -> List[Dict[str, Any]]:
         """Detect all SEO issues for a page"""
         issues = []
+        page = ParsedPage.ensure(crawl_result, parsed_page)
         
         # Extract data from crawl result metadata (not extracted_content)
         metadata = getattr(crawl_result, 'metadata', {}) or {}
@@ -79,7 +83,7 @@ class IssueDetector:
         meta_desc = metadata.get('description', '') or metadata.get('meta_description', '')
         
         # Calculate word count from markdown
-        word_count = self._calculate_word_count_from_crawl_result(crawl_result)
+        word_count = self._calculate_word_count_from_crawl_result(crawl_result, page)
         
         # Get URL and content type
         url = getattr(crawl_result, 'url', '')
@@ -95,16 +99,16 @@ class IssueDetector:
             issues.extend(self._check_title_issues(title))
             
             # Check meta description issues
-            issues.extend(self._check_meta_description_issues(meta_desc, crawl_result))
+            issues.extend(self._check_meta_description_issues(meta_desc, crawl_result, page))
             
             # Check content issues
             issues.extend(self._check_content_issues(word_count))
             
             # Check heading structure issues
-            issues.extend(self._check_heading_issues(crawl_result))
+            issues.extend(self._check_heading_issues(crawl_result, page))
             
             # Check canonical issues
-            issues.extend(self._check_canonical_issues(crawl_result))
+            issues.extend(self._check_canonical_issues(crawl_result, page))
         
         # Check image-specific issues for image files
         elif content_type == 'image':
@@ -159,7 +163,8 @@ class IssueDetector:
         
         return issues
     
-    def _check_meta_description_issues(self, meta_desc: str, crawl_result) -> List[Dict[str, Any]]:
+    def _check_meta_description_issues(self, meta_desc: str, crawl_result,
+                                       parsed_page: Optional[ParsedPage] = None) -> List[Dict[str, Any]]:
         """Check meta description for SEO issues"""
         issues = []
         
@@ -170,8 +175,9 @@ class IssueDetector:
             title_text = metadata.get('title', '')
             
             # Extract content preview and keywords for meta description optimization
-            content_preview = self._extract_content_preview(crawl_result)
-            top_keywords = self._extract_top_keywords(crawl_result)
+            page = ParsedPage.ensure(crawl_result, parsed_page)
+            content_preview = self._extract_content_preview(crawl_result, page)
+            top_keywords = self._extract_top_keywords(crawl_result, page)
             
             # Generate intelligent meta description suggestion
             suggested_description = self._generate_meta_description_suggestion(
@@ -236,19 +242,18 @@ class IssueDetector:
         
         return issues
     
-    def _check_heading_issues(self, crawl_result) -> List[Dict[str, Any]]:
+    def _check_heading_issues(self, crawl_result, parsed_page: Optional[ParsedPage] = None) -> List[Dict[str, Any]]:
         """Check heading structure for SEO issues"""
         issues = []
         
         try:
-            # Get HTML content to analyze headings
-            html_content = getattr(crawl_result, 'cleaned_html', '') or getattr(crawl_result, 'html', '')
+            # Headings are checked on the cleaned HTML (falls back to raw HTML)
+            page = ParsedPage.ensure(crawl_result, parsed_page)
             
-            if not html_content:
+            if not (page.cleaned_html or page.html):
                 return issues
             
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = page.cleaned_soup
             
             # Find all heading tags
             h1_tags = soup.find_all('h1')
@@ -262,7 +267,7 @@ class IssueDetector:
                 title_text = metadata.get('title', '')
                 
                 # Extract top keywords from content for H1 suggestions
-                top_keywords = self._extract_top_keywords(crawl_result)
+                top_keywords = self._extract_top_keywords(crawl_result, page)
                 
                 # Generate intelligent H1 suggestion
                 suggested_h1 = self._generate_h1_suggestion(title_text, top_keywords, getattr(crawl_result, 'url', ''))
@@ -682,32 +687,13 @@ class IssueDetector:
         
         return issues
     
-    def _calculate_word_count_from_crawl_result(self, crawl_result) -> int:
-        """Calculate word count from Crawl4AI result"""
+    def _calculate_word_count_from_crawl_result(self, crawl_result,
+                                                parsed_page: Optional[ParsedPage] = None) -> int:
+        """Calculate word count from Crawl4AI result (markdown first, cleaned HTML fallback)"""
         try:
-            # Try to get word count from markdown content
-            if hasattr(crawl_result, 'markdown') and crawl_result.markdown:
-                # Get raw markdown text - handle both string and object types
-                if hasattr(crawl_result, 'markdown') and crawl_result.markdown and hasattr(crawl_result.markdown, 'raw_markdown'):
-                    text = crawl_result.markdown.raw_markdown
-                else:
-                    # Handle string markdown content directly
-                    text = str(crawl_result.markdown) if crawl_result.markdown else ''
-                
-                if text:
-                    # Simple word count (split by whitespace, filter empty strings)
-                    words = [word for word in text.split() if word.strip()]
-                    return len(words)
-            
-            # Fallback to cleaned HTML if markdown not available
-            if hasattr(crawl_result, 'cleaned_html') and crawl_result.cleaned_html:
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(crawl_result.cleaned_html, 'html.parser')
-                text = soup.get_text(separator=' ', strip=True)
-                words = [word for word in text.split() if word.strip()]
-                return len(words)
-                
-            return 0
+            page = ParsedPage.ensure(crawl_result, parsed_page)
+            # Simple word count (split by whitespace)
+            return len(page.content_text.split())
             
         except Exception as e:
             # Log error but don't fail the whole analysis
@@ -735,26 +721,21 @@ class IssueDetector:
         
         return issues
     
-    def _check_canonical_issues(self, crawl_result) -> List[Dict[str, Any]]:
+    def _check_canonical_issues(self, crawl_result, parsed_page: Optional[ParsedPage] = None) -> List[Dict[str, Any]]:
         """Check for missing canonical URL and create granular issue"""
         issues = []
         
         try:
-            # Get HTML content to check for canonical tag
-            html_content = getattr(crawl_result, 'html', '') or getattr(crawl_result, 'cleaned_html', '')
+            page = ParsedPage.ensure(crawl_result, parsed_page)
             page_url = getattr(crawl_result, 'url', '')
             
-            if not html_content or not page_url:
+            if not page.raw_html or not page_url:
                 return issues
             
             # Check if canonical tag exists
-            import re
-            canonical_match = re.search(
-                r'<link[^>]*rel=["\']canonical["\'][^>]*href=["\']([^"\']*)["\']',
-                html_content, re.IGNORECASE
-            )
+            has_canonical = any(link.has_attr('href') for link in page.links_with_rel('canonical'))
             
-            if not canonical_match:
+            if not has_canonical:
                 # Missing canonical - create granular issue
                 suggested_canonical = page_url  # Use current URL as suggested canonical
                 page_context = f"Pagina: {page_url}"
@@ -786,22 +767,11 @@ class IssueDetector:
         
         return issues
     
-    def _extract_top_keywords(self, crawl_result) -> List[str]:
+    def _extract_top_keywords(self, crawl_result, parsed_page: Optional[ParsedPage] = None) -> List[str]:
         """Extract top keywords from page content for H1 optimization"""
         try:
             # Get text content from markdown or HTML
-            text_content = ""
-            
-            if hasattr(crawl_result, 'markdown') and crawl_result.markdown:
-                if hasattr(crawl_result.markdown, 'raw_markdown'):
-                    text_content = crawl_result.markdown.raw_markdown
-                else:
-                    text_content = str(crawl_result.markdown)
-            
-            if not text_content and hasattr(crawl_result, 'cleaned_html'):
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(crawl_result.cleaned_html, 'html.parser')
-                text_content = soup.get_text(separator=' ', strip=True)
+            text_content = ParsedPage.ensure(crawl_result, parsed_page).content_text
             
             if not text_content:
                 return []
@@ -892,22 +862,11 @@ class IssueDetector:
             logger.warning(f"Error generating H1 suggestion: {str(e)}")
             return "Titolo Principale"
     
-    def _extract_content_preview(self, crawl_result) -> str:
+    def _extract_content_preview(self, crawl_result, parsed_page: Optional[ParsedPage] = None) -> str:
         """Extract content preview for meta description generation"""
         try:
             # Get text content from markdown or HTML
-            text_content = ""
-            
-            if hasattr(crawl_result, 'markdown') and crawl_result.markdown:
-                if hasattr(crawl_result.markdown, 'raw_markdown'):
-                    text_content = crawl_result.markdown.raw_markdown
-                else:
-                    text_content = str(crawl_result.markdown)
-            
-            if not text_content and hasattr(crawl_result, 'cleaned_html'):
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(crawl_result.cleaned_html, 'html.parser')
-                text_content = soup.get_text(separator=' ', strip=True)
+            text_content = ParsedPage.ensure(crawl_result, parsed_page).content_text
             
             if not text_content:
                 return ""
@@ -9,11 +9,15 @@ from urllib.parse import urlparse
 from app.core.issue_registry import IssueRegistry
 from app.core.issue_migration import IssueMigrationUtility
 from .core.resource_details import ResourceDetailsBuilder, IssueFactory
+from .core.parsed_page import ParsedPage
+from .core.tag_tokenizer import DocumentTags, tokenize_resource_tags
 from .severity_calculator import SeverityCalculator
 from app.services.url_utils import clean_url
 
 logger = logging.getLogger(__name__)
 
+ABOVE_FOLD_CONTENT_RE = re.compile(r'<(?:h1|p|div)\b[^>]*>', re.IGNORECASE)
+
 class PerformanceAnalyzer:
     """Analyzes Core Web Vitals and performance metrics"""
     
@@ -37,8 +41,25 @@ class PerformanceAnalyzer:
             'no_compression': {'impact': 'high'},
             'blocking_resources': {'impact': 'high'}
         }
+        
+        # Last (html_content, ...) results, shared with IssueDetector for the same document
+        self._last_document_tags = None
+        self._last_blocking_resources = None
+    
+    def _document_tags(self, html_content: str, parsed_page: Optional[ParsedPage] = None) -> DocumentTags:
+        """Resource tags of the document, tokenized once and reused by every heuristic"""
+        cached = self._last_document_tags
+        if cached is not None and cached[0] is html_content:
+            return cached[1]
+        
+        if parsed_page is not None and parsed_page.html is html_content:
+            tags = parsed_page.resource_tags
+        else:
+            tags = tokenize_resource_tags(html_content)
+        self._last_document_tags = (html_content, tags)
+        return tags
     
-    def analyze_core_web_vitals(self, crawl_result) -> Dict[str, Any]:
+    def analyze_core_web_vitals(self, crawl_result, parsed_page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Extract and analyze Core Web Vitals from crawl result"""
         performance_data = {
             'metrics': {},
@@ -49,7 +70,7 @@ class PerformanceAnalyzer:
         
         try:
             # Extract timing data from crawl result
-            metrics = self._extract_performance_metrics(crawl_result)
+            metrics = self._extract_performance_metrics(crawl_result, parsed_page)
             performance_data['metrics'] = metrics
             
             # Calculate scores for each metric
@@ -71,7 +92,8 @@ class PerformanceAnalyzer:
             
         return performance_data
     
-    def _extract_performance_metrics(self, crawl_result) -> Dict[str, float]:
+    def _extract_performance_metrics(self, crawl_result,
+                                     parsed_page: Optional[ParsedPage] = None) -> Dict[str, float]:
         """Extract performance timing metrics from crawl result"""
         metrics = {}
         
@@ -90,28 +112,31 @@ class PerformanceAnalyzer:
             # Analyze HTML structure for performance indicators
             html_content = getattr(crawl_result, 'html', '')
             if html_content:
+                tags = self._document_tags(html_content, parsed_page)
+                images = tags.images
+                
                 # Count resource requests
-                metrics['image_count'] = len(re.findall(r'<img[^>]*>', html_content, re.IGNORECASE))
-                metrics['css_count'] = len(re.findall(r'<link[^>]*rel=["\']stylesheet["\'][^>]*>', html_content, re.IGNORECASE))
-                metrics['js_count'] = len(re.findall(r'<script[^>]*src=[^>]*>', html_content, re.IGNORECASE))
+                metrics['image_count'] = len(images)
+                metrics['css_count'] = len(tags.stylesheets)
+                metrics['js_count'] = len(tags.external_scripts)
                 
-                # Estimate blocking resources
-                blocking_css = len(re.findall(r'<link[^>]*rel=["\']stylesheet["\'][^>]*(?!media=["\']print["\'])', html_content, re.IGNORECASE))
-                blocking_js = len(re.findall(r'<script[^>]*src=[^>]*(?!async|defer)', html_content, re.IGNORECASE))
-                metrics['blocking_resources'] = blocking_css + blocking_js
+                # Estimate blocking resources (every stylesheet and external script)
+                metrics['blocking_resources'] = metrics['css_count'] + metrics['js_count']
                 
                 # Estimate FCP based on content structure
-                has_above_fold_content = bool(re.search(r'<h1[^>]*>|<p[^>]*>|<div[^>]*>', html_content[:2000], re.IGNORECASE))
+                has_above_fold_content = bool(ABOVE_FOLD_CONTENT_RE.search(html_content, 0, 2000))
                 if has_above_fold_content and response_time:
                     metrics['fcp_estimate'] = response_time + 0.3  # Add rendering time estimate
                 
                 # Estimate LCP based on largest content
-                largest_image = re.search(r'<img[^>]*(?:width=["\'](\d+)["\']|height=["\'](\d+)["\'])', html_content, re.IGNORECASE)
-                if largest_image and response_time:
+                has_sized_image = any(img.has('width') or img.has('height') for img in images)
+                if has_sized_image and response_time:
                     metrics['lcp_estimate'] = response_time + 0.5  # Add image loading time
                 
                 # Simple CLS estimation (high if many images without dimensions)
-                images_without_dims = len(re.findall(r'<img(?![^>]*(?:width|height))[^>]*>', html_content, re.IGNORECASE))
+                images_without_dims = sum(
+                    1 for img in images if not (img.has('width') or img.has('height'))
+                )
                 metrics['cls_risk'] = min(images_without_dims * 0.05, 0.5)  # Scale to CLS range
             
         except Exception as e:
@@ -317,25 +342,22 @@ class PerformanceAnalyzer:
         image_issues = []
         
         try:
-            # Extract all image tags with detailed information
-            img_pattern = r'<img[^>]*src=["\']([^"\']+)["\'][^>]*>'
-            img_matches = re.finditer(img_pattern, html_content, re.IGNORECASE)
-            
             page_url = getattr(crawl_result, 'url', '')
             
-            for i, match in enumerate(img_matches):
-                img_tag = match.group(0)
-                img_src = match.group(1)
+            for img in self._document_tags(html_content).images:
+                img_src = img.get('src')
                 
-                # Skip data URLs and very small images
+                # Skip images without a source, data URLs and very small images
+                if not img_src:
+                    continue
                 if img_src.startswith('data:') or any(skip in img_src.lower() for skip in ['icon', 'logo', 'avatar']):
                     continue
                 
                 # Extract image attributes
-                width = self._extract_attribute(img_tag, 'width')
-                height = self._extract_attribute(img_tag, 'height')
-                alt_text = self._extract_attribute(img_tag, 'alt')
-                loading = self._extract_attribute(img_tag, 'loading')
+                width = img.get('width')
+                height = img.get('height')
+                alt_text = img.get('alt')
+                loading = img.get('loading')
                 
                 # Parse dimensions
                 width_int = None
@@ -399,26 +421,33 @@ class PerformanceAnalyzer:
             
         return image_issues
     
-    def _extract_attribute(self, tag: str, attribute: str) -> Optional[str]:
-        """Extract attribute value from HTML tag"""
-        try:
-            pattern = rf'{attribute}=["\']([^"\']*)["\']'
-            match = re.search(pattern, tag, re.IGNORECASE)
-            return match.group(1) if match else None
-        except Exception:
-            return None
-    
     def _identify_blocking_resources(self, html_content: str) -> List[Dict[str, Any]]:
-        """Identify specific blocking CSS and JavaScript resources"""
+        """Identify specific blocking CSS and JavaScript resources (memoized for the last document)"""
+        # Core Web Vitals analysis and IssueDetector both ask for the same document
+        cached = self._last_blocking_resources
+        if cached is not None and cached[0] is html_content:
+            return [dict(issue) for issue in cached[1]]
+        
+        blocking_issues = self._find_blocking_resources(html_content)
+        self._last_blocking_resources = (html_content, blocking_issues)
+        return [dict(issue) for issue in blocking_issues]
+    
+    def _find_blocking_resources(self, html_content: str) -> List[Dict[str, Any]]:
+        """Scan the document for blocking CSS and JavaScript resources"""
         blocking_issues = []
         
         if not html_content:
             return blocking_issues
         
         try:
+            tags = self._document_tags(html_content)
+            async_css_urls = [preload.get('href', '') for preload in tags.preloads] + tags.loadcss_urls
+            
             # Identify blocking CSS files and consolidate into single issue
-            css_pattern = r'<link[^>]*rel=["\']stylesheet["\'][^>]*href=["\']([^"\']+)["\'][^>]*(?!media=["\']print["\'])'
-            css_matches = re.findall(css_pattern, html_content, re.IGNORECASE)
+            css_matches = [
+                link.get('href') for link in tags.stylesheets
+                if link.get('href') and link.get('media', '').strip().lower() != 'print'
+            ]
             
             if css_matches:
                 # Collect all CSS resources  
@@ -428,7 +457,7 @@ class PerformanceAnalyzer:
                 for css_url in css_matches:
                     css_url = clean_url(css_url)  # Clean URL to remove invisible characters
                     # Check if CSS is in critical path (not async loaded)
-                    if not self._is_async_loaded(css_url, html_content):
+                    if not self._is_async_loaded(css_url, async_css_urls):
                         estimated_delay = 150.0  # Estimated blocking delay in ms
                         total_estimated_delay += estimated_delay
                         
@@ -463,8 +492,11 @@ class PerformanceAnalyzer:
                     blocking_issues.append(issue)
             
             # Identify blocking JavaScript files and consolidate into single issue
-            js_pattern = r'<script[^>]*src=["\']([^"\']+)["\'][^>]*(?!async|defer)'
-            js_matches = re.findall(js_pattern, html_content, re.IGNORECASE)
+            blocking_scripts = [
+                script for script in tags.external_scripts
+                if not (script.has('async') or script.has('defer'))
+            ]
+            js_matches = [script.get('src') for script in blocking_scripts]
             
             if js_matches:
                 # Collect all JS resources and determine unified severity
@@ -472,9 +504,9 @@ class PerformanceAnalyzer:
                 has_head_js = False
                 total_estimated_delay = 0
                 
-                for js_url in js_matches:
-                    js_url = clean_url(js_url)  # Clean URL to remove invisible characters
-                    in_head = self._is_script_in_head(js_url, html_content)
+                for script in blocking_scripts:
+                    js_url = clean_url(script.get('src'))  # Clean URL to remove invisible characters
+                    in_head = script.in_head
                     estimated_delay = 200.0 if in_head else 100.0
                     
                     if in_head:
@@ -517,25 +549,9 @@ class PerformanceAnalyzer:
         
         return blocking_issues
     
-    def _is_async_loaded(self, resource_url: str, html_content: str) -> bool:
-        """Check if CSS resource is loaded asynchronously"""
-        # Look for preload patterns or async loading mechanisms
-        async_patterns = [
-            rf'<link[^>]*rel=["\']preload["\'][^>]*href=["\'][^"\']*{re.escape(resource_url)}[^"\']*["\']',
-            rf'loadCSS\(["\'][^"\']*{re.escape(resource_url)}[^"\']*["\']'
-        ]
-        
-        return any(re.search(pattern, html_content, re.IGNORECASE) for pattern in async_patterns)
-    
-    def _is_script_in_head(self, js_url: str, html_content: str) -> bool:
-        """Check if script is loaded in head section"""
-        # Extract head section
-        head_match = re.search(r'<head[^>]*>(.*?)</head>', html_content, re.DOTALL | re.IGNORECASE)
-        if not head_match:
-            return False
-        
-        head_content = head_match.group(1)
-        return js_url in head_content
+    def _is_async_loaded(self, resource_url: str, async_urls: List[str]) -> bool:
+        """Check if CSS resource is loaded asynchronously (preloaded or loaded via loadCSS)"""
+        return any(resource_url in url for url in async_urls)
     
     def _truncate_url(self, url: str, max_length: int = 40) -> str:
         """Truncate URL for display purposes"""
@@ -1,5 +1,7 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from collections import OrderedDict
 import logging
+import threading
 
 from .crawl4ai_analyzer import Crawl4AIAnalyzer
 from .scoring_engine import ScoringEngine
@@ -8,198 +10,170 @@ from .performance_analyzer import PerformanceAnalyzer
 from .technical_seo_analyzer import TechnicalSEOAnalyzer
 from .content.content_quality import ContentQualityAnalyzer
 from .content.accessibility import AccessibilityAnalyzer
+from .core.parsed_page import ParsedPage
+from .core.content_extractor import TextTokens
+from .core.simhash import simhash, format_simhash
 
 logger = logging.getLogger(__name__)
 
 class SEOAnalyzer:
+    # Number of recent crawl results whose full analysis is memoized
+    ANALYSIS_CACHE_SIZE = 16
+    
+    # Keys of analyze_full() that are not part of the content analysis
+    RESULT_ONLY_KEYS = ('issues', 'seo_score', 'performance_score', 'technical_score',
+                        'mobile_score', 'content_score', 'accessibility_score')
+    
     def __init__(self):
         self.crawl4ai_analyzer = Crawl4AIAnalyzer()
         self.scoring_engine = ScoringEngine()
-        self.issue_detector = IssueDetector()
         self.performance_analyzer = PerformanceAnalyzer()
+        self.issue_detector = IssueDetector(performance_analyzer=self.performance_analyzer)
         self.technical_seo_analyzer = TechnicalSEOAnalyzer()
         self.content_quality_analyzer = ContentQualityAnalyzer()
         self.accessibility_analyzer = AccessibilityAnalyzer()
+        self._analysis_cache: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        self._analysis_cache_lock = threading.Lock()
+    
+    def analyze_full(self, crawl_result, domain: str,
+                     parsed_page: Optional[ParsedPage] = None) -> Dict[str, Any]:
+        """
+        Single-pass page analysis returning content data, scores and issues together.
+        Every analyzer runs once per crawl result; results are memoized per crawl result and
+        domain, and each call gets its own shallow copy.
+        """
+        cached = self._get_cached_analysis(crawl_result, domain)
+        if cached is not None:
+            return dict(cached)
+        
+        page = ParsedPage.ensure(crawl_result, parsed_page)
+        
+        # Use Crawl4AI's extracted content directly
+        analysis_result = self.crawl4ai_analyzer.extract_seo_data(crawl_result, domain, page)
+        
+        # Near-duplicate signature of the main content, compared across the scan afterwards
+        main_text = ' '.join(block['text'] for block in page.content_blocks)
+        analysis_result['content_hash'] = format_simhash(simhash(TextTokens.from_text(main_text).words))
+        
+        # Add Core Web Vitals analysis
+        analysis_result['core_web_vitals'] = self.performance_analyzer.analyze_core_web_vitals(crawl_result, page)
+        
+        # Add Technical SEO analysis
+        technical_data = self.technical_seo_analyzer.analyze_technical_seo(crawl_result, domain, page)
+        analysis_result['technical_seo'] = technical_data
+        
+        # Add Content Quality analysis
+        content_quality_result = self.content_quality_analyzer.analyze(crawl_result, parsed_page=page)
+        analysis_result['content_quality'] = {
+            'scores': content_quality_result.scores,
+            'metadata': content_quality_result.metadata
+        }
+        
+        # Add Accessibility analysis
+        accessibility_result = self.accessibility_analyzer.analyze(crawl_result, parsed_page=page)
+        analysis_result['accessibility'] = {
+            'scores': accessibility_result.scores,
+            'metadata': accessibility_result.metadata
+        }
+        
+        # Detect issues from the same analyzer results
+        issues = self.issue_detector.detect_all_issues(
+            crawl_result=crawl_result,
+            page_id=0,
+            parsed_page=page
+        )
+        
+        # NOTE: Performance issues are handled by IssueDetector.detect_all_issues()
+        # which includes granular blocking resources analysis. No need to duplicate here.
+        
+        # Convert technical issues to standard issue format
+        for tech_issue in technical_data.get('technical_issues', []):
+            issues.append({
+                'type': tech_issue['type'],
+                'severity': tech_issue['severity'],
+                'category': tech_issue['category'],
+                'title': tech_issue.get('title', tech_issue['type'].replace('_', ' ').title()),
+                'description': tech_issue.get('message', tech_issue.get('description', '')),
+                'recommendation': tech_issue.get('recommendation', ''),
+                'element': tech_issue.get('impact', ''),
+            })
+        
+        # Add Content Quality and Accessibility issues
+        for analyzer_issue in content_quality_result.issues + accessibility_result.issues:
+            issues.append({
+                'type': analyzer_issue['type'],
+                'severity': analyzer_issue['severity'],
+                'category': analyzer_issue['category'],
+                'title': analyzer_issue['title'],
+                'description': analyzer_issue['description'],
+                'recommendation': analyzer_issue['recommendation'],
+                'element': analyzer_issue.get('element', ''),
+            })
+        
+        analysis_result['issues'] = issues
+        
+        # Calculate scores
+        analysis_result.update({
+            'seo_score': self.scoring_engine.calculate_page_score(issues),
+            'performance_score': analysis_result['core_web_vitals'].get('performance_score', 0),
+            'technical_score': technical_data.get('technical_score', 0),
+            'mobile_score': analysis_result.get('mobile_score', 0),
+            'content_score': content_quality_result.scores.get('overall_score', 0),
+            'accessibility_score': accessibility_result.scores.get('overall_score', 0)
+        })
+        
+        self._store_cached_analysis(crawl_result, domain, analysis_result)
+        return dict(analysis_result)
     
-    async def analyze_page_content(self, crawl_result, domain: str) -> Dict[str, Any]:
+    def _get_cached_analysis(self, crawl_result, domain: str) -> Optional[Dict[str, Any]]:
+        """Return the memoized analysis for this exact crawl result object and domain, if any"""
+        key = (id(crawl_result), domain)
+        with self._analysis_cache_lock:
+            entry = self._analysis_cache.get(key)
+            if entry is None or entry[0] is not crawl_result:
+                return None
+            self._analysis_cache.move_to_end(key)
+            return entry[1]
+    
+    def _store_cached_analysis(self, crawl_result, domain: str, analysis_result: Dict[str, Any]):
+        # The crawl result is kept in the entry so its id cannot be reused while cached
+        key = (id(crawl_result), domain)
+        with self._analysis_cache_lock:
+            self._analysis_cache[key] = (crawl_result, analysis_result)
+            self._analysis_cache.move_to_end(key)
+            while len(self._analysis_cache) > self.ANALYSIS_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
+    
+    async def analyze_page_content(self, crawl_result, domain: str,
+                                   parsed_page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Analyze crawl result from Crawl4AI for SEO factors"""
         try:
-            # Use Crawl4AI's extracted content directly
-            analysis_result = self.crawl4ai_analyzer.extract_seo_data(crawl_result, domain)
-            
-            # Add Core Web Vitals analysis
-            performance_data = self.performance_analyzer.analyze_core_web_vitals(crawl_result)
-            analysis_result['core_web_vitals'] = performance_data
-            
-            # Add Technical SEO analysis
-            technical_data = self.technical_seo_analyzer.analyze_technical_seo(crawl_result, domain)
-            analysis_result['technical_seo'] = technical_data
-            
-            # Add Content Quality analysis
-            content_quality_result = self.content_quality_analyzer.analyze(crawl_result)
-            analysis_result['content_quality'] = {
-                'scores': content_quality_result.scores,
-                'metadata': content_quality_result.metadata
-            }
-            
-            # Add Accessibility analysis
-            accessibility_result = self.accessibility_analyzer.analyze(crawl_result)
-            analysis_result['accessibility'] = {
-                'scores': accessibility_result.scores,
-                'metadata': accessibility_result.metadata
-            }
-            
-            return analysis_result
+            full_result = self.analyze_full(crawl_result, domain, parsed_page)
+            return {key: value for key, value in full_result.items() if key not in self.RESULT_ONLY_KEYS}
             
         except Exception as e:
             logger.error(f"Error analyzing page content for {crawl_result.url}: {str(e)}")
             return {}
     
-    async def analyze_page_issues(self, crawl_result, page_id: int) -> List[Dict[str, Any]]:
+    async def analyze_page_issues(self, crawl_result, domain: str, page_id: int,
+                                  parsed_page: Optional[ParsedPage] = None) -> List[Dict[str, Any]]:
         """Detect and categorize SEO issues for a page using Crawl4AI data"""
         try:
-            # Use Crawl4AI extracted data for issue detection
-            issues = self.issue_detector.detect_all_issues(
-                crawl_result=crawl_result,
-                page_id=page_id
-            )
-            
-            # NOTE: Performance issues are now handled by IssueDetector.detect_all_issues()
-            # which includes granular blocking resources analysis. No need to duplicate here.
-            
-            # Add technical SEO issues
-            technical_data = self.technical_seo_analyzer.analyze_technical_seo(crawl_result, '')
-            technical_issues = technical_data.get('technical_issues', [])
-            
-            # Convert technical issues to standard issue format
-            for tech_issue in technical_issues:
-                issues.append({
-                    'type': tech_issue['type'],
-                    'severity': tech_issue['severity'],
-                    'category': tech_issue['category'],
-                    'title': tech_issue.get('title', tech_issue['type'].replace('_', ' ').title()),
-                    'description': tech_issue['message'],
-                    'recommendation': tech_issue['recommendation'],
-                    'element': tech_issue.get('impact', ''),
-                })
-            
-            # Add Content Quality issues
-            content_quality_result = self.content_quality_analyzer.analyze(crawl_result)
-            for cq_issue in content_quality_result.issues:
-                issues.append({
-                    'type': cq_issue['type'],
-                    'severity': cq_issue['severity'],
-                    'category': cq_issue['category'],
-                    'title': cq_issue['title'],
-                    'description': cq_issue['description'],
-                    'recommendation': cq_issue['recommendation'],
-                    'element': cq_issue.get('element', ''),
-                })
-            
-            # Add Accessibility issues
-            accessibility_result = self.accessibility_analyzer.analyze(crawl_result)
-            for acc_issue in accessibility_result.issues:
-                issues.append({
-                    'type': acc_issue['type'],
-                    'severity': acc_issue['severity'],
-                    'category': acc_issue['category'],
-                    'title': acc_issue['title'],
-                    'description': acc_issue['description'],
-                    'recommendation': acc_issue['recommendation'],
-                    'element': acc_issue.get('element', ''),
-                })
-            
-            return issues
+            # Reuses the analysis memoized by analyze_page_content() for the same crawl result and domain
+            full_result = self.analyze_full(crawl_result, domain, parsed_page)
+            return [dict(issue) for issue in full_result['issues']]
             
         except Exception as e:
             logger.error(f"Error detecting issues for {crawl_result.url}: {str(e)}")
             return []
     
-    
     def analyze_page(self, crawl_result, domain: str) -> Dict[str, Any]:
         """
-        Synchronous wrapper for page analysis - required for enterprise scans
-        Combines content analysis and issue detection into a single result
+        Synchronous page analysis - required for enterprise scans
+        Combines content analysis and issue detection into a single result (see analyze_full)
         """
         try:
-            # Since we're in sync context, we need to run async methods
-            import asyncio
-            
-            # Check if there's already an event loop running
-            try:
-                loop = asyncio.get_running_loop()
-                # If there's a running loop, we need to create a new one in a thread
-                import concurrent.futures
-                import threading
-                
-                def run_analysis():
-                    new_loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(new_loop)
-                    try:
-                        # Run content analysis
-                        content_result = new_loop.run_until_complete(
-                            self.analyze_page_content(crawl_result, domain)
-                        )
-                        
-                        # Run issue detection (using fake page_id for now)
-                        issues_result = new_loop.run_until_complete(
-                            self.analyze_page_issues(crawl_result, 0)
-                        )
-                        
-                        return content_result, issues_result
-                    finally:
-                        new_loop.close()
-                
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(run_analysis)
-                    content_result, issues_result = future.result(timeout=60)
-                    
-            except RuntimeError:
-                # No event loop running, we can create one
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    # Run content analysis
-                    content_result = loop.run_until_complete(
-                        self.analyze_page_content(crawl_result, domain)
-                    )
-                    
-                    # Run issue detection (using fake page_id for now)
-                    issues_result = loop.run_until_complete(
-                        self.analyze_page_issues(crawl_result, 0)
-                    )
-                finally:
-                    loop.close()
-                    asyncio.set_event_loop(None)
-            
-            # Combine results
-            combined_result = content_result.copy()
-            combined_result['issues'] = issues_result
-            
-            # Calculate scores from the scoring engine
-            seo_score = self.scoring_engine.calculate_page_score(issues_result)
-            
-            # Extract other scores from content analysis
-            scores = {
-                'seo_score': seo_score,
-                'performance_score': content_result.get('core_web_vitals', {}).get('performance_score', 0),
-                'technical_score': content_result.get('technical_seo', {}).get('technical_score', 0),
-                'mobile_score': content_result.get('mobile_score', 0),
-                'content_score': content_result.get('content_quality', {}).get('scores', {}).get('overall_score', 0),
-                'accessibility_score': content_result.get('accessibility', {}).get('scores', {}).get('overall_score', 0)
-            }
-            
-            # Add scores to result
-            combined_result.update({
-                'seo_score': scores.get('seo_score', 0),
-                'performance_score': scores.get('performance_score', 0),
-                'technical_score': scores.get('technical_score', 0),
-                'mobile_score': scores.get('mobile_score', 0),
-                'content_score': scores.get('content_score', 0),
-                'accessibility_score': scores.get('accessibility_score', 0)
-            })
-            
-            return combined_result
+            return self.analyze_full(crawl_result, domain)
             
         except Exception as e:
             logger.error(f"Error in analyze_page for {crawl_result.url}: {str(e)}")
@@ -4,9 +4,8 @@ Analyzes Schema.org structured data for SEO
 """
 from typing import Dict, List, Any, Optional
 import logging
-import re
-import json
 from urllib.parse import urlparse
+from ..core.parsed_page import ParsedPage
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +21,7 @@ class SchemaAnalyzer:
             'Website', 'WebPage', 'WebSite'
         }
     
-    def analyze_schema_markup(self, crawl_result) -> Dict[str, Any]:
+    def analyze_schema_markup(self, crawl_result, parsed_page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Analyze Schema.org structured data"""
         schema_data = {
             'has_schema': False,
@@ -36,18 +35,18 @@ class SchemaAnalyzer:
         }
         
         try:
-            html_content = getattr(crawl_result, 'html', '')
-            if not html_content:
+            page = ParsedPage.ensure(crawl_result, parsed_page)
+            if not page.html:
                 return schema_data
             
             # Extract JSON-LD schemas
-            jsonld_schemas = self._extract_jsonld_schemas(html_content)
+            jsonld_schemas = self._extract_jsonld_schemas(page)
             
             # Extract Microdata schemas
-            microdata_schemas = self._extract_microdata_schemas(html_content)
+            microdata_schemas = self._extract_microdata_schemas(page)
             
             # Extract RDFa schemas
-            rdfa_schemas = self._extract_rdfa_schemas(html_content)
+            rdfa_schemas = self._extract_rdfa_schemas(page)
             
             all_schemas = jsonld_schemas + microdata_schemas + rdfa_schemas
             
@@ -81,41 +80,20 @@ class SchemaAnalyzer:
         
         return schema_data
     
-    def _extract_jsonld_schemas(self, html_content: str) -> List[Dict[str, Any]]:
-        """Extract JSON-LD structured data"""
-        schemas = []
-        
-        # Find all JSON-LD script tags
-        jsonld_pattern = r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>'
-        matches = re.findall(jsonld_pattern, html_content, re.DOTALL | re.IGNORECASE)
-        
-        for match in matches:
-            try:
-                # Clean and parse JSON
-                json_content = match.strip()
-                schema_obj = json.loads(json_content)
-                
-                # Handle both single objects and arrays
-                if isinstance(schema_obj, list):
-                    schemas.extend(schema_obj)
-                else:
-                    schemas.append(schema_obj)
-                    
-            except json.JSONDecodeError as e:
-                logger.warning(f"Invalid JSON-LD found: {str(e)}")
-                continue
-        
-        return schemas
+    def _extract_jsonld_schemas(self, page: ParsedPage) -> List[Dict[str, Any]]:
+        """Extract JSON-LD structured data (arrays are flattened by the parsed page)"""
+        return list(page.jsonld_blocks)
     
-    def _extract_microdata_schemas(self, html_content: str) -> List[Dict[str, Any]]:
+    def _extract_microdata_schemas(self, page: ParsedPage) -> List[Dict[str, Any]]:
         """Extract Microdata structured data"""
         schemas = []
         
         # Find elements with itemscope
-        itemscope_pattern = r'<[^>]*itemscope[^>]*itemtype=["\']([^"\']+)["\'][^>]*>'
-        matches = re.findall(itemscope_pattern, html_content, re.IGNORECASE)
-        
-        for itemtype in matches:
+        for node in page.all_nodes:
+            itemtype = node.get('itemtype')
+            if not itemtype or not node.has_attr('itemscope'):
+                continue
+            
             schema_type = itemtype.split('/')[-1]  # Get the type name
             schemas.append({
                 '@type': schema_type,
@@ -125,13 +103,12 @@ class SchemaAnalyzer:
         
         return schemas
     
-    def _extract_rdfa_schemas(self, html_content: str) -> List[Dict[str, Any]]:
+    def _extract_rdfa_schemas(self, page: ParsedPage) -> List[Dict[str, Any]]:
         """Extract RDFa structured data"""
         schemas = []
         
         # Find elements with typeof attribute
-        typeof_pattern = r'<[^>]*typeof=["\']([^"\']+)["\'][^>]*>'
-        matches = re.findall(typeof_pattern, html_content, re.IGNORECASE)
+        matches = [node['typeof'] for node in page.all_nodes if node.get('typeof')]
         
         for typeof in matches:
             if 'schema.org' in typeof.lower():
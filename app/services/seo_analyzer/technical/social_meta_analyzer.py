@@ -6,6 +6,7 @@ from typing import Dict, List, Any, Optional
 import logging
 import re
 from urllib.parse import urlparse
+from ..core.parsed_page import ParsedPage
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +33,7 @@ class SocialMetaAnalyzer:
             }
         }
     
-    def analyze_social_meta_tags(self, crawl_result) -> Dict[str, Any]:
+    def analyze_social_meta_tags(self, crawl_result, parsed_page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Analyze social media meta tags"""
         social_data = {
             'open_graph': {
@@ -58,12 +59,12 @@ class SocialMetaAnalyzer:
         }
         
         try:
-            html_content = getattr(crawl_result, 'html', '')
-            if not html_content:
+            page = ParsedPage.ensure(crawl_result, parsed_page)
+            if not page.html:
                 return social_data
             
             # Extract all meta tags
-            meta_tags = self._extract_meta_tags(html_content)
+            meta_tags = self._extract_meta_tags(page)
             
             # Analyze Open Graph tags
             social_data['open_graph'] = self._analyze_open_graph(meta_tags)
@@ -86,23 +87,20 @@ class SocialMetaAnalyzer:
         
         return social_data
     
-    def _extract_meta_tags(self, html_content: str) -> Dict[str, str]:
-        """Extract all meta tags from HTML"""
+    def _extract_meta_tags(self, page: ParsedPage) -> Dict[str, str]:
+        """Extract all meta tags from the parsed page"""
         meta_tags = {}
+        with_content = [meta for meta in page.meta_tags if meta.has_attr('content')]
         
-        # Pattern to match meta tags with property attribute (Open Graph, etc.)
-        property_pattern = r'<meta[^>]*property=["\']([^"\']+)["\'][^>]*content=["\']([^"\']*)["\'][^>]*/?>'
-        property_matches = re.findall(property_pattern, html_content, re.IGNORECASE)
+        # Meta tags with property attribute (Open Graph, etc.)
+        for meta in with_content:
+            if meta.get('property'):
+                meta_tags[meta['property'].lower()] = meta['content']
         
-        for prop, content in property_matches:
-            meta_tags[prop.lower()] = content
-        
-        # Pattern to match meta tags with name attribute (Twitter Cards, etc.)
-        name_pattern = r'<meta[^>]*name=["\']([^"\']+)["\'][^>]*content=["\']([^"\']*)["\'][^>]*/?>'
-        name_matches = re.findall(name_pattern, html_content, re.IGNORECASE)
-        
-        for name, content in name_matches:
-            meta_tags[name.lower()] = content
+        # Meta tags with name attribute (Twitter Cards, etc.) take precedence
+        for meta in with_content:
+            if meta.get('name'):
+                meta_tags[meta['name'].lower()] = meta['content']
         
         return meta_tags
     
@@ -7,6 +7,7 @@ import logging
 import re
 from urllib.parse import urlparse, urljoin
 from app.services.url_utils import clean_url, normalize_url
+from ..core.parsed_page import ParsedPage
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +28,8 @@ class TechnicalTagsAnalyzer:
             'preload_tags': {'importance': 'medium'}
         }
     
-    def analyze_technical_tags(self, crawl_result, domain: str) -> Dict[str, Any]:
+    def analyze_technical_tags(self, crawl_result, domain: str,
+                               parsed_page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Analyze technical SEO tags and meta elements"""
         tech_data = {
             'canonical': {
@@ -75,32 +77,32 @@ class TechnicalTagsAnalyzer:
         }
         
         try:
-            html_content = getattr(crawl_result, 'html', '')
+            page = ParsedPage.ensure(crawl_result, parsed_page)
             page_url = getattr(crawl_result, 'url', '')
             
-            if not html_content:
+            if not page.html:
                 return tech_data
             
             # Analyze canonical URL
-            tech_data['canonical'] = self._analyze_canonical(html_content, page_url, domain)
+            tech_data['canonical'] = self._analyze_canonical(page, page_url, domain)
             
             # Analyze robots meta
-            tech_data['robots_meta'] = self._analyze_robots_meta(html_content)
+            tech_data['robots_meta'] = self._analyze_robots_meta(page)
             
             # Analyze viewport
-            tech_data['viewport'] = self._analyze_viewport(html_content)
+            tech_data['viewport'] = self._analyze_viewport(page)
             
             # Analyze charset
-            tech_data['charset'] = self._analyze_charset(html_content)
+            tech_data['charset'] = self._analyze_charset(page)
             
             # Analyze lang attribute
-            tech_data['lang_attr'] = self._analyze_lang_attribute(html_content)
+            tech_data['lang_attr'] = self._analyze_lang_attribute(page)
             
             # Analyze hreflang tags
-            tech_data['hreflang'] = self._analyze_hreflang(html_content)
+            tech_data['hreflang'] = self._analyze_hreflang(page)
             
             # Analyze resource hints
-            tech_data['resource_hints'] = self._analyze_resource_hints(html_content)
+            tech_data['resource_hints'] = self._analyze_resource_hints(page)
             
             # Calculate technical score
             tech_data['technical_score'] = self._calculate_technical_score(tech_data)
@@ -111,7 +113,7 @@ class TechnicalTagsAnalyzer:
         
         return tech_data
     
-    def _analyze_canonical(self, html_content: str, page_url: str, domain: str) -> Dict[str, Any]:
+    def _analyze_canonical(self, page: ParsedPage, page_url: str, domain: str) -> Dict[str, Any]:
         """Analyze canonical URL tag"""
         canonical_data = {
             'present': False,
@@ -122,11 +124,9 @@ class TechnicalTagsAnalyzer:
         }
         
         # Extract canonical URL
-        canonical_pattern = r'<link[^>]*rel=["\']canonical["\'][^>]*href=["\']([^"\']+)["\'][^>]*/?>'
-        match = re.search(canonical_pattern, html_content, re.IGNORECASE)
+        canonical_url = self._first_link_href(page, 'canonical')
         
-        if match:
-            canonical_url = match.group(1).strip()
+        if canonical_url:
             canonical_data['present'] = True
             canonical_data['url'] = canonical_url
             
@@ -159,7 +159,7 @@ class TechnicalTagsAnalyzer:
         
         return canonical_data
     
-    def _analyze_robots_meta(self, html_content: str) -> Dict[str, Any]:
+    def _analyze_robots_meta(self, page: ParsedPage) -> Dict[str, Any]:
         """Analyze robots meta tag"""
         robots_data = {
             'present': False,
@@ -169,11 +169,10 @@ class TechnicalTagsAnalyzer:
         }
         
         # Extract robots meta tag
-        robots_pattern = r'<meta[^>]*name=["\']robots["\'][^>]*content=["\']([^"\']*)["\'][^>]*/?>'
-        match = re.search(robots_pattern, html_content, re.IGNORECASE)
+        robots_content = page.meta_content('robots')
         
-        if match:
-            robots_content = match.group(1).strip()
+        if robots_content is not None:
+            robots_content = robots_content.strip()
             robots_data['present'] = True
             robots_data['content'] = robots_content
             
@@ -197,7 +196,7 @@ class TechnicalTagsAnalyzer:
         
         return robots_data
     
-    def _analyze_viewport(self, html_content: str) -> Dict[str, Any]:
+    def _analyze_viewport(self, page: ParsedPage) -> Dict[str, Any]:
         """Analyze viewport meta tag"""
         viewport_data = {
             'present': False,
@@ -207,11 +206,10 @@ class TechnicalTagsAnalyzer:
         }
         
         # Extract viewport meta tag
-        viewport_pattern = r'<meta[^>]*name=["\']viewport["\'][^>]*content=["\']([^"\']*)["\'][^>]*/?>'
-        match = re.search(viewport_pattern, html_content, re.IGNORECASE)
+        viewport_content = page.meta_content('viewport')
         
-        if match:
-            viewport_content = match.group(1).strip()
+        if viewport_content is not None:
+            viewport_content = viewport_content.strip()
             viewport_data['present'] = True
             viewport_data['content'] = viewport_content
             
@@ -237,7 +235,7 @@ class TechnicalTagsAnalyzer:
         
         return viewport_data
     
-    def _analyze_charset(self, html_content: str) -> Dict[str, Any]:
+    def _analyze_charset(self, page: ParsedPage) -> Dict[str, Any]:
         """Analyze charset meta tag"""
         charset_data = {
             'present': False,
@@ -245,24 +243,31 @@ class TechnicalTagsAnalyzer:
             'is_utf8': False
         }
         
-        # Extract charset from meta tag
-        charset_patterns = [
-            r'<meta[^>]*charset=["\']([^"\']+)["\'][^>]*/?>', 
-            r'<meta[^>]*http-equiv=["\']content-type["\'][^>]*content=["\'][^"\']*charset=([^"\';\s]+)[^"\']*["\'][^>]*/?>'
-        ]
-        
-        for pattern in charset_patterns:
-            match = re.search(pattern, html_content, re.IGNORECASE)
-            if match:
-                charset = match.group(1).strip().lower()
-                charset_data['present'] = True
-                charset_data['encoding'] = charset
-                charset_data['is_utf8'] = charset in ['utf-8', 'utf8']
+        # Extract charset from <meta charset> first, then http-equiv content-type
+        charset = None
+        for meta in page.meta_tags:
+            if meta.get('charset'):
+                charset = meta.get('charset')
                 break
         
+        if not charset:
+            for meta in page.meta_tags:
+                if str(meta.get('http-equiv', '')).lower() != 'content-type':
+                    continue
+                match = re.search(r'charset=([^"\';\s]+)', meta.get('content', ''), re.IGNORECASE)
+                if match:
+                    charset = match.group(1)
+                    break
+        
+        if charset:
+            charset = charset.strip().lower()
+            charset_data['present'] = True
+            charset_data['encoding'] = charset
+            charset_data['is_utf8'] = charset in ['utf-8', 'utf8']
+        
         return charset_data
     
-    def _analyze_lang_attribute(self, html_content: str) -> Dict[str, Any]:
+    def _analyze_lang_attribute(self, page: ParsedPage) -> Dict[str, Any]:
         """Analyze lang attribute on html element"""
         lang_data = {
             'present': False,
@@ -271,11 +276,10 @@ class TechnicalTagsAnalyzer:
         }
         
         # Extract lang attribute from html tag
-        lang_pattern = r'<html[^>]*lang=["\']([^"\']+)["\'][^>]*>'
-        match = re.search(lang_pattern, html_content, re.IGNORECASE)
+        lang_value = page.html_tag.get('lang') if page.html_tag is not None else None
         
-        if match:
-            lang_value = match.group(1).strip()
+        if lang_value:
+            lang_value = lang_value.strip()
             lang_data['present'] = True
             lang_data['value'] = lang_value
             
@@ -285,7 +289,7 @@ class TechnicalTagsAnalyzer:
         
         return lang_data
     
-    def _analyze_hreflang(self, html_content: str) -> Dict[str, Any]:
+    def _analyze_hreflang(self, page: ParsedPage) -> Dict[str, Any]:
         """Analyze hreflang tags"""
         hreflang_data = {
             'present': False,
@@ -295,8 +299,11 @@ class TechnicalTagsAnalyzer:
         }
         
         # Extract hreflang links
-        hreflang_pattern = r'<link[^>]*rel=["\']alternate["\'][^>]*hreflang=["\']([^"\']+)["\'][^>]*href=["\']([^"\']+)["\'][^>]*/?>'
-        matches = re.findall(hreflang_pattern, html_content, re.IGNORECASE)
+        matches = [
+            (link['hreflang'], link['href'])
+            for link in page.links_with_rel('alternate')
+            if link.get('hreflang') and link.get('href')
+        ]
         
         if matches:
             hreflang_data['present'] = True
@@ -320,7 +327,7 @@ class TechnicalTagsAnalyzer:
             
         return hreflang_data
     
-    def _analyze_resource_hints(self, html_content: str) -> Dict[str, List[str]]:
+    def _analyze_resource_hints(self, page: ParsedPage) -> Dict[str, List[str]]:
         """Analyze resource hints (dns-prefetch, preconnect, preload, prefetch)"""
         hints = {
             'dns_prefetch': [],
@@ -330,19 +337,27 @@ class TechnicalTagsAnalyzer:
         }
         
         # Extract resource hints
-        hint_patterns = {
-            'dns_prefetch': r'<link[^>]*rel=["\']dns-prefetch["\'][^>]*href=["\']([^"\']+)["\'][^>]*/?>',
-            'preconnect': r'<link[^>]*rel=["\']preconnect["\'][^>]*href=["\']([^"\']+)["\'][^>]*/?>',
-            'preload': r'<link[^>]*rel=["\']preload["\'][^>]*href=["\']([^"\']+)["\'][^>]*/?>', 
-            'prefetch': r'<link[^>]*rel=["\']prefetch["\'][^>]*href=["\']([^"\']+)["\'][^>]*/?>'
+        hint_rels = {
+            'dns_prefetch': 'dns-prefetch',
+            'preconnect': 'preconnect',
+            'preload': 'preload',
+            'prefetch': 'prefetch'
         }
         
-        for hint_type, pattern in hint_patterns.items():
-            matches = re.findall(pattern, html_content, re.IGNORECASE)
-            hints[hint_type] = matches
+        for hint_type, rel in hint_rels.items():
+            hints[hint_type] = [link['href'] for link in page.links_with_rel(rel) if link.get('href')]
         
         return hints
     
+    @staticmethod
+    def _first_link_href(page: ParsedPage, rel: str) -> Optional[str]:
+        """Stripped href of the first <link> with the given rel, if any"""
+        for link in page.links_with_rel(rel):
+            href = (link.get('href') or '').strip()
+            if href:
+                return href
+        return None
+    
     def _calculate_technical_score(self, tech_data: Dict[str, Any]) -> float:
         """Calculate technical SEO score"""
         score = 0.0
@@ -395,18 +410,16 @@ class TechnicalTagsAnalyzer:
         
         return min(score, max_score)
     
-    def extract_canonical_url(self, crawl_result) -> Optional[str]:
+    def extract_canonical_url(self, crawl_result, parsed_page: Optional[ParsedPage] = None) -> Optional[str]:
         """Extract canonical URL from page"""
         try:
-            html_content = getattr(crawl_result, 'html', '')
-            if not html_content:
+            page = ParsedPage.ensure(crawl_result, parsed_page)
+            if not page.html:
                 return None
             
-            canonical_pattern = r'<link[^>]*rel=["\']canonical["\'][^>]*href=["\']([^"\']+)["\'][^>]*/?>'
-            match = re.search(canonical_pattern, html_content, re.IGNORECASE)
+            canonical_url = self._first_link_href(page, 'canonical')
             
-            if match:
-                canonical_url = match.group(1).strip()
+            if canonical_url:
                 return clean_url(canonical_url)
             
             return None
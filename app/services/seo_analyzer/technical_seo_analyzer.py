@@ -10,6 +10,7 @@ from urllib.parse import urlparse
 from .technical.schema_analyzer import SchemaAnalyzer
 from .technical.social_meta_analyzer import SocialMetaAnalyzer
 from .technical.technical_tags_analyzer import TechnicalTagsAnalyzer
+from .core.parsed_page import ParsedPage
 from app.services.url_utils import clean_url, normalize_url
 
 logger = logging.getLogger(__name__)
@@ -23,15 +24,19 @@ class TechnicalSEOAnalyzer:
         self.social_analyzer = SocialMetaAnalyzer()
         self.technical_tags_analyzer = TechnicalTagsAnalyzer()
     
-    def analyze_technical_seo(self, crawl_result, domain: str) -> Dict[str, Any]:
+    def analyze_technical_seo(self, crawl_result, domain: str,
+                              parsed_page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Comprehensive technical SEO analysis using modular components"""
+        page = ParsedPage.ensure(crawl_result, parsed_page)
+        # Technical tags are analyzed once and shared by robots, mobile and i18n checks
+        technical_tags = self.technical_tags_analyzer.analyze_technical_tags(crawl_result, domain, page)
         analysis = {
-            'schema_markup': self.schema_analyzer.analyze_schema_markup(crawl_result),
-            'social_meta_tags': self.social_analyzer.analyze_social_meta_tags(crawl_result),
-            'technical_tags': self.technical_tags_analyzer.analyze_technical_tags(crawl_result, domain),
-            'robots_analysis': self.analyze_robots_directives(crawl_result),
-            'mobile_optimization': self.analyze_mobile_optimization(crawl_result),
-            'internationalization': self.analyze_internationalization(crawl_result),
+            'schema_markup': self.schema_analyzer.analyze_schema_markup(crawl_result, page),
+            'social_meta_tags': self.social_analyzer.analyze_social_meta_tags(crawl_result, page),
+            'technical_tags': technical_tags,
+            'robots_analysis': self.analyze_robots_directives(crawl_result, technical_tags),
+            'mobile_optimization': self.analyze_mobile_optimization(crawl_result, technical_tags),
+            'internationalization': self.analyze_internationalization(crawl_result, technical_tags),
             'technical_issues': [],
             'technical_opportunities': []
         }
@@ -42,7 +47,8 @@ class TechnicalSEOAnalyzer:
         
         return analysis
     
-    def analyze_robots_directives(self, crawl_result) -> Dict[str, Any]:
+    def analyze_robots_directives(self, crawl_result,
+                                  tech_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyze robots.txt and robots meta directives"""
         robots_data = {
             'meta_robots': {
@@ -61,10 +67,9 @@ class TechnicalSEOAnalyzer:
         }
         
         try:
-            html_content = getattr(crawl_result, 'html', '')
-            
             # Analyze meta robots (delegated to technical_tags_analyzer)
-            tech_analysis = self.technical_tags_analyzer.analyze_technical_tags(crawl_result, '')
+            if tech_analysis is None:
+                tech_analysis = self.technical_tags_analyzer.analyze_technical_tags(crawl_result, '')
             robots_data['meta_robots'] = tech_analysis['robots_meta']
             
             # robots.txt analysis would need additional HTTP request
@@ -76,7 +81,8 @@ class TechnicalSEOAnalyzer:
         
         return robots_data
     
-    def analyze_mobile_optimization(self, crawl_result) -> Dict[str, Any]:
+    def analyze_mobile_optimization(self, crawl_result,
+                                    tech_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyze mobile optimization factors"""
         mobile_data = {
             'viewport_tag': {
@@ -104,7 +110,8 @@ class TechnicalSEOAnalyzer:
             html_content = getattr(crawl_result, 'html', '')
             
             # Get viewport analysis from technical_tags_analyzer
-            tech_analysis = self.technical_tags_analyzer.analyze_technical_tags(crawl_result, '')
+            if tech_analysis is None:
+                tech_analysis = self.technical_tags_analyzer.analyze_technical_tags(crawl_result, '')
             mobile_data['viewport_tag'] = tech_analysis['viewport']
             
             # Basic mobile optimization checks
@@ -134,7 +141,8 @@ class TechnicalSEOAnalyzer:
         
         return mobile_data
     
-    def analyze_internationalization(self, crawl_result) -> Dict[str, Any]:
+    def analyze_internationalization(self, crawl_result,
+                                     tech_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyze internationalization and localization factors"""
         i18n_data = {
             'lang_attribute': {
@@ -159,7 +167,8 @@ class TechnicalSEOAnalyzer:
         
         try:
             # Get lang and hreflang analysis from technical_tags_analyzer
-            tech_analysis = self.technical_tags_analyzer.analyze_technical_tags(crawl_result, '')
+            if tech_analysis is None:
+                tech_analysis = self.technical_tags_analyzer.analyze_technical_tags(crawl_result, '')
             i18n_data['lang_attribute'] = tech_analysis['lang_attr']
             i18n_data['hreflang_tags'] = tech_analysis['hreflang']
             
@@ -407,21 +416,22 @@ class TechnicalSEOAnalyzer:
         return opportunities
     
     # Delegation methods for backward compatibility
-    def analyze_schema_markup(self, crawl_result) -> Dict[str, Any]:
+    def analyze_schema_markup(self, crawl_result, parsed_page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Delegate to schema analyzer"""
-        return self.schema_analyzer.analyze_schema_markup(crawl_result)
+        return self.schema_analyzer.analyze_schema_markup(crawl_result, parsed_page)
     
-    def analyze_social_meta_tags(self, crawl_result) -> Dict[str, Any]:
+    def analyze_social_meta_tags(self, crawl_result, parsed_page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Delegate to social meta analyzer"""
-        return self.social_analyzer.analyze_social_meta_tags(crawl_result)
+        return self.social_analyzer.analyze_social_meta_tags(crawl_result, parsed_page)
     
-    def analyze_technical_tags(self, crawl_result, domain: str) -> Dict[str, Any]:
+    def analyze_technical_tags(self, crawl_result, domain: str,
+                               parsed_page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Delegate to technical tags analyzer"""
-        return self.technical_tags_analyzer.analyze_technical_tags(crawl_result, domain)
+        return self.technical_tags_analyzer.analyze_technical_tags(crawl_result, domain, parsed_page)
     
-    def extract_canonical_url(self, crawl_result) -> Optional[str]:
+    def extract_canonical_url(self, crawl_result, parsed_page: Optional[ParsedPage] = None) -> Optional[str]:
         """Delegate to technical tags analyzer"""
-        return self.technical_tags_analyzer.extract_canonical_url(crawl_result)
+        return self.technical_tags_analyzer.extract_canonical_url(crawl_result, parsed_page)
     
     def analyze_url_structure(self, url: str) -> Dict[str, Any]:
         """Analyze URL structure for SEO"""
@@ -3,21 +3,95 @@ Enterprise Sitemap Parser
 Comprehensive XML sitemap parsing with support for sitemap indexes, priority extraction,
 and multi-format sitemap discovery for professional SEO auditing.
 """
+import codecs
+import hashlib
 import logging
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Any, Optional, Tuple, Set
+import zlib
+from typing import List, Dict, Any, Optional, Tuple, Set, AsyncIterator
 from urllib.parse import urljoin, urlparse
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field, InitVar
+from functools import lru_cache
+from datetime import datetime, timezone
+from email.utils import format_datetime
 import asyncio
 import aiohttp
 from enum import Enum
-import gzip
 import io
 import re
 
+from app.services.fetch_cache import FetchCache
+from app.services.date_utils import lastmod_unchanged, parse_http_date
+
 logger = logging.getLogger(__name__)
 
+# Response bytes read per step while streaming a sitemap
+SITEMAP_CHUNK_SIZE = 64 * 1024
+
+# Gzipped sitemaps are recognized by content, whatever their URL or headers say
+GZIP_MAGIC = b'\x1f\x8b'
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+def sitemap_content_hash(content: bytes) -> str:
+    """SHA-256 of a (decompressed) sitemap body, as stored in sitemap snapshots"""
+    return hashlib.sha256(content).hexdigest()
+
+def decompress_sitemap_body(content: bytes) -> bytes:
+    """Sitemap body as discovery reads it: gunzipped when the bytes are gzip, whatever the headers say"""
+    if content.startswith(GZIP_MAGIC):
+        return zlib.decompress(content, zlib.MAX_WBITS | 16)
+    return content
+
+# Fallback formats for lastmods that are not ISO 8601
+DATETIME_FORMATS = (
+    '%Y-%m-%dT%H:%M:%S%z',      # ISO 8601 with timezone
+    '%Y-%m-%dT%H:%M:%SZ',       # ISO 8601 UTC
+    '%Y-%m-%dT%H:%M:%S',        # ISO 8601 without timezone
+    '%Y-%m-%d',                 # Date only
+    '%Y-%m-%d %H:%M:%S',        # MySQL datetime
+)
+
+def _reasonable_year(parsed_date: datetime, datetime_str: str) -> bool:
+    if parsed_date.year < 1900 or parsed_date.year > 2100:
+        logger.debug(f"Date year out of reasonable range: {datetime_str}")
+        return False
+    return True
+
+@lru_cache(maxsize=4096)
+def parse_sitemap_datetime(datetime_str: str) -> Optional[datetime]:
+    """
+    Parse a (stripped) sitemap lastmod. ISO 8601 goes through datetime.fromisoformat; other
+    formats fall back to strptime. Cached: sitemaps repeat the same lastmod strings a lot.
+    """
+    try:
+        parsed_date = datetime.fromisoformat(datetime_str)
+    except ValueError:
+        pass
+    else:
+        return parsed_date if _reasonable_year(parsed_date, datetime_str) else None
+    
+    for fmt in DATETIME_FORMATS:
+        try:
+            parsed_date = datetime.strptime(datetime_str, fmt)
+            # Additional validation for edge cases
+            if not _reasonable_year(parsed_date, datetime_str):
+                continue
+            return parsed_date
+        except ValueError as e:
+            # Log specific problematic dates for debugging
+            if "day is out of range for month" in str(e):
+                logger.debug(f"Invalid date in sitemap: {datetime_str} - {str(e)}")
+            continue
+        except Exception as e:
+            # Catch any other unexpected datetime parsing errors
+            logger.debug(f"Unexpected error parsing datetime {datetime_str}: {str(e)}")
+            continue
+    
+    logger.debug(f"Could not parse datetime: {datetime_str}")
+    return None
+
 class ChangeFrequency(Enum):
     """Standard sitemap changefreq values with priority scoring"""
     ALWAYS = ("always", 1.0)
@@ -41,9 +115,13 @@ class ChangeFrequency(Enum):
                 return freq
         return cls.MONTHLY  # Default fallback
 
-@dataclass
+@dataclass(slots=True)
 class SitemapURL:
-    """Represents a single URL from a sitemap with all metadata"""
+    """
+    Represents a single URL from a sitemap with all metadata. calculated_priority is computed
+    once at creation against reference_time (one per parse), as millions of these are
+    compared and sorted during discovery.
+    """
     url: str
     priority: float = 0.5
     changefreq: ChangeFrequency = ChangeFrequency.MONTHLY
@@ -51,14 +129,16 @@ class SitemapURL:
     source_sitemap: str = ""
     is_image: bool = False
     image_data: Dict[str, Any] = None
+    reference_time: InitVar[Optional[datetime]] = None
+    calculated_priority: float = field(init=False, default=0.0)
     
-    def __post_init__(self):
+    def __post_init__(self, reference_time: Optional[datetime]):
         if self.image_data is None:
             self.image_data = {}
+        self.calculated_priority = self._calculate_priority(reference_time or datetime.now())
     
-    @property
-    def calculated_priority(self) -> float:
-        """Calculate weighted priority combining sitemap priority and changefreq"""
+    def _calculate_priority(self, now: datetime) -> float:
+        """Weighted priority combining sitemap priority, changefreq, recency and URL depth"""
         # Base sitemap priority (0.0-1.0)
         base_priority = self.priority
         
@@ -68,15 +148,9 @@ class SitemapURL:
         # Recency bonus (if lastmod is recent)
         recency_bonus = 0.0
         if self.lastmod:
-            # Handle timezone-aware vs naive datetime comparison
-            now = datetime.now()
-            lastmod = self.lastmod
-            
-            # Convert both to naive datetime for comparison
-            if lastmod.tzinfo is not None:
-                lastmod = lastmod.replace(tzinfo=None)
-            if now.tzinfo is not None:
-                now = now.replace(tzinfo=None)
+            # Compare as naive datetimes: lastmods may carry a timezone, the reference does not
+            lastmod = self.lastmod.replace(tzinfo=None)
+            now = now.replace(tzinfo=None)
             
             try:
                 days_since_mod = (now - lastmod).days
@@ -108,13 +182,157 @@ class SitemapIndex:
     def __post_init__(self):
         self.total_sitemaps = len(self.sitemaps)
 
+def url_record(sitemap_url: SitemapURL) -> list:
+    """Compact [url, priority, changefreq, lastmod, is_image] record stored in sitemap snapshots"""
+    lastmod = sitemap_url.lastmod.isoformat() if sitemap_url.lastmod else None
+    return [sitemap_url.url, sitemap_url.priority, sitemap_url.changefreq.freq_value, lastmod, sitemap_url.is_image]
+
+def url_from_record(record: list, source_sitemap: str, reference_time: Optional[datetime] = None) -> SitemapURL:
+    url, priority, changefreq, lastmod, is_image = record
+    return SitemapURL(
+        url=url,
+        priority=priority,
+        changefreq=ChangeFrequency.from_string(changefreq or ""),
+        lastmod=parse_sitemap_datetime(lastmod) if lastmod else None,
+        source_sitemap=source_sitemap,
+        is_image=bool(is_image),
+        reference_time=reference_time
+    )
+
+@dataclass
+class SitemapState:
+    """
+    Change detection state of one sitemap document: validators, content hash and URL records.
+    Loaded from the latest snapshot before a discovery (known sitemaps) and produced by the
+    discovery for every sitemap it reached. outcome tells how the sitemap was read: fetched,
+    not_modified (304 to a conditional request), lastmod_unchanged (parent index lastmod did
+    not move, no request at all) or failed.
+    """
+    url: str
+    content_hash: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
+    index_lastmod: Optional[datetime] = None
+    parent_url: Optional[str] = None
+    is_index: bool = False
+    child_count: int = 0
+    url_records: Optional[List[list]] = None
+    status_code: Optional[int] = None
+    outcome: str = 'fetched'
+    previous_hash: Optional[str] = None
+    
+    @property
+    def reusable(self) -> bool:
+        """Whether the stored URL records can stand in for downloading the sitemap"""
+        return self.url_records is not None and not self.is_index
+    
+    @property
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            last_modified = self.last_modified
+            if last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            headers['If-Modified-Since'] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+        return headers
+    
+    @property
+    def has_changed(self) -> bool:
+        return self.outcome == 'fetched' and self.content_hash != self.previous_hash
+
+class SitemapStream:
+    """
+    Incremental parser for one sitemap document. Fed raw (decompressed) bytes as they arrive,
+    it returns the <url> entries completed so far; every finished entry is removed from the
+    tree, so the parse tree stays bounded by the largest single entry (the URLs returned are
+    the caller's to keep or drop). Child sitemaps of a sitemap index are collected in sitemaps.
+    """
+    
+    def __init__(self, parser: 'SitemapParser', source_url: str):
+        self.parser = parser
+        self.source_url = source_url
+        self.is_index = False
+        self.sitemaps: List[Dict[str, Any]] = []
+        self.fed = False
+        # One reference time for the priorities of the whole document
+        self.reference_time = parser.reference_time or datetime.now()
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        self._pull = ET.XMLPullParser(events=('start', 'end'))
+        self._open: List[ET.Element] = []
+    
+    def feed(self, data: bytes) -> List[SitemapURL]:
+        text = self._decoder.decode(data)
+        if text:
+            self.fed = True
+            self._pull.feed(text)
+        return self._read_events()
+    
+    def close(self) -> List[SitemapURL]:
+        """Finish the document; raises ET.ParseError if it is truncated or malformed"""
+        text = self._decoder.decode(b'', final=True)
+        if text:
+            self._pull.feed(text)
+        self._pull.close()
+        return self._read_events()
+    
+    def _read_events(self) -> List[SitemapURL]:
+        urls = []
+        for event, elem in self._pull.read_events():
+            if event == 'start':
+                if not self._open and _local_name(elem.tag) == 'sitemapindex':
+                    self.is_index = True
+                self._open.append(elem)
+                continue
+            
+            self._open.pop()
+            tag_name = _local_name(elem.tag)
+            if tag_name == 'url':
+                url_data = self.parser._extract_url_data(elem, self.source_url, self.reference_time)
+                if url_data:
+                    urls.append(url_data)
+            elif tag_name == 'sitemap':
+                # <sitemap> children of the root make the document an index
+                if len(self._open) == 1:
+                    self.is_index = True
+                sitemap_info = self._sitemap_info(elem)
+                if sitemap_info.get('url'):
+                    self.sitemaps.append(sitemap_info)
+            else:
+                continue
+            
+            # Drop the finished entry from the tree
+            elem.clear()
+            if self._open:
+                self._open[-1].remove(elem)
+        return urls
+    
+    def _sitemap_info(self, sitemap_elem: ET.Element) -> Dict[str, Any]:
+        """Child sitemap location and lastmod from an index <sitemap> element"""
+        sitemap_info = {}
+        for child in sitemap_elem:
+            tag_name = _local_name(child.tag)
+            if tag_name == 'loc':
+                sitemap_info['url'] = child.text.strip() if child.text else ""
+            elif tag_name == 'lastmod':
+                sitemap_info['lastmod'] = self.parser._parse_datetime(child.text)
+        return sitemap_info
+
 class SitemapParser:
     """Enterprise-grade sitemap parser with comprehensive format support"""
     
-    def __init__(self, max_concurrent_requests: int = 10, timeout: int = 30):
+    def __init__(self, max_concurrent_requests: int = 10, timeout: int = 30,
+                 cache: Optional[FetchCache] = None,
+                 known_sitemaps: Optional[Dict[str, SitemapState]] = None):
         self.max_concurrent = max_concurrent_requests
         self.timeout = timeout
         self.session: Optional[aiohttp.ClientSession] = None
+        self.cache = cache  # Fresh sitemaps are read from the shared fetch cache
+        # State of each sitemap at the previous discovery, and of each sitemap reached by this one
+        self.known_sitemaps = known_sitemaps or {}
+        self.sitemap_states: Dict[str, SitemapState] = {}
+        self.reference_time: Optional[datetime] = None  # "now" for URL priorities, fixed per parse
         
         # Common sitemap locations to check
         self.common_sitemap_paths = [
@@ -228,102 +446,139 @@ class SitemapParser:
         
         return found_sitemaps
     
-    async def parse_sitemap(self, sitemap_url: str) -> Tuple[List[SitemapURL], Optional[SitemapIndex]]:
+    async def parse_sitemap(self, sitemap_url: str, index_lastmod: Optional[datetime] = None,
+                            parent_url: Optional[str] = None) -> Tuple[List[SitemapURL], Optional[SitemapIndex]]:
         """
         Parse a single sitemap URL and return URLs and index info
-        Handles both sitemap indexes and regular sitemaps
+        Handles both sitemap indexes and regular sitemaps. A regular sitemap known from the
+        previous discovery is not downloaded again when its parent index lastmod did not move,
+        and is requested conditionally (ETag / Last-Modified) otherwise.
+        The document is streamed (no copy of the raw body is kept, gzip included), but the URLs
+        of the sitemap are collected into a list: discovery deduplicates them across sitemaps and
+        stores them as snapshot records, so memory per sitemap stays O(URLs).
         """
+        known = self.known_sitemaps.get(sitemap_url)
+        state = SitemapState(
+            url=sitemap_url, index_lastmod=index_lastmod, parent_url=parent_url,
+            previous_hash=known.content_hash if known else None
+        )
+        self.sitemap_states[sitemap_url] = state
+        reusable = known is not None and known.reusable
         try:
-            content = await self._fetch_sitemap_content(sitemap_url)
-            if not content:
-                return [], None
+            if reusable and lastmod_unchanged(known.index_lastmod, index_lastmod):
+                return self._reuse_known_urls(state, known, 'lastmod_unchanged'), None
             
-            # Determine sitemap type and parse accordingly
-            root = ET.fromstring(content)
+            stream = SitemapStream(self, sitemap_url)
+            headers = known.conditional_headers if reusable else None
+            urls = [url async for url in self.stream_sitemap(sitemap_url, stream, state, headers)]
+            if state.outcome == 'not_modified':
+                return self._reuse_known_urls(state, known, 'not_modified'), None
             
             # Check if it's a sitemap index
-            if self._is_sitemap_index(root):
-                sitemap_index = self._parse_sitemap_index(root, sitemap_url)
-                return [], sitemap_index
-            else:
-                # Regular sitemap with URLs
-                urls = self._parse_sitemap_urls(root, sitemap_url)
-                return urls, None
+            if stream.is_index:
+                state.is_index = True
+                state.child_count = len(stream.sitemaps)
+                return [], SitemapIndex(url=sitemap_url, sitemaps=stream.sitemaps)
+            state.url_records = [url_record(url) for url in urls]
+            return urls, None
                 
         except Exception as e:
+            state.outcome = 'failed'
             logger.error(f"Error parsing sitemap {sitemap_url}: {str(e)}")
             return [], None
     
-    async def _fetch_sitemap_content(self, sitemap_url: str) -> Optional[str]:
-        """Fetch and decompress sitemap content"""
-        try:
-            async with self.session.get(sitemap_url) as response:
-                if response.status != 200:
-                    logger.warning(f"Sitemap {sitemap_url} returned status {response.status}")
-                    return None
-                
-                content = await response.read()
-                
-                # Handle gzipped sitemaps
-                if sitemap_url.endswith('.gz') or response.headers.get('content-encoding') == 'gzip':
-                    try:
-                        content = gzip.decompress(content)
-                    except Exception as e:
-                        logger.debug(f"Failed to decompress gzipped sitemap {sitemap_url}: {str(e)}")
-                
-                return content.decode('utf-8', errors='ignore')
-                
-        except Exception as e:
-            logger.error(f"Failed to fetch sitemap {sitemap_url}: {str(e)}")
-            return None
+    def _reuse_known_urls(self, state: SitemapState, known: SitemapState, outcome: str) -> List[SitemapURL]:
+        """URLs of an unchanged sitemap from its stored records; the state keeps the stored validators"""
+        state.outcome = outcome
+        state.content_hash = known.content_hash
+        state.etag = state.etag or known.etag
+        state.last_modified = state.last_modified or known.last_modified
+        state.url_records = known.url_records
+        reference_time = self.reference_time or datetime.now()
+        logger.debug(f"Sitemap {state.url} unchanged ({outcome}), reusing {len(known.url_records)} URLs")
+        return [url_from_record(record, state.url, reference_time) for record in known.url_records]
     
-    def _is_sitemap_index(self, root: ET.Element) -> bool:
-        """Determine if XML is a sitemap index or regular sitemap"""
-        # Check for sitemapindex tag
-        if root.tag.endswith('sitemapindex'):
-            return True
-        
-        # Check for sitemap children (indicates index)
-        for child in root:
-            if child.tag.endswith('sitemap'):
-                return True
-        
-        return False
-    
-    def _parse_sitemap_index(self, root: ET.Element, source_url: str) -> SitemapIndex:
-        """Parse sitemap index and extract child sitemap information"""
-        sitemaps = []
-        
-        for sitemap_elem in root.iter():
-            if sitemap_elem.tag.endswith('sitemap'):
-                sitemap_info = {}
-                
-                for child in sitemap_elem:
-                    tag_name = child.tag.split('}')[-1]  # Remove namespace
-                    
-                    if tag_name == 'loc':
-                        sitemap_info['url'] = child.text.strip() if child.text else ""
-                    elif tag_name == 'lastmod':
-                        sitemap_info['lastmod'] = self._parse_datetime(child.text)
-                
-                if sitemap_info.get('url'):
-                    sitemaps.append(sitemap_info)
-        
-        return SitemapIndex(url=source_url, sitemaps=sitemaps)
+    async def stream_sitemap(self, sitemap_url: str, stream: Optional[SitemapStream] = None,
+                             state: Optional[SitemapState] = None,
+                             headers: Optional[Dict[str, str]] = None) -> AsyncIterator[SitemapURL]:
+        """
+        Yield the URLs of a sitemap while it downloads, without holding the document in memory;
+        URLs are available before the download completes to callers that consume them one by
+        one (parse_sitemap collects them all). Pass a SitemapStream to read the index entries (is_index, sitemaps) afterwards, and a
+        SitemapState to receive the status, validators and content hash of the response.
+        """
+        stream = stream or SitemapStream(self, sitemap_url)
+        async for chunk in self._iter_sitemap_content(sitemap_url, state, headers):
+            for url in stream.feed(chunk):
+                yield url
+        if stream.fed:
+            for url in stream.close():
+                yield url
     
-    def _parse_sitemap_urls(self, root: ET.Element, source_url: str) -> List[SitemapURL]:
-        """Parse regular sitemap and extract URL information"""
-        urls = []
-        
-        for url_elem in root.iter():
-            if url_elem.tag.endswith('url'):
-                url_data = self._extract_url_data(url_elem, source_url)
-                if url_data:
-                    urls.append(url_data)
-        
-        return urls
+    async def _iter_sitemap_content(self, sitemap_url: str, state: Optional[SitemapState] = None,
+                                    headers: Optional[Dict[str, str]] = None) -> AsyncIterator[bytes]:
+        """
+        Sitemap body in decompressed chunks as they are received. Gzipped sitemaps go through
+        a streaming decoder; the full body is only kept when it has to be written to the cache.
+        The content hash is computed over the decompressed chunks as they pass.
+        """
+        state = state or SitemapState(url=sitemap_url)
+        if self.cache is not None:
+            cached = self.cache.get(sitemap_url)
+            if cached is not None:
+                state.status_code = cached.status_code
+                state.content_hash = sitemap_content_hash(cached.body)
+                state.etag = cached.headers.get('etag')
+                state.last_modified = parse_http_date(cached.headers.get('last-modified'))
+                yield cached.body
+                return
+        
+        async with self.session.get(sitemap_url, headers=headers) as response:
+            state.status_code = response.status
+            state.etag = response.headers.get('ETag')
+            state.last_modified = parse_http_date(response.headers.get('Last-Modified'))
+            if response.status == 304:
+                state.outcome = 'not_modified'
+                return
+            if response.status != 200:
+                logger.warning(f"Sitemap {sitemap_url} returned status {response.status}")
+                return
+            
+            digest = hashlib.sha256()
+            decompressor = None
+            body = [] if self.cache is not None else None
+            first_chunk = True
+            async for chunk in response.content.iter_chunked(SITEMAP_CHUNK_SIZE):
+                if first_chunk:
+                    first_chunk = False
+                    if chunk.startswith(GZIP_MAGIC):
+                        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                if decompressor is not None:
+                    chunk = decompressor.decompress(chunk)
+                digest.update(chunk)
+                if body is not None:
+                    body.append(chunk)
+                yield chunk
+            if decompressor is not None:
+                chunk = decompressor.flush()
+                digest.update(chunk)
+                if body is not None:
+                    body.append(chunk)
+                yield chunk
+            state.content_hash = digest.hexdigest()
+            
+            if body is not None:
+                validators = {key: value for key, value in (
+                    ('etag', state.etag), ('last-modified', response.headers.get('Last-Modified'))
+                ) if value}
+                try:
+                    self.cache.put(sitemap_url, response.status, b''.join(body), headers=validators,
+                                   final_url=str(response.url))
+                except OSError as e:
+                    logger.warning(f"Could not cache sitemap {sitemap_url}: {str(e)}")
     
-    def _extract_url_data(self, url_elem: ET.Element, source_sitemap: str) -> Optional[SitemapURL]:
+    def _extract_url_data(self, url_elem: ET.Element, source_sitemap: str,
+                          reference_time: Optional[datetime] = None) -> Optional[SitemapURL]:
         """Extract URL data from a single <url> element"""
         url_data = {
             'url': '',
@@ -336,7 +591,7 @@ class SitemapParser:
         }
         
         for child in url_elem:
-            tag_name = child.tag.split('}')[-1]  # Remove namespace
+            tag_name = _local_name(child.tag)
             
             if tag_name == 'loc':
                 url_data['url'] = child.text.strip() if child.text else ""
@@ -360,7 +615,7 @@ class SitemapParser:
         if not url_data['url']:
             return None
         
-        return SitemapURL(**url_data)
+        return SitemapURL(**url_data, reference_time=reference_time or self.reference_time)
     
     def _parse_image_data(self, image_elem: ET.Element) -> Dict[str, Any]:
         """Parse image sitemap extension data"""
@@ -384,38 +639,7 @@ class SitemapParser:
         """Parse various datetime formats found in sitemaps with robust error handling"""
         if not datetime_str:
             return None
-        
-        datetime_str = datetime_str.strip()
-        
-        # Common datetime formats in sitemaps
-        formats = [
-            '%Y-%m-%dT%H:%M:%S%z',      # ISO 8601 with timezone
-            '%Y-%m-%dT%H:%M:%SZ',       # ISO 8601 UTC
-            '%Y-%m-%dT%H:%M:%S',        # ISO 8601 without timezone
-            '%Y-%m-%d',                 # Date only
-            '%Y-%m-%d %H:%M:%S',        # MySQL datetime
-        ]
-        
-        for fmt in formats:
-            try:
-                parsed_date = datetime.strptime(datetime_str, fmt)
-                # Additional validation for edge cases
-                if parsed_date.year < 1900 or parsed_date.year > 2100:
-                    logger.debug(f"Date year out of reasonable range: {datetime_str}")
-                    continue
-                return parsed_date
-            except ValueError as e:
-                # Log specific problematic dates for debugging
-                if "day is out of range for month" in str(e):
-                    logger.debug(f"Invalid date in sitemap: {datetime_str} - {str(e)}")
-                continue
-            except Exception as e:
-                # Catch any other unexpected datetime parsing errors
-                logger.debug(f"Unexpected error parsing datetime {datetime_str}: {str(e)}")
-                continue
-        
-        logger.debug(f"Could not parse datetime: {datetime_str}")
-        return None
+        return parse_sitemap_datetime(datetime_str.strip())
     
     async def parse_all_sitemaps(self, domain: str, robots_content: str = None) -> Dict[str, Any]:
         """
@@ -436,10 +660,14 @@ class SitemapParser:
                 'max_depth': 0,
                 'urls_by_priority': {},
                 'urls_by_changefreq': {},
-                'recent_updates': 0
-            }
+                'recent_updates': 0,
+                'sitemaps_unchanged': 0
+            },
+            'sitemap_states': []
         }
         
+        self.reference_time = datetime.now()
+        self.sitemap_states = {}
         try:
             # Step 1: Discover initial sitemaps
             initial_sitemap_urls = await self.discover_sitemaps(domain, robots_content)
@@ -478,6 +706,10 @@ class SitemapParser:
             results['statistics']['sitemaps_parsed'] = len(processed_urls) - len(parsing_errors)
             results['statistics']['indexes_found'] = len(all_indexes)
             results['statistics']['max_depth'] = parsed_data.get('max_depth_reached', 0)
+            results['statistics']['sitemaps_unchanged'] = sum(
+                1 for state in self.sitemap_states.values() if state.outcome in ('not_modified', 'lastmod_unchanged')
+            )
+            results['sitemap_states'] = list(self.sitemap_states.values())
             
             # Generate comprehensive statistics
             results['statistics'].update(self._generate_url_statistics(unique_urls))
@@ -497,7 +729,8 @@ class SitemapParser:
         sitemap_urls: List[str], 
         processed_urls: Set[str], 
         depth: int = 0, 
-        max_depth: int = 5
+        max_depth: int = 5,
+        index_entries: Optional[Dict[str, Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
         """
         Recursively parse sitemaps handling multi-level sitemap indexes
@@ -507,6 +740,7 @@ class SitemapParser:
             processed_urls: Set of already processed URLs (prevents circular refs)
             depth: Current recursion depth
             max_depth: Maximum allowed recursion depth
+            index_entries: Parent index URL and lastmod of child sitemap URLs
             
         Returns:
             Dict containing all URLs, indexes, and errors from recursive parsing
@@ -519,6 +753,8 @@ class SitemapParser:
         all_indexes = []
         all_errors = []
         child_sitemap_urls = []
+        child_entries: Dict[str, Dict[str, Any]] = {}
+        index_entries = index_entries or {}
         max_depth_reached = depth
         
         # Use semaphore to limit concurrent parsing at each level
@@ -534,7 +770,10 @@ class SitemapParser:
             
             async with semaphore:
                 try:
-                    urls, index = await self.parse_sitemap(sitemap_url)
+                    entry = index_entries.get(sitemap_url, {})
+                    urls, index = await self.parse_sitemap(
+                        sitemap_url, index_lastmod=entry.get('lastmod'), parent_url=entry.get('parent_url')
+                    )
                     return urls, index, None
                 except Exception as e:
                     error_msg = f"Failed to parse {sitemap_url} at depth {depth}: {str(e)}"
@@ -565,8 +804,9 @@ class SitemapParser:
                 
                 for sitemap_info in index.sitemaps:
                     child_url = sitemap_info.get('url')
-                    if child_url and child_url not in processed_urls:
+                    if child_url and child_url not in processed_urls and child_url not in child_entries:
                         child_sitemap_urls.append(child_url)
+                        child_entries[child_url] = {'lastmod': sitemap_info.get('lastmod'), 'parent_url': index.url}
             else:
                 # Regular sitemap with URLs
                 all_urls.extend(urls)
@@ -581,7 +821,8 @@ class SitemapParser:
                 child_sitemap_urls, 
                 processed_urls, 
                 depth + 1, 
-                max_depth
+                max_depth,
+                child_entries
             )
             
             all_urls.extend(child_results['urls'])
@@ -641,7 +882,7 @@ class SitemapParser:
         # Calculate distributions
         priority_sum = 0.0
         from datetime import timedelta
-        recent_threshold = datetime.now().replace(hour=0, minute=0, second=0)
+        recent_threshold = (self.reference_time or datetime.now()).replace(hour=0, minute=0, second=0)
         recent_threshold = recent_threshold - timedelta(days=30)  # 30 days ago
         
         for url in urls:
@@ -11,8 +11,9 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
-from .sitemap_parser import SitemapParser, SitemapURL, ChangeFrequency
+from .sitemap_parser import SitemapParser, SitemapURL, SitemapState, ChangeFrequency
 from app.services.url_utils import clean_url, normalize_url
+from app.services.fetch_cache import FetchCache
 
 logger = logging.getLogger(__name__)
 
@@ -143,9 +144,10 @@ class URLDiscoveryConfig:
 class URLDiscoveryService:
     """Enterprise URL discovery service orchestrating multiple sources"""
     
-    def __init__(self, config: URLDiscoveryConfig = None):
+    def __init__(self, config: URLDiscoveryConfig = None, cache: Optional[FetchCache] = None,
+                 known_sitemaps: Optional[Dict[str, SitemapState]] = None):
         self.config = config or URLDiscoveryConfig()
-        self.sitemap_parser = SitemapParser()
+        self.sitemap_parser = SitemapParser(cache=cache, known_sitemaps=known_sitemaps)
         
     async def discover_urls(
         self, 
@@ -163,7 +165,7 @@ class URLDiscoveryService:
             'total_urls': 0,
             'urls': [],
             'sources': {
-                'sitemap': {'count': 0, 'urls': []},
+                'sitemap': {'count': 0, 'urls': [], 'sitemaps': []},
                 'crawl': {'count': 0, 'urls': []},
                 'manual': {'count': 0, 'urls': []}
             },
@@ -200,6 +202,8 @@ class URLDiscoveryService:
                 
                 discovery_results['sources']['sitemap']['count'] = len(sitemap_urls)
                 discovery_results['sources']['sitemap']['urls'] = sitemap_urls
+                # Per-sitemap validators, hashes and URL records for the next discovery
+                discovery_results['sources']['sitemap']['sitemaps'] = list(self.sitemap_parser.sitemap_states.values())
                 discovery_results['statistics']['sitemap_success'] = len(sitemap_urls) > 0
                 
                 logger.info(f"Discovered {len(sitemap_urls)} URLs from sitemaps")
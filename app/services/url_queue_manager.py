@@ -140,7 +140,7 @@ class CrawlBudget:
 class URLQueueManager:
     """Enterprise URL queue manager with priority-based processing"""
     
-    def __init__(self, crawl_budget: CrawlBudget = None):
+    def __init__(self, crawl_budget: CrawlBudget = None, max_concurrent: int = 10):
         self.crawl_budget = crawl_budget or CrawlBudget()
         
         # Priority queues (using heapq for efficient priority sorting)
@@ -166,7 +166,7 @@ class URLQueueManager:
         }
         
         # Concurrency control
-        self.max_concurrent = 10
+        self.max_concurrent = max(1, max_concurrent)
         self.processing_semaphore = asyncio.Semaphore(self.max_concurrent)
         self.currently_processing: Set[str] = set()
     
@@ -7,6 +7,8 @@ import httpx
 from app.core.celery_app import celery_app
 from app.database import AsyncSessionLocal
 from app.models import Website, RobotsSnapshot, SitemapSnapshot
+from app.services.date_utils import parse_http_date
+from app.services.sitemap_parser import SitemapState, decompress_sitemap_body, sitemap_content_hash
 from sqlalchemy import select
 
 logger = logging.getLogger(__name__)
@@ -139,40 +141,58 @@ async def _check_sitemap(db, website: Website, domain: str) -> bool:
     
     for sitemap_url in sitemap_urls:
         try:
+            # Get last snapshot; its validators make the request conditional
+            last_snapshot_result = await db.execute(
+                select(SitemapSnapshot)
+                .where(
+                    SitemapSnapshot.website_id == website.id,
+                    SitemapSnapshot.sitemap_url == sitemap_url
+                )
+                .order_by(SitemapSnapshot.created_at.desc(), SitemapSnapshot.id.desc())
+                .limit(1)
+            )
+            last_snapshot = last_snapshot_result.scalar_one_or_none()
+            headers = SitemapState(
+                url=sitemap_url, etag=last_snapshot.etag, last_modified=last_snapshot.last_modified
+            ).conditional_headers if last_snapshot else {}
+            
             async with httpx.AsyncClient() as client:
-                response = await client.get(sitemap_url, timeout=10)
+                response = await client.get(sitemap_url, headers=headers, timeout=10)
+                
+                if response.status_code == 304:
+                    logger.debug(f"Sitemap not modified for {domain}: {sitemap_url}")
+                    return False
                 
                 if response.status_code == 200:
-                    content = response.text
-                    content_hash = hashlib.md5(content.encode()).hexdigest()
+                    # Hash the body the way discovery does, so .gz sitemaps compare equal
+                    body = decompress_sitemap_body(response.content)
+                    content = body.decode('utf-8', errors='ignore')
+                    content_hash = sitemap_content_hash(body)
+                    etag = response.headers.get('etag')
+                    last_modified = parse_http_date(response.headers.get('last-modified'))
                     
                     # Count URLs in sitemap (basic count)
                     urls_count = content.count('<url>') or content.count('<sitemap>')
                     
-                    # Get last snapshot
-                    last_snapshot_result = await db.execute(
-                        select(SitemapSnapshot)
-                        .where(
-                            SitemapSnapshot.website_id == website.id,
-                            SitemapSnapshot.sitemap_url == sitemap_url
-                        )
-                        .order_by(SitemapSnapshot.created_at.desc())
-                        .limit(1)
-                    )
-                    last_snapshot = last_snapshot_result.scalar_one_or_none()
-                    
                     has_changed = False
-                    if not last_snapshot or last_snapshot.content_hash != content_hash:
+                    if last_snapshot and last_snapshot.content_hash == content_hash:
+                        # Same content: refresh the validators of the snapshot, keeping its URL records
+                        last_snapshot.etag = etag or last_snapshot.etag
+                        last_snapshot.last_modified = last_modified or last_snapshot.last_modified
+                    else:
                         has_changed = True
                         
-                        # Create new snapshot
+                        # Create new snapshot; URL records are only stored by full discoveries
                         new_snapshot = SitemapSnapshot(
                             website_id=website.id,
                             sitemap_url=sitemap_url,
                             content_hash=content_hash,
                             urls_count=urls_count,
+                            urls_with_metadata=None,
                             is_accessible=True,
                             status_code=response.status_code,
+                            etag=etag,
+                            last_modified=last_modified,
                             has_changed=has_changed,
                             previous_hash=last_snapshot.content_hash if last_snapshot else None,
                             previous_urls_count=last_snapshot.urls_count if last_snapshot else None
@@ -188,4 +208,4 @@ async def _check_sitemap(db, website: Website, domain: str) -> bool:
             logger.error(f"Error checking sitemap {sitemap_url} for {domain}: {str(e)}")
             continue
     
-    return False
\ No newline at end of file
+    return False
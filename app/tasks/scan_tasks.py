@@ -8,6 +8,10 @@ from app.models import Website, Scan, Schedule
 from app.services.scan_service_sync import SyncScanService
 from app.services.enterprise_scan_service import EnterpriseScanService
 from app.services.schedule_service import ScheduleService
+from app.services.deletion_service import purge_scan_sync
+from app.services.scan_reanalysis import reanalyze_scan_sync
+from app.services.report_service import build_cached_report
+from app.core.config import settings
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
@@ -92,8 +96,11 @@ def run_scheduled_scans():
                     if schedule.website and schedule.website.is_active:
                         logger.info(f"Scheduling scan for website {schedule.website.domain} (schedule ID: {schedule.id})")
                         
-                        # Schedule the scan task
-                        run_website_scan.delay(schedule.website.id)
+                        # Schedule the scan task; incremental websites need the sitemap-driven scan
+                        if schedule.website.incremental_scan:
+                            run_enterprise_website_scan.delay(schedule.website.id)
+                        else:
+                            run_website_scan.delay(schedule.website.id)
                         scheduled_count += 1
                         
                         # Update schedule for next run
@@ -184,6 +191,42 @@ def run_enterprise_website_scan(self, website_id: int, scan_id: int = None):
                 
             return {"status": "failed", "error": str(exc)}
 
+@celery_app.task(bind=True, max_retries=3)
+def purge_scan_data(self, scan_id: int):
+    """Delete a large scan with its pages and issues in chunked transactions"""
+    try:
+        with SyncSessionLocal() as db:
+            counts = purge_scan_sync(db, scan_id, chunk_size=settings.scan_purge_chunk_size)
+        return {"status": "purged", "scan_id": scan_id, **counts}
+    except Exception as exc:
+        logger.error(f"Purge failed for scan {scan_id}: {str(exc)}")
+        # Already deleted chunks stay deleted; a retry resumes with the remaining pages
+        raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
+
+@celery_app.task
+def reanalyze_scan(scan_id: int):
+    """Rerun page analysis of a completed scan over its stored HTML snapshots, rewriting issues and scores"""
+    try:
+        with SyncSessionLocal() as db:
+            counts = reanalyze_scan_sync(db, scan_id, chunk_size=settings.scan_reanalysis_chunk_size)
+        return {"status": "reanalyzed", "scan_id": scan_id, **counts}
+    except Exception as exc:
+        # Nothing is committed on failure; the scan keeps its previous results
+        logger.error(f"Re-analysis failed for scan {scan_id}: {str(exc)}")
+        return {"status": "failed", "scan_id": scan_id, "error": str(exc)}
+
+@celery_app.task
+def generate_scan_report(scan_id: int):
+    """Build the PDF report of a completed scan into the shared report cache"""
+    try:
+        with SyncSessionLocal() as db:
+            path = build_cached_report(db, scan_id)
+        return {"status": "ready", "scan_id": scan_id, "path": path}
+    except Exception as exc:
+        # The failure is recorded on the scan; the next download request queues a new attempt
+        logger.error(f"Report generation failed for scan {scan_id}: {str(exc)}")
+        return {"status": "failed", "scan_id": scan_id, "error": str(exc)}
+
 def _needs_scan(website: Website, now: datetime) -> bool:
     """Check if website needs a scan based on frequency"""
     if not website.last_scan_at:
@@ -15,6 +15,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
 
 from app.database import AsyncSessionLocal
 from app.models import Client, Website, Scan, Page, Issue
+from app.services.issue_resources import normalize_issue_resources
 from app.core.issue_registry import IssueRegistry, IssueCategory, IssueSeverity, IssueFormat
 from sqlalchemy import select
 
@@ -174,6 +175,7 @@ async def create_demo_scan():
                 
                 issue = Issue(
                     page_id=page.id,
+                    scan_id=page.scan_id,
                     type=issue_type,
                     severity=severity,
                     category=issue_def.category.value,
@@ -182,6 +184,7 @@ async def create_demo_scan():
                     element=json.dumps(element_data) if element_data else None,
                     score_impact=get_score_impact(severity)
                 )
+                issue.resources = normalize_issue_resources(issue.type, issue.element, issue.description)
                 
                 db.add(issue)
                 issue_count += 1
@@ -0,0 +1,30 @@
+"""
+Shared test fixtures
+"""
+import pytest
+import pytest_asyncio
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import Base
+
+
+@pytest.fixture
+def sync_db():
+    """Session on a fresh in-memory SQLite database with all tables created"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def async_engine():
+    """Async engine on a fresh in-memory SQLite database with all tables created"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
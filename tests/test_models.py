@@ -165,6 +165,7 @@ class TestPageModel:
         """Test page relationships with issues"""
         issue = Issue(
             page_id=sample_page.id,
+            scan_id=sample_page.scan_id,
             type="title_too_short",
             category="on_page",
             severity="medium",
@@ -194,6 +195,7 @@ class TestIssueModel:
         """Test creating an issue"""
         issue = Issue(
             page_id=sample_page.id,
+            scan_id=sample_page.scan_id,
             type="missing_h1",
             category="on_page",
             severity="high",
@@ -223,6 +225,7 @@ class TestIssueModel:
         for severity in severities:
             issue = Issue(
                 page_id=sample_page.id,
+                scan_id=sample_page.scan_id,
                 type=f"test_{severity}",
                 category="test",
                 severity=severity,
@@ -7,6 +7,14 @@ from unittest.mock import Mock, patch
 from app.services.seo_analyzer.issue_detector import IssueDetector
 from app.services.seo_analyzer.crawl4ai_analyzer import Crawl4AIAnalyzer
 from app.services.seo_analyzer.scoring_engine import ScoringEngine
+from app.services.seo_analyzer.core.parsed_page import ParsedPage
+from app.services.seo_analyzer.core.tag_tokenizer import tokenize_resource_tags
+from app.services.seo_analyzer.core.content_extractor import ContentExtractor, TextTokens, count_syllables
+from app.services.seo_analyzer.performance_analyzer import PerformanceAnalyzer
+from app.services.seo_analyzer.seo_analyzer import SEOAnalyzer
+from app.services.seo_analyzer.analysis_pool import (
+    PageSnapshot, analyze_page, analyze_snapshot, get_analysis_pool
+)
 from app.core.config import seo_config
 
 class TestIssueDetector:
@@ -320,4 +328,253 @@ class TestIntegratedSEOAnalysis:
         
         # Should have minimal issues and high score
         assert score >= 90.0
-        assert len(issues) <= 2  # Maybe minor issues only
\ No newline at end of file
+        assert len(issues) <= 2  # Maybe minor issues only
+
+class TestParsedPage:
+    """Test the shared single-parse page model"""
+    
+    @pytest.fixture
+    def crawl_result(self):
+        result = Mock()
+        result.url = "https://example.com/page"
+        result.html = """
+        <html lang="it">
+            <head>
+                <meta name="robots" content="index, follow">
+                <link rel="canonical" href="https://example.com/page">
+                <link rel="stylesheet" href="/style.css">
+                <script src="/app.js"></script>
+                <script type="application/ld+json">[{"@type": "Organization"}, {"@type": "WebSite"}]</script>
+            </head>
+            <body>
+                <h1>Titolo</h1><h2>Sezione</h2>
+                <img src="a.jpg"><a href="/interno">Link</a>
+            </body>
+        </html>
+        """
+        result.cleaned_html = ""
+        result.markdown = "# Titolo\n\nContenuto della pagina"
+        result.metadata = {}
+        result.media = {}
+        result.links = {}
+        result.status_code = 200
+        return result
+    
+    def test_node_lists(self, crawl_result):
+        """Nodes are bucketed from a single traversal"""
+        page = ParsedPage(crawl_result)
+        
+        assert [h.get_text() for h in page.headings[1]] == ["Titolo"]
+        assert len(page.images) == 1
+        assert len(page.links) == 1
+        assert len(page.stylesheets) == 1
+        assert len(page.external_scripts) == 1
+        assert page.html_tag.get('lang') == "it"
+        assert page.meta_content('robots') == "index, follow"
+        assert page.links_with_rel('canonical')[0]['href'] == "https://example.com/page"
+    
+    def test_jsonld_blocks_are_flattened(self, crawl_result):
+        page = ParsedPage(crawl_result)
+        
+        assert [block['@type'] for block in page.jsonld_blocks] == ["Organization", "WebSite"]
+    
+    def test_cleaned_soup_reuses_primary_tree(self, crawl_result):
+        """Without cleaned HTML the primary tree is reused instead of reparsed"""
+        page = ParsedPage(crawl_result)
+        
+        assert page.cleaned_soup is page.soup
+        assert page.content_text == "# Titolo\n\nContenuto della pagina"
+    
+    def test_ensure_reuses_given_page(self, crawl_result):
+        page = ParsedPage(crawl_result)
+        
+        assert ParsedPage.ensure(crawl_result, page) is page
+        assert ParsedPage.ensure(crawl_result) is not page
+    
+    def test_detector_accepts_shared_page(self, crawl_result):
+        """Issue detection gives the same result with or without a shared page"""
+        detector = IssueDetector()
+        page = ParsedPage(crawl_result)
+        
+        with_page = detector.detect_all_issues(crawl_result, 1, parsed_page=page)
+        without_page = detector.detect_all_issues(crawl_result, 1)
+        
+        assert [i['type'] for i in with_page] == [i['type'] for i in without_page]
+
+class TestResourceTagTokenizer:
+    """Test the single-pass tokenizer behind the performance heuristics"""
+    
+    HTML = """
+    <html>
+        <head>
+            <link rel="stylesheet" href="/main.css">
+            <link rel="stylesheet" href="/print.css" media="print">
+            <link rel="preload" href="/late.css" as="style">
+            <link rel="stylesheet" href="/late.css">
+            <script src="/head.js"></script>
+            <script src="/deferred.js" defer></script>
+            <script>loadCSS('/fonts.css'); var s = "<img src='fake.jpg'>";</script>
+            <link rel="stylesheet" href="/fonts.css">
+        </head>
+        <body>
+            <!-- <img src="commented.jpg"> -->
+            <img src="hero.jpg" width="800" height="600" alt="a > b">
+            <img src="photo.jpg">
+            <script src="/footer.js"></script>
+        </body>
+    </html>
+    """
+    
+    def test_tokenizes_resources_in_one_pass(self):
+        tags = tokenize_resource_tags(self.HTML)
+        
+        assert [img.get('src') for img in tags.images] == ["hero.jpg", "photo.jpg"]
+        assert tags.images[0].get('alt') == "a > b"
+        assert [link.get('href') for link in tags.stylesheets] == ["/main.css", "/print.css", "/late.css", "/fonts.css"]
+        assert [script.get('src') for script in tags.external_scripts] == ["/head.js", "/deferred.js", "/footer.js"]
+        assert [script.in_head for script in tags.external_scripts] == [True, True, False]
+        assert tags.loadcss_urls == ["/fonts.css"]
+        assert tags.head_start < tags.images[0].start and tags.head_end < tags.images[0].start
+    
+    def test_blocking_resources_from_tokens(self):
+        analyzer = PerformanceAnalyzer()
+        issues = {issue['type']: issue for issue in analyzer._identify_blocking_resources(self.HTML)}
+        
+        assert issues['blocking_css_resource']['description'].startswith('1 CSS')
+        assert "main.css" in issues['blocking_css_resource']['element']
+        assert issues['blocking_js_resource']['description'].startswith('2 JavaScript')
+        assert "deferred.js" not in issues['blocking_js_resource']['element']
+
+
+class TestTextTokens:
+    """Test the shared tokenization behind readability and keyword metrics"""
+    
+    TEXT = ("La guida completa al giardino. Il giardino richiede cura costante! "
+            "Come si cura un giardino? Con pazienza, acqua e una buona guida. ") * 3
+    
+    def test_tokenizes_words_and_sentences_once(self):
+        tokens = TextTokens.from_text(self.TEXT)
+        
+        assert tokens.word_count == 3 * 22
+        assert len(tokens.sentences) == 12
+        assert tokens.word_counts['giardino'] == 9
+        assert tokens.syllable_count == sum(count_syllables(word) for word in tokens.words)
+    
+    def test_metrics_match_per_call_tokenization(self):
+        tokens = TextTokens.from_text(self.TEXT)
+        
+        assert ContentExtractor.readability_scores(self.TEXT, tokens) == ContentExtractor.readability_scores(self.TEXT)
+        assert ContentExtractor.calculate_readability_score(self.TEXT, 'flesch_reading_ease', tokens) > 0
+        assert ContentExtractor.extract_keywords(self.TEXT, 'it', 2, tokens) == [('giardino', 9), ('guida', 6)]
+        assert ContentExtractor.calculate_keyword_density(self.TEXT, 'Giardino', tokens) == pytest.approx(9 / 66 * 100)
+        assert ContentExtractor.calculate_keyword_density(self.TEXT, 'buona guida', tokens) == pytest.approx(3 / 66 * 100)
+    
+    def test_syllables_are_memoized(self):
+        count_syllables.cache_clear()
+        TextTokens.from_text(self.TEXT).syllable_count
+        
+        info = count_syllables.cache_info()
+        assert info.misses == len(set(TextTokens.from_text(self.TEXT).words)) and info.hits == 0
+
+
+class TestSEOAnalyzerFull:
+    """Test single-pass analysis and its per-crawl-result memoization"""
+    
+    @pytest.fixture
+    def seo_analyzer(self):
+        return SEOAnalyzer()
+    
+    @pytest.fixture
+    def crawl_result(self):
+        result = Mock()
+        result.url = "https://example.com/page"
+        result.html = """
+        <html><head><link rel="stylesheet" href="/style.css"></head>
+        <body><h1>Titolo della pagina</h1><p>Contenuto della pagina di prova.</p></body></html>
+        """
+        result.cleaned_html = result.html
+        result.markdown = "# Titolo della pagina\n\nContenuto della pagina di prova."
+        result.metadata = {'title': 'Titolo della pagina'}
+        result.media = {}
+        result.links = {}
+        result.status_code = 200
+        result.response_time = 0.4
+        return result
+    
+    def test_issue_detector_shares_performance_analyzer(self, seo_analyzer):
+        assert seo_analyzer.issue_detector.performance_analyzer is seo_analyzer.performance_analyzer
+    
+    def test_analyze_full_returns_content_scores_and_issues(self, seo_analyzer, crawl_result):
+        result = seo_analyzer.analyze_full(crawl_result, "example.com")
+        
+        assert result['h1_tags'] == ["Titolo della pagina"]
+        assert 'technical_seo' in result
+        assert result['issues']
+        assert result['seo_score'] == seo_analyzer.scoring_engine.calculate_page_score(result['issues'])
+    
+    def test_analyze_full_is_memoized_per_crawl_result(self, seo_analyzer, crawl_result):
+        with patch.object(seo_analyzer.technical_seo_analyzer, 'analyze_technical_seo',
+                          wraps=seo_analyzer.technical_seo_analyzer.analyze_technical_seo) as technical:
+            first = seo_analyzer.analyze_full(crawl_result, "example.com")
+            second = seo_analyzer.analyze_full(crawl_result, "example.com")
+        
+        assert first == second
+        assert first is not second
+        assert technical.call_count == 1
+    
+    def test_analyze_full_memo_is_keyed_on_domain(self, seo_analyzer, crawl_result):
+        with patch.object(seo_analyzer.technical_seo_analyzer, 'analyze_technical_seo',
+                          wraps=seo_analyzer.technical_seo_analyzer.analyze_technical_seo) as technical:
+            seo_analyzer.analyze_full(crawl_result, "")
+            seo_analyzer.analyze_full(crawl_result, "example.com")
+        
+        assert technical.call_count == 2
+        assert [call.args[1] for call in technical.call_args_list] == ["", "example.com"]
+    
+    @pytest.mark.asyncio
+    async def test_content_and_issues_share_one_analysis(self, seo_analyzer, crawl_result):
+        with patch.object(seo_analyzer.accessibility_analyzer, 'analyze',
+                          wraps=seo_analyzer.accessibility_analyzer.analyze) as accessibility:
+            content = await seo_analyzer.analyze_page_content(crawl_result, "example.com")
+            issues = await seo_analyzer.analyze_page_issues(crawl_result, "example.com", 1)
+        
+        assert accessibility.call_count == 1
+        assert 'issues' not in content
+        assert issues
+
+class TestAnalysisPool:
+    """Test the picklable page snapshot used by the process-pool analysis backend"""
+    
+    @pytest.fixture
+    def crawl_result(self):
+        result = Mock()
+        result.url = "https://example.com/page"
+        result.html = '<html lang="it"><head><link rel="canonical" href="https://example.com/page"></head><body><h1>Titolo</h1></body></html>'
+        result.cleaned_html = result.html
+        result.markdown = Mock(raw_markdown="# Titolo")
+        result.metadata = {'title': 'Titolo'}
+        result.media = {'images': []}
+        result.links = {'internal': [], 'external': []}
+        result.status_code = 200
+        result.response_time = 0.3
+        return result
+    
+    def test_snapshot_is_picklable(self, crawl_result):
+        import pickle
+        
+        snapshot = PageSnapshot.from_crawl_result(crawl_result)
+        restored = pickle.loads(pickle.dumps(snapshot))
+        
+        assert restored == snapshot
+        assert restored.markdown == "# Titolo"
+    
+    def test_snapshot_analysis_matches_crawl_result_analysis(self, crawl_result):
+        from_snapshot = analyze_snapshot(PageSnapshot.from_crawl_result(crawl_result), "example.com", crawl_result.url)
+        from_result = analyze_page(SEOAnalyzer(), crawl_result, "example.com", crawl_result.url)
+        
+        assert from_snapshot['canonical_url'] == from_result['canonical_url'] == "https://example.com/page"
+        assert [i['type'] for i in from_snapshot['analysis']['issues']] == \
+            [i['type'] for i in from_result['analysis']['issues']]
+    
+    def test_pool_disabled_by_default_size(self):
+        assert get_analysis_pool(0) is None
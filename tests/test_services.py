@@ -1,11 +1,14 @@
 """
 Test service layer functionality
 """
+import os
 import pytest
+import pytest_asyncio
 from unittest.mock import Mock, patch, AsyncMock
 from datetime import datetime
 
 from app.services.scan_service import ScanService
+from app.services.scan_service_sync import SyncScanService
 from app.models import Scan, Website, Page, Issue
 from app.schemas.scan import ScanCreate
 
@@ -198,6 +201,7 @@ class TestScanServiceIntegration:
         # Add issues
         issue1 = Issue(
             page_id=page1.id,
+            scan_id=page1.scan_id,
             type="missing_h1",
             category="on_page",
             severity="high",
@@ -208,6 +212,7 @@ class TestScanServiceIntegration:
         )
         issue2 = Issue(
             page_id=page2.id,
+            scan_id=page2.scan_id,
             type="http_error_404",
             category="technical",
             severity="critical",
@@ -286,4 +291,1309 @@ class TestScanServiceScheduling:
         """Test scheduling automatic scans"""
         # This would test the automatic scheduling functionality
         # Implementation depends on the scheduling system used (Celery, APScheduler, etc.)
-        pass
\ No newline at end of file
+        pass
+
+class TestSyncScanStreaming:
+    """Test the streaming crawl -> analyze -> persist pipeline"""
+    
+    @staticmethod
+    def _crawl_result(url):
+        result = Mock()
+        result.url = url
+        result.html = "<html><head><title>Pagina</title></head><body><h1>Titolo</h1><p>Testo</p></body></html>"
+        result.cleaned_html = result.html
+        result.markdown = "# Titolo\n\nTesto"
+        result.metadata = {'title': 'Pagina', 'description': ''}
+        result.media = {}
+        result.links = {}
+        result.status_code = 200
+        result.response_time = 0.2
+        return result
+    
+    def _fake_crawler(self, urls):
+        results = [self._crawl_result(url) for url in urls]
+        
+        async def _stream():
+            for result in results:
+                yield result
+        
+        crawler = AsyncMock()
+        crawler.__aenter__.return_value = crawler
+        strategy = Mock()
+        strategy.arun = AsyncMock(return_value=_stream())
+        return crawler, strategy
+    
+    def test_pages_are_persisted_in_batches(self):
+        urls = [f"https://example.com/page-{i}" for i in range(5)] + ["https://example.com/logo.png"]
+        crawler, strategy = self._fake_crawler(urls)
+        service = SyncScanService()
+        db = Mock()
+        db.scalars.side_effect = lambda statement, rows: Mock(all=Mock(return_value=list(range(len(rows)))))
+        scan = Mock(id=1)
+        website = Mock(domain="https://example.com", store_html_snapshots=False)
+        
+        with patch('app.services.scan_service_sync.AsyncWebCrawler', return_value=crawler), \
+             patch.object(service, '_build_crawl_configs', return_value=(Mock(), strategy, Mock())), \
+             patch.object(service, '_finalize_scan', side_effect=lambda db, scan, website, stats: stats), \
+             patch('app.services.scan_service_sync.settings') as settings:
+            settings.scan_pipeline_queue_size = 2
+            settings.scan_persist_batch_size = 2
+            settings.scan_analysis_workers = 2
+            settings.analysis_process_pool_size = 0
+            stats = service._run_streaming_scan(db, scan, website)
+        
+        assert stats['pages_found'] == 6
+        assert stats['pages_scanned'] == 5
+        assert stats['pages_filtered'] == 1
+        # 6 records in batches of 2 -> 3 intermediate commits, 5 pages in 3 bulk inserts
+        assert db.commit.call_count == 3
+        assert db.scalars.call_count == 3
+    
+    def test_store_page_record_counts_failures(self):
+        service = SyncScanService()
+        stats = service._new_scan_stats()
+        
+        service._store_page_record(Mock(), Mock(id=1), {'status': 'failed'}, stats)
+        service._store_page_record(Mock(), Mock(id=1), {'status': 'filtered'}, stats)
+        
+        assert stats['pages_found'] == 2
+        assert stats['pages_failed'] == 1
+        assert stats['pages_filtered'] == 1
+    
+    def test_post_process_sets_canonical_flags_and_url_issues(self, sync_db):
+        from sqlalchemy import select
+        
+        pages = [
+            Page(scan_id=1, url="https://example.com/a", canonical_url="https://example.com/a",
+                 url_structure_data={'url_issues': ['URL troppo lunga']}),
+            Page(scan_id=1, url="https://example.com/a?ref=1", canonical_url="https://example.com/a"),
+            Page(scan_id=1, url="https://example.com/b"),
+            Page(scan_id=1, url="https://example.com/c?x=1", canonical_url="https://example.com/c"),
+        ]
+        sync_db.add_all(pages)
+        sync_db.commit()
+        
+        SyncScanService()._post_process_duplicates_and_canonical(sync_db, Mock(id=1))
+        
+        rows = {url: (canonical_url, is_canonical) for url, canonical_url, is_canonical in sync_db.execute(
+            select(Page.url, Page.canonical_url, Page.is_canonical).where(Page.scan_id == 1)
+        )}
+        assert rows == {
+            "https://example.com/a": ("https://example.com/a", 1),
+            "https://example.com/a?ref=1": ("https://example.com/a", 0),
+            "https://example.com/b": ("https://example.com/b", 1),
+            "https://example.com/c?x=1": ("https://example.com/c", 1),
+        }
+        url_issues = sync_db.execute(select(Issue.page_id, Issue.description).where(Issue.type == 'url_structure_issue')).all()
+        assert url_issues == [(pages[0].id, 'URL troppo lunga')]
+
+
+class TestEnterprisePriorityQueue:
+    """Test concurrent fetching of the enterprise priority queue"""
+    
+    def _queue_manager(self, count, max_concurrent, lastmod=None):
+        from app.services.url_queue_manager import URLQueueManager, CrawlBudget
+        from app.services.url_discovery_service import DiscoveredURL, URLSource
+        
+        queue_manager = URLQueueManager(CrawlBudget(total_budget=count), max_concurrent=max_concurrent)
+        queue_manager.add_urls([
+            DiscoveredURL(url=f"https://example.com/page-{i}", source=URLSource.SITEMAP, lastmod=lastmod)
+            for i in range(count)
+        ])
+        return queue_manager
+    
+    def test_single_browser_with_bounded_concurrency(self):
+        import asyncio
+        from app.services.enterprise_scan_service import EnterpriseScanService
+        
+        state = {'active': 0, 'peak': 0}
+        
+        async def _arun(url, config):
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+            await asyncio.sleep(0.01)
+            state['active'] -= 1
+            return Mock(success=True, url=url)
+        
+        crawler = AsyncMock()
+        crawler.__aenter__.return_value = crawler
+        crawler.arun = _arun
+        
+        service = EnterpriseScanService()
+        queue_manager = self._queue_manager(count=12, max_concurrent=3)
+        db = Mock()
+        db.query.return_value.filter.return_value = []
+        
+        with patch('app.services.enterprise_scan_service.AsyncWebCrawler', return_value=crawler) as crawler_cls, \
+             patch.object(service, '_process_single_page_sync', return_value={'issues_count': 1}):
+            results = asyncio.run(service._process_priority_queue(db, Mock(id=1), Mock(robots_respect=True, incremental_scan=False), queue_manager))
+        
+        assert crawler_cls.call_count == 1
+        assert state['peak'] == 3
+        assert results['pages_scanned'] == 12
+        assert results['total_issues'] == 12
+    
+    def test_incremental_scan_skips_unchanged_sitemap_urls(self):
+        import asyncio
+        from datetime import datetime
+        from app.services.enterprise_scan_service import EnterpriseScanService
+        from app.services.incremental_scan import IncrementalScanState, PreviousPage
+        
+        lastmod = datetime(2025, 1, 1)
+        queue_manager = self._queue_manager(count=4, max_concurrent=2, lastmod=lastmod)
+        previous = {
+            f"https://example.com/page-{i}": PreviousPage(id=i, url=f"https://example.com/page-{i}", sitemap_lastmod=lastmod)
+            for i in range(2)
+        }
+        incremental = IncrementalScanState(Mock(), 7, previous)
+        crawler = AsyncMock()
+        crawler.__aenter__.return_value = crawler
+        crawler.arun = AsyncMock(side_effect=lambda url, config: Mock(success=True, url=url, html='<html></html>'))
+        
+        service = EnterpriseScanService()
+        db = Mock()
+        db.query.return_value.filter.return_value = []
+        
+        with patch('app.services.enterprise_scan_service.AsyncWebCrawler', return_value=crawler), \
+             patch('app.services.enterprise_scan_service.IncrementalScanState.load', return_value=incremental), \
+             patch.object(incremental, 'carry_forward', return_value=5) as carry_forward, \
+             patch.object(service, '_process_single_page_sync', return_value={'issues_count': 1}) as analyze:
+            results = asyncio.run(service._process_priority_queue(
+                db, Mock(id=8), Mock(robots_respect=True, incremental_scan=True, fetch_mode='browser'), queue_manager
+            ))
+        
+        # Both unchanged URLs are copied without a fetch, the other two are analyzed
+        assert crawler.arun.call_count == 2 and analyze.call_count == 2
+        carried = [previous_page.id for call in carry_forward.call_args_list for previous_page, _ in call.args[2]]
+        assert sorted(carried) == [0, 1]
+        assert results['pages_scanned'] == 4
+        assert results['incremental'] == {
+            'previous_scan_id': 7, 'sitemap_unchanged': 2, 'not_modified': 0, 'content_unchanged': 0
+        }
+    
+    def test_page_analysis_runs_off_the_event_loop(self):
+        import asyncio
+        import threading
+        from app.services.enterprise_scan_service import EnterpriseScanService
+        
+        crawler = AsyncMock()
+        crawler.__aenter__.return_value = crawler
+        crawler.arun = AsyncMock(side_effect=lambda url, config: Mock(success=True, url=url))
+        
+        service = EnterpriseScanService()
+        queue_manager = self._queue_manager(count=4, max_concurrent=2)
+        db = Mock()
+        db.query.return_value.filter.return_value = []
+        analysis_threads = []
+        
+        def _analyze_page(crawl_result, domain):
+            analysis_threads.append(threading.current_thread())
+            return {'issues': [], 'seo_score': 90}
+        
+        with patch('app.services.enterprise_scan_service.AsyncWebCrawler', return_value=crawler), \
+             patch('app.services.enterprise_scan_service.settings') as settings, \
+             patch.object(service.seo_analyzer, 'analyze_page', side_effect=_analyze_page), \
+             patch.object(service, '_process_single_page_sync', return_value={'issues_count': 0}) as store:
+            settings.analysis_process_pool_size = 0
+            settings.scan_analysis_workers = 2
+            asyncio.run(service._process_priority_queue(
+                db, Mock(id=1), Mock(robots_respect=True, incremental_scan=False, fetch_mode='browser'), queue_manager
+            ))
+        
+        assert len(analysis_threads) == 4
+        assert threading.main_thread() not in analysis_threads
+        assert all(call.args[4] == {'issues': [], 'seo_score': 90} for call in store.call_args_list)
+
+
+class TestPageFetcher:
+    """Test the HTTP fetch mode and its browser fallback"""
+    
+    STATIC_HTML = (
+        "<html><head><title>Chi siamo</title><meta name='description' content='Studio legale'></head>"
+        "<body><nav><a href='/contatti'>Contatti</a></nav><h1>Chi siamo</h1>"
+        "<p>" + "Testo del contenuto della pagina " * 20 + "</p>"
+        "<img src='/logo.png' alt=''><a href='https://other.example.org/'>Partner</a></body></html>"
+    )
+    SHELL_HTML = (
+        "<html><head><title>App</title><script src='/bundle.js'></script></head>"
+        "<body><div id='root'></div></body></html>"
+    )
+    
+    def _http_fetcher(self, pages):
+        import httpx
+        from app.services.page_fetcher import HttpFetcher
+        
+        def _handler(request):
+            html = pages.get(request.url.path)
+            if html is None:
+                return httpx.Response(404, text="not found", headers={'content-type': 'text/html'})
+            return httpx.Response(200, text=html, headers={'content-type': 'text/html; charset=utf-8'})
+        
+        fetcher = HttpFetcher(timeout=5, max_connections=5)
+        fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+        return fetcher
+    
+    def test_build_fetch_result_matches_crawl_result_shape(self):
+        from app.services.page_fetcher import build_fetch_result, looks_client_rendered
+        
+        result = build_fetch_result("https://example.com/chi-siamo", 200, self.STATIC_HTML, {})
+        
+        assert result.success
+        assert result.metadata['title'] == 'Chi siamo'
+        assert result.metadata['description'] == 'Studio legale'
+        assert result.links['internal'][0]['href'] == 'https://example.com/contatti'
+        assert result.links['external'][0]['href'] == 'https://other.example.org/'
+        assert result.media['images'][0]['src'] == 'https://example.com/logo.png'
+        # nav is stripped from the cleaned content
+        assert 'Contatti' not in result.markdown
+        assert not looks_client_rendered(result)
+    
+    def test_client_rendered_shell_detected(self):
+        from app.services.page_fetcher import build_fetch_result, looks_client_rendered
+        
+        result = build_fetch_result("https://example.com/", 200, self.SHELL_HTML, {})
+        
+        assert result.has_app_mount
+        assert looks_client_rendered(result)
+    
+    def test_auto_mode_falls_back_to_browser_only_for_shells(self):
+        import asyncio
+        from app.services.page_fetcher import PageFetcher
+        
+        browser = AsyncMock()
+        browser.__aenter__.return_value = browser
+        browser.arun = AsyncMock(return_value=Mock(success=True, url="https://example.com/app"))
+        browser_factory = Mock(return_value=browser)
+        http = self._http_fetcher({'/': self.STATIC_HTML, '/app': self.SHELL_HTML})
+        
+        async def _run():
+            async with PageFetcher('auto', Mock(), browser_factory=browser_factory, http_fetcher=http) as fetcher:
+                static = await fetcher.fetch("https://example.com/")
+                assert browser_factory.call_count == 0
+                shell = await fetcher.fetch("https://example.com/app")
+                return static, shell, fetcher.stats
+        
+        static, shell, stats = asyncio.run(_run())
+        
+        assert static.metadata['title'] == 'Chi siamo'
+        assert shell.url == "https://example.com/app"
+        assert stats['browser_fallbacks'] == 1
+        assert browser_factory.call_count == 1
+    
+    def test_http_deep_crawl_respects_limits(self):
+        import asyncio
+        from app.services.page_fetcher import PageFetcher
+        
+        pages = {
+            '/': "<html><body><a href='/a'>A</a><a href='/b'>B</a><a href='/c'>C</a></body></html>",
+            '/a': "<html><body><a href='/a/deep'>Deep</a></body></html>",
+            '/b': "<html><body>B</body></html>",
+            '/c': "<html><body>C</body></html>",
+            '/a/deep': "<html><body>Deep</body></html>",
+        }
+        
+        async def _run(max_depth, max_pages):
+            fetcher = PageFetcher('http', Mock(), http_fetcher=self._http_fetcher(pages))
+            async with fetcher:
+                return [
+                    result.url async for result in fetcher.deep_crawl(
+                        "https://example.com/", max_depth=max_depth, max_pages=max_pages, respect_robots=False
+                    )
+                ]
+        
+        assert len(asyncio.run(_run(max_depth=1, max_pages=100))) == 4
+        assert len(asyncio.run(_run(max_depth=5, max_pages=100))) == 5
+        assert len(asyncio.run(_run(max_depth=5, max_pages=2))) == 2
+    
+    def test_conditional_request_returns_not_modified(self):
+        import asyncio
+        import httpx
+        from app.services.page_fetcher import HttpFetcher, PageFetcher
+        
+        def _handler(request):
+            if request.headers.get('if-none-match') == '"v1"':
+                return httpx.Response(304, headers={'etag': '"v1"'})
+            return httpx.Response(200, text=self.STATIC_HTML, headers={'content-type': 'text/html', 'etag': '"v1"'})
+        
+        http = HttpFetcher(timeout=5, max_connections=5)
+        http._client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+        browser_factory = Mock()
+        
+        async def _run():
+            async with PageFetcher('browser', Mock(), browser_factory=browser_factory, http_fetcher=http) as fetcher:
+                unchanged = await fetcher.fetch("https://example.com/", {'If-None-Match': '"v1"'})
+                fetcher.fetch_mode = 'http'
+                changed = await fetcher.fetch("https://example.com/", {'If-None-Match': '"v0"'})
+                return unchanged, changed, fetcher.stats
+        
+        unchanged, changed, stats = asyncio.run(_run())
+        
+        assert unchanged.not_modified and not unchanged.success
+        assert browser_factory.call_count == 0  # no rendering for an unchanged page
+        assert changed.success and not changed.not_modified
+        assert changed.response_headers['etag'] == '"v1"'
+        assert stats['not_modified'] == 1
+
+
+class TestPageBatchWriter:
+    """Test bulk insertion of pages and issues"""
+    
+    def test_flush_assigns_page_ids_to_issues(self, sync_db):
+        from app.services.page_batch_writer import PageBatchWriter
+        
+        writer = PageBatchWriter(sync_db, flush_size=10)
+        writer.add_page({'scan_id': 1, 'url': 'https://example.com/a', 'title': 'A'}, [
+            {'type': 'title_too_short', 'category': 'on_page', 'severity': 'medium',
+             'title': 'Titolo troppo corto', 'description': 'Titolo corto', 'unknown_key': 'ignored'}
+        ])
+        writer.add_page({'scan_id': 1, 'url': 'https://example.com/b'}, [
+            {'type': 'h1_mancante', 'category': 'on_page', 'severity': 'high',
+             'title': 'H1 mancante', 'description': 'Nessun H1'},
+            {'type': 'image_missing_alt', 'category': 'on_page', 'severity': 'medium',
+             'title': 'Alt mancante', 'description': 'Immagine senza alt'}
+        ])
+        
+        page_ids = writer.flush()
+        sync_db.commit()
+        
+        pages = {page.url: page for page in sync_db.query(Page).all()}
+        assert [pages['https://example.com/a'].id, pages['https://example.com/b'].id] == page_ids
+        assert pages['https://example.com/b'].issues_count == 2
+        assert pages['https://example.com/a'].is_canonical == 1  # column defaults applied
+        assert sorted(issue.page_id for issue in sync_db.query(Issue).all()) == sorted(
+            [page_ids[0], page_ids[1], page_ids[1]]
+        )
+        assert writer.pages_written == 2 and writer.issues_written == 3
+        
+        # Resource rows are normalized on write
+        resources = {issue.type: issue.resources for issue in sync_db.query(Issue).all()}
+        assert resources['title_too_short'][0]['resource_type'] == 'title-tag'
+        assert resources['image_missing_alt'] == []
+        # scan_id is denormalized from the page row
+        assert {issue.scan_id for issue in sync_db.query(Issue).all()} == {1}
+    
+    def test_auto_flush_and_url_tracking(self, sync_db):
+        from app.services.page_batch_writer import PageBatchWriter
+        
+        writer = PageBatchWriter(sync_db, flush_size=2)
+        writer.mark_existing(1, ['https://example.com/old'])
+        for i in range(3):
+            writer.add_page({'scan_id': 1, 'url': f'https://example.com/{i}'})
+        
+        assert sync_db.query(Page).count() == 2
+        assert len(writer) == 1
+        assert writer.has_page(1, 'https://example.com/2')
+        assert writer.has_page(1, 'https://example.com/old')
+        assert not writer.has_page(2, 'https://example.com/2')
+
+    
+    def test_blocking_resources_are_indexed_once_per_scan(self, sync_db):
+        from app.models import ScanResource, ScanResourcePage
+        from app.services.page_batch_writer import PageBatchWriter
+        from app.services.scan_summary_service import compute_scan_summary
+        from app.services.seo_analyzer.core.resource_details import ResourceDetailsBuilder, IssueFactory
+        
+        def blocking_css(*urls):
+            return IssueFactory.create_consolidated_issue(
+                'blocking_css_resource', 'medium', 'performance', 'Render-Blocking CSS',
+                f'{len(urls)} CSS files block page rendering', 'Inline critical CSS',
+                [ResourceDetailsBuilder.blocking_css(url) for url in urls], score_impact=-4.0
+            )
+        
+        writer = PageBatchWriter(sync_db, flush_size=2)
+        writer.add_page({'scan_id': 1, 'url': 'https://example.com/a'}, [blocking_css('/theme.css', '/a.css')])
+        writer.add_page({'scan_id': 1, 'url': 'https://example.com/b'}, [blocking_css('/theme.css')])
+        writer.add_page({'scan_id': 1, 'url': 'https://example.com/c'}, [blocking_css('/theme.css')])
+        writer.flush()
+        sync_db.commit()
+        
+        page_ids = [page.id for page in sync_db.query(Page).order_by(Page.id)]
+        resources = {resource.url: resource for resource in sync_db.query(ScanResource).all()}
+        
+        def linked_pages(resource):
+            return sorted(link.page_id for link in sync_db.query(ScanResourcePage).filter(
+                ScanResourcePage.scan_resource_id == resource.id))
+        
+        # The third page arrives in a later flush and only appends its own reference row
+        assert linked_pages(resources['/theme.css']) == page_ids and resources['/theme.css'].page_count == 3
+        assert linked_pages(resources['/a.css']) == page_ids[:1]
+        assert resources['/theme.css'].details['resource_type'] == 'css'
+        
+        # One issue per resource instead of one per page, kept in sync with the page list
+        issues = {issue.id: issue for issue in sync_db.query(Issue).all()}
+        assert len(issues) == 2 and writer.issues_written == 2
+        theme_issue = issues[resources['/theme.css'].issue_id]
+        assert theme_issue.description.endswith('referenziata da 3 pagine')
+        assert theme_issue.resources[0]['resource_url'] == '/theme.css'
+        
+        # Every referencing page counts the shared issue, and the summary counts the same way
+        issues_count = {page.url: page.issues_count for page in sync_db.query(Page)}
+        assert issues_count == {'https://example.com/a': 2, 'https://example.com/b': 1, 'https://example.com/c': 1}
+        summary = compute_scan_summary(sync_db, 1, persist=False)
+        assert summary.total_issues == 4 == sum(issues_count.values())
+        assert summary.type_counts == {'medium': {'blocking_css_resource': 4}}
+        assert set(summary.top_affected_urls['blocking_css_resource']) == set(issues_count)
+
+
+
+class TestNearDuplicateDetection:
+    """Test SimHash signatures and scan-level near-duplicate clustering"""
+    
+    @staticmethod
+    def _words(seed, count=120):
+        import random
+        rng = random.Random(seed)
+        return [f"parola{rng.randint(0, 5000)}" for _ in range(count)]
+    
+    def test_signatures_and_clusters(self):
+        from app.services.seo_analyzer.core.simhash import simhash, hamming_distance, cluster_near_duplicates
+        
+        base = self._words(1)
+        facet = base[:-1] + ['variante']
+        other = self._words(2)
+        
+        assert simhash(base[:10]) is None  # too short to compare
+        assert hamming_distance(simhash(base), simhash(facet)) <= 3
+        assert hamming_distance(simhash(base), simhash(other)) > 3
+        
+        signatures = {'a': simhash(base), 'b': simhash(facet), 'c': simhash(other), 'd': simhash(base)}
+        assert [sorted(cluster) for cluster in cluster_near_duplicates(signatures)] == [['a', 'b', 'd']]
+    
+    def test_large_bucket_of_near_identical_signatures_stays_linear(self):
+        import random
+        from app.services.seo_analyzer.core import simhash as simhash_module
+        
+        # Template-heavy site: thousands of pages one bit away from the same boilerplate signature
+        rng = random.Random(7)
+        base = rng.getrandbits(64)
+        signatures = {f'page{i}': base ^ (1 << rng.randrange(64)) for i in range(3000)}
+        signatures['outlier'] = base ^ 0xFFFF_FFFF  # shares the upper bands, far in the lower ones
+        
+        with patch.object(simhash_module, 'hamming_distance', wraps=simhash_module.hamming_distance) as distance:
+            clusters = simhash_module.cluster_near_duplicates(signatures)
+        
+        assert len(clusters) == 1 and sorted(clusters[0]) == sorted(set(signatures) - {'outlier'})
+        assert distance.call_count < 5 * len(signatures)
+    
+    def test_detect_near_duplicates_assigns_groups_and_issues(self, sync_db):
+        from app.services.duplicate_detection import detect_near_duplicates
+        from app.services.seo_analyzer.core.simhash import simhash, format_simhash
+        
+        base = format_simhash(simhash(self._words(1)))
+        sync_db.add_all([
+            Page(scan_id=1, url='https://example.com/p', canonical_url='https://example.com/p', content_hash=base),
+            Page(scan_id=1, url='https://example.com/p?color=red', canonical_url='https://example.com/p', content_hash=base),
+            Page(scan_id=1, url='https://example.com/copy', content_hash=base),
+            Page(scan_id=1, url='https://example.com/other', content_hash=format_simhash(simhash(self._words(2)))),
+            Page(scan_id=1, url='https://example.com/legacy', content_hash='d41d8cd98f00b204e9800998ecf8427e'),
+        ])
+        sync_db.flush()
+        
+        counts = detect_near_duplicates(sync_db, 1)
+        
+        pages = {page.url: page for page in sync_db.query(Page).all()}
+        group = pages['https://example.com/p'].duplicate_group_id
+        assert group == 'dup_1_1'
+        assert pages['https://example.com/p?color=red'].duplicate_group_id == group
+        assert pages['https://example.com/copy'].duplicate_group_id == group
+        assert pages['https://example.com/other'].duplicate_group_id is None
+        assert counts == {'pages_with_signature': 4, 'clusters': 1, 'duplicate_pages': 3, 'issues': 1}
+        
+        # Only the uncanonicalized copy is flagged; the facet already points at the representative
+        issue = sync_db.query(Issue).one()
+        assert issue.page_id == pages['https://example.com/copy'].id
+        assert issue.type == 'contenuto_duplicato' and issue.scan_id == 1
+
+
+class TestIncrementalScan:
+    """Test reuse of unchanged pages from the previous scan"""
+    
+    def test_change_signals(self):
+        from datetime import datetime, timezone, timedelta
+        from app.services.html_snapshots import html_digest
+        from app.services.date_utils import lastmod_unchanged
+        from app.services.incremental_scan import PreviousPage, response_validators
+        
+        stored = datetime(2025, 1, 10, 12, 0)
+        assert lastmod_unchanged(stored, datetime(2025, 1, 10, 13, 0, tzinfo=timezone(timedelta(hours=1))))
+        assert not lastmod_unchanged(stored, datetime(2025, 1, 11, tzinfo=timezone.utc))
+        assert not lastmod_unchanged(None, stored)
+        
+        previous = PreviousPage(id=1, url='https://example.com/', etag='"v1"', last_modified='Fri, 10 Jan 2025 12:00:00 GMT')
+        assert previous.conditional_headers == {
+            'If-None-Match': '"v1"', 'If-Modified-Since': 'Fri, 10 Jan 2025 12:00:00 GMT'
+        }
+        assert PreviousPage(id=2, url='https://example.com/a').conditional_headers == {}
+        assert response_validators(Mock(response_headers={'ETag': '"v2"'})) == {'etag': '"v2"', 'last_modified': None}
+        assert html_digest('<html></html>') == html_digest('<html></html>') != html_digest('<html> </html>')
+    
+    def test_carry_forward_copies_pages_issues_and_resources(self, sync_db):
+        from datetime import datetime
+        from app.models import Scan, ScanResource, ScanResourcePage
+        from app.services.incremental_scan import IncrementalScanState
+        from app.services.page_batch_writer import PageBatchWriter
+        from app.services.seo_analyzer.core.resource_details import ResourceDetailsBuilder, IssueFactory
+        
+        blocking_css = IssueFactory.create_consolidated_issue(
+            'blocking_css_resource', 'medium', 'performance', 'Render-Blocking CSS',
+            '1 CSS file blocks page rendering', 'Inline critical CSS',
+            [ResourceDetailsBuilder.blocking_css('/theme.css')], score_impact=-4.0
+        )
+        sync_db.add_all([
+            Scan(id=1, website_id=1, status='completed', completed_at=datetime(2025, 1, 10)),
+            Scan(id=2, website_id=1, status='running')
+        ])
+        writer = PageBatchWriter(sync_db)
+        writer.add_page({'scan_id': 1, 'url': 'https://example.com/a', 'status_code': 200, 'title': 'A',
+                         'etag': '"a1"', 'html_hash': 'abc', 'seo_score': 80.0}, [
+            {'type': 'title_too_short', 'category': 'on_page', 'severity': 'medium',
+             'title': 'Titolo troppo corto', 'description': 'Titolo corto'},
+            blocking_css
+        ])
+        writer.add_page({'scan_id': 1, 'url': 'https://example.com/b', 'status_code': 200}, [blocking_css])
+        writer.flush()
+        sync_db.add(Issue(page_id=writer.pages_written, scan_id=1, type='contenuto_duplicato',
+                          category='content', severity='medium', title='Contenuto Duplicato', description='Duplicato'))
+        sync_db.commit()
+        
+        state = IncrementalScanState.load(sync_db, website_id=1, scan_id=2)
+        assert state.previous_scan_id == 1 and state.get('https://example.com/a').etag == '"a1"'
+        
+        writer = PageBatchWriter(sync_db)
+        carries = [(state.get(url), {'sitemap_lastmod': datetime(2025, 1, 1)})
+                   for url in ('https://example.com/a', 'https://example.com/b')]
+        assert state.carry_forward(writer, 2, carries) == 3
+        writer.flush()
+        sync_db.commit()
+        
+        pages = {page.url: page for page in sync_db.query(Page).filter(Page.scan_id == 2)}
+        assert pages['https://example.com/a'].title == 'A' and pages['https://example.com/a'].seo_score == 80.0
+        assert pages['https://example.com/a'].html_hash == 'abc'
+        assert pages['https://example.com/b'].sitemap_lastmod == datetime(2025, 1, 1)
+        
+        # Page issues are copied, scan-level issues are left to post-processing
+        copied = sync_db.query(Issue).filter(Issue.scan_id == 2).all()
+        assert sorted(issue.type for issue in copied) == ['blocking_css_resource', 'title_too_short']
+        # Site-wide resources are re-indexed for the new scan
+        resource = sync_db.query(ScanResource).filter(ScanResource.scan_id == 2).one()
+        assert resource.url == '/theme.css'
+        assert sorted(link.page_id for link in sync_db.query(ScanResourcePage).filter(
+            ScanResourcePage.scan_resource_id == resource.id)) == sorted(page.id for page in pages.values())
+        assert pages['https://example.com/a'].issues_count == 2 and pages['https://example.com/b'].issues_count == 1
+
+class TestDeletionService:
+    """Test set-based deletion of scans, websites and clients"""
+    
+    @staticmethod
+    def _seed(session):
+        from app.models import Client, Schedule
+        
+        client = Client(name="Cliente")
+        session.add(client)
+        session.flush()
+        website = Website(client_id=client.id, domain="https://example.com")
+        other = Website(client_id=client.id, domain="https://other.example.com")
+        session.add_all([website, other])
+        session.flush()
+        session.add(Schedule(website_id=website.id, frequency="weekly"))
+        scans = [Scan(website_id=website.id), Scan(website_id=website.id), Scan(website_id=other.id)]
+        session.add_all(scans)
+        session.flush()
+        for scan in scans:
+            for i in range(3):
+                page = Page(scan_id=scan.id, url=f"https://example.com/{scan.id}/{i}")
+                session.add(page)
+                session.flush()
+                session.add_all([
+                    Issue(page_id=page.id, scan_id=scan.id, type="h1_mancante", category="on_page", severity="high",
+                          title="H1 mancante", description="Nessun H1")
+                    for _ in range(2)
+                ])
+        session.commit()
+        return client.id, website.id, [scan.id for scan in scans]
+    
+    @pytest_asyncio.fixture
+    async def async_db(self, async_engine):
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        
+        async with async_sessionmaker(async_engine, expire_on_commit=False)() as session:
+            ids = await session.run_sync(self._seed)
+            yield session, ids
+    
+    @staticmethod
+    async def _counts(session):
+        from sqlalchemy import func, select
+        from app.models import Client, Schedule
+        
+        return {
+            model.__tablename__: (await session.execute(select(func.count()).select_from(model))).scalar_one()
+            for model in (Client, Website, Scan, Page, Issue, Schedule)
+        }
+    
+    @pytest.mark.asyncio
+    async def test_delete_scan_removes_only_its_rows(self, async_db):
+        from app.services.deletion_service import DeletionService
+        
+        session, (_, _, scan_ids) = async_db
+        deletion_service = DeletionService(session)
+        
+        assert await deletion_service.count_scan_issues(scan_ids[0]) == 6
+        counts = await deletion_service.delete_scan(scan_ids[0])
+        remaining = await self._counts(session)
+        
+        assert counts == {
+            'scan_resource_pages': 0, 'scan_resources': 0, 'issues': 6, 'html_snapshots': 0, 'pages': 3, 'scan_summaries': 0, 'scans': 1
+        }
+        assert remaining['scans'] == 2 and remaining['pages'] == 6 and remaining['issues'] == 12
+    
+    @pytest.mark.asyncio
+    async def test_delete_website_and_client_cascade(self, async_db):
+        from app.services.deletion_service import DeletionService
+        
+        session, (client_id, website_id, _) = async_db
+        deletion_service = DeletionService(session)
+        
+        await deletion_service.delete_website(website_id)
+        after_website = await self._counts(session)
+        await deletion_service.delete_client(client_id)
+        after_client = await self._counts(session)
+        
+        assert after_website == {'clients': 1, 'websites': 1, 'scans': 1, 'pages': 3, 'issues': 6, 'schedules': 0}
+        assert all(count == 0 for count in after_client.values())
+    
+    def test_purge_scan_in_chunks(self, sync_db):
+        from app.services.deletion_service import purge_scan_sync
+        
+        session = sync_db
+        _, _, scan_ids = self._seed(session)
+        session.commit = Mock(wraps=session.commit)
+        
+        counts = purge_scan_sync(session, scan_ids[1], chunk_size=2)
+        
+        assert counts == {'html_snapshots': 0, 'issues': 6, 'pages': 3, 'scans': 1}
+        # 2 page chunks + the scan row
+        assert session.commit.call_count == 3
+        assert session.query(Page).count() == 6
+
+
+class TestScanSummary:
+    """Test the precomputed scan summary"""
+    
+    def test_compute_scan_summary(self, sync_db):
+        from app.models import ScanSummary
+        from app.services.scan_summary_service import compute_scan_summary
+        
+        session = sync_db
+        pages = [
+            Page(scan_id=1, url="https://example.com/a", seo_score=80.0, performance_score=90.0,
+                 technical_score=70.0, mobile_score=80.0, has_schema_markup=1,
+                 core_web_vitals={'ttfb': 200}, technical_seo_data={'page_size': 1000}),
+            Page(scan_id=1, url="https://example.com/b", seo_score=60.0, performance_score=50.0,
+                 technical_score=50.0, mobile_score=60.0, has_schema_markup=0,
+                 core_web_vitals={'lcp': 2400}, technical_seo_data={'content_length': 3000}),
+            Page(scan_id=2, url="https://example.com/other", seo_score=10.0)
+        ]
+        session.add_all(pages)
+        session.flush()
+        issue_rows = [(pages[0], 'high', 'h1_mancante'), (pages[1], 'high', 'h1_mancante'),
+                      (pages[1], 'high', 'h1_mancante'), (pages[1], 'low', 'title_too_long'),
+                      (pages[2], 'critical', 'h1_mancante')]
+        session.add_all([
+            Issue(page_id=page.id, scan_id=page.scan_id, severity=severity, type=issue_type,
+                  category="on_page", title=issue_type, description=issue_type)
+            for page, severity, issue_type in issue_rows
+        ])
+        session.flush()
+        
+        summary = compute_scan_summary(session, 1)
+        session.commit()
+        
+        assert summary.total_pages == 2
+        assert summary.avg_performance_score == 70.0
+        assert summary.schema_coverage == 50.0
+        assert summary.mobile_coverage == 50.0
+        assert summary.avg_load_time == 1.3
+        assert summary.avg_page_size == 2000
+        assert summary.total_issues == 4
+        assert summary.severity_counts == {'high': 3, 'low': 1}
+        assert summary.type_counts == {'high': {'h1_mancante': 3}, 'low': {'title_too_long': 1}}
+        # Most affected page first
+        assert summary.top_affected_urls['h1_mancante'] == ["https://example.com/b", "https://example.com/a"]
+        
+        # Recomputing updates the same row
+        compute_scan_summary(session, 1)
+        session.commit()
+        assert session.query(ScanSummary).count() == 1
+    
+    def test_top_affected_urls_are_limited_per_type(self, sync_db):
+        from app.services.scan_summary_service import TOP_AFFECTED_URLS_LIMIT, compute_scan_summary
+        
+        pages = [Page(scan_id=1, url=f"https://example.com/{i:02d}") for i in range(TOP_AFFECTED_URLS_LIMIT + 5)]
+        sync_db.add_all(pages)
+        sync_db.flush()
+        # The last page has the issue twice and ranks first; ties are ordered by URL
+        sync_db.add_all([
+            Issue(page_id=page.id, scan_id=1, severity='medium', type='alt_mancante',
+                  category="on_page", title="Alt", description="Alt")
+            for page in pages + pages[-1:]
+        ])
+        sync_db.flush()
+        
+        summary = compute_scan_summary(sync_db, 1, persist=False)
+        
+        assert summary.top_affected_urls['alt_mancante'] == (
+            [pages[-1].url] + [page.url for page in pages[:TOP_AFFECTED_URLS_LIMIT - 1]]
+        )
+
+
+class TestIssueExplorerService:
+    """Test keyset pagination and grouped counts of the issue explorer"""
+    
+    @staticmethod
+    def _seed(session):
+        pages = [Page(scan_id=1, url="https://example.com/blog/a"), Page(scan_id=1, url="https://example.com/shop/b"),
+                 Page(scan_id=2, url="https://example.com/blog/c")]
+        session.add_all(pages)
+        session.flush()
+        rows = [(pages[0], 'high', 'h1_mancante')] * 3 + [(pages[1], 'high', 'h1_mancante')] * 2 + \
+               [(pages[1], 'critical', 'title_too_long'), (pages[2], 'high', 'h1_mancante')]
+        session.add_all([
+            Issue(page_id=page.id, scan_id=page.scan_id, severity=severity, type=issue_type,
+                  category="on_page", title=issue_type, description="Descrizione")
+            for page, severity, issue_type in rows
+        ])
+        session.commit()
+    
+    @pytest_asyncio.fixture
+    async def async_db(self, async_engine):
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        
+        async with async_sessionmaker(async_engine, expire_on_commit=False)() as session:
+            await session.run_sync(self._seed)
+            yield session
+    
+    @pytest.mark.asyncio
+    async def test_group_counts(self, async_db):
+        from app.services.issue_explorer_service import IssueExplorerService, IssueFilters
+        
+        service = IssueExplorerService(async_db)
+        groups = await service.group_counts(1)
+        assert groups == [
+            {'severity': 'critical', 'type': 'title_too_long', 'count': 1, 'pages': 1},
+            {'severity': 'high', 'type': 'h1_mancante', 'count': 5, 'pages': 2}
+        ]
+        
+        blog_groups = await service.group_counts(1, IssueFilters(url_prefix="https://example.com/blog/"))
+        assert blog_groups == [{'severity': 'high', 'type': 'h1_mancante', 'count': 3, 'pages': 1}]
+    
+    @pytest.mark.asyncio
+    async def test_keyset_pages_cover_all_issues(self, async_db):
+        from app.services.issue_explorer_service import IssueExplorerService, IssueFilters
+        
+        service = IssueExplorerService(async_db)
+        filters = IssueFilters(severity='high', type='h1_mancante')
+        seen, cursor = [], None
+        while True:
+            items, cursor = await service.list_issues(1, filters, after_id=cursor, limit=2)
+            seen.extend(items)
+            if cursor is None:
+                break
+        
+        assert len(seen) == 5
+        assert [item['id'] for item in seen] == sorted({item['id'] for item in seen})
+        assert {item['page_url'] for item in seen} == {"https://example.com/blog/a", "https://example.com/shop/b"}
+    
+    @pytest.mark.asyncio
+    async def test_list_resources_falls_back_to_page_level(self, async_db):
+        from app.services.issue_explorer_service import IssueExplorerService, IssueFilters
+        
+        resources, cursor = await IssueExplorerService(async_db).list_resources(1, IssueFilters(type='title_too_long'))
+        assert cursor is None
+        assert resources[0]['resource_type'] == 'title-tag'
+        assert resources[0]['page_url'] == "https://example.com/shop/b"
+
+
+class TestIssueResources:
+    """Test write-time normalization of issue resource details"""
+    
+    def test_consolidated_element_becomes_resource_rows(self):
+        from app.services.issue_resources import normalize_issue_resources, RESOURCE_FIELDS
+        from app.services.seo_analyzer.core.resource_details import IssueFactory, ResourceDetailsBuilder
+        
+        issue = IssueFactory.create_consolidated_issue(
+            'blocking_css_resource', 'medium', 'performance', 'CSS bloccante', 'Risorse CSS bloccanti',
+            'Carica il CSS in modo asincrono',
+            [ResourceDetailsBuilder.blocking_css('https://example.com/a.css'),
+             ResourceDetailsBuilder.blocking_css('https://example.com/b.css')]
+        )
+        rows = normalize_issue_resources(issue['type'], issue['element'], issue['description'])
+        
+        assert [row['resource_url'] for row in rows] == ['https://example.com/a.css', 'https://example.com/b.css']
+        assert all(tuple(row) == RESOURCE_FIELDS and row['resource_type'] == 'css' for row in rows)
+    
+    def test_resource_rows_parse_legacy_issues(self):
+        from app.services.issue_resources import resource_rows
+        
+        stored = resource_rows([{'resource_url': 'https://example.com/a.js', 'resource_type': 'javascript',
+                                 'optimization': '', 'title': '', 'content': ''}], 'https://example.com/')
+        assert stored[0]['page_url'] == 'https://example.com/'
+        
+        # Issues stored before normalization (NULL) are parsed on read
+        legacy = resource_rows(None, 'https://example.com/', 'meta_desc_too_long', None, 'Troppo lunga')
+        assert legacy[0]['resource_type'] == 'meta-description'
+        assert legacy[0]['optimization'] == 'Meta description troppo lunga. Troppo lunga'
+
+
+class TestReportService:
+    """Test cached PDF report generation"""
+    
+    @pytest.fixture
+    def report_db(self, sync_db):
+        from app.models import Client
+        
+        client = Client(name="Cliente")
+        sync_db.add(client)
+        sync_db.flush()
+        website = Website(client_id=client.id, domain="https://example.com")
+        sync_db.add(website)
+        sync_db.flush()
+        scan = Scan(website_id=website.id, status="completed", completed_at=datetime.now())
+        sync_db.add(scan)
+        sync_db.flush()
+        for i in range(30):
+            page = Page(scan_id=scan.id, url=f"https://example.com/{i}", status_code=200 if i % 3 else 404,
+                        title=f"Pagina {i}" if i % 5 else None, response_time=100.0)
+            sync_db.add(page)
+            sync_db.flush()
+            sync_db.add(Issue(page_id=page.id, scan_id=scan.id, type="meta", category="on_page",
+                              severity="critical" if i == 0 else "medium", title="Meta", description="Meta tag"))
+        sync_db.commit()
+        return sync_db, scan.id
+    
+    def test_collect_report_data(self, report_db):
+        from app.services.report_service import ReportService, REPORT_ISSUES_LIMIT, REPORT_PAGES_LIMIT
+        
+        session, scan_id = report_db
+        data = ReportService().collect_report_data(session, scan_id)
+        
+        assert data.total_pages == 30 and data.total_issues == 30
+        assert data.severity_counts == {'critical': 1, 'medium': 29}
+        assert data.error_pages == 10 and data.untitled_pages == 6
+        assert data.avg_response_time == 100.0
+        assert data.issue_types == {'meta'}
+        assert len(data.issue_rows) <= REPORT_ISSUES_LIMIT and data.issue_rows[0][3] == "https://example.com/0"
+        assert len(data.page_rows) == REPORT_PAGES_LIMIT
+    
+    def test_build_cached_report(self, report_db, tmp_path):
+        from app.services import report_service
+        from app.services.report_cache import ReportArtifactCache
+        
+        session, scan_id = report_db
+        cache = ReportArtifactCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+        
+        path = report_service.build_cached_report(session, scan_id, cache)
+        scan = session.get(Scan, scan_id)
+        state = report_service.report_state(scan)
+        assert path == cache.path_for(scan_id, state['digest'])
+        assert open(path, 'rb').read(4) == b'%PDF'
+        assert state['status'] == 'ready'
+        assert report_service.cached_report_path(scan) == path
+        
+        # Same inputs map to the same artifact: no second render, even with the state reset
+        scan.config = {}
+        with patch.object(report_service.ReportService, 'generate_scan_report') as generate:
+            assert report_service.build_cached_report(session, scan_id, cache) == path
+            generate.assert_not_called()
+
+
+class TestReportArtifactCache:
+    """Test the content-addressed report cache"""
+    
+    @staticmethod
+    def _render(size):
+        def render(target):
+            with open(target, 'wb') as f:
+                f.write(b'x' * size)
+        return render
+    
+    def test_put_supersedes_older_artifacts_of_the_scan(self, tmp_path):
+        from app.services.report_cache import ReportArtifactCache, report_digest
+        
+        cache = ReportArtifactCache(str(tmp_path), max_bytes=1000)
+        digest = report_digest({'report_version': 1, 'issues': 3})
+        assert digest == report_digest({'issues': 3, 'report_version': 1})
+        
+        old = cache.put(1, 'a' * 64, self._render(10))
+        new = cache.put(1, digest, self._render(10))
+        other = cache.put(12, 'b' * 64, self._render(10))
+        
+        assert not os.path.exists(old)
+        assert cache.get(1, digest) == new
+        assert cache.get(12, 'b' * 64) == other
+        assert cache.get(1, 'a' * 64) is None
+    
+    def test_evicts_least_recently_used(self, tmp_path):
+        from app.services.report_cache import ReportArtifactCache
+        
+        cache = ReportArtifactCache(str(tmp_path), max_bytes=250)
+        first = cache.put(1, 'a' * 64, self._render(100))
+        second = cache.put(2, 'b' * 64, self._render(100))
+        os.utime(first, (1, 1))
+        os.utime(second, (2, 2))
+        cache.get(1, 'a' * 64)  # first becomes the most recently used
+        
+        third = cache.put(3, 'c' * 64, self._render(100))
+        
+        assert os.path.exists(first) and os.path.exists(third)
+        assert not os.path.exists(second)
+        assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+class TestFetchCache:
+    """Test the persistent on-disk fetch cache"""
+    
+    def test_round_trip_and_freshness(self, tmp_path):
+        import time
+        from app.services.fetch_cache import FetchCache
+        
+        cache = FetchCache(max_age=60, directory=str(tmp_path))
+        path = cache.put("https://Example.com/chi-siamo#team", 200, "<html>Città</html>".encode('utf-8'),
+                         headers={'etag': '"v1"'}, final_url="https://example.com/chi-siamo/")
+        
+        entry = cache.get("https://example.com/chi-siamo")
+        assert entry.text == "<html>Città</html>"
+        assert entry.url == "https://example.com/chi-siamo/" and entry.headers == {'etag': '"v1"'}
+        assert os.path.getsize(path) < 200  # stored compressed
+        
+        assert FetchCache(max_age=60, directory=str(tmp_path)).get("https://example.com/other") is None
+        stale = FetchCache(max_age=60, directory=str(tmp_path))
+        with patch('app.services.fetch_cache.time.time', return_value=time.time() + 120):
+            assert stale.get("https://example.com/chi-siamo") is None
+        assert stale.stats == {'hits': 0, 'misses': 1, 'stores': 0}
+        
+        assert FetchCache.for_website(Mock(fetch_cache_max_age=None)) is None
+        assert FetchCache.for_website(Mock(fetch_cache_max_age=3600)).max_age == 3600
+    
+    def test_evicts_least_recently_used(self, tmp_path):
+        import random
+        from app.services.fetch_cache import FetchCache
+        
+        body = random.Random(1).randbytes(200)  # incompressible
+        cache = FetchCache(max_age=60, directory=str(tmp_path), max_bytes=800)
+        first = cache.put("https://example.com/1", 200, body)
+        second = cache.put("https://example.com/2", 200, body)
+        os.utime(first, (1, 1))
+        os.utime(second, (2, 2))
+        assert cache.get("https://example.com/1") is not None  # first becomes the most recently used
+        
+        third = cache.put("https://example.com/3", 200, body)
+        
+        assert os.path.exists(first) and os.path.exists(third)
+        assert not os.path.exists(second)
+    
+    def test_eviction_frees_room_for_many_puts(self, tmp_path):
+        import random
+        from app.services.fetch_cache import FetchCache
+        
+        body = random.Random(1).randbytes(200)
+        cache = FetchCache(max_age=60, directory=str(tmp_path), max_bytes=30_000)
+        with patch.object(cache, '_entries', wraps=cache._entries) as scans:
+            for i in range(200):
+                cache.put(f"https://example.com/{i}", 200, body)
+        
+        # ~100 puts past the cap, each eviction clears ~10% of the cache
+        assert scans.call_count <= 12
+        assert cache._total_size() <= 30_000
+    
+    def test_page_fetcher_serves_cached_pages_without_browser(self, tmp_path):
+        import asyncio
+        from app.services.fetch_cache import FetchCache
+        from app.services.page_fetcher import PageFetcher
+        
+        html = "<html><head><title>Chi siamo</title></head><body><a href='/contatti'>Contatti</a></body></html>"
+        browser = AsyncMock()
+        browser.__aenter__.return_value = browser
+        browser.arun = AsyncMock(return_value=Mock(
+            success=True, url="https://example.com/", status_code=200, html=html, response_headers={}
+        ))
+        browser_factory = Mock(return_value=browser)
+        
+        async def _run():
+            results = []
+            for _ in range(2):
+                cache = FetchCache(max_age=3600, directory=str(tmp_path))
+                async with PageFetcher('browser', Mock(), browser_factory=browser_factory, cache=cache) as fetcher:
+                    results.append((await fetcher.fetch("https://example.com/"), fetcher.stats))
+            return results
+        
+        (live, live_stats), (cached, cached_stats) = asyncio.run(_run())
+        
+        assert browser.arun.call_count == 1
+        assert live_stats['browser'] == 1 and cached_stats['cached'] == 1
+        assert cached.metadata['title'] == 'Chi siamo'
+        assert cached.links['internal'][0]['href'] == 'https://example.com/contatti'
+    
+    def test_browser_sites_keep_the_deep_crawl_strategy_with_a_cache(self):
+        from app.services.scan_service_sync import SyncScanService
+        
+        assert not SyncScanService._uses_page_fetcher(Mock(fetch_mode='browser', fetch_cache_max_age=3600))
+        assert SyncScanService._uses_page_fetcher(Mock(fetch_mode='auto', fetch_cache_max_age=None))
+
+
+class TestHtmlSnapshots:
+    """Test raw HTML snapshot storage and re-analysis of a scan from snapshots"""
+    
+    def test_snapshots_are_deduplicated_and_round_trip(self, sync_db):
+        from app.models import HtmlSnapshot
+        from app.services.html_snapshots import PendingSnapshot, html_digest, load_snapshots
+        from app.services.page_batch_writer import PageBatchWriter
+        from app.services.deletion_service import purge_scan_sync
+        
+        html = "<html><body>" + "Città " * 200 + "</body></html>"
+        snapshot = PendingSnapshot.from_html(html)
+        assert snapshot.content_hash == html_digest(html) and len(snapshot.data) < snapshot.size
+        
+        sync_db.add_all([Scan(id=1, website_id=1), Scan(id=2, website_id=1)])
+        writer = PageBatchWriter(sync_db)
+        writer.add_page({'scan_id': 1, 'url': 'https://example.com/a'}, snapshot=PendingSnapshot.from_html(html))
+        writer.add_page({'scan_id': 1, 'url': 'https://example.com/b'}, snapshot=PendingSnapshot.from_html(html))
+        writer.flush()
+        writer.add_page({'scan_id': 2, 'url': 'https://example.com/a'}, snapshot=PendingSnapshot.from_html(html))
+        writer.flush()
+        sync_db.commit()
+        
+        assert sync_db.query(HtmlSnapshot).count() == 1
+        assert {page.html_hash for page in sync_db.query(Page)} == {snapshot.content_hash}
+        assert load_snapshots(sync_db, [snapshot.content_hash, 'missing']) == {snapshot.content_hash: html}
+        
+        # A snapshot is removed with the last scan referencing it
+        assert purge_scan_sync(sync_db, 1)['html_snapshots'] == 0
+        assert purge_scan_sync(sync_db, 2)['html_snapshots'] == 1
+        assert sync_db.query(HtmlSnapshot).count() == 0
+    
+    def test_reanalyze_scan_rewrites_issues_and_scores(self, sync_db):
+        from app.models import Website, ScanSummary
+        from app.services.html_snapshots import PendingSnapshot
+        from app.services.page_batch_writer import PageBatchWriter
+        from app.services.scan_reanalysis import reanalyze_scan_sync
+        
+        html = (
+            "<html><head><title>Servizi di consulenza SEO a Milano per PMI</title></head>"
+            "<body><h1>Consulenza SEO</h1><p>" + "Analisi tecnica dei siti web aziendali. " * 30 + "</p></body></html>"
+        )
+        sync_db.add_all([
+            Website(id=1, client_id=1, name='Example', domain='https://example.com'),
+            Scan(id=1, website_id=1, status='completed', total_issues=2, seo_score=10.0)
+        ])
+        writer = PageBatchWriter(sync_db)
+        # Stored as a duplicate of another URL; the snapshot has no canonical link any more
+        writer.add_page({'scan_id': 1, 'url': 'https://example.com/servizi', 'status_code': 200, 'seo_score': 10.0,
+                         'canonical_url': 'https://example.com/vecchia', 'is_canonical': 0}, [
+            {'type': 'obsolete_rule', 'category': 'on_page', 'severity': 'high',
+             'title': 'Regola obsoleta', 'description': 'Non più valida'},
+            {'type': 'url_structure_issue', 'category': 'technical', 'severity': 'medium',
+             'title': 'URL Structure Issue', 'description': 'URL troppo lungo'}
+        ], snapshot=PendingSnapshot.from_html(html))
+        writer.add_page({'scan_id': 1, 'url': 'https://example.com/vecchia', 'status_code': 200, 'seo_score': 50.0}, [
+            {'type': 'obsolete_rule', 'category': 'on_page', 'severity': 'high',
+             'title': 'Regola obsoleta', 'description': 'Non più valida'}
+        ])
+        writer.flush()
+        sync_db.commit()
+        
+        with patch('app.services.scan_reanalysis.get_analysis_pool', return_value=None):
+            result = reanalyze_scan_sync(sync_db, 1)
+        
+        assert result['pages_reanalyzed'] == 1 and result['pages_without_snapshot'] == 1
+        page = sync_db.query(Page).filter(Page.url == 'https://example.com/servizi').one()
+        assert page.title == 'Servizi di consulenza SEO a Milano per PMI'
+        assert page.canonical_url == page.url and page.is_canonical == 1 and page.technical_seo_data
+        issue_types = [issue.type for issue in sync_db.query(Issue).filter(Issue.page_id == page.id)]
+        assert 'obsolete_rule' not in issue_types and 'url_structure_issue' in issue_types
+        # Counted like the summary: the kept URL issue is one of the page's issue rows
+        assert page.issues_count == len(issue_types)
+        # Pages without a snapshot keep their stored results
+        assert sync_db.query(Issue).filter(Issue.type == 'obsolete_rule').count() == 1
+        assert result['total_issues'] == page.issues_count + 1
+        summary = sync_db.query(ScanSummary).filter(ScanSummary.scan_id == 1).one()
+        assert summary.total_issues == result['total_issues']
+
+
+class TestSitemapParser:
+    """Test streaming sitemap parsing"""
+    
+    @staticmethod
+    def _request(body: bytes, chunk_size: int = 64, sent: list = None, status: int = 200, headers: dict = None):
+        response = Mock(status=status, url="https://example.com/sitemap.xml.gz", headers=headers or {})
+        
+        async def _iter_chunked(size):
+            for start in range(0, len(body), chunk_size):
+                if sent is not None:
+                    sent.append(start)
+                yield body[start:start + chunk_size]
+        
+        response.content.iter_chunked = _iter_chunked
+        request = AsyncMock()
+        request.__aenter__.return_value = response
+        return request
+    
+    def _session(self, body: bytes, chunk_size: int = 64, sent: list = None):
+        return Mock(get=Mock(return_value=self._request(body, chunk_size, sent)))
+    
+    def test_streams_gzipped_urls_before_download_completes(self):
+        import asyncio
+        import gzip
+        from app.services.sitemap_parser import SitemapParser, SitemapStream
+        
+        entries = ''.join(
+            f'<url><loc>https://example.com/p{i}</loc><lastmod>2025-01-10</lastmod>'
+            f'<image:image><image:loc>https://example.com/p{i}.jpg</image:loc></image:image></url>'
+            for i in range(200)
+        )
+        body = gzip.compress((
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+            'xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">' + entries + '</urlset>'
+        ).encode('utf-8'))
+        sent = []
+        parser = SitemapParser()
+        parser.session = self._session(body, sent=sent)
+        
+        async def _run():
+            stream = SitemapStream(parser, "https://example.com/sitemap.xml.gz")
+            received = []
+            async for url in parser.stream_sitemap("https://example.com/sitemap.xml.gz", stream):
+                # (url, chunks received so far, entries still held under the root)
+                received.append((url, len(sent), len(stream._open[0]) if stream._open else 0))
+            return stream, received
+        
+        stream, received = asyncio.run(_run())
+        
+        assert [url.url for url, _, _ in received] == [f'https://example.com/p{i}' for i in range(200)]
+        assert received[0][0].image_data == {'image_url': 'https://example.com/p0.jpg'}
+        assert received[0][0].lastmod.year == 2025 and not stream.is_index
+        assert received[0][1] < len(sent)
+        assert max(held for _, _, held in received) <= 1
+    
+    def test_sitemap_index_and_truncated_documents(self):
+        import asyncio
+        from app.services.sitemap_parser import SitemapParser
+        
+        index = (
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            '<sitemap><loc>https://example.com/news-1.xml</loc><lastmod>2025-01-10T08:00:00+00:00</lastmod></sitemap>'
+            '<sitemap><loc>https://example.com/news-2.xml</loc></sitemap>'
+            '</sitemapindex>'
+        ).encode('utf-8')
+        parser = SitemapParser()
+        parser.session = self._session(index, chunk_size=16)
+        urls, sitemap_index = asyncio.run(parser.parse_sitemap("https://example.com/sitemap_index.xml"))
+        
+        assert urls == [] and sitemap_index.total_sitemaps == 2
+        assert sitemap_index.sitemaps[0]['url'] == 'https://example.com/news-1.xml'
+        assert sitemap_index.sitemaps[0]['lastmod'].day == 10
+        
+        parser.session = self._session(b'<urlset><url><loc>https://example.com/a</loc></url><url><loc>')
+        assert asyncio.run(parser.parse_sitemap("https://example.com/sitemap.xml")) == ([], None)
+    
+    def test_url_priority_is_computed_once_per_parse(self):
+        from datetime import datetime, timezone
+        from app.services.sitemap_parser import SitemapURL, ChangeFrequency, parse_sitemap_datetime
+        
+        reference = datetime(2025, 1, 10, 12, 0)
+        url = SitemapURL(url="https://example.com/blog/post", priority=0.8, changefreq=ChangeFrequency.DAILY,
+                         lastmod=datetime(2025, 1, 10, 8, 0, tzinfo=timezone.utc), reference_time=reference)
+        # 0.8 * 0.8 + 0.2 recency - 0.2 depth
+        assert url.calculated_priority == pytest.approx(0.64)
+        assert SitemapURL(url="https://example.com/blog/post", priority=0.8, changefreq=ChangeFrequency.DAILY,
+                          lastmod=datetime(2024, 1, 1), reference_time=reference).calculated_priority == pytest.approx(0.44)
+        assert not hasattr(url, '__dict__')
+        
+        assert parse_sitemap_datetime('2025-01-10T08:00:00Z') == datetime(2025, 1, 10, 8, 0, tzinfo=timezone.utc)
+        assert parse_sitemap_datetime('2025-01-10T08:00:00.123+01:00').utcoffset().seconds == 3600
+        assert parse_sitemap_datetime('2025-01-10') == datetime(2025, 1, 10)
+        assert parse_sitemap_datetime('1850-01-01') is None
+        assert parse_sitemap_datetime('10/01/2025') is None
+    
+    def test_unchanged_child_sitemaps_are_not_downloaded_again(self, sync_db):
+        import asyncio
+        from datetime import datetime
+        from app.models import SitemapSnapshot
+        from app.services.enterprise_scan_service import EnterpriseScanService
+        from app.services.sitemap_parser import SitemapParser, sitemap_content_hash
+        
+        bodies = {
+            'https://example.com/sitemap_index.xml': (
+                b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                b'<sitemap><loc>https://example.com/news.xml</loc><lastmod>2025-01-10</lastmod></sitemap>'
+                b'<sitemap><loc>https://example.com/pages.xml</loc><lastmod>2025-01-10</lastmod></sitemap>'
+                b'</sitemapindex>'
+            ),
+            'https://example.com/news.xml': b'<urlset><url><loc>https://example.com/news/1</loc></url></urlset>',
+            'https://example.com/pages.xml': b'<urlset><url><loc>https://example.com/chi-siamo</loc></url></urlset>',
+        }
+        requests = {}
+        
+        def _get(url, headers=None):
+            requests[url] = dict(headers or {})
+            if url.endswith('pages.xml'):
+                status = 304 if requests[url].get('If-None-Match') == '"pages-v1"' else 200
+                return self._request(bodies[url], status=status, headers={'ETag': '"pages-v1"'})
+            return self._request(bodies[url])
+        
+        async def _discover(parser):
+            parser.session = Mock(get=_get)
+            parsed = await parser._parse_sitemaps_recursive(['https://example.com/sitemap_index.xml'], set())
+            return sorted(url.url for url in parsed['urls'])
+        
+        session = sync_db
+        service = EnterpriseScanService()
+        website = Mock(id=1)
+        
+        # First discovery downloads every sitemap and snapshots each of them
+        parser = SitemapParser(known_sitemaps=service._load_known_sitemaps(website, session))
+        assert asyncio.run(_discover(parser)) == ['https://example.com/chi-siamo', 'https://example.com/news/1']
+        service._store_sitemap_snapshots(
+            website, {'sources': {'sitemap': {'sitemaps': list(parser.sitemap_states.values())}}}, session
+        )
+        snapshots = {snapshot.sitemap_url: snapshot for snapshot in session.query(SitemapSnapshot)}
+        pages = snapshots['https://example.com/pages.xml']
+        assert pages.content_hash == sitemap_content_hash(bodies['https://example.com/pages.xml'])
+        assert pages.urls_count == 1 and pages.etag == '"pages-v1"'
+        assert pages.parent_sitemap_url == 'https://example.com/sitemap_index.xml'
+        assert pages.index_lastmod.date() == datetime(2025, 1, 10).date()
+        assert snapshots['https://example.com/sitemap_index.xml'].child_sitemaps_count == 2
+        
+        # pages.xml is older in the stored index lastmod, so it is re-checked conditionally;
+        # news.xml has the same lastmod as before and is not requested at all
+        pages.index_lastmod = datetime(2025, 1, 9)
+        session.commit()
+        requests.clear()
+        parser = SitemapParser(known_sitemaps=service._load_known_sitemaps(website, session))
+        
+        assert asyncio.run(_discover(parser)) == ['https://example.com/chi-siamo', 'https://example.com/news/1']
+        assert 'https://example.com/news.xml' not in requests
+        assert requests['https://example.com/pages.xml'] == {'If-None-Match': '"pages-v1"'}
+        assert parser.sitemap_states['https://example.com/news.xml'].outcome == 'lastmod_unchanged'
+        assert parser.sitemap_states['https://example.com/pages.xml'].outcome == 'not_modified'
+        assert not any(state.has_changed for state in parser.sitemap_states.values())
+    
+    def test_monitoring_hashes_gzipped_sitemaps_like_discovery(self):
+        import asyncio
+        import gzip
+        from app.services.sitemap_parser import sitemap_content_hash
+        from app.tasks.monitoring_tasks import _check_sitemap
+        
+        body = b'<urlset><url><loc>https://example.com/chi-siamo</loc></url></urlset>'
+        snapshot = Mock(content_hash=sitemap_content_hash(body), etag='"v1"', last_modified=None, urls_count=1)
+        db = Mock(execute=AsyncMock(return_value=Mock(scalar_one_or_none=Mock(return_value=snapshot))))
+        client = AsyncMock()
+        client.__aenter__.return_value = client
+        client.get.return_value = Mock(status_code=200, content=gzip.compress(body), headers={'etag': '"v2"'})
+        
+        with patch('app.tasks.monitoring_tasks.httpx.AsyncClient', return_value=client):
+            assert asyncio.run(_check_sitemap(db, Mock(id=1), 'example.com')) is False
+        
+        # Unchanged content keeps the snapshot holding the URL records; only its validators move
+        db.add.assert_not_called()
+        assert snapshot.etag == '"v2"'